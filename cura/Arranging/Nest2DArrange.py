@@ -1,9 +1,13 @@
 # Copyright (c) 2020 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
 
+import concurrent.futures
+import os
+import threading
+
 import numpy
 from pynest2d import Point, Box, Item, NfpConfig, nest
-from typing import List, TYPE_CHECKING, Optional, Tuple
+from typing import Dict, List, TYPE_CHECKING, Optional, Tuple, Union
 
 from UM.Application import Application
 from UM.Decorators import deprecated
@@ -17,6 +21,7 @@ from UM.Operations.GroupedOperation import GroupedOperation
 from UM.Operations.RotateOperation import RotateOperation
 from UM.Operations.TranslateOperation import TranslateOperation
 from cura.Arranging.Arranger import Arranger
+from cura.Utils.WorkerProcesses import createWorkerProcessPool
 
 if TYPE_CHECKING:
     from UM.Scene.SceneNode import SceneNode
@@ -24,6 +29,17 @@ if TYPE_CHECKING:
 
 
 class Nest2DArrange(Arranger):
+    _strategies = ["CENTER"] * 3 + ["BOTTOM_LEFT"] * 3  # Starting points to try, until all items fit.
+    _parallel_nesting_minimum_item_count = 50
+    _executor_lock = threading.Lock()
+    _executor = None  # type: Optional[concurrent.futures.ProcessPoolExecutor]
+    _is_shutdown_connected = False
+
+    _cache_lock = threading.Lock()
+    _converted_points_cache = {}  # type: Dict[bytes, List[Point]]
+    _maximum_cache_size = 1024
+    _disallowed_area_cache = None  # type: Optional[Tuple[Tuple, List[numpy.ndarray]]]
+
     def __init__(self,
                  nodes_to_arrange: List["SceneNode"],
                  build_volume: "BuildVolume",
@@ -46,29 +62,117 @@ class Nest2DArrange(Arranger):
         self._factor = factor
         self._lock_rotation = lock_rotation
 
-    def findNodePlacement(self) -> Tuple[bool, List[Item]]:
+    def findNodePlacement(self) -> Tuple[bool, List[Union[Item, "_PlacedItem"]]]:
         spacing = int(1.5 * self._factor)  # 1.5mm spacing.
 
         edge_disallowed_size = self._build_volume.getEdgeDisallowedSize()
         machine_width = self._build_volume.getWidth() - (edge_disallowed_size * 2)
         machine_depth = self._build_volume.getDepth() - (edge_disallowed_size * 2)
-        build_plate_bounding_box = Box(int(machine_width * self._factor), int(machine_depth * self._factor))
+        box_size = (int(machine_width * self._factor), int(machine_depth * self._factor))
+        build_plate_bounding_box = Box(*box_size)
 
         if self._fixed_nodes is None:
             self._fixed_nodes = []
 
         # Add all the items we want to arrange
-        node_items = []
+        item_points = []
         for node in self._nodes_to_arrange:
             hull_polygon = node.callDecoration("getConvexHull")
             if not hull_polygon or hull_polygon.getPoints is None:
                 Logger.log("w", "Object {} cannot be arranged because it has no convex hull.".format(node.getName()))
                 continue
-            converted_points = []
-            for point in hull_polygon.getPoints():
-                converted_points.append(Point(int(point[0] * self._factor), int(point[1] * self._factor)))
-            item = Item(converted_points)
-            node_items.append(item)
+            item_points.append(self._toIntegerPoints(hull_polygon.getPoints()))
+        node_items = [Item(self._getConvertedPoints(points)) for points in item_points]
+
+        disallowed_points = self._getDisallowedAreaPoints(machine_width, machine_depth)
+
+        fixed_points = []
+        for node in self._fixed_nodes:
+            hull_polygon = node.callDecoration("getConvexHull")
+
+            if hull_polygon is not None and hull_polygon.getPoints() is not None and len(
+                    hull_polygon.getPoints()) > 2:  # numpy array has to be explicitly checked against None
+                fixed_points.append(self._toIntegerPoints(hull_polygon.getPoints()))
+
+        strategies = list(self._strategies)
+        num_bins = nest(node_items + self._createFixedItems(fixed_points, disallowed_points), build_plate_bounding_box, spacing, self._createConfig(strategies.pop(0), self._lock_rotation))
+        found_solution_for_all = num_bins == 1
+        if found_solution_for_all:
+            return found_solution_for_all, node_items
+
+        if self._shouldNestInParallel(len(node_items)):
+            result = self._nestInParallel(strategies, item_points, fixed_points, disallowed_points, box_size, spacing)
+            if result is not None:
+                return result
+
+        while not found_solution_for_all and len(strategies) > 0:
+            # The items of the fixed nodes and the disallowed areas are created again, so that every try avoids them.
+            num_bins = nest(node_items + self._createFixedItems(fixed_points, disallowed_points), build_plate_bounding_box, spacing, self._createConfig(strategies.pop(0), self._lock_rotation))
+            found_solution_for_all = num_bins == 1
+
+        return found_solution_for_all, node_items
+
+    @staticmethod
+    def _createConfig(strategy: str, lock_rotation: bool) -> NfpConfig:
+        config = NfpConfig()
+        config.accuracy = 1.0
+        config.alignment = NfpConfig.Alignment.CENTER
+        config.starting_point = getattr(NfpConfig.Alignment, strategy)
+
+        if lock_rotation:
+            config.rotations = [0.0]
+        return config
+
+    @staticmethod
+    def _createFixedItems(fixed_points: List[numpy.ndarray], disallowed_points: List[numpy.ndarray]) -> List[Item]:
+        """Create the items that the arranged items must stay clear of, which are new for every call to nest."""
+
+        items = []
+        for points in disallowed_points:
+            disallowed_area = Item(Nest2DArrange._getConvertedPoints(points))
+            disallowed_area.markAsDisallowedAreaInBin(0)
+            items.append(disallowed_area)
+        for points in fixed_points:
+            item = Item(Nest2DArrange._getConvertedPoints(points))
+            item.markAsFixedInBin(0)
+            items.append(item)
+        return items
+
+    def _toIntegerPoints(self, points: numpy.ndarray) -> numpy.ndarray:
+        """Scale the points of a polygon to the integer coordinates of the library, all at once."""
+
+        return (numpy.asarray(points, dtype = numpy.float64) * self._factor).astype(numpy.int64)
+
+    @classmethod
+    def _getConvertedPoints(cls, points: numpy.ndarray) -> List[Point]:
+        """Get the points of a polygon in integer coordinates as points of the library.
+
+        Multiplied objects all have the same convex hull, and the fixed nodes rarely change between arrangements, so the
+        points are only created once for every polygon.
+        """
+
+        key = points.tobytes()
+        with cls._cache_lock:
+            converted_points = cls._converted_points_cache.get(key)
+        if converted_points is None:
+            converted_points = [Point(x, y) for x, y in points.tolist()]
+            with cls._cache_lock:
+                if len(cls._converted_points_cache) >= cls._maximum_cache_size:
+                    cls._converted_points_cache.clear()
+                cls._converted_points_cache[key] = converted_points
+        return converted_points
+
+    def _getDisallowedAreaPoints(self, machine_width: float, machine_depth: float) -> List[numpy.ndarray]:
+        """Get the disallowed areas of the build volume in integer coordinates, clipped to the build plate.
+
+        Clipping the areas takes a while, so they are only clipped again when the build volume changed.
+        """
+
+        disallowed_areas = self._build_volume.getDisallowedAreas()
+        key = (machine_width, machine_depth, self._factor, tuple(area.getPoints().tobytes() for area in disallowed_areas if area.getPoints() is not None))
+        with self._cache_lock:
+            if self._disallowed_area_cache is not None and self._disallowed_area_cache[0] == key:
+                return self._disallowed_area_cache[1]
 
         # Use a tiny margin for the build_plate_polygon (the nesting doesn't like overlapping disallowed areas)
         half_machine_width = 0.5 * machine_width - 1
@@ -80,54 +184,95 @@ class Nest2DArrange(Arranger):
             [half_machine_width, half_machine_depth]
         ], numpy.float32))
 
-        disallowed_areas = self._build_volume.getDisallowedAreas()
+        disallowed_points = []
         for area in disallowed_areas:
-            converted_points = []
-
             # Clip the disallowed areas so that they don't overlap the bounding box (The arranger chokes otherwise)
             clipped_area = area.intersectionConvexHulls(build_plate_polygon)
 
             if clipped_area.getPoints() is not None and len(
                     clipped_area.getPoints()) > 2:  # numpy array has to be explicitly checked against None
-                for point in clipped_area.getPoints():
-                    converted_points.append(Point(int(point[0] * self._factor), int(point[1] * self._factor)))
+                disallowed_points.append(self._toIntegerPoints(clipped_area.getPoints()))
 
-                disallowed_area = Item(converted_points)
-                disallowed_area.markAsDisallowedAreaInBin(0)
-                node_items.append(disallowed_area)
+        with self._cache_lock:
+            Nest2DArrange._disallowed_area_cache = (key, disallowed_points)
+        return disallowed_points
 
-        for node in self._fixed_nodes:
-            converted_points = []
-            hull_polygon = node.callDecoration("getConvexHull")
+    @classmethod
+    def _shouldNestInParallel(cls, item_count: int) -> bool:
+        """Whether the other strategies are worth trying in separate processes at the same time.
 
-            if hull_polygon is not None and hull_polygon.getPoints() is not None and len(
-                    hull_polygon.getPoints()) > 2:  # numpy array has to be explicitly checked against None
-                for point in hull_polygon.getPoints():
-                    converted_points.append(Point(int(point[0] * self._factor), int(point[1] * self._factor)))
-                item = Item(converted_points)
-                item.markAsFixedInBin(0)
-                node_items.append(item)
-
-        strategies = [NfpConfig.Alignment.CENTER] * 3 + [NfpConfig.Alignment.BOTTOM_LEFT] * 3
-        found_solution_for_all = False
-        while not found_solution_for_all and len(strategies) > 0:
-            config = NfpConfig()
-            config.accuracy = 1.0
-            config.alignment = NfpConfig.Alignment.CENTER
-            config.starting_point = strategies[0]
-            strategies = strategies[1:]
+        Waiting for the processes would freeze the interface, so that's only done when arranging in a job.
+        """
 
-            if self._lock_rotation:
-                config.rotations = [0.0]
+        if item_count < cls._parallel_nesting_minimum_item_count or (os.cpu_count() or 1) < 2:
+            return False
+        if threading.current_thread() is threading.main_thread():
+            return False
+        return bool(Application.getInstance().getPreferences().getValue("cura/arrange_in_parallel"))
 
-            num_bins = nest(node_items, build_plate_bounding_box, spacing, config)
+    @classmethod
+    def _getExecutor(cls) -> concurrent.futures.ProcessPoolExecutor:
+        """Get the processes to nest in, which are started the first time they're needed and then kept.
 
-            # Strip the fixed items (previously placed) and the disallowed areas from the results again.
-            node_items = list(filter(lambda item: not item.isFixed(), node_items))
+        Must be called with the executor lock held.
+        """
 
-            found_solution_for_all = num_bins == 1
+        if Nest2DArrange._executor is None:
+            Nest2DArrange._executor = createWorkerProcessPool(min(os.cpu_count() or 1, len(cls._strategies) - 1), __name__, __file__)
+            if not Nest2DArrange._is_shutdown_connected:
+                Application.getInstance().applicationShuttingDown.connect(cls._stopExecutor)
+                Nest2DArrange._is_shutdown_connected = True
+        return Nest2DArrange._executor
+
+    @classmethod
+    def _stopExecutor(cls) -> None:
+        """Stop the processes to nest in, including any strategies they are still trying."""
+
+        with cls._executor_lock:
+            cls._stopExecutorLocked()
+
+    @staticmethod
+    def _stopExecutorLocked() -> None:
+        executor = Nest2DArrange._executor
+        if executor is None:
+            return
+        Nest2DArrange._executor = None
+        # The library can't be interrupted while nesting, so the processes are terminated. The executor has no public
+        # way to do that before Python 3.14.
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait = False, cancel_futures = True)
+        for process in processes:
+            process.terminate()
+
+    def _nestInParallel(self, strategies: List[str], item_points: List[numpy.ndarray], fixed_points: List[numpy.ndarray],
+                        disallowed_points: List[numpy.ndarray], box_size: Tuple[int, int], spacing: int) -> Optional[Tuple[bool, List["_PlacedItem"]]]:
+        """Try the other strategies at the same time, each in a process of its own.
+
+        Like when trying them one after the other, the result of the first strategy that fits all items is used, or the
+        result of the last strategy if none of them do. If the strategies after that one are still being tried, the
+        processes are stopped, and new ones are started for the next arrangement.
+
+        :return: Whether all items fit, and the placement of the items, or None if the processes failed.
+        """
 
-        return found_solution_for_all, node_items
+        Logger.log("d", "Arranging %s objects with %s strategies in parallel.", len(item_points), len(strategies))
+        with self._executor_lock:
+            result = None
+            futures = []  # type: List[concurrent.futures.Future]
+            try:
+                executor = self._getExecutor()
+                futures = [executor.submit(_nestWithStrategy, item_points, fixed_points, disallowed_points, box_size, spacing, strategy, self._lock_rotation) for strategy in strategies]
+                for future in futures:
+                    num_bins, placements = future.result()
+                    result = num_bins == 1, [_PlacedItem(*placement) for placement in placements]
+                    if num_bins == 1:
+                        break
+            except Exception:
+                Logger.logException("w", "Failed to arrange the objects in parallel, trying the strategies one after the other instead.")
+                result = None
+            if result is None or not all(future.done() for future in futures):
+                self._stopExecutorLocked()
+        return result
 
     def createGroupOperationForArrange(self, add_new_nodes_in_scene: bool = False) -> Tuple[GroupedOperation, int]:
         scene_root = Application.getInstance().getController().getScene().getRoot()
@@ -156,9 +301,43 @@ class Nest2DArrange(Arranger):
         return grouped_operation, not_fit_count
 
 
+class _PlacedItem:
+    """The placement of an item that was arranged in another process, with the same getters as the items of the library."""
+
+    def __init__(self, bin_id: int, x: int, y: int, rotation: float) -> None:
+        self._bin_id = bin_id
+        self._translation = Point(x, y)
+        self._rotation = rotation
+
+    def binId(self) -> int:
+        return self._bin_id
+
+    def translation(self) -> Point:
+        return self._translation
+
+    def rotation(self) -> float:
+        return self._rotation
+
+    def isFixed(self) -> bool:
+        return False
+
+
+def _nestWithStrategy(item_points: List[numpy.ndarray], fixed_points: List[numpy.ndarray], disallowed_points: List[numpy.ndarray],
+                      box_size: Tuple[int, int], spacing: int, strategy: str, lock_rotation: bool) -> Tuple[int, List[Tuple[int, int, int, float]]]:
+    """Arrange items with one strategy, in a worker process.
+
+    The items of the library can't be sent between processes, so the points are sent, and the placements are sent back.
+    :return: The number of bins that were needed, and the bin, translation and rotation of every item to arrange.
+    """
+
+    node_items = [Item(Nest2DArrange._getConvertedPoints(points)) for points in item_points]
+    num_bins = nest(node_items + Nest2DArrange._createFixedItems(fixed_points, disallowed_points), Box(*box_size), spacing, Nest2DArrange._createConfig(strategy, lock_rotation))
+    return num_bins, [(item.binId(), item.translation().x(), item.translation().y(), item.rotation()) for item in node_items]
+
+
 @deprecated("Use the Nest2DArrange class instead")
 def findNodePlacement(nodes_to_arrange: List["SceneNode"], build_volume: "BuildVolume",
-                      fixed_nodes: Optional[List["SceneNode"]] = None, factor=10000) -> Tuple[bool, List[Item]]:
+                      fixed_nodes: Optional[List["SceneNode"]] = None, factor=10000) -> Tuple[bool, List[Union[Item, "_PlacedItem"]]]:
     arranger = Nest2DArrange(nodes_to_arrange, build_volume, fixed_nodes, factor=factor)
     return arranger.findNodePlacement()
 
@@ -1,10 +1,12 @@
 # Copyright (c) 2021 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
 
+import collections
 import numpy
 import math
+import threading
 
-from typing import List, Optional, TYPE_CHECKING, Any, Set, cast, Iterable, Dict
+from typing import List, Optional, TYPE_CHECKING, Any, Set, cast, Iterable, Dict, Tuple
 
 from UM.Logger import Logger
 from UM.Mesh.MeshData import MeshData
@@ -29,6 +31,8 @@ from UM.View.GL.OpenGL import OpenGL
 
 from cura.Settings.GlobalStack import GlobalStack
 from cura.Scene.CuraSceneNode import CuraSceneNode
+from cura.Scene.DisallowedAreasJob import DisallowedAreas, DisallowedAreaSettings, DisallowedAreasJob, StackSettingsSnapshot
+from cura.Scene.SpatialGrid import SpatialGrid
 from cura.Settings.ExtruderManager import ExtruderManager
 
 from PyQt6.QtCore import QTimer
@@ -82,10 +86,20 @@ class BuildVolume(SceneNode):
         self._disallowed_areas_no_brim = []  # type: List[Polygon]
         self._disallowed_area_mesh = None  # type: Optional[MeshData]
         self._disallowed_area_size = 0.
+        self._disallowed_areas_generation = 0  # Changes whenever the disallowed areas are replaced.
+        self._disallowed_area_rectangles = None  # type: Optional[Tuple[int, numpy.ndarray]]  # The bounding rectangles of the disallowed areas, with the generation of the areas they are of.
+
+        # The result of the last boundary check of each node, with the state of the node that it was checked for.
+        self._node_boundary_results = {}  # type: Dict[int, Tuple[Tuple, bool]]
+        self._node_boundary_volume_state = None  # type: Optional[Tuple]
 
         self._error_areas = []  # type: List[Polygon]
         self._error_mesh = None  # type: Optional[MeshData]
 
+        self._disallowed_areas_job = None  # type: Optional[DisallowedAreasJob]
+        self._computed_disallowed_areas = collections.OrderedDict()  # type: collections.OrderedDict[str, DisallowedAreas]  # The last computed areas, by the settings they were computed from.
+        self._computed_disallowed_areas_lock = threading.Lock()
+
         self.setCalculateBoundingBox(False)
         self._volume_aabb = None  # type: Optional[AxisAlignedBox]
 
@@ -247,6 +261,7 @@ class BuildVolume(SceneNode):
 
     def setDisallowedAreas(self, areas: List[Polygon]):
         self._disallowed_areas = areas
+        self._disallowed_areas_generation += 1
 
     def render(self, renderer):
         if not self.getMeshData() or not self.isVisible():
@@ -297,6 +312,15 @@ class BuildVolume(SceneNode):
             # In that situation there is a model, but no machine (and therefore no build volume.
             return
 
+        extruder_enabled = tuple(extruder.isEnabled for extruder in self._global_container_stack.extruderList)
+        volume_state = (build_volume_bounding_box.minimum.x, build_volume_bounding_box.minimum.y, build_volume_bounding_box.minimum.z,
+                        build_volume_bounding_box.maximum.x, build_volume_bounding_box.maximum.y, build_volume_bounding_box.maximum.z,
+                        self._disallowed_areas_generation, extruder_enabled)
+        if volume_state != self._node_boundary_volume_state:
+            self._node_boundary_results.clear()
+            self._node_boundary_volume_state = volume_state
+
+        nodes_to_check = []  # type: List[CuraSceneNode]
         for node in nodes:
             # Need to check group nodes later
             if node.callDecoration("isGroup"):
@@ -305,31 +329,32 @@ class BuildVolume(SceneNode):
             if node.callDecoration("isSliceable") or node.callDecoration("isGroup"):
                 if not isinstance(node, CuraSceneNode):
                     continue
+                nodes_to_check.append(node)
+
+        # Only the nodes that changed since the last check need to be checked again.
+        node_states = [self._getNodeBoundaryState(node) for node in nodes_to_check]
+        changed_nodes = []  # type: List[Tuple[CuraSceneNode, Tuple]]
+        for node, node_state in zip(nodes_to_check, node_states):
+            last_result = self._node_boundary_results.get(id(node))
+            if last_result is not None and last_result[0] == node_state:
+                node.setOutsideBuildArea(last_result[1])
+            else:
+                changed_nodes.append((node, node_state))
 
-                if node.collidesWithBbox(build_volume_bounding_box):
-                    node.setOutsideBuildArea(True)
-                    continue
+        # Find the disallowed areas near each node all at once, so the exact intersections are only tested for those.
+        nearby_areas = self._getNearbyDisallowedAreas([node_state[1] for node, node_state in changed_nodes])
 
-                if node.collidesWithAreas(self.getDisallowedAreas()):
-                    node.setOutsideBuildArea(True)
-                    continue
-                # If the entire node is below the build plate, still mark it as outside.
-                node_bounding_box = node.getBoundingBox()
-                if node_bounding_box and node_bounding_box.top < 0 and not node.getParent().callDecoration("isGroup"):
-                    node.setOutsideBuildArea(True)
-                    continue
-                # Mark the node as outside build volume if the set extruder is disabled
-                extruder_position = node.callDecoration("getActiveExtruderPosition")
-                try:
-                    if not self._global_container_stack.extruderList[int(extruder_position)].isEnabled and not node.callDecoration("isGroup"):
-                        node.setOutsideBuildArea(True)
-                        continue
-                except IndexError:  # Happens when the extruder list is too short. We're not done building the printer in memory yet.
-                    continue
-                except TypeError:  # Happens when extruder_position is None. This object has no extruder decoration.
-                    continue
+        for (node, node_state), node_areas in zip(changed_nodes, nearby_areas):
+            outside = self._isNodeOutsideBuildArea(node, build_volume_bounding_box, node_areas)
+            if outside is None:
+                continue
+            node.setOutsideBuildArea(outside)
+            self._node_boundary_results[id(node)] = (node_state, outside)
 
-                node.setOutsideBuildArea(False)
+        checked_node_ids = {id(node) for node in nodes_to_check}
+        for node_id in list(self._node_boundary_results.keys()):
+            if node_id not in checked_node_ids:
+                del self._node_boundary_results[node_id]
 
         # Group nodes should override the _outside_buildarea property of their children.
         for group_node in group_nodes:
@@ -345,6 +370,73 @@ class BuildVolume(SceneNode):
             for child_node in children:
                 child_node.setOutsideBuildArea(group_node.isOutsideBuildArea())
 
+    def _isNodeOutsideBuildArea(self, node: CuraSceneNode, build_volume_bounding_box: AxisAlignedBox, disallowed_areas: List[Polygon]) -> Optional[bool]:
+        """Whether a node is outside of the build area, or None if that can't be told yet.
+
+        :param disallowed_areas: The disallowed areas that may overlap with the node.
+        """
+
+        if node.collidesWithBbox(build_volume_bounding_box):
+            return True
+
+        if disallowed_areas and node.collidesWithAreas(disallowed_areas):
+            return True
+        # If the entire node is below the build plate, still mark it as outside.
+        node_bounding_box = node.getBoundingBox()
+        if node_bounding_box and node_bounding_box.top < 0 and not node.getParent().callDecoration("isGroup"):
+            return True
+        # Mark the node as outside build volume if the set extruder is disabled
+        extruder_position = node.callDecoration("getActiveExtruderPosition")
+        try:
+            if not self._global_container_stack.extruderList[int(extruder_position)].isEnabled and not node.callDecoration("isGroup"):
+                return True
+        except IndexError:  # Happens when the extruder list is too short. We're not done building the printer in memory yet.
+            return None
+        except TypeError:  # Happens when extruder_position is None. This object has no extruder decoration.
+            return None
+
+        return False
+
+    @staticmethod
+    def _getNodeBoundaryState(node: CuraSceneNode) -> Tuple:
+        """Get everything of a node that the boundary check depends on, to tell whether it needs to be checked again.
+
+        :return: A tuple of which the second element is the bounding rectangle of the printing area of the node.
+        """
+
+        bounding_box = node.getBoundingBox()
+        bounding_box_state = None  # type: Optional[Tuple[float, ...]]
+        if bounding_box is not None:
+            bounding_box_state = (bounding_box.minimum.x, bounding_box.minimum.y, bounding_box.minimum.z, bounding_box.maximum.x, bounding_box.maximum.y, bounding_box.maximum.z)
+        printing_area = node.callDecoration("getPrintingArea")
+        printing_area_points = None  # type: Optional[bytes]
+        printing_area_rectangle = None
+        if printing_area is not None and printing_area.isValid():
+            printing_area_points = printing_area.getPoints().tobytes()
+            printing_area_rectangle = SpatialGrid.getPolygonRectangle(printing_area)
+        parent = node.getParent()
+        return bounding_box_state, printing_area_rectangle, printing_area_points, node.callDecoration("getActiveExtruderPosition"), node.callDecoration("isGroup"), parent is not None and parent.callDecoration("isGroup")
+
+    def _getNearbyDisallowedAreas(self, rectangles: List[Optional[Tuple[float, float, float, float]]]) -> List[List[Polygon]]:
+        """Get the disallowed areas of which the bounding rectangles overlap with each of the given rectangles.
+
+        :param rectangles: Bounding rectangles of printing areas, or None if a printing area has no points.
+        """
+
+        if not rectangles:
+            return []
+        disallowed_areas = self._disallowed_areas
+        if self._disallowed_area_rectangles is None or self._disallowed_area_rectangles[0] != self._disallowed_areas_generation:
+            area_rectangles = [SpatialGrid.getPolygonRectangle(area) for area in disallowed_areas]
+            # Areas without points never overlap anything.
+            self._disallowed_area_rectangles = self._disallowed_areas_generation, numpy.array([rectangle if rectangle is not None else (numpy.inf, numpy.inf, -numpy.inf, -numpy.inf) for rectangle in area_rectangles], dtype = numpy.float64).reshape(-1, 4)
+        area_rectangles = self._disallowed_area_rectangles[1]
+
+        node_rectangles = numpy.array([rectangle if rectangle is not None else (numpy.inf, numpy.inf, -numpy.inf, -numpy.inf) for rectangle in rectangles], dtype = numpy.float64)
+        overlapping = (node_rectangles[:, None, 0] <= area_rectangles[None, :, 2]) & (area_rectangles[None, :, 0] <= node_rectangles[:, None, 2]) \
+                    & (node_rectangles[:, None, 1] <= area_rectangles[None, :, 3]) & (area_rectangles[None, :, 1] <= node_rectangles[:, None, 3])
+        return [[disallowed_areas[index] for index in numpy.flatnonzero(row)] for row in overlapping]
+
     def checkBoundsAndUpdate(self, node: CuraSceneNode, bounds: Optional[AxisAlignedBox] = None) -> None:
         """Update the outsideBuildArea of a single node, given bounds or current build volume
 
@@ -761,7 +853,7 @@ class BuildVolume(SceneNode):
 
         # We only want to update all of them once.
         if update_disallowed_areas:
-            self._updateDisallowedAreas()
+            self._updateDisallowedAreasInBackground()
 
         if update_raft_thickness:
             self._updateRaftThickness()
@@ -804,24 +896,97 @@ class BuildVolume(SceneNode):
         which would hit performance.
         """
 
-        self._updateDisallowedAreas()
+        self._updateDisallowedAreasInBackground()
         self._updateRaftThickness()
         self._extra_z_clearance = self._calculateExtraZClearance(ExtruderManager.getInstance().getUsedExtruderStacks())
         self.rebuild()
 
     def _updateDisallowedAreas(self) -> None:
+        """Computes the disallowed areas right away."""
+
         if not self._global_container_stack:
             return
 
-        self._error_areas = []
+        self._cancelDisallowedAreasJob()
+        self._setDisallowedAreas(self._computeDisallowedAreas(self._getDisallowedAreaSettings()))
+
+    def _updateDisallowedAreasInBackground(self) -> None:
+        """Computes the disallowed areas in a job, and rebuilds the build volume when they are done.
+
+        The settings are taken from the stacks right away, so the areas are the same as when they are computed right
+        away. If the settings change again before the job is done, its result is discarded.
+        """
+
+        if not self._global_container_stack:
+            return
+
+        self._cancelDisallowedAreasJob()
+        settings = self._getDisallowedAreaSettings()
+        with self._computed_disallowed_areas_lock:
+            computed_areas = self._computed_disallowed_areas.get(settings.getKey())
+        if computed_areas is not None:
+            self._setDisallowedAreas(computed_areas)
+            return
+
+        self._disallowed_areas_job = DisallowedAreasJob(self._computeDisallowedAreas, settings)
+        self._disallowed_areas_job.finished.connect(self._onDisallowedAreasJobFinished)
+        self._disallowed_areas_job.start()
+
+    def _cancelDisallowedAreasJob(self) -> None:
+        if self._disallowed_areas_job is not None:
+            self._disallowed_areas_job.cancel()
+            self._disallowed_areas_job = None
+
+    def _onDisallowedAreasJobFinished(self, job: DisallowedAreasJob) -> None:
+        if job.isCancelled() or job is not self._disallowed_areas_job:
+            return
+        self._disallowed_areas_job = None
+        self._setDisallowedAreas(job.getResult())
+        self.rebuild()
+
+    def _getDisallowedAreaSettings(self) -> DisallowedAreaSettings:
+        """Take a snapshot of the settings that the disallowed areas are computed from."""
 
         used_extruders = ExtruderManager.getInstance().getUsedExtruderStacks()
+        active_extruders = ExtruderManager.getInstance().getActiveExtruderStacks()
         self._edge_disallowed_size = None  # Force a recalculation
-        disallowed_border_size = self.getEdgeDisallowedSize()
+        border_size = self.getEdgeDisallowedSize()
+
+        global_stack = StackSettingsSnapshot(self._global_container_stack, self._disallowed_area_global_settings, {"nozzle_offsetting_for_disallowed_areas": True})
+        return DisallowedAreaSettings(global_stack = global_stack,
+                                      used_extruders = [StackSettingsSnapshot(extruder, self._disallowed_area_extruder_settings) for extruder in used_extruders],
+                                      active_extruders = [StackSettingsSnapshot(extruder, self._disallowed_area_extruder_settings) for extruder in active_extruders],
+                                      border_size = border_size,
+                                      shape = self._shape)
+
+    def _setDisallowedAreas(self, areas: DisallowedAreas) -> None:
+        self._disallowed_areas = list(areas.disallowed_areas)
+        self._disallowed_areas_generation += 1
+        self._disallowed_areas_no_brim = list(areas.disallowed_areas_no_brim)
+        self._error_areas = list(areas.error_areas)
+        self._has_errors = len(self._error_areas) > 0
+
+    def _computeDisallowedAreas(self, settings: DisallowedAreaSettings) -> DisallowedAreas:
+        """Computes the disallowed areas from a snapshot of the settings, which can be done in another thread.
+
+        The areas that were computed for the last few snapshots are remembered, to reuse them for the same settings.
+        """
 
-        result_areas = self._computeDisallowedAreasStatic(disallowed_border_size, used_extruders)  # Normal machine disallowed areas can always be added.
-        prime_areas = self._computeDisallowedAreasPrimeBlob(disallowed_border_size, used_extruders)
-        result_areas_no_brim = self._computeDisallowedAreasStatic(0, used_extruders)  # Where the priming is not allowed to happen. This is not added to the result, just for collision checking.
+        key = settings.getKey()
+        with self._computed_disallowed_areas_lock:
+            computed_areas = self._computed_disallowed_areas.get(key)
+            if computed_areas is not None:
+                self._computed_disallowed_areas.move_to_end(key)
+                return computed_areas
+
+        global_stack = settings.global_stack
+        used_extruders = settings.used_extruders
+        disallowed_border_size = settings.border_size
+        error_areas = []  # type: List[Polygon]
+
+        result_areas = self._computeDisallowedAreasStatic(disallowed_border_size, used_extruders, global_stack, settings.active_extruders, settings.shape)  # Normal machine disallowed areas can always be added.
+        prime_areas = self._computeDisallowedAreasPrimeBlob(disallowed_border_size, used_extruders, global_stack)
+        result_areas_no_brim = self._computeDisallowedAreasStatic(0, used_extruders, global_stack, settings.active_extruders, settings.shape)  # Where the priming is not allowed to happen. This is not added to the result, just for collision checking.
 
         # Check if prime positions intersect with disallowed areas.
         for extruder in used_extruders:
@@ -840,7 +1005,7 @@ class BuildVolume(SceneNode):
         # Add prime tower location as disallowed area.
         if len([x for x in used_extruders if x.isEnabled]) > 1:  # No prime tower if only one extruder is enabled
             prime_tower_collision = False
-            prime_tower_areas = self._computeDisallowedAreasPrinted(used_extruders)
+            prime_tower_areas = self._computeDisallowedAreasPrinted(used_extruders, global_stack)
             for extruder_id in prime_tower_areas:
                 for area_index, prime_tower_area in enumerate(prime_tower_areas[extruder_id]):
                     for area in result_areas_no_brim[extruder_id]:
@@ -853,28 +1018,36 @@ class BuildVolume(SceneNode):
                     result_areas[extruder_id].extend(prime_tower_areas[extruder_id])
                     result_areas_no_brim[extruder_id].extend(prime_tower_areas[extruder_id])
                 else:
-                    self._error_areas.extend(prime_tower_areas[extruder_id])
-
-        self._has_errors = len(self._error_areas) > 0
+                    error_areas.extend(prime_tower_areas[extruder_id])
 
-        self._disallowed_areas = []
+        disallowed_areas = []  # type: List[Polygon]
         for extruder_id in result_areas:
-            self._disallowed_areas.extend(result_areas[extruder_id])
-        self._disallowed_areas_no_brim = []
+            disallowed_areas.extend(result_areas[extruder_id])
+        disallowed_areas_no_brim = []  # type: List[Polygon]
         for extruder_id in result_areas_no_brim:
-            self._disallowed_areas_no_brim.extend(result_areas_no_brim[extruder_id])
+            disallowed_areas_no_brim.extend(result_areas_no_brim[extruder_id])
 
-    def _computeDisallowedAreasPrinted(self, used_extruders):
+        computed_areas = DisallowedAreas(disallowed_areas, disallowed_areas_no_brim, error_areas)
+        with self._computed_disallowed_areas_lock:
+            self._computed_disallowed_areas[key] = computed_areas
+            while len(self._computed_disallowed_areas) > self._maximum_computed_disallowed_areas:
+                self._computed_disallowed_areas.popitem(last = False)
+        return computed_areas
+
+    def _computeDisallowedAreasPrinted(self, used_extruders, global_stack = None):
         """Computes the disallowed areas for objects that are printed with print features.
 
         This means that the brim, travel avoidance and such will be applied to these features.
 
+        :param global_stack: The stack to get the settings from, or the stack of the active printer if not given.
         :return: A dictionary with for each used extruder ID the disallowed areas where that extruder may not print.
         """
 
+        if global_stack is None:
+            global_stack = self._global_container_stack
         result = {}
         skirt_brim_extruder: ExtruderStack = None
-        skirt_brim_extruder_nr = self._global_container_stack.getProperty("skirt_brim_extruder_nr", "value")
+        skirt_brim_extruder_nr = global_stack.getProperty("skirt_brim_extruder_nr", "value")
 
         for extruder in used_extruders:
             if skirt_brim_extruder_nr == -1:
@@ -884,18 +1057,18 @@ class BuildVolume(SceneNode):
             result[extruder.getId()] = []
 
         # Currently, the only normally printed object is the prime tower.
-        if self._global_container_stack.getProperty("prime_tower_enable", "value"):
-            prime_tower_size = self._global_container_stack.getProperty("prime_tower_size", "value")
-            machine_width = self._global_container_stack.getProperty("machine_width", "value")
-            machine_depth = self._global_container_stack.getProperty("machine_depth", "value")
-            prime_tower_x = self._global_container_stack.getProperty("prime_tower_position_x", "value")
-            prime_tower_y = - self._global_container_stack.getProperty("prime_tower_position_y", "value")
-            prime_tower_brim_enable = self._global_container_stack.getProperty("prime_tower_brim_enable", "value")
-            prime_tower_base_size = self._global_container_stack.getProperty("prime_tower_base_size", "value")
-            prime_tower_base_height = self._global_container_stack.getProperty("prime_tower_base_height", "value")
-            adhesion_type = self._global_container_stack.getProperty("adhesion_type", "value")
-
-            if not self._global_container_stack.getProperty("machine_center_is_zero", "value"):
+        if global_stack.getProperty("prime_tower_enable", "value"):
+            prime_tower_size = global_stack.getProperty("prime_tower_size", "value")
+            machine_width = global_stack.getProperty("machine_width", "value")
+            machine_depth = global_stack.getProperty("machine_depth", "value")
+            prime_tower_x = global_stack.getProperty("prime_tower_position_x", "value")
+            prime_tower_y = - global_stack.getProperty("prime_tower_position_y", "value")
+            prime_tower_brim_enable = global_stack.getProperty("prime_tower_brim_enable", "value")
+            prime_tower_base_size = global_stack.getProperty("prime_tower_base_size", "value")
+            prime_tower_base_height = global_stack.getProperty("prime_tower_base_height", "value")
+            adhesion_type = global_stack.getProperty("adhesion_type", "value")
+
+            if not global_stack.getProperty("machine_center_is_zero", "value"):
                 prime_tower_x = prime_tower_x - machine_width / 2 #Offset by half machine_width and _depth to put the origin in the front-left.
                 prime_tower_y = prime_tower_y + machine_depth / 2
 
@@ -915,7 +1088,7 @@ class BuildVolume(SceneNode):
 
         return result
 
-    def _computeDisallowedAreasPrimeBlob(self, border_size: float, used_extruders: List["ExtruderStack"]) -> Dict[str, List[Polygon]]:
+    def _computeDisallowedAreasPrimeBlob(self, border_size: float, used_extruders: List["ExtruderStack"], global_stack: Optional["GlobalStack"] = None) -> Dict[str, List[Polygon]]:
         """Computes the disallowed areas for the prime blobs.
 
         These are special because they are not subject to things like brim or travel avoidance. They do get a dilute
@@ -924,14 +1097,17 @@ class BuildVolume(SceneNode):
         :param border_size: The size with which to offset the disallowed areas due to skirt, brim, travel avoid distance
          , etc.
         :param used_extruders: The extruder stacks to generate disallowed areas for.
+        :param global_stack: The stack to get the settings from, or the stack of the active printer if not given.
         :return: A dictionary with for each used extruder ID the prime areas.
         """
 
         result = {}  # type: Dict[str, List[Polygon]]
-        if not self._global_container_stack:
+        if global_stack is None:
+            global_stack = self._global_container_stack
+        if not global_stack:
             return result
-        machine_width = self._global_container_stack.getProperty("machine_width", "value")
-        machine_depth = self._global_container_stack.getProperty("machine_depth", "value")
+        machine_width = global_stack.getProperty("machine_width", "value")
+        machine_depth = global_stack.getProperty("machine_depth", "value")
         for extruder in used_extruders:
             prime_blob_enabled = extruder.getProperty("prime_blob_enable", "value")
             prime_x = extruder.getProperty("extruder_prime_pos_x", "value")
@@ -942,7 +1118,7 @@ class BuildVolume(SceneNode):
                 result[extruder.getId()] = []
                 continue
 
-            if not self._global_container_stack.getProperty("machine_center_is_zero", "value"):
+            if not global_stack.getProperty("machine_center_is_zero", "value"):
                 prime_x = prime_x - machine_width / 2  # Offset by half machine_width and _depth to put the origin in the front-left.
                 prime_y = prime_y + machine_depth / 2
 
@@ -954,7 +1130,7 @@ class BuildVolume(SceneNode):
 
         return result
 
-    def _computeDisallowedAreasStatic(self, border_size:float, used_extruders: List["ExtruderStack"]) -> Dict[str, List[Polygon]]:
+    def _computeDisallowedAreasStatic(self, border_size:float, used_extruders: List["ExtruderStack"], global_stack: Optional["GlobalStack"] = None, active_extruders: Optional[List["ExtruderStack"]] = None, shape: Optional[str] = None) -> Dict[str, List[Polygon]]:
         """Computes the disallowed areas that are statically placed in the machine.
 
         It computes different disallowed areas depending on the offset of the extruder. The resulting dictionary will
@@ -963,15 +1139,24 @@ class BuildVolume(SceneNode):
         :param border_size: The size with which to offset the disallowed areas due to skirt, brim, travel avoid distance
          , etc.
         :param used_extruders: The extruder stacks to generate disallowed areas for.
+        :param global_stack: The stack to get the settings from, or the stack of the active printer if not given.
+        :param active_extruders: The enabled extruder stacks, or those of the active printer if not given.
+        :param shape: The shape of the build plate, or the shape of the build volume if not given.
         :return: A dictionary with for each used extruder ID the disallowed areas where that extruder may not print.
         """
 
         # Convert disallowed areas to polygons and dilate them.
         machine_disallowed_polygons = []
-        if self._global_container_stack is None:
+        if global_stack is None:
+            global_stack = self._global_container_stack
+        if global_stack is None:
             return {}
+        if active_extruders is None:
+            active_extruders = ExtruderManager.getInstance().getActiveExtruderStacks()
+        if shape is None:
+            shape = self._shape
 
-        for area in self._global_container_stack.getProperty("machine_disallowed_areas", "value"):
+        for area in global_stack.getProperty("machine_disallowed_areas", "value"):
             if len(area) == 0:
                 continue  # Numpy doesn't deal well with 0-length arrays, since it can't determine the dimensionality of them.
             polygon = Polygon(numpy.array(area, numpy.float32))
@@ -980,7 +1165,7 @@ class BuildVolume(SceneNode):
 
         # For certain machines we don't need to compute disallowed areas for each nozzle.
         # So we check here and only do the nozzle offsetting if needed.
-        nozzle_offsetting_for_disallowed_areas = self._global_container_stack.getMetaDataEntry(
+        nozzle_offsetting_for_disallowed_areas = global_stack.getMetaDataEntry(
             "nozzle_offsetting_for_disallowed_areas", True)
 
         result = {}  # type: Dict[str, List[Polygon]]
@@ -1008,7 +1193,7 @@ class BuildVolume(SceneNode):
             if nozzle_offsetting_for_disallowed_areas:
                 # The build volume is defined as the union of the area that all extruders can reach, so we need to know
                 # the relative offset to all extruders.
-                for other_extruder in ExtruderManager.getInstance().getActiveExtruderStacks():
+                for other_extruder in active_extruders:
                     other_offset_x = other_extruder.getProperty("machine_nozzle_offset_x", "value")
                     if other_offset_x is None:
                         other_offset_x = 0
@@ -1020,13 +1205,13 @@ class BuildVolume(SceneNode):
                     right_unreachable_border = max(right_unreachable_border, other_offset_x - offset_x)
                     top_unreachable_border = min(top_unreachable_border, other_offset_y - offset_y)
                     bottom_unreachable_border = max(bottom_unreachable_border, other_offset_y - offset_y)
-            half_machine_width = self._global_container_stack.getProperty("machine_width", "value") / 2
-            half_machine_depth = self._global_container_stack.getProperty("machine_depth", "value") / 2
+            half_machine_width = global_stack.getProperty("machine_width", "value") / 2
+            half_machine_depth = global_stack.getProperty("machine_depth", "value") / 2
 
             # We need at a minimum a very small border around the edge so that models can't go off the build plate
             border_size = max(border_size, 0.1)
 
-            if self._shape != "elliptic":
+            if shape != "elliptic":
                 if border_size - left_unreachable_border > 0:
                     result[extruder_id].append(Polygon(numpy.array([
                         [-half_machine_width, -half_machine_depth],
@@ -1219,3 +1404,6 @@ class BuildVolume(SceneNode):
     _limit_to_extruder_settings = ["wall_extruder_nr", "wall_0_extruder_nr", "wall_x_extruder_nr", "top_bottom_extruder_nr", "infill_extruder_nr", "support_infill_extruder_nr", "support_extruder_nr_layer_0", "support_bottom_extruder_nr", "support_roof_extruder_nr", "skirt_brim_extruder_nr", "raft_base_extruder_nr", "raft_interface_extruder_nr", "raft_surface_extruder_nr"]
     _material_size_settings = ["material_shrinkage_percentage", "material_shrinkage_percentage_xy", "material_shrinkage_percentage_z"]
     _disallowed_area_settings = _skirt_settings + _prime_settings + _tower_settings + _ooze_shield_settings + _distance_settings + _extruder_settings + _material_size_settings
+    _disallowed_area_global_settings = ["machine_disallowed_areas", "machine_width", "machine_depth", "machine_center_is_zero", "skirt_brim_extruder_nr", "adhesion_type"] + _tower_settings  # Settings of the printer that the disallowed areas are computed from.
+    _disallowed_area_extruder_settings = ["extruder_nr", "machine_nozzle_offset_x", "machine_nozzle_offset_y", "nozzle_disallowed_areas"] + _prime_settings  # Settings of the extruders that the disallowed areas are computed from.
+    _maximum_computed_disallowed_areas = 8
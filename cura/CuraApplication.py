@@ -60,6 +60,7 @@ from cura import ApplicationMetadata
 from cura.API import CuraAPI
 from cura.API.Account import Account
 from cura.Arranging.ArrangeObjectsJob import ArrangeObjectsJob
+from cura.Machines.ContainerTreeSnapshot import ContainerTreeSnapshot
 from cura.Machines.MachineErrorChecker import MachineErrorChecker
 from cura.Machines.Models.BuildPlateModel import BuildPlateModel
 from cura.Machines.Models.CustomQualityProfilesDropDownMenuModel import CustomQualityProfilesDropDownMenuModel
@@ -587,6 +588,13 @@ class CuraApplication(QtApplication):
         with self._container_registry.lockFile():
             self._container_registry.loadAllMetadata()
 
+        # Build the container tree from what it found in the last session, if the profiles didn't change since then.
+        container_tree_snapshot_key = ContainerTreeSnapshot.createKey(self, [self.ResourceTypes.VariantInstanceContainer,
+                                                                             self.ResourceTypes.MaterialInstanceContainer,
+                                                                             self.ResourceTypes.QualityInstanceContainer,
+                                                                             self.ResourceTypes.IntentInstanceContainer])
+        ContainerTreeSnapshot.getInstance().load(os.path.join(Resources.getCacheStoragePath(), "container_tree.json"), container_tree_snapshot_key)
+
         self._setLoadingHint(self._i18n_catalog.i18nc("@info:progress", "Setting up preferences..."))
         # Set the setting version for Preferences
         preferences = self.getPreferences()
@@ -607,6 +615,7 @@ class CuraApplication(QtApplication):
         preferences.addPreference("cura/choice_on_open_project", "always_ask")
         preferences.addPreference("cura/use_multi_build_plate", False)
         preferences.addPreference("cura/show_list_of_objects", False)
+        preferences.addPreference("cura/arrange_in_parallel", False)
         preferences.addPreference("view/settings_list_height", 400)
         preferences.addPreference("view/settings_visible", False)
         preferences.addPreference("view/settings_xpos", 0)
@@ -618,6 +627,7 @@ class CuraApplication(QtApplication):
 
         preferences.addPreference("view/invert_zoom", False)
         preferences.addPreference("view/filter_current_build_plate", False)
+        preferences.addPreference("view/compact_layer_data", False)
         preferences.addPreference("view/navigation_style", "cura")
         preferences.addPreference("cura/sidebar_collapsed", False)
 
@@ -815,6 +825,7 @@ class CuraApplication(QtApplication):
             return
         ContainerRegistry.getInstance().saveDirtyContainers()
         self.savePreferences()
+        ContainerTreeSnapshot.getInstance().save()
 
     def saveStack(self, stack):
         if not self._enable_save:
@@ -1,10 +1,20 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+import numpy
+
+from UM.Math.Polygon import Polygon
+
 from cura.Scene.CuraSceneNode import CuraSceneNode
+from cura.Scene.SpatialGrid import SpatialGrid
 
 
 class HitChecker:
     """Checks if nodes can be printed without causing any collisions and interference"""
 
+    # The hits that were found between pairs of nodes, by the IDs of the nodes, with the hulls of the nodes at the time.
+    # Only the pairs of nodes of which the hulls changed need to be checked again.
+    _cached_hits = {}  # type: Dict[Tuple[int, int], Tuple[bytes, bytes, bool]]
+
     def __init__(self, nodes: List[CuraSceneNode]) -> None:
         self._hit_map = self._buildHitMap(nodes)
 
@@ -38,6 +48,11 @@ class HitChecker:
         score_b = sum(self._hit_map[b].values())
         return score_a - score_b
 
+    def getHitMatrix(self, nodes: List[CuraSceneNode]) -> numpy.ndarray:
+        """Get the hits between nodes as a matrix, where [i, j] is True if nodes[i] can't be printed before nodes[j]"""
+
+        return numpy.array([[bool(self._hit_map[a][b]) for b in nodes] for a in nodes], dtype = bool).reshape(len(nodes), len(nodes))
+
     def canPrintNodesInProvidedOrder(self, ordered_nodes: List[CuraSceneNode]) -> bool:
         """Returns True If nodes don't have any hits in provided order"""
         for node_index, node in enumerate(ordered_nodes):
@@ -51,10 +66,31 @@ class HitChecker:
     def _buildHitMap(nodes: List[CuraSceneNode]) -> Dict[CuraSceneNode, CuraSceneNode]:
         """Pre-computes all hits between all objects
 
+        The hulls of each node are computed once. Pairs of nodes of which the bounding rectangles of the hulls don't
+        overlap can't hit each other, so only the other pairs are checked, unless they were checked before.
+
         :nodes: nodes that need to be checked for collisions
         :return: dictionary where hit_map[node1][node2] is False if there node1 can be printed before node2
         """
-        hit_map = {j: {i: HitChecker._checkHit(j, i) for i in nodes} for j in nodes}
+        hulls = [_HitHulls(node) for node in nodes]
+        candidates = _HitHulls.getOverlappingRectangles([hull.boundary_rectangle for hull in hulls], [hull.head_full_rectangle for hull in hulls])
+        candidates |= _HitHulls.getOverlappingRectangles([hull.adhesion_rectangle for hull in hulls], [hull.adhesion_rectangle for hull in hulls])
+        numpy.fill_diagonal(candidates, False)
+
+        cached_hits = {}  # type: Dict[Tuple[int, int], Tuple[bytes, bytes, bool]]
+        hit_map = {j: {i: False for i in nodes} for j in nodes}
+        for a_index, b_index in zip(*numpy.nonzero(candidates)):
+            a, b = nodes[a_index], nodes[b_index]
+            a_hulls, b_hulls = hulls[a_index], hulls[b_index]
+            key = (id(a), id(b))
+            cached_hit = HitChecker._cached_hits.get(key)
+            if cached_hit is not None and cached_hit[0] == a_hulls.state and cached_hit[1] == b_hulls.state:
+                hit = cached_hit[2]
+            else:
+                hit = HitChecker._checkHitHulls(a_hulls, b_hulls)
+            cached_hits[key] = (a_hulls.state, b_hulls.state, hit)
+            hit_map[a][b] = hit
+        HitChecker._cached_hits = cached_hits
         return hit_map
 
     @staticmethod
@@ -69,20 +105,56 @@ class HitChecker:
         if a == b:
             return False
 
-        a_hit_hull = a.callDecoration("getConvexHullBoundary")
-        b_hit_hull = b.callDecoration("getConvexHullHeadFull")
-        overlap = a_hit_hull.intersectsPolygon(b_hit_hull)
+        return HitChecker._checkHitHulls(_HitHulls(a), _HitHulls(b))
+
+    @staticmethod
+    def _checkHitHulls(a: "_HitHulls", b: "_HitHulls") -> bool:
+        """Checks if a node can be printed before another node, using their hulls
+
+        :return: False if a can be printed before b
+        """
 
-        if overlap:
-            return True
+        if a.boundary is not None and b.head_full is not None:
+            overlap = a.boundary.intersectsPolygon(b.head_full)
+            if overlap:
+                return True
 
         # Adhesion areas must never overlap, regardless of printing order
         # This would cause over-extrusion
-        a_hit_hull = a.callDecoration("getAdhesionArea")
-        b_hit_hull = b.callDecoration("getAdhesionArea")
-        overlap = a_hit_hull.intersectsPolygon(b_hit_hull)
+        if a.adhesion is not None and b.adhesion is not None:
+            overlap = a.adhesion.intersectsPolygon(b.adhesion)
+            if overlap:
+                return True
+        return False
 
-        if overlap:
-            return True
-        else:
-            return False
+
+class _HitHulls:
+    """The hulls of a node that are used to check for hits, which are only computed once."""
+
+    def __init__(self, node: CuraSceneNode) -> None:
+        self.boundary = node.callDecoration("getConvexHullBoundary")  # type: Optional[Polygon]
+        self.head_full = node.callDecoration("getConvexHullHeadFull")  # type: Optional[Polygon]
+        self.adhesion = node.callDecoration("getAdhesionArea")  # type: Optional[Polygon]
+
+        self.boundary_rectangle = SpatialGrid.getPolygonRectangle(self.boundary)
+        self.head_full_rectangle = SpatialGrid.getPolygonRectangle(self.head_full)
+        self.adhesion_rectangle = SpatialGrid.getPolygonRectangle(self.adhesion)
+
+        # A fingerprint of the hulls, which changes when the node moves or changes shape.
+        self.state = b"".join(hull.getPoints().tobytes() + b";" if hull is not None else b"-;" for hull in (self.boundary, self.head_full, self.adhesion))
+
+    @staticmethod
+    def getOverlappingRectangles(rectangles: List[Optional[Tuple[float, float, float, float]]], other_rectangles: List[Optional[Tuple[float, float, float, float]]]) -> numpy.ndarray:
+        """Find which rectangles overlap with which other rectangles, all at once.
+
+        :return: A matrix where [i, j] is True if rectangles[i] overlaps or touches other_rectangles[j].
+        """
+
+        def toArray(rectangle_list: List[Optional[Tuple[float, float, float, float]]]) -> numpy.ndarray:
+            # Missing rectangles are turned inside out, so that they don't overlap anything.
+            return numpy.array([rectangle if rectangle is not None else (numpy.inf, numpy.inf, -numpy.inf, -numpy.inf) for rectangle in rectangle_list], dtype = numpy.float64).reshape(-1, 4)
+
+        a = toArray(rectangles)
+        b = toArray(other_rectangles)
+        return (a[:, numpy.newaxis, 0] <= b[numpy.newaxis, :, 2]) & (b[numpy.newaxis, :, 0] <= a[:, numpy.newaxis, 2]) & \
+               (a[:, numpy.newaxis, 1] <= b[numpy.newaxis, :, 3]) & (b[numpy.newaxis, :, 1] <= a[:, numpy.newaxis, 3])
@@ -93,7 +93,7 @@ class Layer:
             index_mask = numpy.logical_not(polygon.jumpMask) if make_mesh else polygon.jumpMask
 
             # Create an array with rows [p p+1] and only keep those we want to draw based on make_mesh
-            points = numpy.concatenate((polygon.data[:-1], polygon.data[1:]), 1)[index_mask.ravel()]
+            points = polygon.getLineSegments()[index_mask.ravel()]
             # Line types of the points we want to draw
             line_types = polygon.types[index_mask]
 
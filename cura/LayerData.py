@@ -7,14 +7,20 @@ class LayerData(MeshData):
     """Class to holds the layer mesh and information about the layers.
 
     Immutable, use :py:class:`cura.LayerDataBuilder.LayerDataBuilder` to create one of these.
+
+    Compact layer data has no colors per vertex. Instead it holds a color palette for the line types and one for
+    the materials, which the layer shader looks the colors up in.
     """
 
     def __init__(self, vertices = None, normals = None, indices = None, colors = None, uvs = None, file_name = None,
-                 center_position = None, layers=None, element_counts=None, attributes=None):
+                 center_position = None, layers=None, element_counts=None, attributes=None,
+                 line_type_colors = None, material_colors = None):
         super().__init__(vertices=vertices, normals=normals, indices=indices, colors=colors, uvs=uvs,
                          file_name=file_name, center_position=center_position, attributes=attributes)
         self._layers = layers
         self._element_counts = element_counts
+        self._line_type_colors = line_type_colors
+        self._material_colors = material_colors
 
     def getLayer(self, layer):
         if layer in self._layers:
@@ -26,3 +32,16 @@ class LayerData(MeshData):
 
     def getElementCounts(self):
         return self._element_counts
+
+    def isCompact(self):
+        return self._line_type_colors is not None
+
+    def getLineTypeColors(self):
+        """[r, g, b, a] for each line type, only for compact layer data."""
+
+        return self._line_type_colors
+
+    def getMaterialColors(self):
+        """[r, g, b, a] for each extruder, only for compact layer data."""
+
+        return self._material_colors
@@ -3,21 +3,66 @@
 
 from .Layer import Layer
 from .LayerPolygon import LayerPolygon
+from UM.Application import Application
 from UM.Mesh.MeshBuilder import MeshBuilder
+from UM.View.GL.OpenGLContext import OpenGLContext
 from .LayerData import LayerData
 
 import numpy
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 
 class LayerDataBuilder(MeshBuilder):
-    """Builder class for constructing a :py:class:`cura.LayerData.LayerData` object"""
+    """Builder class for constructing a :py:class:`cura.LayerData.LayerData` object
 
-    def __init__(self) -> None:
+    Layers can either be built all at once with :py:meth:`build`, or be appended one at a time with
+    :py:meth:`appendLayer` as soon as their polygons are known. Appended layers are written into growable,
+    preallocated buffers, so intermediate results can be published with :py:meth:`build` without having to
+    concatenate all the layers again.
+
+    A compact builder stores no colors per vertex, the layer shader looks them up in the palettes of the layer data.
+    The line type, previous line type and extruder are packed into one float per vertex, and so are the line width
+    and thickness (in whole microns). This takes about a third of the memory of the normal layout, but it needs the
+    shaders of the 3D layer view; the compatibility mode shaders can't draw it.
+    """
+
+    # When a buffer runs out of space, it grows by this factor (or more if a single layer needs more).
+    _buffer_growth_factor = 1.5
+
+    # The packed line dimensions hold whole microns up to this value, in 12 bits each.
+    _max_packed_line_dimension = 4095
+
+    def __init__(self, compact: bool = False) -> None:
         super().__init__()
+        self._compact = compact
         self._layers = {}  # type: Dict[int, Layer]
         self._element_counts = {}  # type: Dict[int, int]
 
+        self._appended_layers = []  # type: List[int]  # The layers that are already in the buffers, in order.
+        self._vertex_buffers = {}  # type: Dict[str, numpy.ndarray]
+        self._index_buffer = None  # type: Optional[numpy.ndarray]
+        self._vertex_offset = 0
+        self._index_offset = 0
+        self._previous_line_type = LayerPolygon.MoveCombingType  # Line type of the last vertex in the buffers.
+
+    def isCompact(self) -> bool:
+        return self._compact
+
+    @staticmethod
+    def useCompactLayerData() -> bool:
+        """Whether layer data should be built compact, according to the preferences.
+
+        The compatibility mode of the layer view can't draw compact layer data.
+        """
+
+        application = Application.getInstance()
+        if application is None:  # Not running in the application, like in the worker processes that parse g-code.
+            return False
+        preferences = application.getPreferences()
+        if OpenGLContext.isLegacyOpenGL() or bool(preferences.getValue("view/force_layer_view_compatibility_mode")):
+            return False
+        return bool(preferences.getValue("view/compact_layer_data"))
+
     def addLayer(self, layer: int) -> None:
         if layer not in self._layers:
             self._layers[layer] = Layer(layer)
@@ -43,76 +88,268 @@ class LayerDataBuilder(MeshBuilder):
 
         self._layers[layer].setThickness(thickness)
 
-    def build(self, material_color_map, line_type_brightness = 1.0):
-        """Return the layer data as :py:class:`cura.LayerData.LayerData`.
+    def reserve(self, vertex_count: int, index_count: int) -> None:
+        """Make sure the buffers can hold at least the given amount of vertices and indices without growing.
+
+        :param vertex_count: The total number of vertices the buffers should be able to hold.
+        :param index_count: The total number of index pairs the buffers should be able to hold.
+        """
+
+        if not self._vertex_buffers or self._vertex_buffers["vertices"].shape[0] < vertex_count:
+            self._growVertexBuffers(vertex_count)
+        if self._index_buffer is None or self._index_buffer.shape[0] < index_count:
+            self._growIndexBuffer(index_count)
 
+    def appendLayer(self, layer: int, material_color_map: numpy.ndarray, line_type_brightness: float = 1.0) -> bool:
+        """Build the mesh data of a single layer and append it to the buffers.
+
+        Layers need to be appended in ascending order, since the layer view draws ranges of layers. If a layer is
+        appended out of order, nothing is appended and the layer will be built in the next :py:meth:`build` call.
+
+        :param layer: The number of the layer to append. Its polygons need to be complete.
         :param material_color_map: [r, g, b, a] for each extruder row.
         :param line_type_brightness: compatibility layer view uses line type brightness of 0.5
+        :return: Whether the layer was appended.
         """
 
-        vertex_count = 0
-        index_count = 0
-        for layer, data in self._layers.items():
-            vertex_count += data.lineMeshVertexCount()
-            index_count += data.lineMeshElementCount()
+        data = self._layers.get(layer)
+        if data is None or layer in self._element_counts:
+            return False
+        if self._appended_layers and layer < self._appended_layers[-1]:
+            return False
 
-        vertices = numpy.empty((vertex_count, 3), numpy.float32)
-        line_dimensions = numpy.empty((vertex_count, 2), numpy.float32)
-        colors = numpy.empty((vertex_count, 4), numpy.float32)
-        indices = numpy.empty((index_count, 2), numpy.int32)
-        feedrates = numpy.empty((vertex_count), numpy.float32)
-        extruders = numpy.empty((vertex_count), numpy.float32)
-        line_types = numpy.empty((vertex_count), numpy.float32)
+        vertex_count = data.lineMeshVertexCount()
+        index_count = data.lineMeshElementCount()
+        self._ensureCapacity(self._vertex_offset + vertex_count, self._index_offset + index_count)
 
-        vertex_offset = 0
-        index_offset = 0
-        for layer, data in sorted(self._layers.items()):
-            vertex_offset, index_offset = data.build(vertex_offset, index_offset, vertices, colors, line_dimensions, feedrates, extruders, line_types, indices)
+        if self._compact:
+            self._appendCompactLayer(data, vertex_count, index_count)
             self._element_counts[layer] = data.elementCount
+            self._appended_layers.append(layer)
+            return True
+
+        vertex_begin = self._vertex_offset
+        buffers = self._vertex_buffers
+        self._vertex_offset, self._index_offset = data.build(self._vertex_offset, self._index_offset,
+                                                             buffers["vertices"], buffers["colors"],
+                                                             buffers["line_dimensions"], buffers["feedrates"],
+                                                             buffers["extruders"], buffers["line_types"],
+                                                             self._index_buffer)
+        self._element_counts[layer] = data.elementCount
+        self._appended_layers.append(layer)
+
+        # Only the part of the buffers that belongs to this layer gets its colors filled in.
+        colors = buffers["colors"][vertex_begin:self._vertex_offset]
+        extruders = buffers["extruders"][vertex_begin:self._vertex_offset]
+        line_types = buffers["line_types"][vertex_begin:self._vertex_offset]
+        material_colors = buffers["material_colors"][vertex_begin:self._vertex_offset]
 
-        self.addVertices(vertices)
         colors[:, 0:3] *= line_type_brightness
-        self.addColors(colors)
-        self.addIndices(indices.flatten())
 
         # Note: we're using numpy indexing here.
         # See also: https://docs.scipy.org/doc/numpy/reference/arrays.indexing.html
-        material_colors = numpy.zeros((line_dimensions.shape[0], 4), dtype=numpy.float32)
+        material_colors[:] = 0.0
         for extruder_nr in range(material_color_map.shape[0]):
             material_colors[extruders == extruder_nr] = material_color_map[extruder_nr]
         # Set material_colors with indices where line_types (also numpy array) == MoveCombingType
         material_colors[line_types == LayerPolygon.MoveCombingType] = colors[line_types == LayerPolygon.MoveCombingType]
         material_colors[line_types == LayerPolygon.MoveRetractionType] = colors[line_types == LayerPolygon.MoveRetractionType]
+        return True
+
+    def _appendCompactLayer(self, data: Layer, vertex_count: int, index_count: int) -> None:
+        # The polygons write the normal layout, so build the layer in temporary arrays and pack those.
+        vertices = numpy.empty((vertex_count, 3), numpy.float32)
+        colors = numpy.empty((vertex_count, 4), numpy.float32)
+        line_dimensions = numpy.empty((vertex_count, 2), numpy.float32)
+        feedrates = numpy.empty((vertex_count), numpy.float32)
+        extruders = numpy.empty((vertex_count), numpy.float32)
+        line_types = numpy.empty((vertex_count), numpy.float32)
+        indices = numpy.empty((index_count, 2), numpy.int32)
+        data.build(0, 0, vertices, colors, line_dimensions, feedrates, extruders, line_types, indices)
+
+        vertex_begin = self._vertex_offset
+        vertex_end = vertex_begin + vertex_count
+        buffers = self._vertex_buffers
+        buffers["vertices"][vertex_begin:vertex_end] = vertices
+        buffers["feedrates"][vertex_begin:vertex_end] = feedrates
+
+        prev_line_types = numpy.empty((vertex_count), numpy.float32)
+        if vertex_count > 0:
+            prev_line_types[0] = self._previous_line_type
+            prev_line_types[1:] = line_types[:-1]
+            self._previous_line_type = line_types[-1]
+        buffers["line_info"][vertex_begin:vertex_end] = line_types + 16 * prev_line_types + 256 * extruders
+
+        line_microns = numpy.clip(numpy.rint(line_dimensions * 1000), 0, self._max_packed_line_dimension)
+        buffers["line_dimensions"][vertex_begin:vertex_end] = line_microns[:, 0] + 4096 * line_microns[:, 1]
+
+        self._index_buffer[self._index_offset:self._index_offset + index_count] = indices + vertex_begin
+        self._vertex_offset = vertex_end
+        self._index_offset += index_count
+
+    def getAppendedLayers(self) -> List[int]:
+        """Get the numbers of the layers that are currently in the buffers, in ascending order."""
+
+        return self._appended_layers
+
+    def getBufferedVertexCount(self) -> int:
+        """Get the number of vertices of the layers that are currently in the buffers."""
+
+        return self._vertex_offset
+
+    def build(self, material_color_map, line_type_brightness = 1.0):
+        """Return the layer data as :py:class:`cura.LayerData.LayerData`.
+
+        Layers that were not appended yet are appended first. The result only contains the layers that are in
+        the buffers at the moment of calling, so this can be called repeatedly while layers are still being added.
+
+        :param material_color_map: [r, g, b, a] for each extruder row.
+        :param line_type_brightness: compatibility layer view uses line type brightness of 0.5
+        """
+
+        pending_layers = sorted(layer for layer in self._layers if layer not in self._element_counts)
+        if pending_layers and self._appended_layers and pending_layers[0] < self._appended_layers[-1]:
+            # A layer was added below the layers that are already built. Build everything again in the right order.
+            self._clearBuffers()
+            pending_layers = sorted(self._layers)
+
+        if pending_layers:
+            vertex_count = self._vertex_offset
+            index_count = self._index_offset
+            for layer in pending_layers:
+                vertex_count += self._layers[layer].lineMeshVertexCount()
+                index_count += self._layers[layer].lineMeshElementCount()
+            self.reserve(vertex_count, index_count)  # Allocate only once for the remaining layers.
+
+        for layer in pending_layers:
+            self.appendLayer(layer, material_color_map, line_type_brightness)
+
+        if not self._vertex_buffers:
+            self.reserve(0, 0)
+
+        # Hand out read-only views on the used part of the buffers. Appending more layers only writes beyond the
+        # end of these views (or into new buffers when growing), so the returned LayerData stays valid.
+        vertex_views = {name: self._readOnlyView(buffer, self._vertex_offset) for name, buffer in self._vertex_buffers.items()}
+        indices = self._readOnlyView(self._index_buffer, self._index_offset).reshape(-1)
+        # Copy the dictionaries, since the builder keeps on adding layers to its own.
+        layers = {layer: self._layers[layer] for layer in self._appended_layers}
+
+        if self._compact:
+            return self._buildCompact(vertex_views, indices, layers, material_color_map, line_type_brightness)
 
         attributes = {
             "line_dimensions": {
-                "value": line_dimensions,
+                "value": vertex_views["line_dimensions"],
                 "opengl_name": "a_line_dim",
                 "opengl_type": "vector2f"
                 },
             "extruders": {
-                "value": extruders,
+                "value": vertex_views["extruders"],
                 "opengl_name": "a_extruder",
                 "opengl_type": "float"  # Strangely enough, the type has to be float while it is actually an int.
                 },
             "colors": {
-                "value": material_colors,
+                "value": vertex_views["material_colors"],
                 "opengl_name": "a_material_color",
                 "opengl_type": "vector4f"
                 },
             "line_types": {
-                "value": line_types,
+                "value": vertex_views["line_types"],
                 "opengl_name": "a_line_type",
                 "opengl_type": "float"
                 },
             "feedrates": {
-                "value": feedrates,
+                "value": vertex_views["feedrates"],
+                "opengl_name": "a_feedrate",
+                "opengl_type": "float"
+                }
+            }
+
+        return LayerData(vertices=vertex_views["vertices"], normals=self.getNormals(), indices=indices,
+                        colors=vertex_views["colors"], uvs=self.getUVCoordinates(), file_name=self.getFileName(),
+                        center_position=self.getCenterPosition(), layers=layers,
+                        element_counts=dict(self._element_counts), attributes=attributes)
+
+    def _buildCompact(self, vertex_views: Dict[str, numpy.ndarray], indices: numpy.ndarray, layers: Dict[int, Layer],
+                      material_color_map: numpy.ndarray, line_type_brightness: float) -> LayerData:
+        line_type_colors = numpy.array(LayerPolygon.getColorMap(), dtype = numpy.float32)
+        line_type_colors[:, 0:3] *= line_type_brightness
+        material_colors = numpy.zeros((8, 4), dtype = numpy.float32)  # The shader has room for 8 extruders.
+        extruder_count = min(material_color_map.shape[0], material_colors.shape[0])
+        material_colors[:extruder_count] = material_color_map[:extruder_count]
+
+        attributes = {
+            "line_info": {
+                "value": vertex_views["line_info"],
+                "opengl_name": "a_line_info",
+                "opengl_type": "float"
+                },
+            "line_dimensions": {
+                "value": vertex_views["line_dimensions"],
+                "opengl_name": "a_line_dim_packed",
+                "opengl_type": "float"
+                },
+            "feedrates": {
+                "value": vertex_views["feedrates"],
                 "opengl_name": "a_feedrate",
                 "opengl_type": "float"
                 }
             }
 
-        return LayerData(vertices=self.getVertices(), normals=self.getNormals(), indices=self.getIndices(),
-                        colors=self.getColors(), uvs=self.getUVCoordinates(), file_name=self.getFileName(),
-                        center_position=self.getCenterPosition(), layers=self._layers,
-                        element_counts=self._element_counts, attributes=attributes)
+        return LayerData(vertices=vertex_views["vertices"], normals=self.getNormals(), indices=indices,
+                        uvs=self.getUVCoordinates(), file_name=self.getFileName(),
+                        center_position=self.getCenterPosition(), layers=layers,
+                        element_counts=dict(self._element_counts), attributes=attributes,
+                        line_type_colors=line_type_colors, material_colors=material_colors)
+
+    def _ensureCapacity(self, vertex_count: int, index_count: int) -> None:
+        if not self._vertex_buffers or self._vertex_buffers["vertices"].shape[0] < vertex_count:
+            current = self._vertex_buffers["vertices"].shape[0] if self._vertex_buffers else 0
+            self._growVertexBuffers(max(vertex_count, int(current * self._buffer_growth_factor)))
+        if self._index_buffer is None or self._index_buffer.shape[0] < index_count:
+            current = self._index_buffer.shape[0] if self._index_buffer is not None else 0
+            self._growIndexBuffer(max(index_count, int(current * self._buffer_growth_factor)))
+
+    def _growVertexBuffers(self, capacity: int) -> None:
+        if self._compact:
+            new_buffers = {
+                "vertices": numpy.empty((capacity, 3), numpy.float32),
+                "line_dimensions": numpy.empty((capacity), numpy.float32),
+                "line_info": numpy.empty((capacity), numpy.float32),
+                "feedrates": numpy.empty((capacity), numpy.float32),
+            }
+        else:
+            new_buffers = {
+                "vertices": numpy.empty((capacity, 3), numpy.float32),
+                "line_dimensions": numpy.empty((capacity, 2), numpy.float32),
+                "colors": numpy.empty((capacity, 4), numpy.float32),
+                "material_colors": numpy.empty((capacity, 4), numpy.float32),
+                "feedrates": numpy.empty((capacity), numpy.float32),
+                "extruders": numpy.empty((capacity), numpy.float32),
+                "line_types": numpy.empty((capacity), numpy.float32),
+            }
+        for name, buffer in self._vertex_buffers.items():
+            new_buffers[name][:self._vertex_offset] = buffer[:self._vertex_offset]
+        self._vertex_buffers = new_buffers
+
+    def _growIndexBuffer(self, capacity: int) -> None:
+        new_buffer = numpy.empty((capacity, 2), numpy.int32)
+        if self._index_buffer is not None:
+            new_buffer[:self._index_offset] = self._index_buffer[:self._index_offset]
+        self._index_buffer = new_buffer
+
+    def _clearBuffers(self) -> None:
+        self._appended_layers = []
+        self._element_counts.clear()
+        self._vertex_buffers = {}
+        self._index_buffer = None
+        self._vertex_offset = 0
+        self._index_offset = 0
+        self._previous_line_type = LayerPolygon.MoveCombingType
+
+    @staticmethod
+    def _readOnlyView(buffer: numpy.ndarray, length: int) -> numpy.ndarray:
+        # MeshData copies writable arrays to make them immutable. A read-only view prevents that copy.
+        view = buffer[:length]
+        view.flags.writeable = False
+        return view
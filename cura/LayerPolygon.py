@@ -3,7 +3,7 @@
 import math
 import numpy
 
-from typing import Optional, cast
+from typing import List, Optional, Union, cast
 
 from UM.Qt.Bindings.Theme import Theme
 from UM.Qt.QtApplication import QtApplication
@@ -29,16 +29,23 @@ class LayerPolygon:
                                                    numpy.arange(__number_of_types) == MoveCombingType),
                                                    numpy.arange(__number_of_types) == MoveRetractionType)
 
-    def __init__(self, extruder: int, line_types: numpy.ndarray, data: numpy.ndarray,
-                 line_widths: numpy.ndarray, line_thicknesses: numpy.ndarray, line_feedrates: numpy.ndarray) -> None:
+    def __init__(self, extruder: Union[int, numpy.ndarray], line_types: numpy.ndarray, data: numpy.ndarray,
+                 line_widths: numpy.ndarray, line_thicknesses: numpy.ndarray, line_feedrates: numpy.ndarray,
+                 polygon_offsets: Optional[numpy.ndarray] = None) -> None:
         """LayerPolygon, used in ProcessSlicedLayersJob
 
-        :param extruder: The position of the extruder
+        A LayerPolygon can also hold a batch of polygons, stored as one structure of arrays. The lines of all
+        polygons are then concatenated, as are their points. Since each polygon has one more point than it has
+        lines, the points of polygon ``i`` are ``data[polygon_offsets[i] + i:polygon_offsets[i + 1] + i + 1]``.
+
+        :param extruder: The position of the extruder, or an array with the extruder of each polygon in the batch
         :param line_types: array with line_types
         :param data: new_points
         :param line_widths: array with line widths
         :param line_thicknesses: array with type as index and thickness as value
         :param line_feedrates: array with line feedrates
+        :param polygon_offsets: array with the index of the first line of each polygon in the batch, followed by
+        the total number of lines. If not given, all lines form a single polygon.
         """
 
         self._extruder = extruder
@@ -54,6 +61,15 @@ class LayerPolygon:
         self._line_thicknesses = line_thicknesses
         self._line_feedrates = line_feedrates
 
+        if polygon_offsets is None:
+            polygon_offsets = numpy.array([0, len(self._types)], dtype = numpy.int32)
+        self._polygon_offsets = polygon_offsets
+        # The index of the starting point of each line. Each polygon in the batch adds one extra point.
+        line_counts = numpy.diff(polygon_offsets)
+        self._line_start_indices = numpy.arange(len(self._types), dtype = numpy.int32)
+        if len(line_counts) > 1:
+            self._line_start_indices += numpy.repeat(numpy.arange(len(line_counts), dtype = numpy.int32), line_counts)
+
         self._vertex_begin = 0
         self._vertex_end = 0
         self._index_begin = 0
@@ -87,6 +103,9 @@ class LayerPolygon:
         self._build_cache_needed_points = numpy.ones((len(self._types), 2), dtype = bool)
         # Only if the type of line segment changes do we need to add an extra vertex to change colors
         self._build_cache_needed_points[1:, 0][:, numpy.newaxis] = self._types[1:] != self._types[:-1]
+        # The first line of each polygon in the batch can't continue from the previous line.
+        polygon_starts = self._polygon_offsets[:-1]
+        self._build_cache_needed_points[polygon_starts[polygon_starts < len(self._types)], 0] = True
         # Mark points as unneeded if they are of types we don't want in the line mesh according to the calculated mask
         numpy.logical_and(self._build_cache_needed_points, self._build_cache_line_mesh_mask, self._build_cache_needed_points)
 
@@ -124,8 +143,9 @@ class LayerPolygon:
         # Index to the points we need to represent the line mesh.
         # This is constructed by generating simple start and end points for each line.
         # For line segment n, these are points n and n+1. Row n reads [n n+1]
+        # (offset by the extra points of the preceding polygons if this is a batch of polygons).
         # Then the indices for the points we don't need are thrown away based on the pre-calculated list.
-        index_list = (numpy.arange(len(self._types)).reshape((-1, 1)) + numpy.array([[0, 1]])).reshape((-1, 1))[needed_points_list.reshape((-1, 1))]
+        index_list = (self._line_start_indices.reshape((-1, 1)) + numpy.array([[0, 1]])).reshape((-1, 1))[needed_points_list.reshape((-1, 1))]
 
         # The relative values of begin and end indices have already been set in buildCache, so we only need to offset them to the parents offset.
         self._vertex_begin += vertex_offset
@@ -144,7 +164,11 @@ class LayerPolygon:
         # Create an array with feedrates for each line
         feedrates[self._vertex_begin:self._vertex_end] = numpy.tile(self._line_feedrates, (1, 2)).reshape((-1, 1))[needed_points_list.ravel()][:, 0]
 
-        extruders[self._vertex_begin:self._vertex_end] = self._extruder
+        if isinstance(self._extruder, numpy.ndarray):
+            line_extruders = numpy.repeat(self._extruder, numpy.diff(self._polygon_offsets)).reshape((-1, 1))
+            extruders[self._vertex_begin:self._vertex_end] = numpy.tile(line_extruders, (1, 2)).reshape((-1, 1))[needed_points_list.ravel()][:, 0]
+        else:
+            extruders[self._vertex_begin:self._vertex_end] = self._extruder
 
         # Convert type per vertex to type per line
         line_types[self._vertex_begin:self._vertex_end] = numpy.tile(self._types, (1, 2)).reshape((-1, 1))[needed_points_list.ravel()][:, 0]
@@ -190,7 +214,7 @@ class LayerPolygon:
     @property
     def lineLengths(self):
         data_array = numpy.array(self._data)
-        return numpy.linalg.norm(data_array[1:] - data_array[:-1], axis=1)
+        return numpy.linalg.norm(data_array[self._line_start_indices + 1] - data_array[self._line_start_indices], axis=1)
 
     @property
     def data(self):
@@ -212,6 +236,26 @@ class LayerPolygon:
     def lineFeedrates(self):
         return self._line_feedrates
 
+    @property
+    def polygonOffsets(self) -> numpy.ndarray:
+        """The index of the first line of each polygon in this batch, followed by the total number of lines."""
+
+        return self._polygon_offsets
+
+    @property
+    def polygonCount(self) -> int:
+        return len(self._polygon_offsets) - 1
+
+    def getPolygonData(self) -> List[numpy.ndarray]:
+        """Get the points of each separate polygon in this batch."""
+
+        return [self._data[begin + index:end + index + 1] for index, (begin, end) in enumerate(zip(self._polygon_offsets[:-1], self._polygon_offsets[1:]))]
+
+    def getLineSegments(self) -> numpy.ndarray:
+        """Get the start and end point of each line, as rows of [start_x, start_y, start_z, end_x, end_y, end_z]."""
+
+        return numpy.concatenate((self._data[self._line_start_indices], self._data[self._line_start_indices + 1]), 1)
+
     @property
     def jumpMask(self):
         return self._jump_mask
@@ -230,14 +274,10 @@ class LayerPolygon:
         :return: normals for the entire polygon
         """
 
-        normals = numpy.copy(self._data)
-        normals[:, 1] = 0.0  # We are only interested in 2D normals
-
         # Calculate the edges between points.
-        # The call to numpy.roll shifts the entire array by one
-        # so that we end up subtracting each next point from the current, wrapping around.
         # This gives us the edges from the next point to the current point.
-        normals = numpy.diff(normals, 1, 0)
+        normals = self._data[self._line_start_indices + 1] - self._data[self._line_start_indices]
+        normals[:, 1] = 0.0  # We are only interested in 2D normals
 
         # Calculate the length of each edge using standard Pythagoras
         lengths = numpy.sqrt(normals[:, 0] ** 2 + normals[:, 2] ** 2)
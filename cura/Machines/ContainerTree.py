@@ -7,6 +7,7 @@ from UM.Logger import Logger
 from UM.Settings.ContainerRegistry import ContainerRegistry  # To listen to containers being added.
 from UM.Signal import Signal
 import cura.CuraApplication  # Imported like this to prevent circular dependencies.
+from cura.Machines.ContainerTreeSnapshot import ContainerTreeSnapshot
 from cura.Machines.MachineNode import MachineNode
 from cura.Settings.GlobalStack import GlobalStack  # To listen only to global stacks being added.
 
@@ -182,4 +183,5 @@ class ContainerTree:
                 definition_id = stack.definition.getId()
                 if not self.tree_root.machines.is_loaded(definition_id):
                     _ = self.tree_root.machines[definition_id]
-            Logger.log("d", "All MachineNode loading completed")
\ No newline at end of file
+            Logger.log("d", "All MachineNode loading completed")
+            ContainerTreeSnapshot.getInstance().save()  # So that the next session can load these printers faster.
\ No newline at end of file
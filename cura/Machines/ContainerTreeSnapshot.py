@@ -0,0 +1,179 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from UM.Logger import Logger
+from UM.Resources import Resources
+from UM.Settings.ContainerRegistry import ContainerRegistry
+
+if TYPE_CHECKING:
+    from UM.Settings.Interfaces import ContainerInterface
+    from cura.CuraApplication import CuraApplication
+
+
+class ContainerTreeSnapshot:
+    """Remembers which profiles the container tree found for each of its look-ups, between sessions.
+
+    Building the tree for a printer filters the metadata of thousands of profiles many times over. The IDs that each
+    look-up found are stored in a file in the cache directory, so that the next session can take the profiles by their
+    IDs instead. The file is only used if none of the profile files changed and the same packages are installed, and
+    it is read with a single read when Cura starts.
+
+    If a material, quality, variant or intent profile is added, removed or changed while Cura runs, the look-ups go
+    to the container registry again for the rest of the session.
+    """
+
+    SnapshotVersion = 1
+
+    _profile_types = {"material", "quality", "variant", "intent"}  # The types of profiles that the tree looks up.
+
+    __instance = None  # type: Optional["ContainerTreeSnapshot"]
+
+    @classmethod
+    def getInstance(cls) -> "ContainerTreeSnapshot":
+        if cls.__instance is None:
+            cls.__instance = ContainerTreeSnapshot()
+        return cls.__instance
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._file_path = None  # type: Optional[str]
+        self._key = ""
+        self._queries = {}  # type: Dict[str, List[str]]  # The IDs of the profiles found by each look-up.
+        self._is_enabled = False
+        self._is_dirty = False
+
+    def load(self, file_path: str, key: str) -> None:
+        """Start using the snapshot in a file, if it was made with the same key, or start a new snapshot.
+
+        :param file_path: The file to read the snapshot from, and to save it to.
+        :param key: Identifies the profiles that the snapshot was made from. See :py:meth:`createKey`.
+        """
+
+        queries = {}  # type: Dict[str, List[str]]
+        try:
+            with open(file_path, "r", encoding = "utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.SnapshotVersion and data.get("key") == key:
+                queries = data["queries"]
+            else:
+                Logger.log("i", "The container tree snapshot is out of date, so the container tree will be built from the profiles.")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            Logger.log("w", "Unable to read the container tree snapshot from {file_path}: {err}".format(file_path = file_path, err = str(e)))
+
+        with self._lock:
+            self._file_path = file_path
+            self._key = key
+            self._queries = queries
+            self._is_enabled = True
+            self._is_dirty = False
+
+        container_registry = ContainerRegistry.getInstance()
+        container_registry.containerAdded.connect(self._onContainerChanged)
+        container_registry.containerRemoved.connect(self._onContainerChanged)
+        container_registry.containerMetaDataChanged.connect(self._onContainerChanged)
+
+    def save(self) -> None:
+        """Write the look-ups done in this session to the snapshot file, if there are new ones."""
+
+        with self._lock:
+            if not self._is_enabled or not self._is_dirty or self._file_path is None:
+                return
+            file_path = self._file_path
+            data = json.dumps({"version": self.SnapshotVersion, "key": self._key, "queries": self._queries})
+            self._is_dirty = False
+
+        temporary_path = file_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok = True)
+            with open(temporary_path, "w", encoding = "utf-8") as f:
+                f.write(data)
+            os.replace(temporary_path, file_path)  # Replace it at once, so another Cura never reads half a snapshot.
+        except OSError as e:
+            Logger.log("w", "Unable to save the container tree snapshot to {file_path}: {err}".format(file_path = file_path, err = str(e)))
+
+    def findInstanceContainersMetadata(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Find the metadata of the profiles that match a look-up, like
+        :py:meth:`UM.Settings.ContainerRegistry.ContainerRegistry.findInstanceContainersMetadata`.
+
+        If the same look-up was done in an earlier session, the profiles are taken by their IDs.
+        """
+
+        container_registry = ContainerRegistry.getInstance()
+        with self._lock:
+            if not self._is_enabled:
+                return container_registry.findInstanceContainersMetadata(**kwargs)
+            query_key = json.dumps(kwargs, sort_keys = True)
+            container_ids = self._queries.get(query_key)
+
+        if container_ids is not None:
+            result = []
+            for container_id in container_ids:
+                metadata = container_registry.findContainersMetadata(id = container_id)
+                if not metadata:
+                    break  # The profile is gone, so the snapshot is wrong. Do the look-up after all.
+                result.append(metadata[0])
+            else:
+                return result
+
+        result = container_registry.findInstanceContainersMetadata(**kwargs)
+        with self._lock:
+            if self._is_enabled:
+                self._queries[query_key] = [metadata["id"] for metadata in result]
+                self._is_dirty = True
+        return result
+
+    @staticmethod
+    def createKey(application: "CuraApplication", resource_types: Iterable[int]) -> str:
+        """Create a key that changes if the profiles that the container tree is built from could have changed.
+
+        :param application: The application, for its version and its installed packages.
+        :param resource_types: The resource types of the profiles that the tree is built from.
+        """
+
+        key = hashlib.sha1()
+        key.update(application.getVersion().encode("utf-8"))
+        key.update(str(application.SettingVersion).encode("utf-8"))
+
+        package_manager = application.getPackageManager()
+        for package_id in sorted(package_manager.getAllInstalledPackageIDs()):
+            package_info = package_manager.getInstalledPackageInfo(package_id) or {}
+            key.update("{package_id}={version}\n".format(package_id = package_id, version = package_info.get("package_version", "")).encode("utf-8"))
+
+        for resource_type in resource_types:
+            for path in sorted(Resources.getAllPathsForType(resource_type)):
+                for file_path, modified_time, size in sorted(ContainerTreeSnapshot._listFiles(path)):
+                    key.update("{file_path}:{modified_time}:{size}\n".format(file_path = file_path, modified_time = modified_time, size = size).encode("utf-8"))
+        return key.hexdigest()
+
+    @staticmethod
+    def _listFiles(path: str) -> List[Tuple[str, int, int]]:
+        """List the files in a directory and its subdirectories, with when they were last modified and their size."""
+
+        files = []
+        for root, _, file_names in os.walk(path):
+            for file_name in file_names:
+                file_path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                files.append((file_path, stat.st_mtime_ns, stat.st_size))
+        return files
+
+    def _onContainerChanged(self, container: "ContainerInterface", *args: Any, **kwargs: Any) -> None:
+        if container.getMetaDataEntry("type") not in self._profile_types:
+            return
+        with self._lock:
+            if not self._is_enabled:
+                return
+            Logger.log("d", "Profile {container_id} changed, so the container tree snapshot is no longer used in this session.".format(container_id = container.getId()))
+            self._is_enabled = False
+            self._queries = {}
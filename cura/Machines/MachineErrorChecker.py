@@ -1,12 +1,11 @@
 # Copyright (c) 2020 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
 
+import threading
 import time
 
-from collections import deque
-
 from PyQt6.QtCore import QObject, QTimer, pyqtSignal, pyqtProperty
-from typing import Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple, TYPE_CHECKING
 
 from UM.Logger import Logger
 from UM.Settings.SettingDefinition import SettingDefinition
@@ -14,17 +13,22 @@ from UM.Settings.Validator import ValidatorState
 
 import cura.CuraApplication
 
+if TYPE_CHECKING:
+    from cura.Settings.CuraContainerStack import CuraContainerStack
+
 
 class MachineErrorChecker(QObject):
     """This class performs setting error checks for the currently active machine.
 
-    The whole error checking process is pretty heavy which can take ~0.5 secs, so it can cause GUI to lag. The idea
-    here is to split the whole error check into small tasks, each of which only checks a single setting key in a
-    stack. According to my profiling results, the maximal runtime for such a sub-task is <0.03 secs, which should be
-    good enough. Moreover, if any changes happened to the machine, we can cancel the check in progress without wait
-    for it to finish the complete work.
+    The whole error checking process is pretty heavy which can take ~0.5 secs per extruder, so it is done in small
+    batches on the main thread, to not make the GUI lag. The stacks can only be evaluated on the main thread, because
+    they are changed there. Settings that are not settable per extruder get their value from the global stack in every
+    extruder, so those are only checked once. If any changes happened to the machine, the check in progress is
+    cancelled before the next batch, without waiting for it to finish the complete work.
     """
 
+    _batch_duration = 0.02  # The time to check settings for, in seconds, before letting the GUI process its events.
+
     def __init__(self, parent: Optional[QObject] = None) -> None:
         super().__init__(parent)
 
@@ -34,11 +38,15 @@ class MachineErrorChecker(QObject):
         self._error_keys = set()  # type: Set[str] # A set of settings keys that have errors
         self._error_keys_in_progress = set()  # type: Set[str]  # The variable that stores the results of the currently in progress check
 
-        self._stacks_and_keys_to_check = None  # type: Optional[deque]  # a FIFO queue of tuples (stack, key) to check for errors
+        self._settable_per_extruder = {}  # type: Dict[str, Dict[str, bool]]  # Per machine definition ID, whether each setting is settable per extruder.
+        self._result_event = threading.Event()  # Set while there is no need to wait for a result.
+        self._result_event.set()
 
         self._need_to_check = False  # Whether we need to schedule a new check or not. This flag is set when a new
                                      # error check needs to take place while there is already one running at the moment.
         self._check_in_progress = False  # Whether there is an error check running in progress at the moment.
+        self._stacks_and_keys_to_check = []  # type: List[Tuple[CuraContainerStack, str]]  # The settings that the check in progress checks.
+        self._check_index = 0  # The next setting that the check in progress checks.
 
         self._application = cura.CuraApplication.CuraApplication.getInstance()
         self._machine_manager = self._application.getMachineManager()
@@ -49,8 +57,6 @@ class MachineErrorChecker(QObject):
 
         self._keys_to_check = set()  # type: Set[str]
 
-        self._num_keys_to_check_per_update = 1
-
     def initialize(self) -> None:
         self._error_check_timer.timeout.connect(self._rescheduleCheck)
 
@@ -105,6 +111,22 @@ class MachineErrorChecker(QObject):
     def needToWaitForResult(self) -> bool:
         return self._need_to_check or self._check_in_progress
 
+    def waitForResult(self, timeout: Optional[float] = None) -> bool:
+        """Wait until there is no need to wait for the result any more, from another thread than the main thread.
+
+        :param timeout: The maximum time to wait, in seconds, or None to wait as long as it takes.
+        :return: Whether the result is there, or False if the time ran out before that.
+        """
+
+        return self._result_event.wait(timeout)
+
+    def _emitNeedToWaitForResultChanged(self) -> None:
+        if self.needToWaitForResult:
+            self._result_event.clear()
+        else:
+            self._result_event.set()
+        self.needToWaitForResultChanged.emit()
+
     def startErrorCheckPropertyChanged(self, key: str, property_name: str) -> None:
         """Start the error check for property changed
         this is separate from the startErrorCheck because it ignores a number property types
@@ -126,7 +148,7 @@ class MachineErrorChecker(QObject):
 
         if not self._check_in_progress:
             self._need_to_check = True
-            self.needToWaitForResultChanged.emit()
+            self._emitNeedToWaitForResultChanged()
         self._error_check_timer.start()
 
     def _rescheduleCheck(self) -> None:
@@ -136,78 +158,109 @@ class MachineErrorChecker(QObject):
         to notify the current check to stop and start a new one.
         """
 
-        if self._check_in_progress and not self._need_to_check:
-            self._need_to_check = True
-            self.needToWaitForResultChanged.emit()
+        if self._check_in_progress:
+            if not self._need_to_check:
+                self._need_to_check = True
+                self._emitNeedToWaitForResultChanged()
             return
 
-        self._error_keys_in_progress = set()
         self._need_to_check = False
-        self.needToWaitForResultChanged.emit()
 
         global_stack = self._machine_manager.activeMachine
         if global_stack is None:
             Logger.log("i", "No active machine, nothing to check.")
+            self._emitNeedToWaitForResultChanged()
             return
 
         # Populate the (stack, key) tuples to check
-        self._stacks_and_keys_to_check = deque()
+        stacks_and_keys_to_check = []  # type: List[Tuple[CuraContainerStack, str]]
+        keys_checked_in_any_extruder = set()  # type: Set[str]
         for stack in global_stack.extruderList:
             if not self._keys_to_check:
                 self._keys_to_check = stack.getAllKeys()
 
             for key in self._keys_to_check:
-                self._stacks_and_keys_to_check.append((stack, key))
-
-        self._application.callLater(self._checkStack)
+                if not self._isSettablePerExtruder(global_stack, key):
+                    # The extruders all get this setting from the global stack, so the result is the same for each.
+                    if key in keys_checked_in_any_extruder:
+                        continue
+                    keys_checked_in_any_extruder.add(key)
+                stacks_and_keys_to_check.append((stack, key))
+
+        self._stacks_and_keys_to_check = stacks_and_keys_to_check
+        self._check_index = 0
+        self._check_in_progress = True
+        self._emitNeedToWaitForResultChanged()
         self._check_start_time = time.time()
-        Logger.log("d", "New error check scheduled.")
+        self._application.callLater(self._checkBatch)
+        Logger.log("d", "New error check started for %s settings.", len(stacks_and_keys_to_check))
 
-    def _checkStack(self) -> None:
-        if self._need_to_check:
-            Logger.log("d", "Need to check for errors again. Discard the current progress and reschedule a check.")
-            self._check_in_progress = False
-            self._application.callLater(self.startErrorCheck)
-            return
+    def _isSettablePerExtruder(self, global_stack: "CuraContainerStack", key: str) -> bool:
+        """Whether a setting is settable per extruder, which can only be set in the definitions, so it never changes."""
 
-        self._check_in_progress = True
+        settable_per_extruder = self._settable_per_extruder.setdefault(global_stack.definition.getId(), {})
+        result = settable_per_extruder.get(key)
+        if result is None:
+            result = bool(global_stack.definition.getProperty(key, "settable_per_extruder"))
+            settable_per_extruder[key] = result
+        return result
 
-        for i in range(self._num_keys_to_check_per_update):
-            # If there is nothing to check any more, it means there is no error.
-            if not self._stacks_and_keys_to_check:
-                # Finish
-                self._setResult(False)
-                return
+    def _checkBatch(self) -> None:
+        """Check the next settings for errors, until the time for a batch runs out, and schedule the next batch."""
 
-            # Get the next stack and key to check
-            stack, key = self._stacks_and_keys_to_check.popleft()
-
-            enabled = stack.getProperty(key, "enabled")
-            if not enabled:
-                continue
-
-            validation_state = stack.getProperty(key, "validationState")
-            if validation_state is None:
-                # Setting is not validated. This can happen if there is only a setting definition.
-                # We do need to validate it, because a setting definitions value can be set by a function, which could
-                # be an invalid setting.
-                definition = stack.getSettingDefinition(key)
-                validator_type = SettingDefinition.getValidatorForType(definition.type)
-                if validator_type:
-                    validator = validator_type(key)
-                    validation_state = validator(stack)
-            if validation_state in (ValidatorState.Exception, ValidatorState.MaximumError, ValidatorState.MinimumError, ValidatorState.Invalid):
+        if self._need_to_check:
+            self._discardCheck()
+            return
+
+        batch_end_time = time.monotonic() + self._batch_duration
+        while self._check_index < len(self._stacks_and_keys_to_check):
+            stack, key = self._stacks_and_keys_to_check[self._check_index]
+            try:
+                has_error = self._hasError(stack, key)
+            except Exception:
+                Logger.logException("w", "Failed to check setting %s for errors.", key)
+                has_error = True
+            if has_error:
                 # Since we don't know if any of the settings we didn't check is has an error value, store the list for the
                 # next check.
-                keys_to_recheck = {setting_key for stack, setting_key in self._stacks_and_keys_to_check}
-                keys_to_recheck.add(key)
-                self._setResult(True, keys_to_recheck = keys_to_recheck)
+                keys_to_recheck = {setting_key for stack, setting_key in self._stacks_and_keys_to_check[self._check_index:]}
+                self._setResult(True, keys_to_recheck)
+                return
+
+            self._check_index += 1
+            if self._check_index < len(self._stacks_and_keys_to_check) and time.monotonic() > batch_end_time:
+                self._application.callLater(self._checkBatch)
                 return
 
-        # Schedule the check for the next key
-        self._application.callLater(self._checkStack)
+        # If there is nothing to check any more, it means there is no error.
+        self._setResult(False)
+
+    @staticmethod
+    def _hasError(stack: "CuraContainerStack", key: str) -> bool:
+        enabled = stack.getProperty(key, "enabled")
+        if not enabled:
+            return False
+
+        validation_state = stack.getProperty(key, "validationState")
+        if validation_state is None:
+            # Setting is not validated. This can happen if there is only a setting definition.
+            # We do need to validate it, because a setting definitions value can be set by a function, which could
+            # be an invalid setting.
+            definition = stack.getSettingDefinition(key)
+            validator_type = SettingDefinition.getValidatorForType(definition.type)
+            if validator_type:
+                validator = validator_type(key)
+                validation_state = validator(stack)
+        return validation_state in (ValidatorState.Exception, ValidatorState.MaximumError, ValidatorState.MinimumError, ValidatorState.Invalid)
+
+    def _discardCheck(self) -> None:
+        Logger.log("d", "Need to check for errors again. Discard the current progress and reschedule a check.")
+        self._stacks_and_keys_to_check = []
+        self._check_in_progress = False
+        self.startErrorCheck()
 
     def _setResult(self, result: bool, keys_to_recheck = None) -> None:
+        self._stacks_and_keys_to_check = []
         if result != self._has_errors:
             self._has_errors = result
             self.hasErrorUpdated.emit()
@@ -215,7 +268,7 @@ class MachineErrorChecker(QObject):
         self._keys_to_check = keys_to_recheck if keys_to_recheck else set()
         self._need_to_check = False
         self._check_in_progress = False
-        self.needToWaitForResultChanged.emit()
+        self._emitNeedToWaitForResultChanged()
         self.errorCheckFinished.emit()
         execution_time = time.time() - self._check_start_time
         Logger.info(f"Error check finished, result = {result}, time = {execution_time:.2f}s")
@@ -11,6 +11,7 @@ from UM.Settings.ContainerRegistry import ContainerRegistry  # To find all the v
 
 import cura.CuraApplication  # Imported like this to prevent circular dependencies.
 from cura.Machines.ContainerNode import ContainerNode
+from cura.Machines.ContainerTreeSnapshot import ContainerTreeSnapshot
 from cura.Machines.QualityChangesGroup import QualityChangesGroup  # To construct groups of quality changes profiles that belong together.
 from cura.Machines.QualityGroup import QualityGroup  # To construct groups of quality profiles that belong together.
 from cura.Machines.QualityNode import QualityNode
@@ -186,13 +187,13 @@ class MachineNode(ContainerNode):
     def _loadAll(self) -> None:
         """(Re)loads all variants under this printer."""
 
-        container_registry = ContainerRegistry.getInstance()
+        snapshot = ContainerTreeSnapshot.getInstance()
         if not self.has_variants:
             self.variants["empty"] = VariantNode("empty_variant", machine=self)
             self.variants["empty"].materialsChanged.connect(self.materialsChanged)
         else:
             # Find all the variants for this definition ID.
-            variants = container_registry.findInstanceContainersMetadata(type = "variant", definition = self.container_id, hardware_type = "nozzle")
+            variants = snapshot.findInstanceContainersMetadata(type = "variant", definition = self.container_id, hardware_type = "nozzle")
             for variant in variants:
                 variant_name = variant["name"]
                 if variant_name not in self.variants:
@@ -206,9 +207,9 @@ class MachineNode(ContainerNode):
                 self.variants["empty"] = VariantNode("empty_variant", machine = self)
 
         # Find the global qualities for this printer.
-        global_qualities = container_registry.findInstanceContainersMetadata(type = "quality", definition = self.quality_definition, global_quality = "True")  # First try specific to this printer.
+        global_qualities = snapshot.findInstanceContainersMetadata(type = "quality", definition = self.quality_definition, global_quality = "True")  # First try specific to this printer.
         if not global_qualities:  # This printer doesn't override the global qualities.
-            global_qualities = container_registry.findInstanceContainersMetadata(type = "quality", definition = "fdmprinter", global_quality = "True")  # Otherwise pick the global global qualities.
+            global_qualities = snapshot.findInstanceContainersMetadata(type = "quality", definition = "fdmprinter", global_quality = "True")  # Otherwise pick the global global qualities.
             if not global_qualities:  # There are no global qualities either?! Something went very wrong, but we'll not crash and properly fill the tree.
                 global_qualities = [cura.CuraApplication.CuraApplication.getInstance().empty_quality_container.getMetaData()]
         for global_quality in global_qualities:
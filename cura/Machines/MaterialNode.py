@@ -8,6 +8,7 @@ from UM.Settings.ContainerRegistry import ContainerRegistry
 from UM.Settings.Interfaces import ContainerInterface
 from UM.Signal import Signal
 from cura.Machines.ContainerNode import ContainerNode
+from cura.Machines.ContainerTreeSnapshot import ContainerTreeSnapshot
 from cura.Machines.QualityNode import QualityNode
 import UM.FlameProfiler
 if TYPE_CHECKING:
@@ -68,38 +69,38 @@ class MaterialNode(ContainerNode):
 
     @UM.FlameProfiler.profile
     def _loadAll(self) -> None:
-        container_registry = ContainerRegistry.getInstance()
+        snapshot = ContainerTreeSnapshot.getInstance()
         # Find all quality profiles that fit on this material.
         if not self.variant.machine.has_machine_quality:  # Need to find the global qualities.
-            qualities = container_registry.findInstanceContainersMetadata(type = "quality",
-                                                                          definition = "fdmprinter")
+            qualities = snapshot.findInstanceContainersMetadata(type = "quality",
+                                                                definition = "fdmprinter")
         elif not self.variant.machine.has_materials:
-            qualities = container_registry.findInstanceContainersMetadata(type = "quality",
-                                                                          definition = self.variant.machine.quality_definition)
+            qualities = snapshot.findInstanceContainersMetadata(type = "quality",
+                                                                definition = self.variant.machine.quality_definition)
         else:
             if self.variant.machine.has_variants:
                 # Need to find the qualities that specify a material profile with the same material type.
-                qualities = container_registry.findInstanceContainersMetadata(type = "quality",
-                                                                              definition = self.variant.machine.quality_definition,
-                                                                              variant = self.variant.variant_name,
-                                                                              material = self.base_file)  # First try by exact material ID.
+                qualities = snapshot.findInstanceContainersMetadata(type = "quality",
+                                                                    definition = self.variant.machine.quality_definition,
+                                                                    variant = self.variant.variant_name,
+                                                                    material = self.base_file)  # First try by exact material ID.
                 # CURA-7070
                 # The quality profiles only reference a material with the material_root_id. They will never state something
                 # such as "generic_pla_ultimaker_s5_AA_0.4". So we search with the "base_file" which is the material_root_id.
             else:
-                qualities = container_registry.findInstanceContainersMetadata(type = "quality", definition = self.variant.machine.quality_definition, material = self.base_file)
+                qualities = snapshot.findInstanceContainersMetadata(type = "quality", definition = self.variant.machine.quality_definition, material = self.base_file)
 
             if not qualities:
                 my_material_type = self.material_type
                 if self.variant.machine.has_variants:
-                    qualities_any_material = container_registry.findInstanceContainersMetadata(type = "quality",
-                                                                                               definition = self.variant.machine.quality_definition,
-                                                                                               variant = self.variant.variant_name)
+                    qualities_any_material = snapshot.findInstanceContainersMetadata(type = "quality",
+                                                                                     definition = self.variant.machine.quality_definition,
+                                                                                     variant = self.variant.variant_name)
                 else:
-                    qualities_any_material = container_registry.findInstanceContainersMetadata(type = "quality", definition = self.variant.machine.quality_definition)
+                    qualities_any_material = snapshot.findInstanceContainersMetadata(type = "quality", definition = self.variant.machine.quality_definition)
 
                 # First we attempt to find materials that have the same brand but not the right color
-                all_material_base_files_right_brand = {material_metadata["base_file"] for material_metadata in container_registry.findInstanceContainersMetadata(type = "material", material = my_material_type, brand = self.brand)}
+                all_material_base_files_right_brand = {material_metadata["base_file"] for material_metadata in snapshot.findInstanceContainersMetadata(type = "material", material = my_material_type, brand = self.brand)}
 
                 right_brand_no_color_qualities = [quality for quality in qualities_any_material if quality.get("material") in all_material_base_files_right_brand]
 
@@ -109,15 +110,15 @@ class MaterialNode(ContainerNode):
                 else:
                     # Fall back to generic
                     all_material_base_files = {material_metadata["base_file"] for material_metadata in
-                                               container_registry.findInstanceContainersMetadata(type="material",
-                                                                                                 material=my_material_type)}
+                                               snapshot.findInstanceContainersMetadata(type="material",
+                                                                                       material=my_material_type)}
                     no_brand_no_color_qualities = (quality for quality in qualities_any_material if
                                                    quality.get("material") in all_material_base_files)
                     qualities.extend(no_brand_no_color_qualities)
 
                 if not qualities:  # No quality profiles found. Go by GUID then.
                     my_guid = self.guid
-                    for material_metadata in container_registry.findInstanceContainersMetadata(type = "material", guid = my_guid):
+                    for material_metadata in snapshot.findInstanceContainersMetadata(type = "material", guid = my_guid):
                         qualities.extend((quality for quality in qualities_any_material if quality["material"] == material_metadata["base_file"]))
 
                 if not qualities:
@@ -5,6 +5,7 @@ from typing import Union, TYPE_CHECKING
 
 from UM.Settings.ContainerRegistry import ContainerRegistry
 from cura.Machines.ContainerNode import ContainerNode
+from cura.Machines.ContainerTreeSnapshot import ContainerTreeSnapshot
 from cura.Machines.IntentNode import IntentNode
 import UM.FlameProfiler
 if TYPE_CHECKING:
@@ -34,12 +35,12 @@ class QualityNode(ContainerNode):
 
     @UM.FlameProfiler.profile
     def _loadAll(self) -> None:
-        container_registry = ContainerRegistry.getInstance()
+        snapshot = ContainerTreeSnapshot.getInstance()
 
         # Find all intent profiles that fit the current configuration.
         from cura.Machines.MachineNode import MachineNode
         if not isinstance(self.parent, MachineNode):  # Not a global profile.
-            for intent in container_registry.findInstanceContainersMetadata(type = "intent", definition = self.parent.variant.machine.quality_definition, variant = self.parent.variant.variant_name, material = self._material, quality_type = self.quality_type):
+            for intent in snapshot.findInstanceContainersMetadata(type = "intent", definition = self.parent.variant.machine.quality_definition, variant = self.parent.variant.variant_name, material = self._material, quality_type = self.quality_type):
                 self.intents[intent["id"]] = IntentNode(intent["id"], quality = self)
 
         self.intents["empty_intent"] = IntentNode("empty_intent", quality = self)
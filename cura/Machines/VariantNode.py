@@ -8,6 +8,7 @@ from UM.Settings.Interfaces import ContainerInterface
 from UM.Signal import Signal
 
 from cura.Machines.ContainerNode import ContainerNode
+from cura.Machines.ContainerTreeSnapshot import ContainerTreeSnapshot
 from cura.Machines.MaterialNode import MaterialNode
 
 import UM.FlameProfiler
@@ -43,7 +44,7 @@ class VariantNode(ContainerNode):
     def _loadAll(self) -> None:
         """(Re)loads all materials under this variant."""
 
-        container_registry = ContainerRegistry.getInstance()
+        snapshot = ContainerTreeSnapshot.getInstance()
 
         if not self.machine.has_materials:
             self.materials["empty_material"] = MaterialNode("empty_material", variant = self)
@@ -51,9 +52,9 @@ class VariantNode(ContainerNode):
 
         # Find all the materials for this variant's name.
         else:  # Printer has its own material profiles. Look for material profiles with this printer's definition.
-            base_materials = container_registry.findInstanceContainersMetadata(type = "material", definition = "fdmprinter")
-            printer_specific_materials = container_registry.findInstanceContainersMetadata(type = "material", definition = self.machine.container_id)
-            variant_specific_materials = container_registry.findInstanceContainersMetadata(type = "material", definition = self.machine.container_id, variant_name = self.variant_name)  # If empty_variant, this won't return anything.
+            base_materials = snapshot.findInstanceContainersMetadata(type = "material", definition = "fdmprinter")
+            printer_specific_materials = snapshot.findInstanceContainersMetadata(type = "material", definition = self.machine.container_id)
+            variant_specific_materials = snapshot.findInstanceContainersMetadata(type = "material", definition = self.machine.container_id, variant_name = self.variant_name)  # If empty_variant, this won't return anything.
             materials_per_base_file = {material["base_file"]: material for material in base_materials}
             materials_per_base_file.update({material["base_file"]: material for material in printer_specific_materials})  # Printer-specific profiles override global ones.
             materials_per_base_file.update({material["base_file"]: material for material in variant_specific_materials})  # Variant-specific profiles override all of those.
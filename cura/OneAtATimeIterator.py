@@ -1,8 +1,11 @@
 # Copyright (c) 2019 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
 
+import heapq
 from typing import List
 
+import numpy
+
 from UM.Scene.Iterator import Iterator
 from UM.Scene.SceneNode import SceneNode
 from functools import cmp_to_key
@@ -67,34 +70,23 @@ class OneAtATimeIterator(Iterator.Iterator):
             return []  # No solution
 
         # Sort the original list so that items that block the most other objects are at the beginning.
-        # This does not decrease the worst case running time, but should improve it in most cases.
         node_list = sorted(node_list, key = cmp_to_key(hit_checker.calculateScore))
 
-        todo_node_list = [_ObjectOrder([], node_list)]
-        while len(todo_node_list) > 0:
-            current = todo_node_list.pop()
-            for node in current.todo:
-                # Check if the object can be placed with what we have and still allows for a solution in the future
-                if hit_checker.canPrintAfter(node, current.order) and hit_checker.canPrintBefore(node, current.todo):
-                    # We found a possible result. Create new todo & order list.
-                    new_todo_list = current.todo[:]
-                    new_todo_list.remove(node)
-                    new_order = current.order[:] + [node]
-                    if len(new_todo_list) == 0:
-                        # We have no more nodes to check, so quit looking.
-                        return new_order # Solution found!
-                    todo_node_list.append(_ObjectOrder(new_order, new_todo_list))
-        return []  # No result found!
-
-
-class _ObjectOrder:
-    """Internal object used to keep track of a possible order in which to print objects."""
-
-    def __init__(self, order: List[SceneNode], todo: List[SceneNode]) -> None:
-        """Creates the _ObjectOrder instance.
-
-        :param order: List of indices in which to print objects, ordered by printing order.
-        :param todo: List of indices which are not yet inserted into the order list.
-        """
-        self.order = order
-        self.todo = todo
+        # A node can be printed when it doesn't hit any of the nodes that are still to be printed, so this is a
+        # topological sort. Of the nodes that can be printed next, the one that is last in the sorted list is taken.
+        hit_matrix = hit_checker.getHitMatrix(node_list)
+        remaining_hit_counts = hit_matrix.sum(axis = 1)
+        printable = [-index for index in range(len(node_list)) if remaining_hit_counts[index] == 0]
+        heapq.heapify(printable)
+        order = []
+        while printable:
+            index = -heapq.heappop(printable)
+            order.append(node_list[index])
+            # The nodes that hit this node can be printed after it now.
+            for other_index in numpy.nonzero(hit_matrix[:, index])[0]:
+                remaining_hit_counts[other_index] -= 1
+                if remaining_hit_counts[other_index] == 0:
+                    heapq.heappush(printable, -int(other_index))
+        if len(order) < len(node_list):
+            return []  # No result found! Some nodes hit each other in a cycle.
+        return order
@@ -1,17 +1,22 @@
 # Copyright (c) 2022 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
 
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy
 from PyQt6.QtCore import QTimer
 
 from UM.Application import Application
 from UM.Logger import Logger
 from UM.Scene.SceneNode import SceneNode
 from UM.Scene.Iterator.BreadthFirstIterator import BreadthFirstIterator
+from UM.Math.Polygon import Polygon
 from UM.Math.Vector import Vector
 from UM.Scene.Selection import Selection
 from UM.Scene.SceneNodeSettings import SceneNodeSettings
 
 from cura.Scene.ConvexHullDecorator import ConvexHullDecorator
+from cura.Scene.SpatialGrid import SpatialGrid
 
 from cura.Operations import PlatformPhysicsOperation
 from cura.Scene import ZOffsetDecorator
@@ -36,6 +41,7 @@ class PlatformPhysics:
         self._move_factor = 1.1  # By how much should we multiply overlap to calculate a new spot?
         self._max_overlap_checks = 10  # How many times should we try to find a new spot per tick?
         self._minimum_gap = 2  # It is a minimum distance (in mm) between two models, applicable for small models
+        self._node_states = {}  # type: Dict[int, bytes]  # Where each node was in the previous tick, by the ID of the node.
 
         Application.getInstance().getPreferences().addPreference("physics/automatic_push_free", False)
         Application.getInstance().getPreferences().addPreference("physics/automatic_drop_down", True)
@@ -68,10 +74,20 @@ class PlatformPhysics:
         # same direction.
         transformed_nodes = []
 
-        nodes = list(BreadthFirstIterator(root))
+        all_nodes = list(BreadthFirstIterator(root))
 
         # Only check nodes inside build area.
-        nodes = [node for node in nodes if (hasattr(node, "_outside_buildarea") and not node._outside_buildarea)]
+        nodes = [node for node in all_nodes if (hasattr(node, "_outside_buildarea") and not node._outside_buildarea)]
+
+        # The convex hulls of all nodes that others can be pushed away from, in a grid per build plate.
+        hull_grids = {}  # type: Dict[int, SpatialGrid[SceneNode]]
+        node_hulls = {}  # type: Dict[int, _NodeHulls]
+        changed_node_ids = set()  # type: Set[int]
+        if app_automatic_push_free:
+            hull_grids, node_hulls = self._buildHullGrids(root, all_nodes)
+            changed_node_ids = self._updateNodeStates(node_hulls)
+        else:
+            self._node_states.clear()  # Check all nodes when pushing apart gets enabled.
 
         # We try to shuffle all the nodes to prevent "locked" situations, where iteration B inverts iteration A.
         # By shuffling the order of the nodes, this might happen a few times, but at some point it will resolve.
@@ -100,73 +116,9 @@ class PlatformPhysics:
                     continue
 
                 # Check for collisions between convex hulls
-                for other_node in BreadthFirstIterator(root):
-                    # Ignore root, ourselves and anything that is not a normal SceneNode.
-                    if other_node is root or not issubclass(type(other_node), SceneNode) or other_node is node or other_node.callDecoration("getBuildPlateNumber") != node.callDecoration("getBuildPlateNumber"):
-                        continue
-
-                    # Ignore collisions of a group with it's own children
-                    if other_node in node.getAllChildren() or node in other_node.getAllChildren():
-                        continue
-
-                    # Ignore collisions within a group
-                    if other_node.getParent() and node.getParent() and (other_node.getParent().callDecoration("isGroup") is not None or node.getParent().callDecoration("isGroup") is not None):
-                        continue
-
-                    # Ignore nodes that do not have the right properties set.
-                    if not other_node.callDecoration("getConvexHull") or not other_node.getBoundingBox():
-                        continue
-
-                    if other_node in transformed_nodes:
-                        continue  # Other node is already moving, wait for next pass.
-
-                    if other_node.callDecoration("isNonPrintingMesh"):
-                        continue
-
-                    overlap = (0, 0)  # Start loop with no overlap
-                    current_overlap_checks = 0
-                    # Continue to check the overlap until we no longer find one.
-                    while overlap and current_overlap_checks < self._max_overlap_checks:
-                        current_overlap_checks += 1
-                        head_hull = node.callDecoration("getConvexHullHead")
-                        if head_hull:  # One at a time intersection.
-                            overlap = head_hull.translate(move_vector.x, move_vector.z).intersectsPolygon(other_node.callDecoration("getConvexHull"))
-                            if not overlap:
-                                other_head_hull = other_node.callDecoration("getConvexHullHead")
-                                if other_head_hull:
-                                    overlap = node.callDecoration("getConvexHull").translate(move_vector.x, move_vector.z).intersectsPolygon(other_head_hull)
-                                    if overlap:
-                                        # Moving ensured that overlap was still there. Try anew!
-                                        move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
-                                                                      z = move_vector.z + overlap[1] * self._move_factor)
-                            else:
-                                # Moving ensured that overlap was still there. Try anew!
-                                move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
-                                                              z = move_vector.z + overlap[1] * self._move_factor)
-                        else:
-                            own_convex_hull = node.callDecoration("getConvexHull")
-                            other_convex_hull = other_node.callDecoration("getConvexHull")
-                            if own_convex_hull and other_convex_hull:
-                                overlap = own_convex_hull.translate(move_vector.x, move_vector.z).intersectsPolygon(other_convex_hull)
-                                if overlap:  # Moving ensured that overlap was still there. Try anew!
-                                    temp_move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
-                                                                       z = move_vector.z + overlap[1] * self._move_factor)
-
-                                    # if the distance between two models less than 2mm then try to find a new factor
-                                    if abs(temp_move_vector.x - overlap[0]) < self._minimum_gap and abs(temp_move_vector.y - overlap[1]) < self._minimum_gap:
-                                        temp_x_factor = (abs(overlap[0]) + self._minimum_gap) / overlap[0] if overlap[0] != 0 else 0 # find x move_factor, like (3.4 + 2) / 3.4 = 1.58
-                                        temp_y_factor = (abs(overlap[1]) + self._minimum_gap) / overlap[1] if overlap[1] != 0 else 0 # find y move_factor
-
-                                        temp_scale_factor = temp_x_factor if abs(temp_x_factor) > abs(temp_y_factor) else temp_y_factor
-
-                                        move_vector = move_vector.set(x = move_vector.x + overlap[0] * temp_scale_factor,
-                                                                      z = move_vector.z + overlap[1] * temp_scale_factor)
-                                    else:
-                                        move_vector = temp_move_vector
-                            else:
-                                # This can happen in some cases if the object is not yet done with being loaded.
-                                # Simply waiting for the next tick seems to resolve this correctly.
-                                overlap = None
+                grid = hull_grids.get(node.callDecoration("getBuildPlateNumber"))
+                if grid is not None:
+                    move_vector = self._pushFree(node, move_vector, grid, node_hulls, changed_node_ids, transformed_nodes)
 
             if not Vector.Null.equals(move_vector, epsilon = 1e-5):
                 transformed_nodes.append(node)
@@ -176,7 +128,151 @@ class PlatformPhysics:
         # setting this drop to model same as app_automatic_drop_down
         self._app_all_model_drop = False
         # After moving, we have to evaluate the boundary checks for nodes
-        build_volume.updateNodeBoundaryCheck()
+        if transformed_nodes:
+            build_volume.updateNodeBoundaryCheck()
+
+    def _buildHullGrids(self, root: SceneNode, nodes: List[SceneNode]) -> Tuple[Dict[int, "SpatialGrid[SceneNode]"], Dict[int, "_NodeHulls"]]:
+        """Put the convex hulls of all nodes that others can collide with in a grid per build plate.
+
+        :return: The grid for each build plate, and the convex hulls of each node by the ID of the node.
+        """
+
+        node_hulls = {}  # type: Dict[int, _NodeHulls]
+        for other_node in nodes:
+            # Ignore root, anything that is not a normal SceneNode and nodes that do not have the right properties set.
+            if other_node is root or not issubclass(type(other_node), SceneNode) or not other_node.getBoundingBox():
+                continue
+            if other_node.callDecoration("isNonPrintingMesh"):
+                continue
+            convex_hull = other_node.callDecoration("getConvexHull")
+            if not convex_hull:
+                continue
+            hulls = _NodeHulls(convex_hull, other_node.callDecoration("getConvexHullHead"))
+            if hulls.rectangle is not None:
+                node_hulls[id(other_node)] = hulls
+
+        # Make the cells about as large as the objects, so that most objects are in only a few cells.
+        sizes = [max(hulls.rectangle[2] - hulls.rectangle[0], hulls.rectangle[3] - hulls.rectangle[1]) for hulls in node_hulls.values()]
+        cell_size = float(numpy.median(sizes)) if sizes else 1.0
+
+        hull_grids = {}  # type: Dict[int, SpatialGrid[SceneNode]]
+        for other_node in nodes:
+            hulls = node_hulls.get(id(other_node))
+            if hulls is None:
+                continue
+            build_plate_number = other_node.callDecoration("getBuildPlateNumber")
+            if build_plate_number not in hull_grids:
+                hull_grids[build_plate_number] = SpatialGrid(cell_size)
+            hull_grids[build_plate_number].insert(other_node, hulls.rectangle)
+        return hull_grids, node_hulls
+
+    def _updateNodeStates(self, node_hulls: Dict[int, "_NodeHulls"]) -> Set[int]:
+        """Remember where all nodes are, to find the nodes that moved or changed shape since the previous tick.
+
+        :return: The IDs of the nodes that changed.
+        """
+
+        states = {node_id: hulls.getState() for node_id, hulls in node_hulls.items()}
+        changed_node_ids = {node_id for node_id, state in states.items() if self._node_states.get(node_id) != state}
+        self._node_states = states
+        return changed_node_ids
+
+    def _pushFree(self, node: SceneNode, move_vector: Vector, grid: "SpatialGrid[SceneNode]", node_hulls: Dict[int, "_NodeHulls"], changed_node_ids: Set[int], transformed_nodes: List[SceneNode]) -> Vector:
+        """Find a vector to move a node with, so that it no longer collides with the nodes around it.
+
+        Only pairs of nodes of which at least one moved since the previous tick are checked, since the other pairs were
+        pushed apart already.
+
+        :param move_vector: How far the node is moved already.
+        :return: How far the node should be moved.
+        """
+
+        own_hulls = node_hulls.get(id(node))
+        if own_hulls is None:
+            own_hulls = _NodeHulls(node.callDecoration("getConvexHull"), node.callDecoration("getConvexHullHead"))
+            if own_hulls.rectangle is None:
+                return move_vector
+        node_changed = id(node) in changed_node_ids or id(node) not in node_hulls
+
+        checked_node_ids = {id(node)}
+        while True:
+            rectangle = SpatialGrid.translateRectangle(own_hulls.rectangle, move_vector.x, move_vector.z)
+            candidates = [other_node for other_node in grid.query(rectangle) if id(other_node) not in checked_node_ids]
+            moved = False
+            for other_node in candidates:
+                checked_node_ids.add(id(other_node))
+                if not node_changed and id(other_node) not in changed_node_ids:
+                    continue  # Neither of them moved, so they were already pushed apart.
+
+                # Ignore collisions of a group with it's own children
+                if other_node in node.getAllChildren() or node in other_node.getAllChildren():
+                    continue
+
+                # Ignore collisions within a group
+                if other_node.getParent() and node.getParent() and (other_node.getParent().callDecoration("isGroup") is not None or node.getParent().callDecoration("isGroup") is not None):
+                    continue
+
+                if other_node in transformed_nodes:
+                    continue  # Other node is already moving, wait for next pass.
+
+                new_move_vector = self._resolveOverlap(own_hulls, node_hulls[id(other_node)], move_vector)
+                if new_move_vector is not move_vector:
+                    # The node moved, so it may now overlap with nodes that weren't near it before.
+                    move_vector = new_move_vector
+                    moved = True
+                    break
+            if not moved:
+                return move_vector
+
+    def _resolveOverlap(self, own_hulls: "_NodeHulls", other_hulls: "_NodeHulls", move_vector: Vector) -> Vector:
+        """Move a node away from another node until their convex hulls no longer overlap, or it took too many tries."""
+
+        head_hull = own_hulls.convex_hull_head
+        own_convex_hull = own_hulls.convex_hull
+        other_convex_hull = other_hulls.convex_hull
+        other_head_hull = other_hulls.convex_hull_head
+
+        overlap = (0, 0)  # Start loop with no overlap
+        current_overlap_checks = 0
+        # Continue to check the overlap until we no longer find one.
+        while overlap and current_overlap_checks < self._max_overlap_checks:
+            current_overlap_checks += 1
+            if head_hull:  # One at a time intersection.
+                overlap = head_hull.translate(move_vector.x, move_vector.z).intersectsPolygon(other_convex_hull)
+                if not overlap:
+                    if other_head_hull and own_convex_hull:
+                        overlap = own_convex_hull.translate(move_vector.x, move_vector.z).intersectsPolygon(other_head_hull)
+                        if overlap:
+                            # Moving ensured that overlap was still there. Try anew!
+                            move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
+                                                          z = move_vector.z + overlap[1] * self._move_factor)
+                else:
+                    # Moving ensured that overlap was still there. Try anew!
+                    move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
+                                                  z = move_vector.z + overlap[1] * self._move_factor)
+            else:
+                if own_convex_hull and other_convex_hull:
+                    overlap = own_convex_hull.translate(move_vector.x, move_vector.z).intersectsPolygon(other_convex_hull)
+                    if overlap:  # Moving ensured that overlap was still there. Try anew!
+                        temp_move_vector = move_vector.set(x = move_vector.x + overlap[0] * self._move_factor,
+                                                           z = move_vector.z + overlap[1] * self._move_factor)
+
+                        # if the distance between two models less than 2mm then try to find a new factor
+                        if abs(temp_move_vector.x - overlap[0]) < self._minimum_gap and abs(temp_move_vector.y - overlap[1]) < self._minimum_gap:
+                            temp_x_factor = (abs(overlap[0]) + self._minimum_gap) / overlap[0] if overlap[0] != 0 else 0 # find x move_factor, like (3.4 + 2) / 3.4 = 1.58
+                            temp_y_factor = (abs(overlap[1]) + self._minimum_gap) / overlap[1] if overlap[1] != 0 else 0 # find y move_factor
+
+                            temp_scale_factor = temp_x_factor if abs(temp_x_factor) > abs(temp_y_factor) else temp_y_factor
+
+                            move_vector = move_vector.set(x = move_vector.x + overlap[0] * temp_scale_factor,
+                                                          z = move_vector.z + overlap[1] * temp_scale_factor)
+                        else:
+                            move_vector = temp_move_vector
+                else:
+                    # This can happen in some cases if the object is not yet done with being loaded.
+                    # Simply waiting for the next tick seems to resolve this correctly.
+                    overlap = None
+        return move_vector
 
     def _onToolOperationStarted(self, tool):
         self._enabled = False
@@ -199,3 +295,20 @@ class PlatformPhysics:
 
         self._enabled = True
         self._onChangeTimerFinished()
+
+
+class _NodeHulls:
+    """The convex hulls of a node, which are computed once per tick."""
+
+    def __init__(self, convex_hull: Optional[Polygon], convex_hull_head: Optional[Polygon]) -> None:
+        self.convex_hull = convex_hull
+        self.convex_hull_head = convex_hull_head
+        self.rectangle = SpatialGrid.getPolygonRectangle(convex_hull, convex_hull_head)
+
+    def getState(self) -> bytes:
+        """Get a fingerprint of where the hulls are, which changes when the node moves or changes shape."""
+
+        state = b""
+        for hull in (self.convex_hull, self.convex_hull_head):
+            state += hull.getPoints().tobytes() + b";" if hull is not None else b"-;"
+        return state
@@ -11,9 +11,12 @@ from UM.Settings.ContainerRegistry import ContainerRegistry
 from cura.Settings.ExtruderManager import ExtruderManager
 from cura.Scene import ConvexHullNode
 
+import collections
+import hashlib
 import numpy
+import threading
 
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Optional, Tuple
 
 if TYPE_CHECKING:
     from UM.Scene.SceneNode import SceneNode
@@ -28,6 +31,12 @@ class ConvexHullDecorator(SceneNodeDecorator):
     If a scene node has a convex hull decorator, it will have a shadow in which other objects can not be printed.
     """
 
+    # The convex hulls of meshes, by the contents of the mesh and the rotation and scale of the node, shared between all
+    # nodes. Copies of a model only need to compute the hull once, and moving a node only moves its hull.
+    _shared_convex_hulls = collections.OrderedDict()  # type: collections.OrderedDict[Tuple[bytes, bytes], Polygon]
+    _shared_convex_hulls_lock = threading.Lock()
+    _maximum_shared_convex_hulls = 256
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -227,6 +236,7 @@ class ConvexHullDecorator(SceneNodeDecorator):
         self._2d_convex_hull_mesh = None  # type: Optional[MeshData]
         self._2d_convex_hull_mesh_world_transform = None  # type: Optional[Matrix]
         self._2d_convex_hull_mesh_result = None  # type: Optional[Polygon]
+        self._2d_convex_hull_mesh_content = None  # type: Optional[Tuple[MeshData, bytes, Optional[numpy.ndarray]]]
 
     def _compute2DConvexHull(self) -> Optional[Polygon]:
         if self._node is None:
@@ -259,8 +269,6 @@ class ConvexHullDecorator(SceneNodeDecorator):
             return offset_hull
 
         else:
-            convex_hull = Polygon([])
-            offset_hull = Polygon([])
             mesh = self._node.getMeshData()
             if mesh is None:
                 return Polygon([])  # Node has no mesh data, so just return an empty Polygon.
@@ -271,35 +279,8 @@ class ConvexHullDecorator(SceneNodeDecorator):
             if mesh is self._2d_convex_hull_mesh and world_transform == self._2d_convex_hull_mesh_world_transform:
                 return self._offsetHull(self._2d_convex_hull_mesh_result)
 
-            vertex_data = mesh.getConvexHullTransformedVertices(world_transform)
-            # Don't use data below 0.
-            # TODO; We need a better check for this as this gives poor results for meshes with long edges.
-            # Do not throw away vertices: the convex hull may be too small and objects can collide.
-            # vertex_data = vertex_data[vertex_data[:,1] >= -0.01]
-
-            if vertex_data is not None and len(vertex_data) >= 4:  # type: ignore # mypy and numpy don't play along well just yet.
-                # Round the vertex data to 1/10th of a mm, then remove all duplicate vertices
-                # This is done to greatly speed up further convex hull calculations as the convex hull
-                # becomes much less complex when dealing with highly detailed models.
-                vertex_data = numpy.round(vertex_data, 1)
-
-                vertex_data = vertex_data[:, [0, 2]]  # Drop the Y components to project to 2D.
-
-                # Grab the set of unique points.
-                #
-                # This basically finds the unique rows in the array by treating them as opaque groups of bytes
-                # which are as long as the 2 float64s in each row, and giving this view to numpy.unique() to munch.
-                # See http://stackoverflow.com/questions/16970982/find-unique-rows-in-numpy-array
-                vertex_byte_view = numpy.ascontiguousarray(vertex_data).view(
-                    numpy.dtype((numpy.void, vertex_data.dtype.itemsize * vertex_data.shape[1])))
-                _, idx = numpy.unique(vertex_byte_view, return_index = True)
-                vertex_data = vertex_data[idx]  # Select the unique rows by index.
-
-                hull = Polygon(vertex_data)
-
-                if len(vertex_data) >= 3:
-                    convex_hull = hull.getConvexHull()
-                    offset_hull = self._offsetHull(convex_hull)
+            convex_hull = self._getSharedConvexHull(mesh, world_transform)
+            offset_hull = self._offsetHull(convex_hull)
 
             # Store the result in the cache
             self._2d_convex_hull_mesh = mesh
@@ -308,6 +289,86 @@ class ConvexHullDecorator(SceneNodeDecorator):
 
             return offset_hull
 
+    def _getSharedConvexHull(self, mesh: "MeshData", world_transform: "Matrix") -> Polygon:
+        """Get the convex hull of a mesh under a transformation, computing it only if no node with the same mesh and
+        the same rotation and scale computed it before.
+        """
+
+        mesh_content, hull_vertices = self._getMeshHullVertices(mesh)
+        transform_data = world_transform.getData()
+        rotation_scale = numpy.array(transform_data[:3, :3], dtype = numpy.float64)
+        key = (mesh_content, rotation_scale.tobytes())
+
+        with self._shared_convex_hulls_lock:
+            convex_hull = self._shared_convex_hulls.get(key)
+            if convex_hull is not None:
+                self._shared_convex_hulls.move_to_end(key)
+        if convex_hull is None:
+            # Compute the hull around the origin, so that it can be moved to wherever a node with this mesh is.
+            # Only the vertices of the 3D hull of the mesh can end up on the 2D hull, and only their X and Z are needed.
+            projected_vertices = None
+            if hull_vertices is not None:
+                projected_vertices = hull_vertices @ rotation_scale[[0, 2]].T
+            convex_hull = self._computeMeshConvexHull(projected_vertices)
+            with self._shared_convex_hulls_lock:
+                self._shared_convex_hulls[key] = convex_hull
+                while len(self._shared_convex_hulls) > self._maximum_shared_convex_hulls:
+                    self._shared_convex_hulls.popitem(last = False)
+
+        if len(convex_hull.getPoints()) == 0:
+            return convex_hull
+        return convex_hull.translate(float(transform_data[0, 3]), float(transform_data[2, 3]))  # Drop the Y component to project to 2D.
+
+    def _getMeshHullVertices(self, mesh: "MeshData") -> Tuple[bytes, Optional[numpy.ndarray]]:
+        """Get the vertices of the 3D convex hull of a mesh, with a hash of them that is the same for meshes with the
+        same convex hull.
+        """
+
+        if self._2d_convex_hull_mesh_content is not None and self._2d_convex_hull_mesh_content[0] is mesh:
+            return self._2d_convex_hull_mesh_content[1], self._2d_convex_hull_mesh_content[2]
+        hull_vertices = mesh.getConvexHullVertices()
+        if hull_vertices is None or len(hull_vertices) == 0:
+            content_hash = b""
+            hull_vertices = None
+        else:
+            hull_vertices = numpy.ascontiguousarray(hull_vertices, dtype = numpy.float64)
+            content_hash = hashlib.sha1(hull_vertices.tobytes()).digest()
+        self._2d_convex_hull_mesh_content = (mesh, content_hash, hull_vertices)
+        return content_hash, hull_vertices
+
+    @staticmethod
+    def _computeMeshConvexHull(vertex_data: Optional[numpy.ndarray]) -> Polygon:
+        """Compute the 2D convex hull of the vertices of a mesh, projected on the build plate."""
+
+        convex_hull = Polygon([])
+
+        # Don't use data below 0.
+        # TODO; We need a better check for this as this gives poor results for meshes with long edges.
+        # Do not throw away vertices: the convex hull may be too small and objects can collide.
+        # vertex_data = vertex_data[vertex_data[:,1] >= -0.01]
+
+        if vertex_data is not None and len(vertex_data) >= 4:  # type: ignore # mypy and numpy don't play along well just yet.
+            # Round the vertex data to 1/10th of a mm, then remove all duplicate vertices
+            # This is done to greatly speed up further convex hull calculations as the convex hull
+            # becomes much less complex when dealing with highly detailed models.
+            vertex_data = numpy.round(vertex_data, 1)
+
+            # Grab the set of unique points.
+            #
+            # This basically finds the unique rows in the array by treating them as opaque groups of bytes
+            # which are as long as the 2 float64s in each row, and giving this view to numpy.unique() to munch.
+            # See http://stackoverflow.com/questions/16970982/find-unique-rows-in-numpy-array
+            vertex_byte_view = numpy.ascontiguousarray(vertex_data).view(
+                numpy.dtype((numpy.void, vertex_data.dtype.itemsize * vertex_data.shape[1])))
+            _, idx = numpy.unique(vertex_byte_view, return_index = True)
+            vertex_data = vertex_data[idx]  # Select the unique rows by index.
+
+            hull = Polygon(vertex_data)
+
+            if len(vertex_data) >= 3:
+                convex_hull = hull.getConvexHull()
+        return convex_hull
+
     def _getHeadAndFans(self) -> Polygon:
         if not self._global_stack:
             return Polygon()
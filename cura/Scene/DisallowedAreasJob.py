@@ -0,0 +1,87 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, TYPE_CHECKING
+
+from UM.Job import Job
+from UM.Math.Polygon import Polygon
+
+if TYPE_CHECKING:
+    from UM.Settings.ContainerStack import ContainerStack
+
+
+class StackSettingsSnapshot:
+    """The values of some settings of a stack, at the moment the snapshot was taken.
+
+    It answers the same calls as the stack for these settings, so the disallowed areas can be computed from it in
+    another thread, while the settings in the stack change.
+    """
+
+    def __init__(self, stack: "ContainerStack", setting_keys: Iterable[str], metadata_defaults: Optional[Dict[str, Any]] = None) -> None:
+        self.id = stack.getId()
+        self.isEnabled = getattr(stack, "isEnabled", True)
+        self._values = {key: stack.getProperty(key, "value") for key in setting_keys}  # type: Dict[str, Any]
+        self._metadata = {key: stack.getMetaDataEntry(key, default) for key, default in (metadata_defaults or {}).items()}  # type: Dict[str, Any]
+
+    def getId(self) -> str:
+        return self.id
+
+    def getProperty(self, key: str, property_name: str) -> Any:
+        if property_name != "value":
+            return None
+        return self._values.get(key)
+
+    def getMetaDataEntry(self, key: str, default: Any = None) -> Any:
+        return self._metadata.get(key, default)
+
+    def getKey(self) -> str:
+        """Get a string that is the same for snapshots of the same settings with the same values."""
+
+        return repr((self.id, self.isEnabled, sorted(self._values.items()), sorted(self._metadata.items())))
+
+
+class DisallowedAreaSettings(NamedTuple):
+    """Everything that the disallowed areas of the build volume are computed from."""
+
+    global_stack: StackSettingsSnapshot
+    used_extruders: List[StackSettingsSnapshot]
+    active_extruders: List[StackSettingsSnapshot]
+    border_size: float
+    shape: str
+
+    def getKey(self) -> str:
+        """Get a string that is the same for the same settings, so the areas computed from them can be reused."""
+
+        return repr((self.global_stack.getKey(), [extruder.getKey() for extruder in self.used_extruders],
+                     [extruder.getKey() for extruder in self.active_extruders], self.border_size, self.shape))
+
+
+class DisallowedAreas(NamedTuple):
+    """The disallowed areas of the build volume, with the areas where it is not allowed to print."""
+
+    disallowed_areas: List[Polygon]
+    disallowed_areas_no_brim: List[Polygon]
+    error_areas: List[Polygon]
+
+
+class DisallowedAreasJob(Job):
+    """Computes the disallowed areas of the build volume in the background, from a snapshot of the settings."""
+
+    def __init__(self, compute: Callable[[DisallowedAreaSettings], DisallowedAreas], settings: DisallowedAreaSettings) -> None:
+        super().__init__()
+        self._compute = compute
+        self._settings = settings
+        self._is_cancelled = False
+
+    def cancel(self) -> None:
+        """Don't compute the areas if the job didn't start yet, and don't report the result."""
+
+        self._is_cancelled = True
+
+    def isCancelled(self) -> bool:
+        return self._is_cancelled
+
+    def run(self) -> None:
+        if self._is_cancelled:
+            return
+        self.setResult(self._compute(self._settings))
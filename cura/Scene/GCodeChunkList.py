@@ -0,0 +1,79 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+from collections.abc import MutableSequence
+from typing import Iterable, Iterator, List, Union, overload
+
+
+class GCodeChunkList(MutableSequence):
+    """The g-code of a slice, as a list of chunks of g-code.
+
+    The chunks are kept as the UTF-8 encoded bytes that the engine sent, and are only decoded when they are read as
+    strings. Writers that write bytes can get the chunks with :py:meth:`iterEncoded`, without decoding them and
+    encoding them again. Chunks that are changed are stored as strings.
+    """
+
+    def __init__(self, chunks: Iterable[Union[str, bytes]] = ()) -> None:
+        self._chunks = list(chunks)  # type: List[Union[str, bytes]]
+
+    def appendEncoded(self, chunk: bytes) -> None:
+        """Add a chunk of UTF-8 encoded g-code to the end."""
+
+        self._chunks.append(chunk)
+
+    def insertEncoded(self, index: int, chunk: bytes) -> None:
+        """Insert a chunk of UTF-8 encoded g-code."""
+
+        self._chunks.insert(index, chunk)
+
+    def getEncoded(self, index: int) -> bytes:
+        """Get a chunk of g-code, encoded as UTF-8."""
+
+        chunk = self._chunks[index]
+        return chunk if isinstance(chunk, bytes) else chunk.encode("utf-8")
+
+    def iterEncoded(self) -> Iterator[bytes]:
+        """Iterate over the chunks of g-code, encoded as UTF-8."""
+
+        for chunk in self._chunks:
+            yield chunk if isinstance(chunk, bytes) else chunk.encode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self._decode(chunk) for chunk in self._chunks[index]]
+        return self._decode(self._chunks[index])
+
+    def __setitem__(self, index, value) -> None:
+        self._chunks[index] = value
+
+    def __delitem__(self, index) -> None:
+        del self._chunks[index]
+
+    def insert(self, index: int, value: str) -> None:
+        self._chunks.insert(index, value)
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._chunks:
+            yield self._decode(chunk)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, GCodeChunkList):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return "GCodeChunkList({chunk_count} chunks)".format(chunk_count = len(self._chunks))
+
+    @staticmethod
+    def _decode(chunk: Union[str, bytes]) -> str:
+        return chunk.decode("utf-8", "replace") if isinstance(chunk, bytes) else chunk
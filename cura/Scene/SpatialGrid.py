@@ -0,0 +1,89 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import math
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+import numpy
+
+from UM.Math.Polygon import Polygon
+
+T = TypeVar("T")
+
+BoundingRectangle = Tuple[float, float, float, float]  # Minimum X, minimum Y, maximum X, maximum Y.
+
+
+class SpatialGrid(Generic[T]):
+    """A uniform grid over the build plate, to quickly find the items of which the bounding rectangles overlap.
+
+    Testing every pair of objects on the build plate for intersection takes quadratic time. Putting their bounding
+    rectangles in a grid limits the exact tests to the items that are near each other.
+    """
+
+    _maximum_item_cell_count = 64
+
+    def __init__(self, cell_size: float) -> None:
+        self._cell_size = max(cell_size, 1e-3)
+        self._cells = {}  # type: Dict[Tuple[int, int], List[int]]
+        self._items = []  # type: List[T]
+        self._rectangles = []  # type: List[BoundingRectangle]
+        self._large_items = []  # type: List[int]  # Items that cover too many cells to add them to every cell.
+
+    @staticmethod
+    def getPolygonRectangle(*polygons: Optional[Polygon]) -> Optional[BoundingRectangle]:
+        """Get the bounding rectangle around some polygons, or None if none of them have any points."""
+
+        points = [polygon.getPoints() for polygon in polygons if polygon is not None and len(polygon.getPoints()) > 0]
+        if not points:
+            return None
+        all_points = numpy.concatenate(points)
+        minimum = all_points.min(axis = 0)
+        maximum = all_points.max(axis = 0)
+        return float(minimum[0]), float(minimum[1]), float(maximum[0]), float(maximum[1])
+
+    @staticmethod
+    def translateRectangle(rectangle: BoundingRectangle, x: float, y: float) -> BoundingRectangle:
+        return rectangle[0] + x, rectangle[1] + y, rectangle[2] + x, rectangle[3] + y
+
+    def insert(self, item: T, rectangle: BoundingRectangle) -> None:
+        """Add an item to the grid, with the rectangle that it covers."""
+
+        index = len(self._items)
+        self._items.append(item)
+        self._rectangles.append(rectangle)
+        if self._getCellCount(rectangle) > self._maximum_item_cell_count:
+            self._large_items.append(index)
+            return
+        for cell in self._getCells(rectangle):
+            self._cells.setdefault(cell, []).append(index)
+
+    def query(self, rectangle: BoundingRectangle) -> List[T]:
+        """Get the items of which the rectangles overlap or touch a rectangle, in the order in which they were added."""
+
+        min_x, min_y, max_x, max_y = rectangle
+        if self._getCellCount(rectangle) > len(self._cells):  # Covers most of the grid anyway.
+            candidates = range(len(self._items))  # type: Iterable[int]
+        else:
+            candidates = {index for cell in self._getCells(rectangle) for index in self._cells.get(cell, ())}
+            candidates.update(self._large_items)
+        found = []
+        for index in candidates:
+            other_min_x, other_min_y, other_max_x, other_max_y = self._rectangles[index]
+            if other_min_x <= max_x and min_x <= other_max_x and other_min_y <= max_y and min_y <= other_max_y:
+                found.append(index)
+        return [self._items[index] for index in sorted(found)]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _getCellRange(self, rectangle: BoundingRectangle) -> Tuple[int, int, int, int]:
+        min_x, min_y, max_x, max_y = rectangle
+        return math.floor(min_x / self._cell_size), math.floor(min_y / self._cell_size), math.floor(max_x / self._cell_size), math.floor(max_y / self._cell_size)
+
+    def _getCellCount(self, rectangle: BoundingRectangle) -> int:
+        first_column, first_row, last_column, last_row = self._getCellRange(rectangle)
+        return (last_column - first_column + 1) * (last_row - first_row + 1)
+
+    def _getCells(self, rectangle: BoundingRectangle) -> List[Tuple[int, int]]:
+        first_column, first_row, last_column, last_row = self._getCellRange(rectangle)
+        return [(column, row) for column in range(first_column, last_column + 1) for row in range(first_row, last_row + 1)]
@@ -7,6 +7,8 @@ from UM.Settings.PropertyEvaluationContext import PropertyEvaluationContext
 from UM.Settings.SettingFunction import SettingFunction
 from UM.Logger import Logger
 
+from cura.Settings.FormulaValueCache import FormulaValueCache
+
 if TYPE_CHECKING:
     from cura.CuraApplication import CuraApplication
     from cura.Settings.CuraContainerStack import CuraContainerStack
@@ -20,6 +22,12 @@ class CuraFormulaFunctions:
 
     def __init__(self, application: "CuraApplication") -> None:
         self._application = application
+        self._value_cache = FormulaValueCache()
+
+    def getValueCache(self) -> FormulaValueCache:
+        """Get the values that were looked up for formulas, for instance to see how often they were looked up again."""
+
+        return self._value_cache
 
     # ================
     # Custom Functions
@@ -52,6 +60,13 @@ class CuraFormulaFunctions:
             Logger.log("w", "Value for %s of extruder %s was requested, but that extruder is not available. " % (property_key, extruder_position))
             return None
 
+        if context is None:
+            return self._value_cache.getValue(extruder_stack, property_key, "extruderValue", lambda: self._evaluateValueInExtruder(extruder_stack, property_key))
+        return self._evaluateValueInExtruder(extruder_stack, property_key, context)
+
+    @staticmethod
+    def _evaluateValueInExtruder(extruder_stack: "CuraContainerStack", property_key: str,
+                                 context: Optional["PropertyEvaluationContext"] = None) -> Any:
         value = extruder_stack.getRawProperty(property_key, "value", context = context)
         if isinstance(value, SettingFunction):
             value = value(extruder_stack, context = context)
@@ -61,7 +76,7 @@ class CuraFormulaFunctions:
 
         return value
 
-    def _getActiveExtruders(self, context: Optional["PropertyEvaluationContext"] = None) -> List[str]:
+    def _getActiveExtruders(self, context: Optional["PropertyEvaluationContext"] = None) -> List["CuraContainerStack"]:
         machine_manager = self._application.getMachineManager()
         extruder_manager = self._application.getExtruderManager()
 
@@ -82,9 +97,18 @@ class CuraFormulaFunctions:
     def getValuesInAllExtruders(self, property_key: str,
                                 context: Optional["PropertyEvaluationContext"] = None) -> List[Any]:
         global_stack = self._application.getMachineManager().activeMachine
+        active_extruders = self._getActiveExtruders(context)
+
+        if context is None:
+            kind = ("extruderValues", tuple(extruder.getId() for extruder in active_extruders))
+            return list(self._value_cache.getValue(global_stack, property_key, kind, lambda: self._evaluateValuesInAllExtruders(global_stack, active_extruders, property_key)))
+        return self._evaluateValuesInAllExtruders(global_stack, active_extruders, property_key, context)
 
+    @staticmethod
+    def _evaluateValuesInAllExtruders(global_stack: "CuraContainerStack", active_extruders: List["CuraContainerStack"], property_key: str,
+                                      context: Optional["PropertyEvaluationContext"] = None) -> List[Any]:
         result = []
-        for extruder in self._getActiveExtruders(context):
+        for extruder in active_extruders:
             value = extruder.getRawProperty(property_key, "value", context = context)
 
             if value is None:
@@ -124,6 +148,8 @@ class CuraFormulaFunctions:
         machine_manager = self._application.getMachineManager()
 
         global_stack = machine_manager.activeMachine
+        if context is None:
+            return self._value_cache.getValue(global_stack, property_key, "resolveOrValue", lambda: global_stack.getProperty(property_key, "value"))
         resolved_value = global_stack.getProperty(property_key, "value", context = context)
 
         return resolved_value
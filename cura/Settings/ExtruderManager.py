@@ -14,11 +14,16 @@ from UM.Scene.Iterator.DepthFirstIterator import DepthFirstIterator
 from UM.Scene.Selection import Selection
 from UM.Scene.Iterator.BreadthFirstIterator import BreadthFirstIterator
 from UM.Settings.ContainerRegistry import ContainerRegistry  # Finding containers by ID.
+from UM.Settings.SettingRelation import RelationType
 from cura.Machines.ContainerTree import ContainerTree
 
-from typing import Any, cast, Dict, List, Optional, TYPE_CHECKING, Union
+from typing import Any, cast, Dict, List, Optional, Set, Tuple, TYPE_CHECKING, Union
 
 if TYPE_CHECKING:
+    from UM.Scene.SceneNode import SceneNode
+    from UM.Settings.ContainerStack import ContainerStack
+    from UM.Settings.Interfaces import ContainerInterface
+    from UM.Signal import Signal
     from cura.Settings.ExtruderStack import ExtruderStack
 
 
@@ -46,8 +51,19 @@ class ExtruderManager(QObject):
         # TODO; I have no idea why this is a union of ID's and extruder stacks. This needs to be fixed at some point.
         self._selected_object_extruders = []  # type: List[Union[str, "ExtruderStack"]]
 
+        # The extruders that are used by the scene and the settings, until something changes that they depend on.
+        self._used_extruder_stacks = None  # type: Optional[List["ExtruderStack"]]
+        self._used_extruder_node_states = {}  # type: Dict[int, Tuple]  # The state of the nodes that were taken into account, by ID.
+        self._used_extruder_setting_keys = set()  # type: Set[str]  # The settings that the used extruders depend on.
+        self._used_extruder_followed_stacks = []  # type: List[ContainerStack]
+        self._used_extruder_followed_extruders = []  # type: List[ExtruderStack]
+        self._used_extruder_followed_node_signals = []  # type: List[Signal]  # The activeExtruderChanged signals of the nodes.
+        self._is_following_scene = False
+
         Selection.selectionChanged.connect(self.resetSelectedObjectExtruders)
         Application.getInstance().globalContainerStackChanged.connect(self.emitGlobalStackExtrudersChanged)  # When the machine is swapped we must update the active machine extruders
+        Application.getInstance().globalContainerStackChanged.connect(self._invalidateUsedExtruderStacks)
+        self.extrudersChanged.connect(self._invalidateUsedExtruderStacks)
 
     extrudersChanged = pyqtSignal(QVariant)
     """Signal to notify other components when the list of extruders for a machine definition changes."""
@@ -195,6 +211,17 @@ class ExtruderManager(QObject):
         else:
             return value
 
+    _used_extruder_mesh_setting_keys = ["support_enable", "support_bottom_enable", "support_roof_enable"]
+    """The settings of the meshes that determine which extruders are used."""
+
+    _used_extruder_global_setting_keys = ["machine_extruder_count",
+                                          "wall_0_extruder_nr", "wall_x_extruder_nr", "roofing_extruder_nr", "top_bottom_extruder_nr", "infill_extruder_nr",
+                                          "support_infill_extruder_nr", "support_extruder_nr_layer_0", "support_bottom_extruder_nr", "support_roof_extruder_nr",
+                                          "adhesion_type", "skirt_line_count", "skirt_brim_minimal_length", "prime_tower_brim_enable", "brim_line_count",
+                                          "raft_interface_layers", "raft_surface_layers",
+                                          "skirt_brim_extruder_nr", "raft_base_extruder_nr", "raft_interface_extruder_nr", "raft_surface_extruder_nr"]
+    """The settings of the printer that determine which extruders are used."""
+
     def getUsedExtruderStacks(self) -> List["ExtruderStack"]:
         """Gets the extruder stacks that are actually being used at the moment.
 
@@ -205,9 +232,22 @@ class ExtruderManager(QObject):
         If there are no extruders, this returns the global stack as a singleton
         list.
 
+        The result is remembered until an object is added, removed or changes
+        extruder, or until one of the settings that it depends on changes.
+
         :return: A list of extruder stacks.
         """
 
+        if self._used_extruder_stacks is not None:
+            return list(self._used_extruder_stacks)
+
+        used_extruder_stacks = self._findUsedExtruderStacks()
+        # Before the extruders are registered, nothing is followed yet, so the result can't be remembered.
+        if self.extruderIds:
+            self._used_extruder_stacks = used_extruder_stacks
+        return list(used_extruder_stacks)
+
+    def _findUsedExtruderStacks(self) -> List["ExtruderStack"]:
         global_stack = self._application.getGlobalContainerStack()
         container_registry = ContainerRegistry.getInstance()
 
@@ -227,6 +267,7 @@ class ExtruderManager(QObject):
 
         # Get the extruders of all printable meshes in the scene
         nodes = [node for node in DepthFirstIterator(scene_root) if node.isSelectable() and not node.callDecoration("isAntiOverhangMesh") and not  node.callDecoration("isSupportMesh")] #type: ignore #Ignore type error because iter() should get called automatically by Python syntax.
+        self._followUsedExtruderSources(global_stack, nodes)
 
         for node in nodes:
             extruder_stack_id = node.callDecoration("getActiveExtruder")
@@ -303,6 +344,86 @@ class ExtruderManager(QObject):
             Logger.log("e", "Unable to find one or more of the extruders in %s", used_extruder_stack_ids)
             return []
 
+    def _followUsedExtruderSources(self, global_stack: Optional[GlobalStack], nodes: List["SceneNode"]) -> None:
+        """Follow the changes of everything that the used extruders depend on, to know when to find them again."""
+
+        if not self._is_following_scene:
+            self._application.getController().getScene().sceneChanged.connect(self._onSceneChangedForUsedExtruders)
+            self._is_following_scene = True
+
+        for stack in self._used_extruder_followed_stacks:
+            stack.propertyChanged.disconnect(self._onSettingChangedForUsedExtruders)
+            stack.containersChanged.disconnect(self._onContainersChangedForUsedExtruders)
+        for extruder in self._used_extruder_followed_extruders:
+            extruder.enabledChanged.disconnect(self._invalidateUsedExtruderStacks)
+        for signal in self._used_extruder_followed_node_signals:
+            signal.disconnect(self._invalidateUsedExtruderStacks)
+        self._used_extruder_followed_stacks = []
+        self._used_extruder_followed_extruders = []
+        self._used_extruder_followed_node_signals = []
+
+        self._used_extruder_node_states = {id(node): self._getUsedExtruderNodeState(node) for node in nodes}
+        # Changing the extruder of an object doesn't change the scene.
+        for node in nodes:
+            signal = node.callDecoration("getActiveExtruderChangedSignal")
+            if signal is not None:
+                signal.connect(self._invalidateUsedExtruderStacks)
+                self._used_extruder_followed_node_signals.append(signal)
+        if global_stack is None:
+            return
+
+        self._used_extruder_followed_extruders = list(global_stack.extruderList)
+        self._used_extruder_followed_stacks = [global_stack] + self._used_extruder_followed_extruders
+        for node in nodes:
+            per_mesh_stack = node.callDecoration("getStack")
+            if per_mesh_stack:
+                self._used_extruder_followed_stacks.append(per_mesh_stack)
+        for stack in self._used_extruder_followed_stacks:
+            stack.propertyChanged.connect(self._onSettingChangedForUsedExtruders)
+            stack.containersChanged.connect(self._onContainersChangedForUsedExtruders)
+        for extruder in self._used_extruder_followed_extruders:
+            extruder.enabledChanged.connect(self._invalidateUsedExtruderStacks)
+
+        # Settings also change when the settings that their formulas use change.
+        self._used_extruder_setting_keys = set()
+        setting_keys = self._used_extruder_mesh_setting_keys + self._used_extruder_global_setting_keys
+        while setting_keys:
+            setting_key = setting_keys.pop()
+            if setting_key in self._used_extruder_setting_keys:
+                continue
+            self._used_extruder_setting_keys.add(setting_key)
+            definition = global_stack.getSettingDefinition(setting_key)
+            if definition is not None:
+                setting_keys.extend(relation.target.key for relation in definition.relations if relation.type == RelationType.RequiresTarget and relation.role == "value")
+
+    @staticmethod
+    def _getUsedExtruderNodeState(node: "SceneNode") -> Tuple:
+        """Get everything of a node that determines whether and with which extruder it is printed."""
+
+        parent = node.getParent()
+        return id(parent) if parent is not None else None, node.isSelectable(), node.callDecoration("getActiveExtruder"), node.callDecoration("isSupportMesh"), node.callDecoration("isAntiOverhangMesh"), id(node.callDecoration("getStack"))
+
+    def _invalidateUsedExtruderStacks(self, *args) -> None:
+        self._used_extruder_stacks = None
+
+    def _onSceneChangedForUsedExtruders(self, source: "SceneNode") -> None:
+        if self._used_extruder_stacks is None:
+            return
+        node_state = self._used_extruder_node_states.get(id(source))
+        if node_state is None:
+            # Only objects, or the groups and the root that they are added to or removed from, matter.
+            if source.callDecoration("isSliceable") or source.callDecoration("isGroup") or source.getParent() is None:
+                self._invalidateUsedExtruderStacks()
+        elif node_state != self._getUsedExtruderNodeState(source):  # Moving an object doesn't change its extruder.
+            self._invalidateUsedExtruderStacks()
+
+    def _onSettingChangedForUsedExtruders(self, setting_key: str, property_name: str) -> None:
+        if property_name == "value" and setting_key in self._used_extruder_setting_keys:
+            self._invalidateUsedExtruderStacks()
+
+    def _onContainersChangedForUsedExtruders(self, container: "ContainerInterface") -> None:
+        self._invalidateUsedExtruderStacks()
+
     def getInitialExtruderNr(self) -> int:
         """Get the extruder that the print will start with.
 
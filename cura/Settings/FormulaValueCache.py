@@ -0,0 +1,137 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Set, TYPE_CHECKING
+
+from UM.Settings.SettingRelation import RelationType
+
+if TYPE_CHECKING:
+    from UM.Settings.ContainerStack import ContainerStack
+    from UM.Settings.Interfaces import ContainerInterface
+
+
+class FormulaValueCache:
+    """Remembers the values that setting formulas looked up in the stacks of the active printer.
+
+    Formulas look up the values of other settings, in other extruders, thousands of times while the settings are
+    evaluated, and most of these look-ups are the same. The values are remembered per stack and per setting, until the
+    setting or one of the settings that it depends on changes in any stack, or the containers of a stack change.
+
+    Only values that are evaluated without a context are remembered, because contexts are made for one evaluation.
+    """
+
+    # The properties that the looked up values are evaluated from. Which extruder a value is resolved in depends on
+    # limit_to_extruder, like brim_width on skirt_brim_extruder_nr.
+    _formula_roles = ("value", "resolve", "limit_to_extruder")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._global_stack = None  # type: Optional[ContainerStack]
+        self._stacks = {}  # type: Dict[str, ContainerStack]  # The stacks of which the changes are followed, by ID.
+        self._values = {}  # type: Dict[str, Dict[str, Dict[Hashable, Any]]]  # Per stack ID and setting, the values per kind of look-up.
+        self._dependent_keys = {}  # type: Dict[str, Set[str]]  # For each setting, the settings whose value depends on it, including itself.
+        self._generation = 0  # Increased on every change, so that values evaluated during a change aren't remembered.
+        self._hit_count = 0
+        self._miss_count = 0
+
+    def getValue(self, stack: "ContainerStack", key: str, kind: Hashable, evaluate: Callable[[], Any]) -> Any:
+        """Get a value that was looked up for a setting in a stack, or look it up if it isn't known yet.
+
+        :param stack: The stack that the value was looked up in.
+        :param key: The setting that the value was looked up for.
+        :param kind: Tells different look-ups of the same setting in the same stack apart.
+        :param evaluate: Looks up the value.
+        """
+
+        stack_id = stack.getId()
+        with self._lock:
+            setting_values = self._values.get(stack_id, {}).get(key)
+            if setting_values is not None and kind in setting_values and self._stacks.get(stack_id) is stack:
+                self._hit_count += 1
+                return setting_values[kind]
+            self._miss_count += 1
+            generation = self._generation
+
+        value = evaluate()
+
+        with self._lock:
+            if self._generation == generation:  # Nothing changed while evaluating.
+                self._follow(stack)
+                self._values.setdefault(stack_id, {}).setdefault(key, {})[kind] = value
+        return value
+
+    def invalidate(self) -> None:
+        """Forget all values."""
+
+        with self._lock:
+            self._values.clear()
+            self._dependent_keys.clear()
+            self._generation += 1
+
+    def getHitCount(self) -> int:
+        return self._hit_count
+
+    def getMissCount(self) -> int:
+        return self._miss_count
+
+    def resetStatistics(self) -> None:
+        self._hit_count = 0
+        self._miss_count = 0
+
+    def _follow(self, stack: "ContainerStack") -> None:
+        """Follow the changes of a stack, and forget the stacks of other printers."""
+
+        global_stack = stack.getNextStack() or stack
+        if global_stack is not self._global_stack:
+            for followed_stack in self._stacks.values():
+                followed_stack.propertyChanged.disconnect(self._onPropertyChanged)
+                followed_stack.containersChanged.disconnect(self._onContainersChanged)
+            self._stacks.clear()
+            self._values.clear()
+            self._dependent_keys.clear()
+            self._global_stack = global_stack
+
+        # Formulas of the global stack look up values in the extruders, so follow those too.
+        for new_stack in [global_stack, stack] + list(getattr(global_stack, "extruderList", [])):
+            if self._stacks.get(new_stack.getId()) is not new_stack:
+                self._values.pop(new_stack.getId(), None)
+                self._stacks[new_stack.getId()] = new_stack
+                new_stack.propertyChanged.connect(self._onPropertyChanged)
+                new_stack.containersChanged.connect(self._onContainersChanged)
+
+    def _onPropertyChanged(self, key: str, property_name: str) -> None:
+        if property_name not in self._formula_roles:
+            return
+        with self._lock:
+            if not self._values:
+                return
+            dependent_keys = self._getDependentKeys(key)
+            # Formulas can look up values in other stacks, so the settings change in every stack.
+            for stack_values in self._values.values():
+                for dependent_key in dependent_keys:
+                    stack_values.pop(dependent_key, None)
+            self._generation += 1
+
+    def _onContainersChanged(self, container: "ContainerInterface") -> None:
+        self.invalidate()
+
+    def _getDependentKeys(self, key: str) -> Set[str]:
+        dependent_keys = self._dependent_keys.get(key)
+        if dependent_keys is not None:
+            return dependent_keys
+
+        dependent_keys = {key}
+        definition = self._global_stack.getSettingDefinition(key) if self._global_stack is not None else None
+        if definition is not None:
+            relations = list(definition.relations)
+            while relations:
+                relation = relations.pop()
+                if relation.type == RelationType.RequiresTarget or relation.role not in self._formula_roles:
+                    continue
+                if relation.target.key in dependent_keys:
+                    continue
+                dependent_keys.add(relation.target.key)
+                relations.extend(relation.target.relations)
+        self._dependent_keys[key] = dependent_keys
+        return dependent_keys
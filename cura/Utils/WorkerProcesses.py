@@ -0,0 +1,38 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import concurrent.futures
+import multiprocessing
+import os
+import site
+
+
+def createWorkerProcessPool(max_workers: int, module_name: str, module_file: str) -> concurrent.futures.ProcessPoolExecutor:
+    """Create worker processes that can run the functions of a module.
+
+    The processes are spawned rather than forked, since forking a process that runs Qt threads is not safe. Spawned
+    processes import the functions they run by the name of their module, and plug-ins are imported by a name that
+    depends on where they are installed, so the worker processes get the directory to import the module from.
+
+    :param max_workers: The number of worker processes.
+    :param module_name: The name of the module with the functions to run, i.e. its __name__.
+    :param module_file: The file of the module with the functions to run, i.e. its __file__.
+    """
+
+    return concurrent.futures.ProcessPoolExecutor(max_workers = max_workers,
+                                                  mp_context = multiprocessing.get_context("spawn"),
+                                                  initializer = site.addsitedir,
+                                                  initargs = (getImportPath(module_name, module_file), ))
+
+
+def getImportPath(module_name: str, module_file: str) -> str:
+    """Get the directory that a module is imported from by its name.
+
+    :param module_name: The name of the module, i.e. its __name__.
+    :param module_file: The file of the module, i.e. its __file__.
+    """
+
+    path = os.path.dirname(os.path.abspath(module_file))
+    for _ in range(module_name.count(".")):
+        path = os.path.dirname(path)
+    return path
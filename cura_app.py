@@ -14,8 +14,12 @@ if "" in sys.path:
 
 import argparse
 import faulthandler
+import multiprocessing
 import os
 
+# Worker processes of frozen builds start by running this script too. They have to do their work and quit here.
+multiprocessing.freeze_support()
+
 # set the environment variable QT_QUICK_FLICKABLE_WHEEL_DECELERATION to 5000 as mentioned in qt6.6 update log to overcome scroll related issues
 os.environ["QT_QUICK_FLICKABLE_WHEEL_DECELERATION"] = str(int(os.environ.get("QT_QUICK_FLICKABLE_WHEEL_DECELERATION", "5000")))
 
@@ -239,5 +243,6 @@ if ApplicationMetadata.CuraDebugMode:
     ssl_conf.setPeerVerifyMode(QSslSocket.PeerVerifyMode.VerifyNone)
     QSslConfiguration.setDefaultConfiguration(ssl_conf)
 
-app = CuraApplication()
-app.run()
+if __name__ == "__main__":  # Not when worker processes (like those that parse g-code) import this module.
+    app = CuraApplication()
+    app.run()
@@ -0,0 +1,178 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import concurrent.futures
+import os
+import threading
+import zipfile
+from configparser import ConfigParser
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class ProjectArchive:
+    """A project file that is being loaded, kept open from the pre-read of the project until it is read.
+
+    The archive is opened and its entries are indexed once. Every file in it is decompressed and decoded at most once,
+    and the container files are upgraded and parsed at most once, no matter how often the readers look at them. A
+    large file, like the 3D model, can be parsed in a thread while the containers are being loaded.
+    """
+
+    def __init__(self, file_name: str) -> None:
+        """Open a project file.
+
+        :param file_name: The project file to open.
+        :raises EnvironmentError: The file can't be read.
+        :raises zipfile.BadZipFile: The file is not a valid archive.
+        """
+
+        self._file_name = file_name
+        self._archive = zipfile.ZipFile(file_name, "r")
+        self._file_stamp = self._getFileStamp(file_name)
+        self._names = self._archive.namelist()
+        self._name_set = set(self._names)
+        self._cura_file_names = [name for name in self._names if name.startswith("Cura/")]
+
+        self._texts = {}  # type: Dict[str, str]
+        self._serialized = {}  # type: Dict[Tuple[str, Optional[Callable[[str, str], str]]], str]
+        self._parsers = {}  # type: Dict[Tuple[str, Optional[Callable[[str, str], str]], Tuple[Tuple[str, Any], ...]], ConfigParser]
+        self._parsed_files = {}  # type: Dict[str, concurrent.futures.Future]
+
+    def getFileName(self) -> str:
+        return self._file_name
+
+    def isArchiveOf(self, file_name: str) -> bool:
+        """Whether this is the archive of a file, and the file didn't change since it was opened."""
+
+        if os.path.realpath(file_name) != os.path.realpath(self._file_name):
+            return False
+        try:
+            return self._getFileStamp(file_name) == self._file_stamp
+        except OSError:
+            return False
+
+    def getNames(self) -> List[str]:
+        """Get the names of all files in the archive, in the order in which they are stored."""
+
+        return self._names
+
+    def getCuraFileNames(self) -> List[str]:
+        """Get the names of the files with the settings of the project, in the Cura directory of the archive."""
+
+        return self._cura_file_names
+
+    def hasFile(self, name: str) -> bool:
+        return name in self._name_set
+
+    def readBytes(self, name: str) -> bytes:
+        """Read a file from the archive.
+
+        :raises KeyError: There is no such file in the archive.
+        """
+
+        return self._archive.read(name)
+
+    def readText(self, name: str) -> str:
+        """Read a text file from the archive. It is only decompressed and decoded the first time.
+
+        :raises KeyError: There is no such file in the archive.
+        """
+
+        text = self._texts.get(name)
+        if text is None:
+            text = self.readBytes(name).decode("utf-8")
+            self._texts[name] = text
+        return text
+
+    def getSerialized(self, name: str, update: Optional[Callable[[str, str], str]] = None) -> str:
+        """Read a container file from the archive, upgraded to the current version.
+
+        :param name: The container file to read.
+        :param update: The function to upgrade the serialized container with, like
+        :py:meth:`UM.Settings.ContainerStack.ContainerStack._updateSerialized`. It is only called the first time.
+        :raises KeyError: There is no such file in the archive.
+        """
+
+        key = (name, update)
+        serialized = self._serialized.get(key)
+        if serialized is None:
+            serialized = self.readText(name)
+            if update is not None:
+                serialized = update(serialized, name)
+            self._serialized[key] = serialized
+        return serialized
+
+    def getParser(self, name: str, update: Optional[Callable[[str, str], str]] = None, **parser_options: Any) -> ConfigParser:
+        """Get a container file from the archive, upgraded to the current version and parsed.
+
+        The parsers are shared by everyone that asks for the same file, so they must not be changed.
+
+        :param name: The container file to parse.
+        :param update: The function to upgrade the serialized container with. See :py:meth:`getSerialized`.
+        :param parser_options: Options for the :py:class:`ConfigParser`, besides that it doesn't interpolate.
+        :raises KeyError: There is no such file in the archive.
+        """
+
+        serialized = self.getSerialized(name, update)
+        if update is not None and serialized == self.readText(name):
+            update = None  # The container was up to date already, so it parses the same as the file itself.
+
+        key = (name, update, tuple(sorted(parser_options.items())))
+        parser = self._parsers.get(key)
+        if parser is None:
+            parser = ConfigParser(interpolation = None, **parser_options)
+            parser.read_string(serialized)
+            self._parsers[key] = parser
+        return parser
+
+    def parseInBackground(self, name: str, parse: Callable[[bytes], Any]) -> None:
+        """Start reading and parsing a file of the archive in a thread.
+
+        :param name: The file to parse.
+        :param parse: Creates the result from the contents of the file. It must not need the main thread.
+        """
+
+        if name in self._parsed_files:
+            return
+        future = concurrent.futures.Future()  # type: concurrent.futures.Future
+        self._parsed_files[name] = future
+        thread = threading.Thread(target = self._parse, args = (name, parse, future), name = "ProjectArchiveParse", daemon = True)
+        thread.start()
+
+    def getParsed(self, name: str, parse: Callable[[bytes], Any]) -> Any:
+        """Get a parsed file of the archive, waiting for it if it's being parsed in the background.
+
+        :param name: The file to parse.
+        :param parse: Creates the result from the contents of the file, if it wasn't parsed in the background.
+        :raises KeyError: There is no such file in the archive.
+        :raises Exception: Any exception that the parse function raised.
+        """
+
+        future = self._parsed_files.pop(name, None)
+        if future is None:
+            return parse(self.readBytes(name))
+        return future.result()
+
+    def close(self) -> None:
+        """Forget everything that was read from the archive, and close it.
+
+        Files that are still being parsed in the background are finished first.
+        """
+
+        for future in self._parsed_files.values():
+            concurrent.futures.wait([future])
+        self._parsed_files = {}
+        self._texts = {}
+        self._serialized = {}
+        self._parsers = {}
+        self._archive.close()
+
+    def _parse(self, name: str, parse: Callable[[bytes], Any], future: concurrent.futures.Future) -> None:
+        try:
+            future.set_result(parse(self.readBytes(name)))
+        except Exception as e:
+            future.set_exception(e)
+
+    @staticmethod
+    def _getFileStamp(file_name: str) -> Tuple[int, int]:
+        stat = os.stat(file_name)
+        return stat.st_mtime_ns, stat.st_size
@@ -1,9 +1,10 @@
 #  Copyright (c) 2021-2022 Ultimaker B.V.
 #  Cura is released under the terms of the LGPLv3 or higher.
 
+import hashlib
 import os.path
 import zipfile
-from typing import List, Optional, Union, TYPE_CHECKING, cast
+from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING, cast
 
 import pySavitar as Savitar
 import numpy
@@ -12,6 +13,7 @@ from UM.Logger import Logger
 from UM.Math.Matrix import Matrix
 from UM.Math.Vector import Vector
 from UM.Mesh.MeshBuilder import MeshBuilder
+from UM.Mesh.MeshData import MeshData
 from UM.Mesh.MeshReader import MeshReader
 from UM.MimeTypeDatabase import MimeTypeDatabase, MimeType
 from UM.Scene.GroupDecorator import GroupDecorator
@@ -27,6 +29,9 @@ from cura.Scene.SliceableObjectDecorator import SliceableObjectDecorator
 from cura.Scene.ZOffsetDecorator import ZOffsetDecorator
 from cura.Settings.ExtruderManager import ExtruderManager
 
+if TYPE_CHECKING:
+    from .ProjectArchive import ProjectArchive
+
 try:
     if not TYPE_CHECKING:
         import xml.etree.cElementTree as ET
@@ -38,6 +43,8 @@ except ImportError:
 class ThreeMFReader(MeshReader):
     """Base implementation for reading 3MF files. Has no support for textures. Only loads meshes!"""
 
+    _model_file_name = "3D/3dmodel.model"
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -54,10 +61,34 @@ class ThreeMFReader(MeshReader):
         self._base_name = ""
         self._unit = None
         self._empty_project = False
+        self._project_archive = None  # type: Optional[ProjectArchive]
+
+        # Merge the vertices that the triangles of a mesh have in common, so that it's stored with indices. The vertices
+        # then get the normal of one of their triangles, so this is not done unless asked for.
+        CuraApplication.getInstance().getPreferences().addPreference("3mfreader/weld_vertices", False)
 
     def emptyFileHintSet(self) -> bool:
         return self._empty_project
 
+    def setProjectArchive(self, project_archive: Optional["ProjectArchive"]) -> None:
+        """Read the scene of a project from its archive, which the workspace reader opened already.
+
+        The scene is parsed in the background right away, so that it's done while the workspace reader loads the
+        containers of the project.
+
+        :param project_archive: The archive to read the scene from when the project is read, or None to open the file
+        again.
+        """
+
+        self._project_archive = project_archive
+        if project_archive is not None:
+            project_archive.parseInBackground(self._model_file_name, self._parseScene)
+
+    @staticmethod
+    def _parseScene(model: bytes) -> "Savitar.Scene":
+        parser = Savitar.ThreeMFParser()
+        return parser.parse(model)
+
     @staticmethod
     def _createMatrixFromTransformationString(transformation: str) -> Matrix:
         if transformation == "":
@@ -94,11 +125,66 @@ class ThreeMFReader(MeshReader):
         return temp_mat
 
     @staticmethod
-    def _convertSavitarNodeToUMNode(savitar_node: Savitar.SceneNode, file_name: str = "") -> Optional[SceneNode]:
+    def _createMeshData(savitar_mesh_data: Savitar.MeshData, mesh_id: str, file_name: str, mesh_cache: Dict[Tuple[bytes, str], MeshData]) -> MeshData:
+        """Create the mesh data of a node from the vertices that libSavitar read.
+
+        The vertices are used from the bytes that libSavitar returns, without copying them. Meshes with the same
+        vertices, like those of the objects that refer to the same mesh in the file, or copies of the same model, share
+        one mesh data.
+
+        :param savitar_mesh_data: The mesh of a node, as obtained from libSavitar.
+        :param mesh_id: The ID of the node.
+        :param file_name: The file name to remember in the mesh data, if any.
+        :param mesh_cache: The meshes that were created while reading this file, by a hash of their vertices and their
+        file name.
+        """
+
+        vertex_bytes = savitar_mesh_data.getFlatVerticesAsBytes()
+        key = (hashlib.sha1(vertex_bytes).digest(), file_name)
+        mesh_data = mesh_cache.get(key)
+        if mesh_data is not None:
+            return mesh_data
+
+        vertices = numpy.frombuffer(vertex_bytes, dtype = numpy.float32).reshape(-1, 3)
+        vertices.flags.writeable = False  # So that the mesh data doesn't copy them.
+
+        mesh_builder = MeshBuilder()
+        if CuraApplication.getInstance().getPreferences().getValue("3mfreader/weld_vertices"):
+            vertices, indices = ThreeMFReader._weldVertices(vertices)
+            mesh_builder.setVertices(vertices)
+            mesh_builder.setIndices(indices)
+        else:
+            mesh_builder.setVertices(vertices)
+        mesh_builder.calculateNormals(fast = True)
+        mesh_builder.setMeshId(mesh_id)
+        if file_name:
+            mesh_builder.setFileName(file_name)
+        mesh_data = mesh_builder.build()
+        mesh_cache[key] = mesh_data
+        return mesh_data
+
+    @staticmethod
+    def _weldVertices(vertices: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Merge the vertices of a triangle soup that have exactly the same coordinates.
+
+        :param vertices: The vertices of the triangles, three for each triangle.
+        :return: The distinct vertices, and for each triangle the indices of its vertices.
+        """
+
+        # Compare the vertices by their bytes, which is a lot faster than comparing rows of numbers.
+        vertex_keys = numpy.ascontiguousarray(vertices).view(numpy.dtype((numpy.void, vertices.dtype.itemsize * 3))).ravel()
+        _, first_indices, inverse = numpy.unique(vertex_keys, return_index = True, return_inverse = True)
+        return vertices[first_indices], inverse.reshape(-1, 3).astype(numpy.int32)
+
+    @staticmethod
+    def _convertSavitarNodeToUMNode(savitar_node: Savitar.SceneNode, file_name: str = "", mesh_cache: Optional[Dict[Tuple[bytes, str], MeshData]] = None) -> Optional[SceneNode]:
         """Convenience function that converts a SceneNode object (as obtained from libSavitar) to a scene node.
 
+        :param mesh_cache: The meshes that were created for other nodes of the same file, to share with this node.
         :returns: Scene node.
         """
+        if mesh_cache is None:
+            mesh_cache = {}
         try:
             node_name = savitar_node.getName()
             node_id = savitar_node.getId()
@@ -125,25 +211,15 @@ class ThreeMFReader(MeshReader):
         um_node.setId(node_id)
         transformation = ThreeMFReader._createMatrixFromTransformationString(savitar_node.getTransformation())
         um_node.setTransformation(transformation)
-        mesh_builder = MeshBuilder()
-
-        data = numpy.fromstring(savitar_node.getMeshData().getFlatVerticesAsBytes(), dtype=numpy.float32)
-
-        vertices = numpy.resize(data, (int(data.size / 3), 3))
-        mesh_builder.setVertices(vertices)
-        mesh_builder.calculateNormals(fast=True)
-        mesh_builder.setMeshId(node_id)
-        if file_name:
-            # The filename is used to give the user the option to reload the file if it is changed on disk
-            # It is only set for the root node of the 3mf file
-            mesh_builder.setFileName(file_name)
-        mesh_data = mesh_builder.build()
+        # The filename is used to give the user the option to reload the file if it is changed on disk
+        # It is only set for the root node of the 3mf file
+        mesh_data = ThreeMFReader._createMeshData(savitar_node.getMeshData(), node_id, file_name, mesh_cache)
 
         if len(mesh_data.getVertices()):
             um_node.setMeshData(mesh_data)
 
         for child in savitar_node.getChildren():
-            child_node = ThreeMFReader._convertSavitarNodeToUMNode(child)
+            child_node = ThreeMFReader._convertSavitarNodeToUMNode(child, mesh_cache = mesh_cache)
             if child_node:
                 um_node.addChild(child_node)
 
@@ -222,17 +298,20 @@ class ThreeMFReader(MeshReader):
         result = []
         # The base object of 3mf is a zipped archive.
         try:
-            archive = zipfile.ZipFile(file_name, "r")
             self._base_name = os.path.basename(file_name)
-            parser = Savitar.ThreeMFParser()
-            scene_3mf = parser.parse(archive.open("3D/3dmodel.model").read())
+            if self._project_archive is not None and self._project_archive.isArchiveOf(file_name):
+                scene_3mf = self._project_archive.getParsed(self._model_file_name, self._parseScene)
+            else:
+                archive = zipfile.ZipFile(file_name, "r")
+                scene_3mf = self._parseScene(archive.open(self._model_file_name).read())
             self._unit = scene_3mf.getUnit()
 
             for key, value in scene_3mf.getMetadata().items():
                 CuraApplication.getInstance().getController().getScene().setMetaDataEntry(key, value)
 
+            mesh_cache = {}  # type: Dict[Tuple[bytes, str], MeshData]
             for node in scene_3mf.getSceneNodes():
-                um_node = ThreeMFReader._convertSavitarNodeToUMNode(node, file_name)
+                um_node = ThreeMFReader._convertSavitarNodeToUMNode(node, file_name, mesh_cache)
                 if um_node is None:
                     continue
 
@@ -331,8 +410,9 @@ class ThreeMFReader(MeshReader):
 
         # Convert the scene to scene nodes
         nodes = []
+        mesh_cache = {}  # type: Dict[Tuple[bytes, str], MeshData]
         for savitar_node in scene.getSceneNodes():
-            scene_node = ThreeMFReader._convertSavitarNodeToUMNode(savitar_node, "file_name")
+            scene_node = ThreeMFReader._convertSavitarNodeToUMNode(savitar_node, "file_name", mesh_cache)
             if scene_node is None:
                 continue
             nodes.append(scene_node)
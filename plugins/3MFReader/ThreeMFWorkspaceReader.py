@@ -41,6 +41,7 @@ from cura.Utils.Threading import call_on_qt_thread
 
 from PyQt6.QtCore import QCoreApplication
 
+from .ProjectArchive import ProjectArchive
 from .WorkspaceDialog import WorkspaceDialog
 
 i18n_catalog = i18nCatalog("cura")
@@ -120,6 +121,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         self._dialog = WorkspaceDialog()
         self._3mf_mesh_reader = None
         self._is_ucp = None
+        self._project_archive: Optional[ProjectArchive] = None  # The project being loaded, from preRead until read.
         self._container_registry = ContainerRegistry.getInstance()
 
         # suffixes registered with the MimeTypes don't start with a dot '.'
@@ -153,6 +155,25 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         self._old_new_materials = {}
         self._machine_info = None
         self._user_settings = {}
+        self._closeProjectArchive()  # Left open if a project was pre-read, but its loading was abandoned.
+
+    def _openProjectArchive(self, file_name: str) -> ProjectArchive:
+        """Get the open archive of a project file, or open it if the archive of another file was open.
+
+        :raises EnvironmentError: The file can't be read.
+        :raises zipfile.BadZipFile: The file is not a valid archive.
+        """
+
+        if self._project_archive is not None and self._project_archive.isArchiveOf(file_name):
+            return self._project_archive
+        self._closeProjectArchive()
+        self._project_archive = ProjectArchive(file_name)
+        return self._project_archive
+
+    def _closeProjectArchive(self) -> None:
+        if self._project_archive is not None:
+            self._project_archive.close()
+            self._project_archive = None
 
     def clearOpenAsUcp(self):
         self._is_ucp =  None
@@ -166,13 +187,13 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
             self._id_mapping[old_id] = self._container_registry.uniqueName(old_id)
         return self._id_mapping[old_id]
 
-    def _determineGlobalAndExtruderStackFiles(self, project_file_name: str, file_list: List[str]) -> Tuple[str, List[str]]:
+    def _determineGlobalAndExtruderStackFiles(self, project_archive: ProjectArchive, file_list: List[str]) -> Tuple[str, List[str]]:
         """Separates the given file list into a list of GlobalStack files and a list of ExtruderStack files.
 
         In old versions, extruder stack files have the same suffix as container stack files ".stack.cfg".
         """
 
-        archive = zipfile.ZipFile(project_file_name, "r")
+        project_file_name = project_archive.getFileName()
 
         global_stack_file_list = [name for name in file_list if name.endswith(self._global_stack_suffix)]
         extruder_stack_file_list = [name for name in file_list if name.endswith(self._extruder_stack_suffix)]
@@ -184,9 +205,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
             # We need to know the type of the stack file, but we can only know it if we deserialize it.
             # The default ContainerStack.deserialize() will connect signals, which is not desired in this case.
             # Since we know that the stack files are INI files, so we directly use the ConfigParser to parse them.
-            serialized = archive.open(file_name).read().decode("utf-8")
-            stack_config = ConfigParser(interpolation = None)
-            stack_config.read_string(serialized)
+            stack_config = project_archive.getParser(file_name, empty_lines_in_values = False)
 
             # sanity check
             if not stack_config.has_option("metadata", "type"):
@@ -211,11 +230,9 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
 
         return global_stack_file_list[0], extruder_stack_file_list
 
-    def _isProjectUcp(self, file_name) -> bool:
+    def _isProjectUcp(self, project_archive: ProjectArchive) -> bool:
         if self._is_ucp == None:
-            archive = zipfile.ZipFile(file_name, "r")
-            cura_file_names = [name for name in archive.namelist() if name.startswith("Cura/")]
-            self._is_ucp =True if USER_SETTINGS_PATH in cura_file_names else False
+            self._is_ucp = project_archive.hasFile(USER_SETTINGS_PATH)
 
     def getIsProjectUcp(self) -> bool:
         return self._is_ucp
@@ -224,12 +241,25 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
     def preRead(self, file_name, show_dialog=True, *args, **kwargs):
         """Read some info so we can make decisions
 
+        The project file is kept open, with everything that was read from it, until the project is read or another
+        project is pre-read.
+
         :param file_name:
         :param show_dialog: In case we use preRead() to check if a file is a valid project file,
                             we don't want to show a dialog.
         """
         self._clearState()
-        self._isProjectUcp(file_name)
+        project_archive = self._openProjectArchive(file_name)
+        result = WorkspaceReader.PreReadResult.failed
+        try:
+            result = self._preReadProject(project_archive, file_name, show_dialog)
+        finally:
+            if result != WorkspaceReader.PreReadResult.accepted or not show_dialog:
+                self._closeProjectArchive()  # The project is not going to be read.
+        return result
+
+    def _preReadProject(self, project_archive: ProjectArchive, file_name: str, show_dialog: bool) -> WorkspaceReader.PreReadResult:
+        self._isProjectUcp(project_archive)
         self._3mf_mesh_reader = Application.getInstance().getMeshFileHandler().getReaderForFile(file_name)
         if self._3mf_mesh_reader and self._3mf_mesh_reader.preRead(file_name) == WorkspaceReader.PreReadResult.accepted:
             pass
@@ -242,8 +272,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         variant_type_name = i18n_catalog.i18nc("@label", "Nozzle")
 
         # Check if there are any conflicts, so we can ask the user.
-        archive = zipfile.ZipFile(file_name, "r")
-        cura_file_names = [name for name in archive.namelist() if name.startswith("Cura/")]
+        cura_file_names = project_archive.getCuraFileNames()
 
         resolve_strategy_keys = ["machine", "material", "quality_changes"]
         self._resolve_strategies = {k: None for k in resolve_strategy_keys}
@@ -263,9 +292,9 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         for definition_container_file in definition_container_files:
             container_id = self._stripFileToId(definition_container_file)
             definitions = self._container_registry.findDefinitionContainersMetadata(id = container_id)
-            serialized = archive.open(definition_container_file).read().decode("utf-8")
 
             if not definitions:
+                serialized = project_archive.readText(definition_container_file)
                 definition_container = DefinitionContainer.deserializeMetadata(serialized, container_id)[0]
             else:
                 definition_container = definitions[0]
@@ -302,7 +331,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
             for material_container_file in material_container_files:
                 container_id = self._stripFileToId(material_container_file)
 
-                serialized = archive.open(material_container_file).read().decode("utf-8")
+                serialized = project_archive.readText(material_container_file)
                 metadata_list = xml_material_profile.deserializeMetadata(serialized, container_id)
                 reverse_map = {metadata["id"]: container_id for metadata in metadata_list}
                 reverse_material_id_dict.update(reverse_map)
@@ -332,17 +361,12 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         for instance_container_file_name in instance_container_files:
             container_id = self._stripFileToId(instance_container_file_name)
 
-            serialized = archive.open(instance_container_file_name).read().decode("utf-8")
-
             # Qualities and variants don't have upgrades, so don't upgrade them
-            parser = ConfigParser(interpolation = None, comment_prefixes = ())
-            parser.read_string(serialized)
+            parser = project_archive.getParser(instance_container_file_name, comment_prefixes = ())
             container_type = parser["metadata"]["type"]
-            if container_type not in ("quality", "variant"):
-                serialized = InstanceContainer._updateSerialized(serialized, instance_container_file_name)
-
-            parser = ConfigParser(interpolation = None, comment_prefixes = ())
-            parser.read_string(serialized)
+            update = None if container_type in ("quality", "variant") else InstanceContainer._updateSerialized
+            serialized = project_archive.getSerialized(instance_container_file_name, update)
+            parser = project_archive.getParser(instance_container_file_name, update, comment_prefixes = ())
             container_info = ContainerInfo(instance_container_file_name, serialized, parser)
             instance_container_info_dict[container_id] = container_info
 
@@ -397,7 +421,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         # Load ContainerStack files and ExtruderStack files
         try:
             global_stack_file, extruder_stack_files = self._determineGlobalAndExtruderStackFiles(
-                file_name, cura_file_names)
+                project_archive, cura_file_names)
         except FileNotFoundError:
             return WorkspaceReader.PreReadResult.failed
         machine_conflict = False
@@ -407,14 +431,12 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         # To simplify this, only check if the global stack exists or not
         global_stack_id = self._stripFileToId(global_stack_file)
 
-        serialized = archive.open(global_stack_file).read().decode("utf-8")
-
-        serialized = GlobalStack._updateSerialized(serialized, global_stack_file)
-        machine_name = self._getMachineNameFromSerializedStack(serialized)
-        self._machine_info.metadata_dict = self._getMetaDataDictFromSerializedStack(serialized)
+        parser = project_archive.getParser(global_stack_file, GlobalStack._updateSerialized, empty_lines_in_values = False)
+        machine_name = self._getMachineNameFromStackParser(parser)
+        self._machine_info.metadata_dict = self._getMetaDataDictFromStackParser(parser)
 
         # Check if the definition has been changed (this usually happens due to an upgrade)
-        id_list = self._getContainerIdListFromSerialized(serialized)
+        id_list = self._getContainerIdListFromStackParser(parser)
         if id_list[7] != machine_definition_id:
             machine_definition_id = id_list[7]
 
@@ -438,8 +460,6 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
             containers_found_dict["machine"] = True
 
         # Get quality type
-        parser = ConfigParser(interpolation = None)
-        parser.read_string(serialized)
         quality_container_id = parser["containers"][str(_ContainerIndexes.Quality)]
         quality_type = "empty_quality"
         if quality_container_id not in ("empty", "empty_quality"):
@@ -451,10 +471,6 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
                     quality_type = quality_matches[0]["quality_type"]
 
         # Get machine info
-        serialized = archive.open(global_stack_file).read().decode("utf-8")
-        serialized = GlobalStack._updateSerialized(serialized, global_stack_file)
-        parser = ConfigParser(interpolation = None)
-        parser.read_string(serialized)
         definition_changes_id = parser["containers"][str(_ContainerIndexes.DefinitionChanges)]
         if definition_changes_id not in ("empty", "empty_definition_changes"):
             self._machine_info.definition_changes_info = instance_container_info_dict[definition_changes_id]
@@ -487,14 +503,8 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
 
         # If the global stack is found, we check if there are conflicts in the extruder stacks
         for extruder_stack_file in extruder_stack_files:
-            serialized = archive.open(extruder_stack_file).read().decode("utf-8")
-
-            not_upgraded_parser = ConfigParser(interpolation=None)
-            not_upgraded_parser.read_string(serialized)
-
-            serialized = ExtruderStack._updateSerialized(serialized, extruder_stack_file)
-            parser = ConfigParser(interpolation=None)
-            parser.read_string(serialized)
+            not_upgraded_parser = project_archive.getParser(extruder_stack_file, empty_lines_in_values = False)
+            parser = project_archive.getParser(extruder_stack_file, ExtruderStack._updateSerialized, empty_lines_in_values = False)
 
             # The check should be done for the extruder stack that's associated with the existing global stack,
             # and those extruder stacks may have different IDs.
@@ -542,7 +552,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
 
                 existing_extruder_stack = global_stack.extruderList[int(position)]
                 # Check if there are any changes at all in any of the container stacks.
-                id_list = self._getContainerIdListFromSerialized(serialized)
+                id_list = self._getContainerIdListFromStackParser(parser)
                 for index, container_id in enumerate(id_list):
                     # Take into account the old empty container IDs
                     container_id = self._old_empty_profile_id_dict.get(container_id, container_id)
@@ -560,7 +570,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         num_visible_settings = 0
         try:
             temp_preferences = Preferences()
-            serialized = archive.open("Cura/preferences.cfg").read().decode("utf-8")
+            serialized = project_archive.readText("Cura/preferences.cfg")
             temp_preferences.deserialize(serialized)
 
             visible_settings_string = temp_preferences.getValue("general/visible_settings")
@@ -618,7 +628,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
                 machine_name = group_name
 
         # Getting missing required package ids
-        package_metadata = self._parse_packages_metadata(archive)
+        package_metadata = self._parse_packages_metadata(project_archive)
         missing_package_metadata = self._filter_missing_package_metadata(package_metadata)
 
         # Load the user specifically exported settings
@@ -626,7 +636,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         self._dialog.setCurrentMachineName("")
         if self._is_ucp:
             try:
-                self._user_settings = json.loads(archive.open("Cura/user-settings.json").read().decode("utf-8"))
+                self._user_settings = json.loads(project_archive.readText(USER_SETTINGS_PATH))
                 any_extruder_stack = ExtruderManager.getInstance().getExtruderStack(0)
                 actual_global_stack = CuraApplication.getInstance().getGlobalContainerStack()
                 self._dialog.setCurrentMachineName(actual_global_stack.id)
@@ -743,10 +753,8 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
 
         :param file_name:
         """
-        application = CuraApplication.getInstance()
-
         try:
-            archive = zipfile.ZipFile(file_name, "r")
+            project_archive = self._openProjectArchive(file_name)
         except EnvironmentError as e:
             message = Message(i18n_catalog.i18nc("@info:error Don't translate the XML tags <filename> or <message>!",
                                                  "Project file <filename>{0}</filename> is suddenly inaccessible: <message>{1}</message>.", file_name, str(e)),
@@ -764,13 +772,25 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
             self.setWorkspaceName("")
             return [], {}
 
-        cura_file_names = [name for name in archive.namelist() if name.startswith("Cura/")]
+        # Parse the scene while the containers are being loaded.
+        if hasattr(self._3mf_mesh_reader, "setProjectArchive"):
+            self._3mf_mesh_reader.setProjectArchive(project_archive)
+        try:
+            return self._readProject(project_archive, file_name)
+        finally:
+            if hasattr(self._3mf_mesh_reader, "setProjectArchive"):
+                self._3mf_mesh_reader.setProjectArchive(None)
+            self._closeProjectArchive()
+
+    def _readProject(self, project_archive: ProjectArchive, file_name: str):
+        application = CuraApplication.getInstance()
+        cura_file_names = project_archive.getCuraFileNames()
 
         # Create a shadow copy of the preferences (We don't want all of the preferences, but we do want to re-use its
         # parsing code.
         temp_preferences = Preferences()
         try:
-            serialized = archive.open("Cura/preferences.cfg").read().decode("utf-8")
+            serialized = project_archive.readText("Cura/preferences.cfg")
         except KeyError as e:
             # If there is no preferences file, it's not a workspace, so notify user of failure.
             Logger.log("w", "File %s is not a valid workspace.", file_name)
@@ -848,7 +868,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
                 if not definitions:
                     definition_container = DefinitionContainer(container_id)
                     try:
-                        definition_container.deserialize(archive.open(definition_container_file).read().decode("utf-8"),
+                        definition_container.deserialize(project_archive.readText(definition_container_file),
                                                          file_name = definition_container_file)
                     except ContainerFormatError:
                         # We cannot just skip the definition file because everything else later will just break if the
@@ -896,7 +916,7 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
                     if to_deserialize_material:
                         material_container = xml_material_profile(container_id)
                         try:
-                            material_container.deserialize(archive.open(material_container_file).read().decode("utf-8"),
+                            material_container.deserialize(project_archive.readText(material_container_file),
                                                            file_name = container_id + "." + self._material_container_suffix)
                         except ContainerFormatError:
                             Logger.logException("e", "Failed to deserialize material file %s in project file %s",
@@ -960,26 +980,17 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         self.setWorkspaceName(base_file_name)
 
         self._is_ucp = None
-        return nodes, self._loadMetadata(file_name)
+        return nodes, self._loadMetadata(project_archive)
 
     @staticmethod
-    def _loadMetadata(file_name: str) -> Dict[str, Dict[str, Any]]:
+    def _loadMetadata(project_archive: ProjectArchive) -> Dict[str, Dict[str, Any]]:
         result: Dict[str, Dict[str, Any]] = dict()
-        try:
-            archive = zipfile.ZipFile(file_name, "r")
-        except zipfile.BadZipFile:
-            Logger.logException("w", "Unable to retrieve metadata from {fname}: 3MF archive is corrupt.".format(fname = file_name))
-            return result
-        except EnvironmentError as e:
-            Logger.logException("w", "Unable to retrieve metadata from {fname}: File is inaccessible. Error: {err}".format(fname = file_name, err = str(e)))
-            return result
-
-        metadata_files = [name for name in archive.namelist() if name.endswith("plugin_metadata.json")]
+        metadata_files = [name for name in project_archive.getNames() if name.endswith("plugin_metadata.json")]
 
         for metadata_file in metadata_files:
             try:
                 plugin_id = metadata_file.split("/")[0]
-                result[plugin_id] = json.loads(archive.open("%s/plugin_metadata.json" % plugin_id).read().decode("utf-8"))
+                result[plugin_id] = json.loads(project_archive.readText("%s/plugin_metadata.json" % plugin_id))
             except Exception:
                 Logger.logException("w", "Unable to retrieve metadata for %s", metadata_file)
 
@@ -1387,11 +1398,8 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         return self._container_registry.getContainerForMimeType(MimeTypeDatabase.getMimeType("application/x-ultimaker-material-profile"))
 
     @staticmethod
-    def _getContainerIdListFromSerialized(serialized):
-        """Get the list of ID's of all containers in a container stack by partially parsing it's serialized data."""
-
-        parser = ConfigParser(interpolation = None, empty_lines_in_values = False)
-        parser.read_string(serialized)
+    def _getContainerIdListFromStackParser(parser: ConfigParser) -> List[str]:
+        """Get the list of ID's of all containers in a container stack from its parsed serialized data."""
 
         container_ids = []
         if "containers" in parser:
@@ -1411,15 +1419,11 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
         return container_ids
 
     @staticmethod
-    def _getMachineNameFromSerializedStack(serialized):
-        parser = ConfigParser(interpolation = None, empty_lines_in_values = False)
-        parser.read_string(serialized)
+    def _getMachineNameFromStackParser(parser: ConfigParser) -> str:
         return parser["general"].get("name", "")
 
     @staticmethod
-    def _getMetaDataDictFromSerializedStack(serialized: str) -> Dict[str, str]:
-        parser = ConfigParser(interpolation = None, empty_lines_in_values = False)
-        parser.read_string(serialized)
+    def _getMetaDataDictFromStackParser(parser: ConfigParser) -> Dict[str, str]:
         return dict(parser["metadata"])
 
     @staticmethod
@@ -1430,9 +1434,9 @@ class ThreeMFWorkspaceReader(WorkspaceReader):
             return entry.text
 
     @staticmethod
-    def _parse_packages_metadata(archive: zipfile.ZipFile) -> List[Dict[str, str]]:
+    def _parse_packages_metadata(project_archive: ProjectArchive) -> List[Dict[str, str]]:
         try:
-            package_metadata = json.loads(archive.open("Cura/packages.json").read().decode("utf-8"))
+            package_metadata = json.loads(project_archive.readText("Cura/packages.json"))
             return package_metadata["packages"]
         except KeyError:
             Logger.warning("No package metadata was found in .3mf file.")
@@ -0,0 +1,89 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+import sys
+import zipfile
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ProjectArchive import ProjectArchive
+
+global_stack = "[general]\nversion = 4\nname = My Printer\n\n[metadata]\ntype = machine\n\n[containers]\n0 = user\n"
+
+
+@pytest.fixture
+def project_file(tmp_path):
+    file_name = str(tmp_path / "project.3mf")
+    with zipfile.ZipFile(file_name, "w", compression = zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("3D/3dmodel.model", b"<model/>")
+        archive.writestr("Cura/preferences.cfg", "[general]\nversion = 7\n")
+        archive.writestr("Cura/printer.global.cfg", global_stack)
+    return file_name
+
+
+def test_index(project_file):
+    project_archive = ProjectArchive(project_file)
+    assert project_archive.getNames() == ["3D/3dmodel.model", "Cura/preferences.cfg", "Cura/printer.global.cfg"]
+    assert project_archive.getCuraFileNames() == ["Cura/preferences.cfg", "Cura/printer.global.cfg"]
+    assert project_archive.hasFile("Cura/preferences.cfg")
+    assert not project_archive.hasFile("Cura/user-settings.json")
+    with pytest.raises(KeyError):
+        project_archive.readText("Cura/user-settings.json")
+    project_archive.close()
+
+
+def test_parseOnce(project_file):
+    project_archive = ProjectArchive(project_file)
+    update = MagicMock(side_effect = lambda serialized, file_name: serialized.replace("version = 4", "version = 5"))
+
+    parser = project_archive.getParser("Cura/printer.global.cfg", update)
+    assert parser["general"]["version"] == "5"
+    assert project_archive.getParser("Cura/printer.global.cfg", update) is parser
+    update.assert_called_once_with(global_stack, "Cura/printer.global.cfg")
+
+    # The file itself is parsed separately, and with other options.
+    assert project_archive.getParser("Cura/printer.global.cfg")["general"]["version"] == "4"
+    assert project_archive.getParser("Cura/printer.global.cfg", comment_prefixes = ()) is not project_archive.getParser("Cura/printer.global.cfg")
+    project_archive.close()
+
+
+def test_upToDateFileParsedOnce(project_file):
+    project_archive = ProjectArchive(project_file)
+    parser = project_archive.getParser("Cura/printer.global.cfg")
+    assert project_archive.getParser("Cura/printer.global.cfg", lambda serialized, file_name: serialized) is parser
+    project_archive.close()
+
+
+def test_parseInBackground(project_file):
+    project_archive = ProjectArchive(project_file)
+    project_archive.parseInBackground("3D/3dmodel.model", lambda model: model.decode("utf-8").upper())
+    assert project_archive.getParsed("3D/3dmodel.model", MagicMock()) == "<MODEL/>"
+
+    # The result is only handed out once. After that, the file is parsed again.
+    parse = MagicMock(return_value = "parsed")
+    assert project_archive.getParsed("3D/3dmodel.model", parse) == "parsed"
+    parse.assert_called_once_with(b"<model/>")
+    project_archive.close()
+
+
+def test_parseInBackgroundFails(project_file):
+    project_archive = ProjectArchive(project_file)
+    project_archive.parseInBackground("3D/3dmodel.model", MagicMock(side_effect = ValueError("Not a model")))
+    with pytest.raises(ValueError):
+        project_archive.getParsed("3D/3dmodel.model", MagicMock())
+    project_archive.close()
+
+
+def test_isArchiveOf(project_file, tmp_path):
+    project_archive = ProjectArchive(project_file)
+    assert project_archive.isArchiveOf(project_file)
+    assert not project_archive.isArchiveOf(str(tmp_path / "other.3mf"))
+    project_archive.close()
+
+    with zipfile.ZipFile(project_file, "a") as archive:  # The file changed after it was opened.
+        archive.writestr("Cura/user-settings.json", "{}")
+    assert not project_archive.isArchiveOf(project_file)
@@ -0,0 +1,68 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import numpy
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ThreeMFReader import ThreeMFReader
+
+# Two triangles that share an edge, as a triangle soup.
+triangles = numpy.array([[0, 0, 0], [10, 0, 0], [0, 10, 0],
+                         [10, 0, 0], [10, 10, 0], [0, 10, 0]], dtype = numpy.float32)
+
+
+def createSavitarMeshData(vertices: numpy.ndarray) -> MagicMock:
+    savitar_mesh_data = MagicMock()
+    savitar_mesh_data.getFlatVerticesAsBytes = MagicMock(return_value = vertices.tobytes())
+    return savitar_mesh_data
+
+
+@pytest.fixture(params = [False, True], ids = ["soup", "welded"])
+def weld_vertices(request):
+    application = MagicMock()
+    application.getPreferences().getValue = MagicMock(side_effect = lambda key: request.param if key == "3mfreader/weld_vertices" else None)
+    with patch("ThreeMFReader.CuraApplication.getInstance", MagicMock(return_value = application)):
+        yield request.param
+
+
+def test_createMeshDataShared(weld_vertices):
+    mesh_cache = {}
+    mesh_data = ThreeMFReader._createMeshData(createSavitarMeshData(triangles), "1", "model.3mf", mesh_cache)
+
+    assert ThreeMFReader._createMeshData(createSavitarMeshData(triangles.copy()), "2", "model.3mf", mesh_cache) is mesh_data
+    assert ThreeMFReader._createMeshData(createSavitarMeshData(triangles + 1), "3", "model.3mf", mesh_cache) is not mesh_data
+
+
+def test_createMeshDataOtherFile(weld_vertices):
+    mesh_cache = {}
+    mesh_data = ThreeMFReader._createMeshData(createSavitarMeshData(triangles), "1", "model.3mf", mesh_cache)
+    other_mesh_data = ThreeMFReader._createMeshData(createSavitarMeshData(triangles), "1", "other.3mf", mesh_cache)
+
+    assert other_mesh_data is not mesh_data
+    assert mesh_data.getFileName() == "model.3mf"
+    assert other_mesh_data.getFileName() == "other.3mf"
+
+
+def test_createMeshDataKeepsTriangles(weld_vertices):
+    mesh_data = ThreeMFReader._createMeshData(createSavitarMeshData(triangles), "1", "", {})
+
+    vertices = mesh_data.getVertices()
+    if weld_vertices:
+        assert mesh_data.hasIndices()
+        vertices = vertices[mesh_data.getIndices()].reshape(-1, 3)
+    assert numpy.array_equal(vertices, triangles)
+
+
+def test_weldVertices():
+    vertices, indices = ThreeMFReader._weldVertices(triangles)
+
+    assert len(vertices) == 4  # The vertices of the shared edge are merged.
+    assert indices.shape == (2, 3)
+    assert indices.dtype == numpy.int32
+    assert numpy.array_equal(vertices[indices].reshape(-1, 3), triangles)
@@ -0,0 +1,100 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import concurrent.futures
+import zipfile
+from typing import List, Optional, Union
+
+from UM.Logger import Logger
+
+
+class BackgroundArchiveWriter:
+    """Writes files to a zip archive in a thread, in the order in which they are added.
+
+    Compressing the files is the slowest part of writing a project. zlib compresses without holding the GIL, so while
+    one file is being compressed in the background, the next files can be created and the interface stays responsive.
+
+    Errors in writing a file are raised by :py:meth:`flush` and :py:meth:`close`.
+
+    No progress is reported while the files are written. Writers aren't told which job runs them, so there is no
+    message to report it in, and the job keeps showing that it's busy until the archive is closed.
+    """
+
+    def __init__(self, archive: zipfile.ZipFile, compress_level: Optional[int] = None) -> None:
+        """
+        :param archive: The archive to write to. It's only used by the thread that writes the files from now on.
+        :param compress_level: The compression level of the files that are compressed, from 0 to 9. If None, the
+        default level of zlib is used.
+        """
+
+        self._archive = archive
+        self._compress_level = compress_level
+        self._names = archive.namelist()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "BackgroundArchiveWriter")
+        self._futures = []  # type: List[concurrent.futures.Future]
+        self._is_closed = False
+
+    def namelist(self) -> List[str]:
+        """Get the names of the files in the archive, including those that are not written yet."""
+
+        return list(self._names)
+
+    def writestr(self, zinfo_or_arcname: Union[zipfile.ZipInfo, str], data: Union[bytes, str]) -> None:
+        """Add a file with some contents to the archive, like :py:meth:`zipfile.ZipFile.writestr`.
+
+        The contents must not be changed any more.
+        """
+
+        self._names.append(zinfo_or_arcname.filename if isinstance(zinfo_or_arcname, zipfile.ZipInfo) else zinfo_or_arcname)
+        self._futures.append(self._executor.submit(self._archive.writestr, zinfo_or_arcname, data, compresslevel = self._compress_level))
+
+    def write(self, filename: str, arcname: str) -> None:
+        """Add a file from the disk to the archive, like :py:meth:`zipfile.ZipFile.write`."""
+
+        self._names.append(arcname)
+        self._futures.append(self._executor.submit(self._archive.write, filename, arcname = arcname, compresslevel = self._compress_level))
+
+    def flush(self) -> None:
+        """Wait until all files that were added are written.
+
+        :raises Exception: The first error that occurred while writing the files.
+        """
+
+        futures = self._futures
+        self._futures = []
+        concurrent.futures.wait(futures)
+        for future in futures:
+            error = future.exception()
+            if error is not None:
+                raise error
+
+    def close(self) -> None:
+        """Write the files that were added, and close the archive.
+
+        :raises Exception: The first error that occurred while writing the files.
+        """
+
+        if self._is_closed:
+            return
+        self._is_closed = True
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown()
+            self._archive.close()
+
+    def abort(self) -> None:
+        """Close the archive without writing the files that were not written yet, and without raising errors."""
+
+        if self._is_closed:
+            return
+        self._is_closed = True
+        self._executor.shutdown(cancel_futures = True)
+        for future in self._futures:
+            if not future.cancelled() and future.exception() is not None:
+                Logger.warning("Failed to write a file to the archive: {err}".format(err = str(future.exception())))
+        self._futures = []
+        try:
+            self._archive.close()
+        except EnvironmentError as e:
+            Logger.warning("Failed to close the archive: {err}".format(err = str(e)))
@@ -9,7 +9,6 @@ from threading import Lock
 import zipfile
 from typing import Dict, Any
 from pathlib import Path
-from zipfile import ZipFile
 
 from UM.Application import Application
 from UM.Logger import Logger
@@ -20,6 +19,7 @@ from UM.Workspace.WorkspaceWriter import WorkspaceWriter
 from UM.i18n import i18nCatalog
 catalog = i18nCatalog("cura")
 
+from .BackgroundArchiveWriter import BackgroundArchiveWriter
 from .ThreeMFWriter import ThreeMFWriter
 from .SettingsExportModel import SettingsExportModel
 from .SettingsExportGroup import SettingsExportGroup
@@ -58,42 +58,64 @@ class ThreeMFWorkspaceWriter(WorkspaceWriter):
         mesh_writer.setStoreArchive(True)
         if not mesh_writer.write(stream, nodes, mode, self._ucp_model):
             self.setInformation(mesh_writer.getInformation())
+            if mesh_writer.getArchive() is not None:
+                mesh_writer.getArchive().abort()
             return False
 
+        # The files of the mesh writer may still be compressed in the background, while the containers are serialized.
         archive = mesh_writer.getArchive()
         if archive is None:  # This happens if there was no mesh data to write.
-            archive = zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED)
+            archive = ThreeMFWriter._createArchive(stream)
 
         try:
-            # Add global container stack data to the archive.
-            self._writeContainerToArchive(global_stack, archive)
+            self._writeWorkspaceToArchive(global_stack, archive, include_log)
+            # Close the archive & reset states. This waits until all files are written.
+            archive.close()
+        except PermissionError:
+            self.setInformation(catalog.i18nc("@error:zip", "No permission to write the workspace here."))
+            Logger.error("No permission to write workspace to this stream.")
+            archive.abort()
+            return False
+        except EnvironmentError as e:
+            self.setInformation(catalog.i18nc("@error:zip", str(e)))
+            Logger.error("EnvironmentError when writing workspace to this stream: {err}".format(err=str(e)))
+            archive.abort()
+            return False
+        except Exception:
+            archive.abort()  # Don't leave the files that are still being written in the background behind.
+            raise
+        finally:
+            mesh_writer.setStoreArchive(False)
 
-            # Also write all containers in the stack to the file
-            for container in global_stack.getContainers():
-                self._writeContainerToArchive(container, archive)
+        return True
 
-            # Check if the machine has extruders and save all that data as well.
-            for extruder_stack in global_stack.extruderList:
-                self._writeContainerToArchive(extruder_stack, archive)
-                for container in extruder_stack.getContainers():
-                    self._writeContainerToArchive(container, archive)
+    def _writeWorkspaceToArchive(self, global_stack, archive: BackgroundArchiveWriter, include_log: bool) -> None:
+        application = Application.getInstance()
 
-            # Write user settings data
-            if self._ucp_model is not None:
-                user_settings_data = self._getUserSettings(self._ucp_model)
-                ThreeMFWriter._storeMetadataJson(user_settings_data, archive, USER_SETTINGS_PATH)
+        # Add global container stack data to the archive.
+        self._writeContainerToArchive(global_stack, archive)
 
-            # Write log file
-            if include_log:
-                ThreeMFWorkspaceWriter._writeLogFile(archive)
+        # Also write all containers in the stack to the file
+        for container in global_stack.getContainers():
+            self._writeContainerToArchive(container, archive)
 
-        except PermissionError:
-            self.setInformation(catalog.i18nc("@error:zip", "No permission to write the workspace here."))
-            Logger.error("No permission to write workspace to this stream.")
-            return False
+        # Check if the machine has extruders and save all that data as well.
+        for extruder_stack in global_stack.extruderList:
+            self._writeContainerToArchive(extruder_stack, archive)
+            for container in extruder_stack.getContainers():
+                self._writeContainerToArchive(container, archive)
+
+        # Write user settings data
+        if self._ucp_model is not None:
+            user_settings_data = self._getUserSettings(self._ucp_model)
+            ThreeMFWriter._storeMetadataJson(user_settings_data, archive, USER_SETTINGS_PATH)
+
+        # Write log file
+        if include_log:
+            ThreeMFWorkspaceWriter._writeLogFile(archive)
 
         # Write preferences to archive
-        original_preferences = Application.getInstance().getPreferences()  # Copy only the preferences that we use to the workspace.
+        original_preferences = application.getPreferences()  # Copy only the preferences that we use to the workspace.
         temp_preferences = Preferences()
         for preference in {"general/visible_settings", "cura/active_mode", "cura/categories_expanded",
                            "metadata/setting_version"}:
@@ -102,36 +124,21 @@ class ThreeMFWorkspaceWriter(WorkspaceWriter):
         preferences_string = StringIO()
         temp_preferences.writeToFile(preferences_string)
         preferences_file = zipfile.ZipInfo("Cura/preferences.cfg")
-        try:
-            archive.writestr(preferences_file, preferences_string.getvalue())
+        archive.writestr(preferences_file, preferences_string.getvalue())
 
-            # Save Cura version
-            version_file = zipfile.ZipInfo("Cura/version.ini")
-            version_config_parser = configparser.ConfigParser(interpolation=None)
-            version_config_parser.add_section("versions")
-            version_config_parser.set("versions", "cura_version", application.getVersion())
-            version_config_parser.set("versions", "build_type", application.getBuildType())
-            version_config_parser.set("versions", "is_debug_mode", str(application.getIsDebugMode()))
+        # Save Cura version
+        version_file = zipfile.ZipInfo("Cura/version.ini")
+        version_config_parser = configparser.ConfigParser(interpolation=None)
+        version_config_parser.add_section("versions")
+        version_config_parser.set("versions", "cura_version", application.getVersion())
+        version_config_parser.set("versions", "build_type", application.getBuildType())
+        version_config_parser.set("versions", "is_debug_mode", str(application.getIsDebugMode()))
 
-            version_file_string = StringIO()
-            version_config_parser.write(version_file_string)
-            archive.writestr(version_file, version_file_string.getvalue())
-
-            self._writePluginMetadataToArchive(archive)
-
-            # Close the archive & reset states.
-            archive.close()
-        except PermissionError:
-            self.setInformation(catalog.i18nc("@error:zip", "No permission to write the workspace here."))
-            Logger.error("No permission to write workspace to this stream.")
-            return False
-        except EnvironmentError as e:
-            self.setInformation(catalog.i18nc("@error:zip", str(e)))
-            Logger.error("EnvironmentError when writing workspace to this stream: {err}".format(err=str(e)))
-            return False
-        mesh_writer.setStoreArchive(False)
+        version_file_string = StringIO()
+        version_config_parser.write(version_file_string)
+        archive.writestr(version_file, version_file_string.getvalue())
 
-        return True
+        self._writePluginMetadataToArchive(archive)
 
     def write(self, stream, nodes, mode=WorkspaceWriter.OutputMode.BinaryMode, **kwargs):
         success = self._write(stream, nodes, WorkspaceWriter.OutputMode.BinaryMode, kwargs.get("include_log", False))
@@ -139,7 +146,7 @@ class ThreeMFWorkspaceWriter(WorkspaceWriter):
         return success
 
     @staticmethod
-    def _writePluginMetadataToArchive(archive: zipfile.ZipFile) -> None:
+    def _writePluginMetadataToArchive(archive: BackgroundArchiveWriter) -> None:
         file_name_template = "%s/plugin_metadata.json"
 
         for plugin_id, metadata in Application.getInstance().getWorkspaceMetadataStorage().getAllData().items():
@@ -151,7 +158,7 @@ class ThreeMFWorkspaceWriter(WorkspaceWriter):
             archive.writestr(file_in_archive, json.dumps(metadata, separators = (", ", ": "), indent = 4, skipkeys = True))
 
     @staticmethod
-    def _writeContainerToArchive(container, archive):
+    def _writeContainerToArchive(container, archive: BackgroundArchiveWriter):
         """Helper function that writes ContainerStacks, InstanceContainers and DefinitionContainers to the archive.
 
         :param container: That follows the :type{ContainerInterface} to archive.
@@ -196,11 +203,11 @@ class ThreeMFWorkspaceWriter(WorkspaceWriter):
 
             archive.writestr(file_in_archive, serialized_data)
         except (FileNotFoundError, EnvironmentError):
-            Logger.error("File became inaccessible while writing to it: {archive_filename}".format(archive_filename = archive.fp.name))
+            Logger.error("File became inaccessible while writing {file_name} to it.".format(file_name = file_name))
             return
 
     @staticmethod
-    def _writeLogFile(archive: ZipFile) -> None:
+    def _writeLogFile(archive: BackgroundArchiveWriter) -> None:
         """Helper function that writes the Cura log file to the archive.
 
         :param archive: The archive to write to.
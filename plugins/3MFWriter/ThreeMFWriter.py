@@ -43,6 +43,7 @@ except ImportError:
 import zipfile
 import UM.Application
 
+from .BackgroundArchiveWriter import BackgroundArchiveWriter
 from .SettingsExportModel import SettingsExportModel
 from .SettingsExportGroup import SettingsExportGroup
 
@@ -64,10 +65,13 @@ class ThreeMFWriter(MeshWriter):
         }
 
         self._unit_matrix_string = ThreeMFWriter._convertMatrixToString(Matrix())
-        self._archive: Optional[zipfile.ZipFile] = None
+        self._archive: Optional[BackgroundArchiveWriter] = None
         self._store_archive = False
         self._lock = threading.Lock()
 
+        # The compression level of the files in 3MF files and projects, from 0 (fastest) to 9 (smallest).
+        Application.getInstance().getPreferences().addPreference("3mfwriter/compression_level", 6)
+
     @staticmethod
     def _convertMatrixToString(matrix):
         result = ""
@@ -181,9 +185,19 @@ class ThreeMFWriter(MeshWriter):
 
         return savitar_node
 
-    def getArchive(self):
+    def getArchive(self) -> Optional[BackgroundArchiveWriter]:
         return self._archive
 
+    @staticmethod
+    def _createArchive(stream) -> BackgroundArchiveWriter:
+        """Create a 3MF archive that is written to a stream in the background."""
+
+        try:
+            compress_level = max(0, min(9, int(Application.getInstance().getPreferences().getValue("3mfwriter/compression_level"))))
+        except (TypeError, ValueError):
+            compress_level = None
+        return BackgroundArchiveWriter(zipfile.ZipFile(stream, "w", compression = zipfile.ZIP_DEFLATED), compress_level)
+
     def _addLogoToThumbnail(self, primary_image, logo_name):
         # Load the icon png image
         icon_image = QImage(Resources.getPath(Resources.Images,  logo_name))
@@ -203,7 +217,7 @@ class ThreeMFWriter(MeshWriter):
 
     def write(self, stream, nodes, mode = MeshWriter.OutputMode.BinaryMode, export_settings_model = None) -> bool:
         self._archive = None # Reset archive
-        archive = zipfile.ZipFile(stream, "w", compression = zipfile.ZIP_DEFLATED)
+        archive = self._createArchive(stream)
         try:
             model_file = zipfile.ZipInfo(MODEL_PATH)
             # Because zipfile is stupid and ignores archive-level compression settings when writing with ZipInfo.
@@ -235,7 +249,7 @@ class ThreeMFWriter(MeshWriter):
 
                 thumbnail_file = zipfile.ZipInfo(THUMBNAIL_PATH)
                 # Don't try to compress snapshot file, because the PNG is pretty much as compact as it will get
-                archive.writestr(thumbnail_file, thumbnail_buffer.data())
+                archive.writestr(thumbnail_file, bytes(thumbnail_buffer.data()))
 
                 # Add PNG to content types file
                 thumbnail_type = ET.SubElement(content_types, "Default", Extension="png", ContentType="image/png")
@@ -304,23 +318,26 @@ class ThreeMFWriter(MeshWriter):
             parser = Savitar.ThreeMFParser()
             scene_string = parser.sceneToString(savitar_scene)
 
+            # The files are compressed in the background. A project writer adds its files in the meantime.
             archive.writestr(model_file, scene_string)
             archive.writestr(content_types_file, b'<?xml version="1.0" encoding="UTF-8"?> \n' + ET.tostring(content_types))
             archive.writestr(relations_file, b'<?xml version="1.0" encoding="UTF-8"?> \n' + ET.tostring(relations_element))
+            if not self._store_archive:
+                archive.close()
         except Exception as error:
             Logger.logException("e", "Error writing zip file")
             self.setInformation(str(error))
+            if not self._store_archive:
+                archive.abort()
             return False
         finally:
-            if not self._store_archive:
-                archive.close()
-            else:
+            if self._store_archive:
                 self._archive = archive
 
         return True
 
     @staticmethod
-    def _storeMetadataJson(metadata: Dict[str, List[Dict[str, str]]], archive: zipfile.ZipFile, path: str) -> None:
+    def _storeMetadataJson(metadata: Dict[str, List[Dict[str, str]]], archive: BackgroundArchiveWriter, path: str) -> None:
         """Stores metadata inside archive path as json file"""
         metadata_file = zipfile.ZipInfo(path)
         # We have to set the compress type of each file as well (it doesn't keep the type of the entire archive)
@@ -0,0 +1,51 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+import sys
+import zipfile
+from io import BytesIO
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from BackgroundArchiveWriter import BackgroundArchiveWriter
+
+
+def test_writeInOrder():
+    stream = BytesIO()
+    archive = BackgroundArchiveWriter(zipfile.ZipFile(stream, "w", compression = zipfile.ZIP_DEFLATED), compress_level = 1)
+    archive.writestr("3D/3dmodel.model", "<model />" * 1000)
+    archive.writestr(zipfile.ZipInfo("Cura/global.cfg"), b"[general]\n")
+    assert archive.namelist() == ["3D/3dmodel.model", "Cura/global.cfg"]
+    archive.close()
+    archive.close()  # Closing it again does nothing.
+
+    with zipfile.ZipFile(stream) as result:
+        assert result.namelist() == ["3D/3dmodel.model", "Cura/global.cfg"]
+        assert result.read("3D/3dmodel.model") == b"<model />" * 1000
+        assert result.read("Cura/global.cfg") == b"[general]\n"
+
+
+def test_writeError():
+    zip_file = MagicMock()
+    zip_file.namelist = MagicMock(return_value = [])
+    zip_file.writestr = MagicMock(side_effect = PermissionError("Not allowed"))
+    archive = BackgroundArchiveWriter(zip_file)
+    archive.writestr("Cura/global.cfg", "[general]\n")
+    with pytest.raises(PermissionError):
+        archive.close()
+    zip_file.close.assert_called_once_with()
+
+
+def test_abort():
+    zip_file = MagicMock()
+    zip_file.namelist = MagicMock(return_value = [])
+    zip_file.writestr = MagicMock(side_effect = PermissionError("Not allowed"))
+    zip_file.close = MagicMock(side_effect = OSError("Disk is gone"))
+    archive = BackgroundArchiveWriter(zip_file)
+    archive.writestr("Cura/global.cfg", "[general]\n")
+    archive.abort()  # Doesn't raise the errors.
+    zip_file.close.assert_called_once_with()
@@ -25,10 +25,13 @@ from UM.Settings.SettingInstance import SettingInstance #For typing.
 from UM.Tool import Tool #For typing.
 
 from cura.CuraApplication import CuraApplication
+from cura.Scene.GCodeChunkList import GCodeChunkList
 from cura.Settings.ExtruderManager import ExtruderManager
 from cura.Snapshot import Snapshot
 from cura.Utils.Threading import call_on_qt_thread
 from .ProcessSlicedLayersJob import ProcessSlicedLayersJob
+from .SliceMeshCache import SliceMeshCache
+from .SliceSettingsCache import SliceSettingsCache
 from .StartSliceJob import StartSliceJob, StartJobResult
 
 import pyArcus as Arcus
@@ -148,6 +151,8 @@ class CuraEngineBackend(QObject, Backend):
 
         self._start_slice_job: Optional[StartSliceJob] = None
         self._start_slice_job_build_plate: Optional[int] = None
+        self._slice_mesh_cache: SliceMeshCache = SliceMeshCache()  # The vertices of the objects of the previous slice.
+        self._slice_settings_cache: SliceSettingsCache = SliceSettingsCache()  # The setting values of the previous slice.
         self._slicing: bool = False  # Are we currently slicing?
         self._restart: bool = False  # Back-end is currently restarting?
         self._tool_active: bool = False  # If a tool is active, some tasks do not have to do anything
@@ -402,7 +407,7 @@ class CuraEngineBackend(QObject, Backend):
         self.processingProgress.emit(0.0)
         self.backendStateChange.emit(BackendState.NotStarted)
 
-        self._scene.gcode_dict[build_plate_to_be_sliced] = []  # type: ignore #[] indexed by build plate number
+        self._scene.gcode_dict[build_plate_to_be_sliced] = GCodeChunkList()  # type: ignore #[] indexed by build plate number
         self._slicing = True
         self.slicingStarted.emit()
 
@@ -412,6 +417,8 @@ class CuraEngineBackend(QObject, Backend):
         self._start_slice_job = StartSliceJob(slice_message)
         self._start_slice_job_build_plate = build_plate_to_be_sliced
         self._start_slice_job.setBuildPlate(self._start_slice_job_build_plate)
+        self._start_slice_job.setMeshCache(self._slice_mesh_cache)
+        self._start_slice_job.setSettingsCache(self._slice_settings_cache)
         self._start_slice_job.start()
         self._start_slice_job.finished.connect(self._onStartSliceCompleted)
 
@@ -422,6 +429,10 @@ class CuraEngineBackend(QObject, Backend):
         """
         self._slicing = False
         self._stored_layer_data = []
+        if self._process_layers_job is not None and self._process_layers_job.isStreaming():
+            # The job is waiting for layers that will never arrive.
+            self._process_layers_job.abort()
+            self._process_layers_job = None
         if self._start_slice_job_build_plate in self._stored_optimized_layer_data:
             del self._stored_optimized_layer_data[self._start_slice_job_build_plate]
         if self._start_slice_job is not None:
@@ -814,6 +825,17 @@ class CuraEngineBackend(QObject, Backend):
                 self._stored_optimized_layer_data[self._start_slice_job_build_plate] = []
             self._stored_optimized_layer_data[self._start_slice_job_build_plate].append(message)
 
+            # Start turning the layers into layer data while the engine is still sending them, so the layer view
+            # can show the first layers before slicing has finished.
+            active_build_plate = CuraApplication.getInstance().getMultiBuildPlateModel().activeBuildPlate
+            if (
+                self._layer_view_active and
+                self._process_layers_job is None and
+                active_build_plate == self._start_slice_job_build_plate and
+                active_build_plate not in self._build_plates_to_be_sliced):
+
+                self._startProcessSlicedLayersJob(active_build_plate, streaming = True)
+
     def _onProgressMessage(self, message: Arcus.PythonMessage) -> None:
         """Called when a progress message is received from the engine.
 
@@ -855,13 +877,20 @@ class CuraEngineBackend(QObject, Backend):
             # Can occur if the g-code has been cleared while a slice message is still arriving from the other end.
             gcode_list = []
         application = CuraApplication.getInstance()
+        print_information = application.getPrintInformation()
+        replacements = {
+            "{print_time}": str(print_information.currentPrintTime.getDisplayString(DurationFormat.Format.ISO8601)),
+            "{filament_amount}": str(print_information.materialLengths),
+            "{filament_weight}": str(print_information.materialWeights),
+            "{filament_cost}": str(print_information.materialCosts),
+            "{jobname}": str(print_information.jobName)
+        }
         for index, line in enumerate(gcode_list):
-            replaced = line.replace("{print_time}", str(application.getPrintInformation().currentPrintTime.getDisplayString(DurationFormat.Format.ISO8601)))
-            replaced = replaced.replace("{filament_amount}", str(application.getPrintInformation().materialLengths))
-            replaced = replaced.replace("{filament_weight}", str(application.getPrintInformation().materialWeights))
-            replaced = replaced.replace("{filament_cost}", str(application.getPrintInformation().materialCosts))
-            replaced = replaced.replace("{jobname}", str(application.getPrintInformation().jobName))
-
+            if "{" not in line:  # Leave the chunks without placeholders as the engine sent them.
+                continue
+            replaced = line
+            for placeholder, value in replacements.items():
+                replaced = replaced.replace(placeholder, value)
             gcode_list[index] = replaced
 
         self._slicing = False
@@ -872,6 +901,13 @@ class CuraEngineBackend(QObject, Backend):
         # See if we need to process the sliced layers job.
         active_build_plate = application.getMultiBuildPlateModel().activeBuildPlate
         if (
+            self._process_layers_job is not None and
+            self._process_layers_job.isStreaming() and
+            self._process_layers_job.getBuildPlate() == self._start_slice_job_build_plate):
+
+            # The layers are already being processed while they came in. Let the job know there are no more.
+            self._process_layers_job.finishStream()
+        elif (
             self._layer_view_active and
             (self._process_layers_job is None or not self._process_layers_job.isRunning()) and
             active_build_plate == self._start_slice_job_build_plate and
@@ -895,11 +931,9 @@ class CuraEngineBackend(QObject, Backend):
         :param message: The protobuf message containing g-code, encoded as UTF-8.
         """
 
-        try:
-            self._scene.gcode_dict[self._start_slice_job_build_plate].append(message.data.decode("utf-8", "replace")) #type: ignore #Because we generate this attribute dynamically.
-        except KeyError:
-            # Can occur if the g-code has been cleared while a slice message is still arriving from the other end.
-            pass  # Throw the message away.
+        gcode_list = self._getSlicingGCodeList()
+        if gcode_list is not None:
+            gcode_list.appendEncoded(message.data)
 
     def _onGCodePrefixMessage(self, message: Arcus.PythonMessage) -> None:
         """Called when a g-code prefix message is received from the engine.
@@ -908,11 +942,21 @@ class CuraEngineBackend(QObject, Backend):
         encoded as UTF-8.
         """
 
-        try:
-            self._scene.gcode_dict[self._start_slice_job_build_plate].insert(0, message.data.decode("utf-8", "replace")) #type: ignore #Because we generate this attribute dynamically.
-        except KeyError:
-            # Can occur if the g-code has been cleared while a slice message is still arriving from the other end.
-            pass  # Throw the message away.
+        gcode_list = self._getSlicingGCodeList()
+        if gcode_list is not None:
+            gcode_list.insertEncoded(0, message.data)
+
+    def _getSlicingGCodeList(self) -> Optional[GCodeChunkList]:
+        """Get the g-code list that the engine's messages for the build plate being sliced go into.
+
+        :return: The g-code list, or None if the messages must be thrown away. That can occur if the g-code has been
+        cleared or replaced (e.g. by a loaded g-code file) while a slice message is still arriving from the other end.
+        """
+
+        gcode_list = getattr(self._scene, "gcode_dict", {}).get(self._start_slice_job_build_plate)
+        if not isinstance(gcode_list, GCodeChunkList):
+            return None
+        return gcode_list
 
     def _onSliceUUIDMessage(self, message: Arcus.PythonMessage) -> None:
         application = CuraApplication.getInstance()
@@ -1026,8 +1070,8 @@ class CuraEngineBackend(QObject, Backend):
             source = self._postponed_scene_change_sources.pop(0)
             self._onSceneChanged(source)
 
-    def _startProcessSlicedLayersJob(self, build_plate_number: int) -> None:
-        self._process_layers_job = ProcessSlicedLayersJob(self._stored_optimized_layer_data[build_plate_number])
+    def _startProcessSlicedLayersJob(self, build_plate_number: int, streaming: bool = False) -> None:
+        self._process_layers_job = ProcessSlicedLayersJob(self._stored_optimized_layer_data[build_plate_number], streaming = streaming)
         self._process_layers_job.setBuildPlate(build_plate_number)
         self._process_layers_job.finished.connect(self._onProcessLayersFinished)
         self._process_layers_job.start()
@@ -1089,6 +1133,7 @@ class CuraEngineBackend(QObject, Backend):
                 extruder.containersChanged.disconnect(self._onChanged)
 
         self._global_container_stack = CuraApplication.getInstance().getMachineManager().activeMachine
+        self._slice_settings_cache.setGlobalStack(self._global_container_stack)
 
         if self._global_container_stack:
             # Note: Only starts slicing when the value changed.
@@ -1101,6 +1146,9 @@ class CuraEngineBackend(QObject, Backend):
             self._onChanged()
 
     def _onProcessLayersFinished(self, job: ProcessSlicedLayersJob) -> None:
+        if job is not self._process_layers_job:
+            # This job was aborted and may have been replaced already. Don't throw away the layers of the new one.
+            return
         if job.getBuildPlate() in self._stored_optimized_layer_data:
             del self._stored_optimized_layer_data[job.getBuildPlate()]
         else:
@@ -1142,6 +1190,7 @@ class CuraEngineBackend(QObject, Backend):
             self._change_timer.start()
 
     def _extruderChanged(self) -> None:
+        self._slice_settings_cache.invalidate()  # Settings can depend on which extruders are enabled.
         if not self._multi_build_plate_model:
             Logger.log("w", "CuraEngineBackend does not have multi_build_plate_model assigned!")
             return
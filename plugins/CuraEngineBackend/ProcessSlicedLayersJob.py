@@ -23,7 +23,7 @@ from cura import LayerDataDecorator
 from cura import LayerPolygon
 
 import numpy
-from time import time
+from time import sleep, time
 from cura.Machines.Models.ExtrudersModel import ExtrudersModel
 catalog = i18nCatalog("cura")
 
@@ -45,9 +45,18 @@ def colorCodeToRGBA(color_code):
 
 
 class ProcessSlicedLayersJob(Job):
-    def __init__(self, layers):
+    def __init__(self, layers, streaming = False):
+        """Creates a job to turn the layer messages of the engine into layer data.
+
+        :param layers: The LayerOptimized messages from the engine.
+        :param streaming: Whether the engine is still sending layers. The job will then keep on appending the
+        layers that are added to the ``layers`` list, until :py:meth:`finishStream` is called.
+        """
+
         super().__init__()
         self._layers = layers
+        self._streaming = streaming
+        self._stream_finished = not streaming
         self._scene = Application.getInstance().getController().getScene()
         self._progress_message = Message(catalog.i18nc("@info:status", "Processing Layers"), 0, False, -1)
         self._abort_requested = False
@@ -64,6 +73,14 @@ class ProcessSlicedLayersJob(Job):
 
         self._abort_requested = True
 
+    def finishStream(self):
+        """Indicates that the engine has sent all layers, so the job can finish once it has processed them."""
+
+        self._stream_finished = True
+
+    def isStreaming(self) -> bool:
+        return self._streaming
+
     def setBuildPlate(self, new_value):
         self._build_plate_number = new_value
 
@@ -95,9 +112,13 @@ class ProcessSlicedLayersJob(Job):
         # sure any old layer data is really cleaned up before adding new.
         gc.collect()
 
+        # The colors are needed up front, since every layer is turned into mesh data as soon as it is processed.
+        material_color_map, line_type_brightness = self._getMaterialColorMap()
+        compact = LayerDataBuilder.LayerDataBuilder.useCompactLayerData()
+
         mesh = MeshData()
-        layer_data = LayerDataBuilder.LayerDataBuilder()
-        layer_count = len(self._layers)
+        layer_data = LayerDataBuilder.LayerDataBuilder(compact)
+        published_vertex_count = 0
 
         # Find the minimum layer number
         # When disabling the remove empty first layers setting, the minimum layer number will be a positive
@@ -106,94 +127,216 @@ class ProcessSlicedLayersJob(Job):
         # When using a raft, the raft layers are sent as layers < 0. Instead of allowing layers < 0, we
         # simply offset all other layers so the lowest layer is always 0. It could happens that the first
         # raft layer has value -8 but there are just 4 raft (negative) layers.
+        # While streaming, not all layers are known yet. The engine sends them in ascending order, so the numbers
+        # can be determined while going. If that turns out to be wrong, everything is processed again at the end.
         min_layer_number = sys.maxsize
         negative_layers = 0
-        for layer in self._layers:
-            if layer.repeatedMessageCount("path_segment") > 0:
+        if not self._streaming:
+            min_layer_number, negative_layers = self._findLayerNumbering(self._layers)
+        numbering_changed = False
+        processed_non_negative_layer = False
+
+        current_layer = 0
+        layer_index = 0
+        while True:
+            layer = self._getNextLayer(layer_index)
+            if layer is None:
+                break
+            layer_index += 1
+
+            if self._streaming and layer.repeatedMessageCount("path_segment") > 0:
                 if layer.id < min_layer_number:
+                    numbering_changed = numbering_changed or current_layer > 0
                     min_layer_number = layer.id
                 if layer.id < 0:
                     negative_layers += 1
+                    numbering_changed = numbering_changed or processed_non_negative_layer
 
-        current_layer = 0
-
-        for layer in self._layers:
             # If the layer is below the minimum, it means that there is no data, so that we don't create a layer
             # data. However, if there are empty layers in between, we compute them.
             if layer.id < min_layer_number:
                 continue
 
-            # Layers are offset by the minimum layer number. In case the raft (negative layers) is being used,
-            # then the absolute layer number is adjusted by removing the empty layers that can be in between raft
-            # and the model
-            abs_layer_number = layer.id - min_layer_number
-            if layer.id >= 0 and negative_layers != 0:
-                abs_layer_number += (min_layer_number + negative_layers)
+            abs_layer_number = self._getAbsoluteLayerNumber(layer.id, min_layer_number, negative_layers)
+            processed_non_negative_layer = processed_non_negative_layer or layer.id >= 0
+            self._processLayer(layer, abs_layer_number, layer_data)
+
+            # Turn the layer into mesh data right away, so we don't have to concatenate all layers at the end.
+            layer_data.appendLayer(abs_layer_number, material_color_map, line_type_brightness)
 
-            layer_data.addLayer(abs_layer_number)
-            this_layer = layer_data.getLayer(abs_layer_number)
-            layer_data.setLayerHeight(abs_layer_number, layer.height)
-            layer_data.setLayerThickness(abs_layer_number, layer.thickness)
+            Job.yieldThread()
+            current_layer += 1
+            progress = (current_layer / len(self._layers)) * 99
+
+            if self._abort_requested:
+                self._abortProcessing(new_node)
+                return
+            if self._progress_message:
+                self._progress_message.setProgress(progress)
 
-            for p in range(layer.repeatedMessageCount("path_segment")):
-                polygon = layer.getRepeatedMessage("path_segment", p)
+            # Show what we have so far. Every time the amount of data has doubled, so the total amount of data that
+            # is sent to the layer view stays in the order of the size of the final result.
+            if layer_data.getBufferedVertexCount() > 2 * published_vertex_count:
+                published_vertex_count = layer_data.getBufferedVertexCount()
+                self._publishLayerData(new_node, mesh, layer_data.build(material_color_map, line_type_brightness))
 
-                extruder = polygon.extruder
+        if self._abort_requested:
+            self._abortProcessing(new_node)
+            return
 
-                line_types = numpy.fromstring(polygon.line_type, dtype = "u1")  # Convert bytearray to numpy array
+        if numbering_changed:
+            # Layers arrived out of order, so some layers were numbered wrongly. Start over with all the layers.
+            Logger.log("w", "Layers were received out of order, processing all layers again.")
+            min_layer_number, negative_layers = self._findLayerNumbering(self._layers)
+            layer_data = LayerDataBuilder.LayerDataBuilder(compact)
+            for layer in self._layers:
+                if layer.id < min_layer_number:
+                    continue
+                self._processLayer(layer, self._getAbsoluteLayerNumber(layer.id, min_layer_number, negative_layers), layer_data)
+                if self._abort_requested:
+                    self._abortProcessing(new_node)
+                    return
 
-                line_types = line_types.reshape((-1,1))
+        # We are done processing all the layers we got from the engine, now create a mesh out of the remaining data
+        layer_mesh = layer_data.build(material_color_map, line_type_brightness)
 
-                points = numpy.fromstring(polygon.points, dtype = "f4")  # Convert bytearray to numpy array
-                if polygon.point_type == 0: # Point2D
-                    points = points.reshape((-1,2))  # We get a linear list of pairs that make up the points, so make numpy interpret them correctly.
-                else:  # Point3D
-                    points = points.reshape((-1,3))
+        if self._abort_requested:
+            self._abortProcessing(new_node)
+            return
 
-                line_widths = numpy.fromstring(polygon.line_width, dtype = "f4")  # Convert bytearray to numpy array
-                line_widths = line_widths.reshape((-1,1))  # We get a linear list of pairs that make up the points, so make numpy interpret them correctly.
+        self._publishLayerData(new_node, mesh, layer_mesh)  # Note: After this we can no longer abort!
 
-                line_thicknesses = numpy.fromstring(polygon.line_thickness, dtype = "f4")  # Convert bytearray to numpy array
-                line_thicknesses = line_thicknesses.reshape((-1,1))  # We get a linear list of pairs that make up the points, so make numpy interpret them correctly.
+        if self._progress_message:
+            self._progress_message.setProgress(100)
 
-                line_feedrates = numpy.fromstring(polygon.line_feedrate, dtype = "f4")  # Convert bytearray to numpy array
-                line_feedrates = line_feedrates.reshape((-1,1))  # We get a linear list of pairs that make up the points, so make numpy interpret them correctly.
+        if self._progress_message:
+            self._progress_message.hide()
 
-                # Create a new 3D-array, copy the 2D points over and insert the right height.
-                # This uses manual array creation + copy rather than numpy.insert since this is
-                # faster.
-                new_points = numpy.empty((len(points), 3), numpy.float32)
-                if polygon.point_type == 0:  # Point2D
-                    new_points[:, 0] = points[:, 0]
-                    new_points[:, 1] = layer.height / 1000  # layer height value is in backend representation
-                    new_points[:, 2] = -points[:, 1]
-                else: # Point3D
-                    new_points[:, 0] = points[:, 0]
-                    new_points[:, 1] = points[:, 2]
-                    new_points[:, 2] = -points[:, 1]
+        # Clear the unparsed layers. This saves us a bunch of memory if the Job does not get destroyed.
+        self._layers = None
 
-                this_poly = LayerPolygon.LayerPolygon(extruder, line_types, new_points, line_widths, line_thicknesses, line_feedrates)
-                this_poly.buildCache()
+        Logger.log("d", "Processing layers took %s seconds", time() - start_time)
 
-                this_layer.polygons.append(this_poly)
+    def _getNextLayer(self, index):
+        """Get the layer message at the given index, waiting for the engine to send it if it is still streaming.
 
-                Job.yieldThread()
-            Job.yieldThread()
-            current_layer += 1
-            progress = (current_layer / layer_count) * 99
-            # TODO: Rebuild the layer data mesh once the layer has been processed.
-            # This needs some work in LayerData so we can add the new layers instead of recreating the entire mesh.
+        :return: The layer message, or None if there are no more layers.
+        """
 
+        while index >= len(self._layers):
             if self._abort_requested:
-                if self._progress_message:
-                    self._progress_message.hide()
-                return
-            if self._progress_message:
-                self._progress_message.setProgress(progress)
+                return None
+            if self._stream_finished:
+                # All layers were added before the stream was finished, so check one last time.
+                return self._layers[index] if index < len(self._layers) else None
+            sleep(0.1)
+        return self._layers[index]
+
+    @staticmethod
+    def _findLayerNumbering(layers):
+        """Find the minimum layer number with data and the number of negative (raft) layers with data."""
+
+        min_layer_number = sys.maxsize
+        negative_layers = 0
+        for layer in layers:
+            if layer.repeatedMessageCount("path_segment") > 0:
+                if layer.id < min_layer_number:
+                    min_layer_number = layer.id
+                if layer.id < 0:
+                    negative_layers += 1
+        return min_layer_number, negative_layers
+
+    @staticmethod
+    def _getAbsoluteLayerNumber(layer_id, min_layer_number, negative_layers):
+        # Layers are offset by the minimum layer number. In case the raft (negative layers) is being used,
+        # then the absolute layer number is adjusted by removing the empty layers that can be in between raft
+        # and the model
+        abs_layer_number = layer_id - min_layer_number
+        if layer_id >= 0 and negative_layers != 0:
+            abs_layer_number += (min_layer_number + negative_layers)
+        return abs_layer_number
+
+    def _processLayer(self, layer, abs_layer_number, layer_data):
+        """Convert the path segments of one layer message into layer polygons.
+
+        :param layer: The LayerOptimized message from the engine.
+        :param abs_layer_number: The number of the layer in the layer data.
+        :param layer_data: The layer data builder to add the layer to.
+        """
+
+        layer_data.addLayer(abs_layer_number)
+        this_layer = layer_data.getLayer(abs_layer_number)
+        layer_data.setLayerHeight(abs_layer_number, layer.height)
+        layer_data.setLayerThickness(abs_layer_number, layer.thickness)
+
+        path_segments = [layer.getRepeatedMessage("path_segment", p) for p in range(layer.repeatedMessageCount("path_segment"))]
+        if not path_segments:
+            return
+
+        this_poly = self.decodePathSegments(path_segments, layer.height)
+        this_poly.buildCache()
+
+        this_layer.polygons.append(this_poly)
+
+    @staticmethod
+    def decodePathSegments(path_segments, layer_height):
+        """Decode all path segments of a layer at once, into a single batch of layer polygons.
 
-        # We are done processing all the layers we got from the engine, now create a mesh out of the data
+        Instead of converting the byte buffers of every path segment separately, the buffers of all segments are
+        joined and converted in one go. The polygons are kept apart by the offsets of their first lines.
+
+        :param path_segments: The PathSegment messages of a layer.
+        :param layer_height: The height of the layer, in backend representation (microns).
+        :return: A layer polygon holding all path segments as one batch.
+        """
+
+        # The buffers are joined in a bytearray, so the resulting numpy arrays are writable.
+        line_types = numpy.frombuffer(bytearray().join(segment.line_type for segment in path_segments), dtype = "u1").reshape((-1, 1))
+        line_widths = numpy.frombuffer(bytearray().join(segment.line_width for segment in path_segments), dtype = "f4").reshape((-1, 1))
+        line_thicknesses = numpy.frombuffer(bytearray().join(segment.line_thickness for segment in path_segments), dtype = "f4").reshape((-1, 1))
+        line_feedrates = numpy.frombuffer(bytearray().join(segment.line_feedrate for segment in path_segments), dtype = "f4").reshape((-1, 1))
+
+        line_counts = numpy.fromiter((len(segment.line_type) for segment in path_segments), dtype = numpy.int32, count = len(path_segments))
+        polygon_offsets = numpy.zeros(len(path_segments) + 1, dtype = numpy.int32)
+        numpy.cumsum(line_counts, out = polygon_offsets[1:])
+        extruders = numpy.fromiter((segment.extruder for segment in path_segments), dtype = numpy.int32, count = len(path_segments))
+
+        # Create a new 3D-array, copy the 2D points over and insert the right height.
+        # This uses manual array creation + copy rather than numpy.insert since this is
+        # faster.
+        point_types = {segment.point_type for segment in path_segments}
+        if len(point_types) == 1:
+            points = numpy.frombuffer(b"".join(segment.points for segment in path_segments), dtype = "f4")
+            new_points = ProcessSlicedLayersJob._toScenePoints(points, point_types.pop(), layer_height)
+        else:  # Mixed 2D and 3D points. Not sent by the engine, but convert them per segment to be sure.
+            new_points = numpy.concatenate([ProcessSlicedLayersJob._toScenePoints(numpy.frombuffer(segment.points, dtype = "f4"), segment.point_type, layer_height) for segment in path_segments])
+
+        return LayerPolygon.LayerPolygon(extruders, line_types, new_points, line_widths, line_thicknesses, line_feedrates, polygon_offsets)
+
+    @staticmethod
+    def _toScenePoints(points, point_type, layer_height):
+        if point_type == 0:  # Point2D
+            points = points.reshape((-1, 2))  # We get a linear list of pairs that make up the points, so make numpy interpret them correctly.
+        else:  # Point3D
+            points = points.reshape((-1, 3))
+
+        new_points = numpy.empty((len(points), 3), numpy.float32)
+        if point_type == 0:  # Point2D
+            new_points[:, 0] = points[:, 0]
+            new_points[:, 1] = layer_height / 1000  # layer height value is in backend representation
+            new_points[:, 2] = -points[:, 1]
+        else: # Point3D
+            new_points[:, 0] = points[:, 0]
+            new_points[:, 1] = points[:, 2]
+            new_points[:, 2] = -points[:, 1]
+        return new_points
+
+    def _getMaterialColorMap(self):
+        """Find out colors per extruder.
+
+        :return: A tuple of the [r, g, b, a] rows per extruder and the brightness to use for line types.
+        """
 
-        # Find out colors per extruder
         global_container_stack = Application.getInstance().getGlobalContainerStack()
         manager = ExtruderManager.getInstance()
         extruders = manager.getActiveExtruderStacks()
@@ -220,11 +363,18 @@ class ProcessSlicedLayersJob(Job):
             line_type_brightness = 0.5  # for compatibility mode
         else:
             line_type_brightness = 1.0
-        layer_mesh = layer_data.build(material_color_map, line_type_brightness)
+        return material_color_map, line_type_brightness
 
-        if self._abort_requested:
-            if self._progress_message:
-                self._progress_message.hide()
+    def _publishLayerData(self, new_node, mesh, layer_mesh):
+        """Show the (partial) layer data in the scene.
+
+        The first time, the node is added to the scene. After that, only its layer data is replaced.
+        """
+
+        decorator = new_node.getDecorator(LayerDataDecorator.LayerDataDecorator)
+        if decorator is not None:
+            decorator.setLayerData(layer_mesh)
+            new_node.setMeshData(mesh)  # Notifies the scene (and so the layer view) that the layer data changed.
             return
 
         # Add LayerDataDecorator to scene node to indicate that the node has layer data
@@ -236,22 +386,18 @@ class ProcessSlicedLayersJob(Job):
         # Set build volume as parent, the build volume can move as a result of raft settings.
         # It makes sense to set the build volume as parent: the print is actually printed on it.
         new_node_parent = Application.getInstance().getBuildVolume()
-        new_node.setParent(new_node_parent)  # Note: After this we can no longer abort!
+        new_node.setParent(new_node_parent)
 
         settings = Application.getInstance().getGlobalContainerStack()
         if not settings.getProperty("machine_center_is_zero", "value"):
             new_node.setPosition(Vector(-settings.getProperty("machine_width", "value") / 2, 0.0, settings.getProperty("machine_depth", "value") / 2))
 
-        if self._progress_message:
-            self._progress_message.setProgress(100)
-
+    def _abortProcessing(self, new_node):
         if self._progress_message:
             self._progress_message.hide()
-
-        # Clear the unparsed layers. This saves us a bunch of memory if the Job does not get destroyed.
-        self._layers = None
-
-        Logger.log("d", "Processing layers took %s seconds", time() - start_time)
+        if new_node.getParent() is not None:
+            # Partial layer data was already shown. It's outdated now.
+            new_node.setParent(None)
 
     def _onActiveViewChanged(self):
         if self.isRunning():
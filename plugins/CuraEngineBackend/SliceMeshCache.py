@@ -0,0 +1,104 @@
+#  Copyright (c) 2026 UltiMaker
+#  Cura is released under the terms of the LGPLv3 or higher.
+
+from typing import Dict, Iterable, NamedTuple, Optional, TYPE_CHECKING
+
+import numpy
+
+if TYPE_CHECKING:
+    from UM.Math.Matrix import Matrix
+    from UM.Mesh.MeshData import MeshData
+    from UM.Scene.SceneNode import SceneNode
+
+
+class _CacheEntry(NamedTuple):
+    build_plate_number: Optional[int]
+    mesh_data: "MeshData"
+    transformation: bytes
+    vertices: numpy.ndarray
+
+
+class SliceMeshCache:
+    """Keeps the vertices that were sent to the engine for every object, so they don't need to be computed again.
+
+    Most reslices are caused by a changed setting, while the objects stay where they are. The vertices of an object
+    are only computed again when its mesh data or its world transformation changed since the previous slice.
+
+    The objects of every build plate are kept, since the build plates are sliced one after the other.
+    """
+
+    def __init__(self) -> None:
+        self._entries = {}  # type: Dict[int, _CacheEntry]
+        self._hit_count = 0
+        self._miss_count = 0
+
+    def getVertices(self, node: "SceneNode") -> numpy.ndarray:
+        """Get the vertices of an object, transformed to the coordinates of the engine and flattened per face.
+
+        The returned array is shared with the cache, so it must not be changed.
+        """
+
+        mesh_data = node.getMeshData()
+        transformation = node.getWorldTransformation()
+        transformation_data = transformation.getData().tobytes()
+
+        build_plate_number = node.callDecoration("getBuildPlateNumber")
+
+        entry = self._entries.get(id(node))
+        if entry is not None and entry.mesh_data is mesh_data and entry.transformation == transformation_data:
+            self._hit_count += 1
+            if entry.build_plate_number != build_plate_number:  # Moved to another build plate.
+                self._entries[id(node)] = entry._replace(build_plate_number = build_plate_number)
+            return entry.vertices
+
+        self._miss_count += 1
+        vertices = self.transformVertices(mesh_data, transformation)
+        self._entries[id(node)] = _CacheEntry(build_plate_number, mesh_data, transformation_data, vertices)
+        return vertices
+
+    def removeUnusedEntries(self, build_plate_number: Optional[int], nodes: Iterable["SceneNode"]) -> None:
+        """Forget the vertices of the objects on a build plate, except the given ones, which were sliced last.
+
+        :param build_plate_number: The build plate that was sliced.
+        :param nodes: The objects that were sliced.
+        """
+
+        used_ids = {id(node) for node in nodes}
+        for node_id, entry in list(self._entries.items()):
+            if entry.build_plate_number == build_plate_number and node_id not in used_ids:
+                del self._entries[node_id]
+
+    def getHitCount(self) -> int:
+        return self._hit_count
+
+    def getMissCount(self) -> int:
+        return self._miss_count
+
+    def resetStatistics(self) -> None:
+        self._hit_count = 0
+        self._miss_count = 0
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.resetStatistics()
+
+    @staticmethod
+    def transformVertices(mesh_data: "MeshData", transformation: "Matrix") -> numpy.ndarray:
+        """Transform the vertices of a mesh to the coordinates of the engine, with one vertex per corner of each face."""
+
+        rot_scale = transformation.getTransposed().getData()[0:3, 0:3]
+        translate = transformation.getData()[:3, 3]
+
+        # This effectively performs a limited form of MeshData.getTransformed that ignores normals.
+        verts = mesh_data.getVertices()
+        verts = verts.dot(rot_scale)
+        verts += translate
+
+        # Convert from Y up axes to Z up axes. Equals a 90 degree rotation.
+        verts[:, [1, 2]] = verts[:, [2, 1]]
+        verts[:, 1] *= -1
+
+        indices = mesh_data.getIndices()
+        if indices is not None:
+            return numpy.take(verts, indices.flatten(), axis = 0)
+        return numpy.array(verts)
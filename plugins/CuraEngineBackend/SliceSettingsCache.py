@@ -0,0 +1,189 @@
+#  Copyright (c) 2026 UltiMaker
+#  Cura is released under the terms of the LGPLv3 or higher.
+
+import threading
+from typing import Any, Dict, Optional, Set, Tuple, TYPE_CHECKING
+
+from UM.Job import Job
+from UM.Settings.SettingRelation import RelationType
+
+if TYPE_CHECKING:
+    from UM.Settings.ContainerStack import ContainerStack
+    from UM.Settings.Interfaces import ContainerInterface
+    from cura.Settings.GlobalStack import GlobalStack
+
+
+class _StackEntry:
+    """The values of all settings of a stack, as they were last sent to the engine."""
+
+    def __init__(self, stack: "ContainerStack") -> None:
+        self.stack = stack
+        self.values = None  # type: Optional[Dict[str, Any]]
+        self.encoded_values = {}  # type: Dict[str, bytes]
+        self.dirty_value_keys = set()  # type: Set[str]
+        self.limit_to_extruder = None  # type: Optional[Dict[str, int]]
+        self.dirty_limit_to_extruder_keys = set()  # type: Set[str]
+
+
+class SliceSettingsCache:
+    """Keeps the setting values of the global stack and the extruder stacks between slices.
+
+    Evaluating every setting of every stack takes a while, but most slices follow a change of only a few settings.
+    When a setting changes, only that setting and the settings that depend on it are evaluated again in the next slice.
+    When the containers of a stack change, for instance because another profile is selected, or when the extruders
+    change, all settings are evaluated again.
+
+    The values are read from the thread of the slice job, while the stacks notify their changes on the main thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._global_stack = None  # type: Optional[GlobalStack]
+        self._entries = {}  # type: Dict[str, _StackEntry]
+        self._dependent_keys = {}  # type: Dict[str, Set[str]]  # For each setting, the settings whose value depends on it, including itself.
+        self._settable_per_extruder = {}  # type: Dict[Tuple[str, str], Dict[str, bool]]
+
+    def setGlobalStack(self, global_stack: Optional["GlobalStack"]) -> None:
+        """Follow the changes of the settings of another printer."""
+
+        if self._global_stack is not None:
+            self._global_stack.propertyChanged.disconnect(self._onPropertyChanged)
+            self._global_stack.containersChanged.disconnect(self._onContainersChanged)
+            for extruder in self._global_stack.extruderList:
+                extruder.propertyChanged.disconnect(self._onPropertyChanged)
+                extruder.containersChanged.disconnect(self._onContainersChanged)
+
+        self._global_stack = global_stack
+        with self._lock:
+            self._entries.clear()
+            self._dependent_keys.clear()
+            self._settable_per_extruder.clear()
+
+        if self._global_stack is not None:
+            self._global_stack.propertyChanged.connect(self._onPropertyChanged)
+            self._global_stack.containersChanged.connect(self._onContainersChanged)
+            for extruder in self._global_stack.extruderList:
+                extruder.propertyChanged.connect(self._onPropertyChanged)
+                extruder.containersChanged.connect(self._onContainersChanged)
+
+    def invalidate(self) -> None:
+        """Evaluate all settings of all stacks again in the next slice."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def getValues(self, stack: "ContainerStack") -> Dict[str, Any]:
+        """Get the values of all settings in a stack, evaluating only those that changed since the last time.
+
+        :return: A new dictionary, which the caller may change.
+        """
+
+        with self._lock:
+            entry = self._getEntry(stack)
+            values = entry.values
+            dirty_keys = entry.dirty_value_keys
+            entry.dirty_value_keys = set()
+
+        if values is None:
+            values = {}
+            dirty_keys = stack.getAllKeys()
+        for key in dirty_keys:
+            values[key] = stack.getProperty(key, "value")
+            Job.yieldThread()
+
+        with self._lock:
+            if self._entries.get(stack.getId()) is entry:  # Not invalidated in the meanwhile.
+                entry.values = values
+                for key in dirty_keys:
+                    entry.encoded_values.pop(key, None)
+        return values.copy()
+
+    def encodeValue(self, stack: "ContainerStack", key: str, value: Any) -> bytes:
+        """Encode the value of a setting for the engine, reusing the encoding of the last value if it didn't change."""
+
+        with self._lock:
+            entry = self._entries.get(stack.getId())
+            if entry is None or entry.values is None or key not in entry.values or entry.values[key] is not value:
+                return str(value).encode("utf-8")
+            encoded_value = entry.encoded_values.get(key)
+            if encoded_value is None:
+                encoded_value = str(value).encode("utf-8")
+                entry.encoded_values[key] = encoded_value
+            return encoded_value
+
+    def getLimitToExtruder(self, stack: "ContainerStack") -> Dict[str, int]:
+        """Get the extruder that each setting of a stack is limited to, or -1 if it isn't limited to an extruder."""
+
+        with self._lock:
+            entry = self._getEntry(stack)
+            limit_to_extruder = entry.limit_to_extruder
+            dirty_keys = entry.dirty_limit_to_extruder_keys
+            entry.dirty_limit_to_extruder_keys = set()
+
+        if limit_to_extruder is None:
+            limit_to_extruder = {}
+            dirty_keys = stack.getAllKeys()
+        for key in dirty_keys:
+            limit_to_extruder[key] = int(round(float(stack.getProperty(key, "limit_to_extruder"))))
+            Job.yieldThread()
+
+        with self._lock:
+            if self._entries.get(stack.getId()) is entry:
+                entry.limit_to_extruder = limit_to_extruder
+        return limit_to_extruder.copy()
+
+    def isSettablePerExtruder(self, global_definition: "ContainerInterface", own_definition: "ContainerInterface", key: str) -> bool:
+        """Whether a setting may be sent per extruder, according to the definitions of an extruder.
+
+        This can only be set in definition files, so it never changes.
+        """
+
+        with self._lock:
+            settable_per_extruder = self._settable_per_extruder.setdefault((global_definition.getId(), own_definition.getId()), {})
+        result = settable_per_extruder.get(key)
+        if result is None:
+            result = bool(global_definition.getProperty(key, "settable_per_extruder") or own_definition.getProperty(key, "settable_per_extruder"))
+            settable_per_extruder[key] = result
+        return result
+
+    def _getEntry(self, stack: "ContainerStack") -> _StackEntry:
+        entry = self._entries.get(stack.getId())
+        if entry is None or entry.stack is not stack:
+            entry = _StackEntry(stack)
+            self._entries[stack.getId()] = entry
+        return entry
+
+    def _onPropertyChanged(self, key: str, property_name: str) -> None:
+        if property_name not in ("value", "limit_to_extruder"):
+            return
+        if not self._entries:
+            return
+        dependent_keys = self._getDependentKeys(key)
+        with self._lock:
+            # Settings can depend on the values of other stacks, so the settings change in every stack.
+            for entry in self._entries.values():
+                entry.dirty_value_keys |= dependent_keys
+                entry.dirty_limit_to_extruder_keys |= dependent_keys
+
+    def _onContainersChanged(self, container: "ContainerInterface") -> None:
+        self.invalidate()
+
+    def _getDependentKeys(self, key: str) -> Set[str]:
+        dependent_keys = self._dependent_keys.get(key)
+        if dependent_keys is not None:
+            return dependent_keys
+
+        dependent_keys = {key}
+        definition = self._global_stack.getSettingDefinition(key) if self._global_stack is not None else None
+        if definition is not None:
+            relations = list(definition.relations)
+            while relations:
+                relation = relations.pop()
+                if relation.type == RelationType.RequiresTarget or relation.role not in ("value", "limit_to_extruder"):
+                    continue
+                if relation.target.key in dependent_keys:
+                    continue
+                dependent_keys.add(relation.target.key)
+                relations.extend(relation.target.relations)
+        self._dependent_keys[key] = dependent_keys
+        return dependent_keys
@@ -4,7 +4,6 @@ import uuid
 
 import os
 
-import numpy
 from string import Formatter
 from enum import IntEnum
 import time
@@ -34,6 +33,9 @@ from cura.OneAtATimeIterator import OneAtATimeIterator
 from cura.Settings.ExtruderManager import ExtruderManager
 from cura.CuraVersion import CuraVersion
 
+from .SliceMeshCache import SliceMeshCache
+from .SliceSettingsCache import SliceSettingsCache
+
 
 NON_PRINTING_MESH_SETTINGS = ["anti_overhang_mesh", "infill_mesh", "cutting_mesh"]
 
@@ -235,6 +237,8 @@ class StartSliceJob(Job):
         self._is_cancelled: bool = False
         self._build_plate_number: Optional[int] = None
         self._associated_disabled_extruders: Optional[str] = None
+        self._mesh_cache: Optional[SliceMeshCache] = None
+        self._settings_cache: Optional[SliceSettingsCache] = None
 
         # cache for all setting values from all stacks (global & extruder) for the current machine
         self._all_extruders_settings: Optional[Dict[str, Any]] = None
@@ -248,6 +252,16 @@ class StartSliceJob(Job):
     def setBuildPlate(self, build_plate_number: int) -> None:
         self._build_plate_number = build_plate_number
 
+    def setMeshCache(self, mesh_cache: SliceMeshCache) -> None:
+        """Reuse the vertices of objects that didn't change since a previous slice that used the same cache."""
+
+        self._mesh_cache = mesh_cache
+
+    def setSettingsCache(self, settings_cache: SliceSettingsCache) -> None:
+        """Only evaluate the settings that changed since a previous slice that used the same cache."""
+
+        self._settings_cache = settings_cache
+
     def _checkStackForErrors(self, stack: ContainerStack) -> bool:
         """Check if a stack has any errors."""
 
@@ -306,8 +320,7 @@ class StartSliceJob(Job):
             return
 
         # Wait for error checker to be done.
-        while CuraApplication.getInstance().getMachineErrorChecker().needToWaitForResult:
-            time.sleep(0.1)
+        CuraApplication.getInstance().getMachineErrorChecker().waitForResult()
 
         if CuraApplication.getInstance().getMachineErrorChecker().hasError:
             self.setResult(StartJobResult.SettingError)
@@ -476,6 +489,9 @@ class StartSliceJob(Job):
                 plugin_message.plugin_name = plugin.getPluginId()
                 plugin_message.plugin_version = plugin.getVersion()
 
+        time_start_meshes = time.time()
+        if self._mesh_cache is not None:
+            self._mesh_cache.resetStatistics()
         for group in filtered_object_groups:
             group_message = self._slice_message.addRepeatedMessage("object_lists")
             parent = group[0].getParent()
@@ -486,33 +502,25 @@ class StartSliceJob(Job):
                 mesh_data = object.getMeshData()
                 if mesh_data is None:
                     continue
-                rot_scale = object.getWorldTransformation().getTransposed().getData()[0:3, 0:3]
-                translate = object.getWorldTransformation().getData()[:3, 3]
-
-                # This effectively performs a limited form of MeshData.getTransformed that ignores normals.
-                verts = mesh_data.getVertices()
-                verts = verts.dot(rot_scale)
-                verts += translate
-
-                # Convert from Y up axes to Z up axes. Equals a 90 degree rotation.
-                verts[:, [1, 2]] = verts[:, [2, 1]]
-                verts[:, 1] *= -1
-
                 obj = group_message.addRepeatedMessage("objects")
                 obj.id = id(object)
                 obj.name = object.getName()
-                indices = mesh_data.getIndices()
-                if indices is not None:
-                    flat_verts = numpy.take(verts, indices.flatten(), axis=0)
+                if self._mesh_cache is not None:
+                    obj.vertices = self._mesh_cache.getVertices(object)
                 else:
-                    flat_verts = numpy.array(verts)
-
-                obj.vertices = flat_verts
+                    obj.vertices = SliceMeshCache.transformVertices(mesh_data, object.getWorldTransformation())
 
                 self._handlePerObjectSettings(cast(CuraSceneNode, object), obj)
 
                 Job.yieldThread()
 
+        if self._mesh_cache is not None:
+            self._mesh_cache.removeUnusedEntries(self._build_plate_number, (node for group in filtered_object_groups for node in group))
+            Logger.log("d", "Adding the meshes to the slice message took %s seconds, %s of %s meshes were reused",
+                       time.time() - time_start_meshes, self._mesh_cache.getHitCount(), self._mesh_cache.getHitCount() + self._mesh_cache.getMissCount())
+        else:
+            Logger.log("d", "Adding the meshes to the slice message took %s seconds", time.time() - time_start_meshes)
+
         self.setResult(StartJobResult.Finished)
 
     def cancel(self) -> None:
@@ -533,10 +541,13 @@ class StartSliceJob(Job):
         :return: A dictionary of replacement tokens to the values they should be replaced with.
         """
 
-        result = {}
-        for key in stack.getAllKeys():
-            result[key] = stack.getProperty(key, "value")
-            Job.yieldThread()
+        if self._settings_cache is not None:
+            result = self._settings_cache.getValues(stack)
+        else:
+            result = {}
+            for key in stack.getAllKeys():
+                result[key] = stack.getProperty(key, "value")
+                Job.yieldThread()
 
         # Material identification in addition to non-human-readable GUID
         result["material_id"] = stack.material.getMetaDataEntry("base_file", "")
@@ -624,13 +635,17 @@ class StartSliceJob(Job):
         for key, value in settings.items():
             # Do not send settings that are not settable_per_extruder.
             # Since these can only be set in definition files, we only have to ask there.
-            if not global_definition.getProperty(key, "settable_per_extruder") and \
+            if self._settings_cache is not None:
+                if not self._settings_cache.isSettablePerExtruder(global_definition, own_definition, key):
+                    continue
+            elif not global_definition.getProperty(key, "settable_per_extruder") and \
                     not own_definition.getProperty(key, "settable_per_extruder"):
                     continue
             setting = message.getMessage("settings").addRepeatedMessage("settings")
             setting.name = key
-            setting.value = str(value).encode("utf-8")
-            Job.yieldThread()
+            setting.value = self._encodeSettingValue(stack, key, value)
+            if self._settings_cache is None:
+                Job.yieldThread()
 
     def _buildGlobalSettingsMessage(self, stack: ContainerStack) -> None:
         """Sends all global settings to the engine.
@@ -676,8 +691,9 @@ class StartSliceJob(Job):
         for key, value in settings.items():
             setting_message = self._slice_message.getMessage("global_settings").addRepeatedMessage("settings")
             setting_message.name = key
-            setting_message.value = str(value).encode("utf-8")
-            Job.yieldThread()
+            setting_message.value = self._encodeSettingValue(stack, key, value)
+            if self._settings_cache is None:
+                Job.yieldThread()
 
     def _buildGlobalInheritsStackMessage(self, stack: ContainerStack) -> None:
         """Sends for some settings which extruder they should fallback to if not set.
@@ -689,6 +705,14 @@ class StartSliceJob(Job):
             limit_to_extruder property.
         """
 
+        if self._settings_cache is not None:
+            for key, extruder_position in self._settings_cache.getLimitToExtruder(stack).items():
+                if extruder_position >= 0:  # Set to a specific extruder.
+                    setting_extruder = self._slice_message.addRepeatedMessage("limit_to_extruder")
+                    setting_extruder.name = key
+                    setting_extruder.extruder = extruder_position
+            return
+
         for key in stack.getAllKeys():
             extruder_position = int(round(float(stack.getProperty(key, "limit_to_extruder"))))
             if extruder_position >= 0:  # Set to a specific extruder.
@@ -697,6 +721,13 @@ class StartSliceJob(Job):
                 setting_extruder.extruder = extruder_position
             Job.yieldThread()
 
+    def _encodeSettingValue(self, stack: ContainerStack, key: str, value: Any) -> bytes:
+        """Encode the value of a setting to send it to the engine."""
+
+        if self._settings_cache is not None:
+            return self._settings_cache.encodeValue(stack, key, value)
+        return str(value).encode("utf-8")
+
     def _handlePerObjectSettings(self, node: CuraSceneNode, message: Arcus.PythonMessage):
         """Check if a node has per object settings and ensure that they are set correctly in the message
 
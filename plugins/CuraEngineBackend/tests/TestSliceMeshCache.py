@@ -0,0 +1,96 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+import sys
+
+import numpy
+
+from UM.Math.Matrix import Matrix
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshData import MeshData
+
+from cura.Scene.BuildPlateDecorator import BuildPlateDecorator
+from cura.Scene.CuraSceneNode import CuraSceneNode
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from SliceMeshCache import SliceMeshCache
+
+
+def createNode(mesh_data: MeshData, x: float = 0, build_plate_number: int = 0) -> CuraSceneNode:
+    node = CuraSceneNode(no_setting_override = True)
+    node.setMeshData(mesh_data)
+    node.setPosition(Vector(x, 0, 0))
+    node.addDecorator(BuildPlateDecorator(build_plate_number))
+    return node
+
+
+def createMeshData() -> MeshData:
+    return MeshData(vertices = numpy.array([[0, 0, 0], [1, 0, 0], [0, 2, 0]], dtype = numpy.float32),
+                    indices = numpy.array([[0, 1, 2], [2, 1, 0]], dtype = numpy.int32))
+
+
+def test_transformVertices():
+    transformation = Matrix()
+    transformation.setByTranslation(Vector(10, 20, 30))
+    vertices = SliceMeshCache.transformVertices(createMeshData(), transformation)
+    # Y and Z are swapped and Y is mirrored, to convert from Y up to Z up.
+    assert vertices.tolist() == [[10, -30, 20], [11, -30, 20], [10, -30, 22], [10, -30, 22], [11, -30, 20], [10, -30, 20]]
+
+
+def test_reuseUnchangedVertices():
+    cache = SliceMeshCache()
+    node = createNode(createMeshData(), x = 10)
+
+    vertices = cache.getVertices(node)
+    assert cache.getVertices(node) is vertices
+    assert cache.getHitCount() == 1
+    assert cache.getMissCount() == 1
+
+    node.setPosition(Vector(20, 0, 0))  # Moved.
+    assert cache.getVertices(node)[0].tolist() == [20, 0, 0]
+    node.setMeshData(createMeshData())  # Changed mesh.
+    assert cache.getVertices(node) is not vertices
+    assert cache.getMissCount() == 3
+
+
+def test_removeUnusedEntries():
+    cache = SliceMeshCache()
+    node = createNode(createMeshData())
+    other_node = createNode(createMeshData())
+    cache.getVertices(node)
+    cache.getVertices(other_node)
+
+    cache.removeUnusedEntries(0, [other_node])
+    cache.getVertices(node)
+    cache.getVertices(other_node)
+    assert cache.getHitCount() == 1
+    assert cache.getMissCount() == 3
+
+
+def test_keepEntriesOfOtherBuildPlates():
+    cache = SliceMeshCache()
+    node = createNode(createMeshData(), build_plate_number = 0)
+    other_node = createNode(createMeshData(), build_plate_number = 1)
+    cache.getVertices(node)
+    cache.getVertices(other_node)
+
+    cache.removeUnusedEntries(1, [other_node])  # Slicing the second build plate.
+    cache.removeUnusedEntries(0, [node])  # Slicing the first build plate.
+    cache.getVertices(node)
+    cache.getVertices(other_node)
+    assert cache.getHitCount() == 2
+    assert cache.getMissCount() == 2
+
+
+def test_removeEntriesMovedToOtherBuildPlate():
+    cache = SliceMeshCache()
+    node = createNode(createMeshData(), build_plate_number = 0)
+    cache.getVertices(node)
+
+    node.callDecoration("setBuildPlateNumber", 1)
+    cache.getVertices(node)
+    cache.removeUnusedEntries(0, [])  # It isn't on this build plate anymore.
+    cache.getVertices(node)
+    assert cache.getHitCount() == 2
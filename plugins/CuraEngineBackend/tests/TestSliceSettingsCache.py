@@ -0,0 +1,96 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from UM.Settings.SettingRelation import RelationType
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from SliceSettingsCache import SliceSettingsCache
+
+
+class MockStack:
+    def __init__(self, stack_id: str, values: dict) -> None:
+        self.values = values
+        self.evaluated_keys = []
+        self.propertyChanged = MagicMock()
+        self.containersChanged = MagicMock()
+        self.extruderList = []
+        self._id = stack_id
+
+    def getId(self) -> str:
+        return self._id
+
+    def getAllKeys(self) -> set:
+        return set(self.values.keys())
+
+    def getProperty(self, key: str, property_name: str):
+        self.evaluated_keys.append(key)
+        if property_name == "limit_to_extruder":
+            return "-1" if key != "support_enable" else "1"
+        return self.values[key]
+
+    def getSettingDefinition(self, key: str):
+        # layer_height_0 depends on layer_height.
+        definition = MagicMock(relations = [])
+        if key == "layer_height":
+            target = MagicMock(key = "layer_height_0", relations = [])
+            definition.relations = [MagicMock(type = RelationType.RequiredByTarget, role = "value", target = target)]
+        return definition
+
+
+@pytest.fixture
+def global_stack():
+    return MockStack("global", {"layer_height": 0.1, "layer_height_0": 0.2, "infill_sparse_density": 20, "support_enable": False})
+
+
+@pytest.fixture
+def cache(global_stack):
+    cache = SliceSettingsCache()
+    cache.setGlobalStack(global_stack)
+    return cache
+
+
+def test_getValues(cache, global_stack):
+    assert cache.getValues(global_stack) == global_stack.values
+    global_stack.evaluated_keys.clear()
+    assert cache.getValues(global_stack) == global_stack.values
+    assert global_stack.evaluated_keys == []  # Nothing changed, so nothing is evaluated again.
+
+
+def test_reevaluateChangedSettings(cache, global_stack):
+    cache.getValues(global_stack)
+    global_stack.evaluated_keys.clear()
+    global_stack.values["layer_height"] = 0.2
+    global_stack.values["layer_height_0"] = 0.3
+    cache._onPropertyChanged("layer_height", "value")
+    cache._onPropertyChanged("layer_height", "validationState")  # Doesn't change the value.
+
+    assert cache.getValues(global_stack)["layer_height_0"] == 0.3
+    assert sorted(global_stack.evaluated_keys) == ["layer_height", "layer_height_0"]
+
+
+def test_invalidate(cache, global_stack):
+    cache.getValues(global_stack)
+    global_stack.evaluated_keys.clear()
+    cache._onContainersChanged(MagicMock())
+    cache.getValues(global_stack)
+    assert sorted(global_stack.evaluated_keys) == sorted(global_stack.values.keys())
+
+
+def test_encodeValue(cache, global_stack):
+    values = cache.getValues(global_stack)
+    encoded = cache.encodeValue(global_stack, "infill_sparse_density", values["infill_sparse_density"])
+    assert encoded == b"20"
+    assert cache.encodeValue(global_stack, "infill_sparse_density", values["infill_sparse_density"]) is encoded
+    assert cache.encodeValue(global_stack, "infill_sparse_density", 30) == b"30"  # Changed by the slice job.
+    assert cache.encodeValue(global_stack, "material_guid", "abc") == b"abc"  # Not a setting.
+
+
+def test_getLimitToExtruder(cache, global_stack):
+    assert cache.getLimitToExtruder(global_stack) == {"layer_height": -1, "layer_height_0": -1, "infill_sparse_density": -1, "support_enable": 1}
@@ -2,7 +2,7 @@
 # Cura is released under the terms of the LGPLv3 or higher.
 
 import gzip
-from io import StringIO, BufferedIOBase #To write the g-code to a temporary buffer, and for typing.
+from io import BufferedIOBase, BytesIO
 from typing import cast, List
 
 from UM.Logger import Logger
@@ -43,14 +43,15 @@ class GCodeGzWriter(MeshWriter):
             self.setInformation(catalog.i18nc("@error:not supported", "GCodeGzWriter does not support text mode."))
             return False
 
-        #Get the g-code from the g-code writer.
-        gcode_textio = StringIO() #We have to convert the g-code into bytes.
+        #The g-code writer writes the g-code chunk by chunk, and each chunk is compressed right away.
+        #That way the g-code is never completely in memory uncompressed.
+        #It's compressed into a buffer first, so that nothing is written to the stream if writing the g-code fails.
         gcode_writer = cast(MeshWriter, PluginRegistry.getInstance().getPluginObject("GCodeWriter"))
-        success = gcode_writer.write(gcode_textio, None)
+        buffer = BytesIO()
+        with gzip.GzipFile(filename = "", mode = "wb", fileobj = buffer) as gzip_stream:
+            success = gcode_writer.write(gzip_stream, None, MeshWriter.OutputMode.BinaryMode)
         if not success: #Writing the g-code failed. Then I can also not write the gzipped g-code.
             self.setInformation(gcode_writer.getInformation())
             return False
-
-        result = gzip.compress(gcode_textio.getvalue().encode("utf-8"))
-        stream.write(result)
+        stream.write(buffer.getbuffer())
         return True
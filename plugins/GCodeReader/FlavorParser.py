@@ -1,9 +1,13 @@
 # Copyright (c) 2022 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
 
+import concurrent.futures
+import copy
+import io
 import math
+import os
 import re
-from typing import Dict, List, NamedTuple, Optional, Union, Set
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, TextIO, Tuple, TYPE_CHECKING, Union, Set
 
 import numpy
 
@@ -21,6 +25,11 @@ from cura.LayerPolygon import LayerPolygon
 from cura.Scene.CuraSceneNode import CuraSceneNode
 from cura.Scene.GCodeListDecorator import GCodeListDecorator
 from cura.Settings.ExtruderManager import ExtruderManager
+from cura.Utils.WorkerProcesses import createWorkerProcessPool
+
+if TYPE_CHECKING:
+    from cura.Settings.GlobalStack import GlobalStack
+    from .GCodeLayerIndex import GCodeLayerIndex
 
 catalog = i18nCatalog("cura")
 
@@ -28,14 +37,63 @@ PositionOptional = NamedTuple("PositionOptional", [("x", Optional[float]), ("y",
 Position = NamedTuple("Position", [("x", float), ("y", float), ("z", float), ("f", float), ("e", List[float])])
 
 
+class PathBuffer:
+    """Growable buffer with the points of a path, as rows of x, y, z, feedrate, extrusion and line type."""
+
+    _initial_capacity = 1024
+
+    def __init__(self) -> None:
+        self._data = numpy.empty((self._initial_capacity, 6), numpy.float64)
+        self._count = 0
+
+    def append(self, point: Sequence[float]) -> None:
+        if self._count == self._data.shape[0]:
+            data = numpy.empty((self._count * 2, 6), numpy.float64)
+            data[:self._count] = self._data
+            self._data = data
+        self._data[self._count] = point
+        self._count += 1
+
+    def clear(self) -> None:
+        self._count = 0
+
+    def getData(self) -> numpy.ndarray:
+        """Get a view on the points that are in the buffer. It is only valid until the buffer is changed."""
+
+        return self._data[:self._count]
+
+    def __len__(self) -> int:
+        return self._count
+
+
 class FlavorParser:
     """This parser is intended to interpret the common firmware codes among all the different flavors"""
 
     MAX_EXTRUDER_COUNT = 16
     DEFAULT_FILAMENT_DIAMETER = 2.85
 
+    # The end of a value in a line of g-code.
+    _value_end_pattern = re.compile("[;\\s]")
+
+    # The number of lines to parse between updates of the progress.
+    _progress_line_interval = 10000
+
+    # Files are only parsed in parallel from this size on, since starting the worker processes takes a while.
+    _parallel_parsing_minimum_file_size = 32 * 1024 * 1024
+    # The smallest number of layers in a shard, when a file is parsed in parallel.
+    _minimum_shard_layer_count = 20
+    # The number of layers before a shard that are parsed to get the machine state at the start of the shard.
+    _warm_up_layer_count = 2
+    # How often to check whether parsing was cancelled, while waiting for shards, in seconds.
+    _cancel_check_interval = 0.1
+    # Numbers in machine states that differ less than this are the same. G-code has no more decimals than this.
+    _machine_state_tolerance = 1e-4
+
     def __init__(self) -> None:
-        CuraApplication.getInstance().hideMessageSignal.connect(self._onHideMessage)
+        application = CuraApplication.getInstance()
+        if application is not None:  # Not in the worker processes that parse shards of a file.
+            application.hideMessageSignal.connect(self._onHideMessage)
+            application.getPreferences().addPreference("gcodereader/show_caution", True)
         self._cancelled = False
         self._message = None  # type: Optional[Message]
         self._layer_number = 0
@@ -51,8 +109,10 @@ class FlavorParser:
         self._current_layer_thickness = 0.2  # default
         self._current_filament_diameter = 2.85       # default
         self._previous_extrusion_value = 0.0  # keep track of the filament retractions
-
-        CuraApplication.getInstance().getPreferences().addPreference("gcodereader/show_caution", True)
+        self._global_stack = None  # type: Optional[GlobalStack]
+        self._filament_diameters = []  # type: List[float]  # The filament diameter of each extruder of the printer.
+        # When not None, the lines of the paths are stored here as arrays instead of being turned into polygons.
+        self._polygon_data = None  # type: Optional[List[Tuple[int, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]]]
 
     def _clearValues(self) -> None:
         self._extruder_number = 0
@@ -60,7 +120,7 @@ class FlavorParser:
         self._layer_type = LayerPolygon.Inset0Type
         self._layer_number = 0
         self._previous_z = 0 # type: float
-        self._layer_data_builder = LayerDataBuilder()
+        self._layer_data_builder = LayerDataBuilder(LayerDataBuilder.useCompactLayerData())
         self._is_absolute_positioning = True    # It can be absolute (G90) or relative (G91)
         self._is_absolute_extrusion = True  # It can become absolute (M82, default) or relative (M83)
 
@@ -70,8 +130,7 @@ class FlavorParser:
         if n < 0:
             return None
         n += len(code)
-        pattern = re.compile("[;\\s]")
-        match = pattern.search(line, n)
+        match = FlavorParser._value_end_pattern.search(line, n)
         m = match.start() if match is not None else -1
         try:
             if m < 0:
@@ -80,6 +139,15 @@ class FlavorParser:
         except:
             return None
 
+    @staticmethod
+    def _getCommandNumber(line: str) -> Optional[int]:
+        """Get the number of the command a line starts with, like 1 for "G1 X10"."""
+
+        try:
+            return int(line.split(None, 1)[0].split(";", 1)[0][1:])
+        except ValueError:
+            return None
+
     def _getInt(self, line: str, code: str) -> Optional[int]:
         value = self._getValue(line, code)
         try:
@@ -98,48 +166,36 @@ class FlavorParser:
         if message == self._message:
             self._cancelled = True
 
-    def _createPolygon(self, layer_thickness: float, path: List[List[Union[float, int]]], extruder_offsets: List[float]) -> bool:
-        countvalid = 0
-        for point in path:
-            if point[5] > 0:
-                countvalid += 1
-                if countvalid >= 2:
-                    # we know what to do now, no need to count further
-                    continue
-        if countvalid < 2:
+    def _createPolygon(self, layer_thickness: float, path: PathBuffer, extruder_offsets: List[float]) -> bool:
+        path_data = path.getData()
+        if numpy.count_nonzero(path_data[:, 5] > 0) < 2:
             return False
         try:
             self._layer_data_builder.addLayer(self._layer_number)
-            self._layer_data_builder.setLayerHeight(self._layer_number, path[0][2])
+            self._layer_data_builder.setLayerHeight(self._layer_number, path_data[0, 2])
             self._layer_data_builder.setLayerThickness(self._layer_number, layer_thickness)
             this_layer = self._layer_data_builder.getLayer(self._layer_number)
             if not this_layer:
                 return False
         except ValueError:
             return False
-        count = len(path)
-        line_types = numpy.empty((count - 1, 1), numpy.int32)
-        line_widths = numpy.empty((count - 1, 1), numpy.float32)
-        line_thicknesses = numpy.empty((count - 1, 1), numpy.float32)
-        line_feedrates = numpy.empty((count - 1, 1), numpy.float32)
-        line_widths[:, 0] = 0.35  # Just a guess
-        line_thicknesses[:, 0] = layer_thickness
+        count = len(path_data)
         points = numpy.empty((count, 3), numpy.float32)
-        extrusion_values = numpy.empty((count, 1), numpy.float32)
-        i = 0
-        for point in path:
-            points[i, :] = [point[0] + extruder_offsets[0], point[2], -point[1] - extruder_offsets[1]]
-            extrusion_values[i] = point[4]
-            if i > 0:
-                line_feedrates[i - 1] = point[3]
-                line_types[i - 1] = point[5]
-                if point[5] in [LayerPolygon.MoveCombingType, LayerPolygon.MoveRetractionType]:
-                    line_widths[i - 1] = 0.1
-                    line_thicknesses[i - 1] = 0.0 # Travels are set as zero thickness lines
-                else:
-                    line_widths[i - 1] = self._calculateLineWidth(points[i], points[i-1], extrusion_values[i], extrusion_values[i-1], layer_thickness)
-            i += 1
-
+        points[:, 0] = path_data[:, 0] + extruder_offsets[0]
+        points[:, 1] = path_data[:, 2]
+        points[:, 2] = -path_data[:, 1] - extruder_offsets[1]
+        extrusion_values = path_data[:, 4].astype(numpy.float32)
+        line_types = path_data[1:, 5].astype(numpy.int32).reshape((-1, 1))
+        line_feedrates = path_data[1:, 3].astype(numpy.float32).reshape((-1, 1))
+
+        # Travels are set as thin, zero thickness lines.
+        is_travel = (line_types == LayerPolygon.MoveCombingType) | (line_types == LayerPolygon.MoveRetractionType)
+        line_widths = numpy.where(is_travel, numpy.float32(0.1), self._calculateLineWidths(points, extrusion_values, layer_thickness).reshape((-1, 1))).astype(numpy.float32)
+        line_thicknesses = numpy.where(is_travel, numpy.float32(0.0), numpy.float32(layer_thickness))
+
+        if self._polygon_data is not None:
+            self._polygon_data.append((self._extruder_number, line_types, points, line_widths, line_thicknesses, line_feedrates))
+            return True
         this_poly = LayerPolygon(self._extruder_number, line_types, points, line_widths, line_thicknesses, line_feedrates)
         this_poly.buildCache()
 
@@ -151,32 +207,32 @@ class FlavorParser:
         self._layer_data_builder.setLayerHeight(layer_number, 0)
         self._layer_data_builder.setLayerThickness(layer_number, 0)
 
-    def _calculateLineWidth(self, current_point: Position, previous_point: Position, current_extrusion: float, previous_extrusion: float, layer_thickness: float) -> float:
+    def _calculateLineWidths(self, points: numpy.ndarray, extrusion_values: numpy.ndarray, layer_thickness: float) -> numpy.ndarray:
+        """Estimate the width of each line from the amount of filament extruded over its length."""
+
         # Area of the filament
         Af = (self._current_filament_diameter / 2) ** 2 * numpy.pi
         # Length of the extruded filament
-        de = current_extrusion - previous_extrusion
+        de = extrusion_values[1:] - extrusion_values[:-1]
         # Volume of the extruded filament
         dVe = de * Af
         # Length of the printed line
-        dX = numpy.sqrt((current_point[0] - previous_point[0])**2 + (current_point[2] - previous_point[2])**2)
-        # When the extruder recovers from a retraction, we get zero distance
-        if dX == 0:
-            return 0.1
+        dX = numpy.sqrt((points[1:, 0] - points[:-1, 0]) ** 2 + (points[1:, 2] - points[:-1, 2]) ** 2)
         # Area of the printed line. This area is a rectangle
-        Ae = dVe / dX
-        # This area is a rectangle with area equal to layer_thickness * layer_width
-        line_width = Ae / layer_thickness
+        with numpy.errstate(divide = "ignore", invalid = "ignore"):
+            Ae = dVe / dX
+            # This area is a rectangle with area equal to layer_thickness * layer_width
+            line_widths = Ae / layer_thickness
 
         # A threshold is set to avoid weird paths in the GCode
-        if line_width > 1.2:
-            return 0.35
+        line_widths[line_widths > 1.2] = 0.35
         # Prevent showing infinitely wide lines
-        if line_width < 0.0:
-            return 0.0
-        return line_width
+        line_widths[line_widths < 0.0] = 0.0
+        # When the extruder recovers from a retraction, we get zero distance
+        line_widths[dX == 0] = 0.1
+        return line_widths
 
-    def _gCode0(self, position: Position, params: PositionOptional, path: List[List[Union[float, int]]]) -> Position:
+    def _gCode0(self, position: Position, params: PositionOptional, path: PathBuffer) -> Position:
         x, y, z, f, e = position
 
         if self._is_absolute_positioning:
@@ -214,7 +270,7 @@ class FlavorParser:
     # G0 and G1 should be handled exactly the same.
     _gCode1 = _gCode0
 
-    def _gCode28(self, position: Position, params: PositionOptional, path: List[List[Union[float, int]]]) -> Position:
+    def _gCode28(self, position: Position, params: PositionOptional, path: PathBuffer) -> Position:
         """Home the head."""
 
         return self._position(
@@ -224,21 +280,21 @@ class FlavorParser:
             position.f,
             position.e)
 
-    def _gCode90(self, position: Position, params: PositionOptional, path: List[List[Union[float, int]]]) -> Position:
+    def _gCode90(self, position: Position, params: PositionOptional, path: PathBuffer) -> Position:
         """Set the absolute positioning"""
 
         self._is_absolute_positioning = True
         self._is_absolute_extrusion = True
         return position
 
-    def _gCode91(self, position: Position, params: PositionOptional, path: List[List[Union[float, int]]]) -> Position:
+    def _gCode91(self, position: Position, params: PositionOptional, path: PathBuffer) -> Position:
         """Set the relative positioning"""
 
         self._is_absolute_positioning = False
         self._is_absolute_extrusion = False
         return position
 
-    def _gCode92(self, position: Position, params: PositionOptional, path: List[List[Union[float, int]]]) -> Position:
+    def _gCode92(self, position: Position, params: PositionOptional, path: PathBuffer) -> Position:
         """Reset the current position to the values specified.
 
         For example: G92 X10 will set the X to 10 without any physical motion.
@@ -258,52 +314,58 @@ class FlavorParser:
             params.f if params.f is not None else position.f,
             position.e)
 
-    def processGCode(self, G: int, line: str, position: Position, path: List[List[Union[float, int]]]) -> Position:
+    def processGCode(self, G: int, line: str, position: Position, path: PathBuffer) -> Position:
         func = getattr(self, "_gCode%s" % G, None)
-        line = line.split(";", 1)[0]  # Remove comments (if any)
-        if func is not None:
-            s = line.upper().split(" ")
-            x, y, z, f, e = None, None, None, None, None
-            for item in s[1:]:
-                if len(item) <= 1:
-                    continue
-                if item.startswith(";"):
-                    continue
-                try:
-                    if item[0] == "X":
-                        x = float(item[1:])
-                    elif item[0] == "Y":
-                        y = float(item[1:])
-                    elif item[0] == "Z":
-                        z = float(item[1:])
-                    elif item[0] == "F":
-                        f = float(item[1:]) / 60
-                    elif item[0] == "E":
-                        e = float(item[1:])
-                except ValueError:  # Improperly formatted g-code: Coordinates are not floats.
-                    continue  # Skip the command then.
-            params = PositionOptional(x, y, z, f, e)
-            return func(position, params, path)
-        return position
-
-    def processTCode(self, global_stack, T: int, line: str, position: Position, path: List[List[Union[float, int]]]) -> Position:
+        if func is None:
+            return position
+        values = {}  # type: Dict[str, float]
+        for item in line.split(";", 1)[0].upper().split()[1:]:  # Remove comments (if any)
+            if len(item) <= 1 or item[0] not in "XYZFE":
+                continue
+            try:
+                values[item[0]] = float(item[1:])
+            except ValueError:  # Improperly formatted g-code: Coordinates are not floats.
+                continue  # Skip the command then.
+        f = values.get("F")
+        params = PositionOptional(values.get("X"), values.get("Y"), values.get("Z"), f / 60 if f is not None else None, values.get("E"))
+        return func(position, params, path)
+
+    def processTCode(self, global_stack, T: int, line: str, position: Position, path: PathBuffer) -> Position:
         self._extruder_number = T
-        try:
-            self._current_filament_diameter = global_stack.extruderList[self._extruder_number].getProperty("material_diameter", "value")
-        except IndexError:
-            self._current_filament_diameter = self.DEFAULT_FILAMENT_DIAMETER
+        self._current_filament_diameter = self._getFilamentDiameter(self._extruder_number)
 
         if self._extruder_number + 1 > len(position.e):
             self._extrusion_length_offset.extend([0] * (self._extruder_number - len(position.e) + 1))
             position.e.extend([0] * (self._extruder_number - len(position.e) + 1))
         return position
 
-    def processMCode(self, M: int, line: str, position: Position, path: List[List[Union[float, int]]]) -> Position:
+    def processMCode(self, M: int, line: str, position: Position, path: PathBuffer) -> Position:
         pass
 
     _type_keyword = ";TYPE:"
     _layer_keyword = ";LAYER:"
 
+    # The line types of the feature types in the type comments.
+    _type_line_types = {
+        "WALL-INNER": LayerPolygon.InsetXType,
+        "WALL-OUTER": LayerPolygon.Inset0Type,
+        "SKIN": LayerPolygon.SkinType,
+        "SKIRT": LayerPolygon.SkirtType,
+        "SUPPORT": LayerPolygon.SupportType,
+        "FILL": LayerPolygon.InfillType,
+        "SUPPORT-INTERFACE": LayerPolygon.SupportInterfaceType,
+        "PRIME-TOWER": LayerPolygon.PrimeTowerType
+    }
+
+    @staticmethod
+    def _getFileSize(file: TextIO) -> int:
+        """Get the size of an opened file to show the progress with, or 0 if it is unknown."""
+
+        try:
+            return os.fstat(file.fileno()).st_size
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return 0
+
     def _extruderOffsets(self) -> Dict[int, List[float]]:
         """For showing correct x, y offsets for each extruder"""
 
@@ -314,48 +376,123 @@ class FlavorParser:
                 extruder.getProperty("machine_nozzle_offset_y", "value")]
         return result
 
-    #
-    # CURA-6643
-    # This function needs the filename so it can be set to the SceneNode. Otherwise, if you load a GCode file and press
-    # F5, that gcode SceneNode will be removed because it doesn't have a file to be reloaded from.
-    #
-    def processGCodeStream(self, stream: str, filename: str) -> Optional["CuraSceneNode"]:
-        Logger.log("d", "Preparing to load g-code")
+    # The attributes that make up the state of the machine at some point in the g-code.
+    _machine_state_attributes = ["_current_position", "_extruder_number", "_extrusion_length_offset", "_layer_type",
+                                 "_previous_z", "_current_layer_thickness", "_current_filament_diameter",
+                                 "_previous_extrusion_value", "_is_absolute_positioning", "_is_absolute_extrusion"]
+
+    def getMachineState(self) -> Dict[str, Any]:
+        """Get a copy of the state of the machine at the current point in the g-code.
+
+        Parsing can continue from this point later on, by restoring the state with :py:meth:`setMachineState`.
+        """
+
+        return copy.deepcopy({name: getattr(self, name) for name in self._machine_state_attributes})
+
+    def setMachineState(self, state: Dict[str, Any]) -> None:
+        for name, value in copy.deepcopy(state).items():
+            setattr(self, name, value)
+
+    def estimateMachineState(self, lines: List[str], extruder_number: int) -> None:
+        """Estimate the state of the machine at the start of some g-code, from the first moves in that g-code.
+
+        This is used when the g-code before it wasn't parsed. The first line that is drawn can be slightly off.
+
+        :param lines: The g-code to estimate the state for.
+        :param extruder_number: The extruder that is active at the start of the g-code.
+        """
+
+        self._extruder_number = extruder_number
+        x, y, z, f, e = self._current_position
+        found_e = None  # type: Optional[float]
+        found = set()  # type: Set[str]
+        for line in lines:
+            if not line.startswith(("G0", "G1")):
+                continue
+            for item in line.split(";", 1)[0].upper().split()[1:]:
+                if len(item) <= 1 or item[0] in found or item[0] not in "XYZFE":
+                    continue
+                try:
+                    value = float(item[1:])
+                except ValueError:
+                    continue
+                found.add(item[0])
+                if item[0] == "X":
+                    x = value
+                elif item[0] == "Y":
+                    y = value
+                elif item[0] == "Z":
+                    z = value
+                elif item[0] == "F":
+                    f = value / 60
+                else:
+                    found_e = value
+            if len(found) == 5:
+                break
+        if found_e is not None and self._is_absolute_extrusion:
+            e[extruder_number] = found_e
+            self._previous_extrusion_value = found_e
+        self._previous_z = z - self._current_layer_thickness
+        self._current_position = self._position(x, y, z, f, e)
+
+    def _prepareParsing(self) -> bool:
+        """Get ready to parse new g-code, with the machine in its initial state.
+
+        :return: Whether there is a printer to parse the g-code for.
+        """
+
         self._cancelled = False
         # We obtain the filament diameter from the selected extruder to calculate line widths
-        global_stack = CuraApplication.getInstance().getGlobalContainerStack()
+        self._global_stack = CuraApplication.getInstance().getGlobalContainerStack()
 
-        if not global_stack:
-            return None
+        if not self._global_stack:
+            return False
 
-        try:
-            self._current_filament_diameter = global_stack.extruderList[self._extruder_number].getProperty("material_diameter", "value")
-        except IndexError:
-            # There can be a mismatch between the number of extruders in the G-Code file and the number of extruders in the current machine.
-            self._current_filament_diameter = self.DEFAULT_FILAMENT_DIAMETER
+        self._resetMachineState([extruder.getProperty("material_diameter", "value") for extruder in self._global_stack.extruderList], self._extruderOffsets())
+        return True
 
-        scene_node = CuraSceneNode()
+    def createLayerParser(self) -> "FlavorParser":
+        """Create a parser for separate layers of the g-code, for the same printer as this parser.
 
-        gcode_list = []
-        self._is_layers_in_file = False
+        The layer parser never shows a progress message, so it doesn't listen for messages that are hidden.
+        """
 
-        self._extruder_offsets = self._extruderOffsets()  # dict with index the extruder number. can be empty
+        parser = type(self)()
+        application = CuraApplication.getInstance()
+        if application is not None:
+            application.hideMessageSignal.disconnect(parser._onHideMessage)
+        parser._resetMachineState(self._filament_diameters, self._extruder_offsets)
+        return parser
 
-        ##############################################################################################
-        ##  This part is where the action starts
-        ##############################################################################################
-        file_lines = 0
-        current_line = 0
-        for line in stream.split("\n"):
-            file_lines += 1
-            gcode_list.append(line + "\n")
-            if not self._is_layers_in_file and line[:len(self._layer_keyword)] == self._layer_keyword:
-                self._is_layers_in_file = True
+    def _resetMachineState(self, filament_diameters: List[float], extruder_offsets: Dict[int, List[float]]) -> None:
+        """Put the machine in its initial state, before any g-code is parsed.
+
+        :param filament_diameters: The filament diameter of each extruder of the printer.
+        :param extruder_offsets: The offsets of the extruders, by extruder number.
+        """
 
-        file_step = max(math.floor(file_lines / 100), 1)
+        self._filament_diameters = filament_diameters
+        self._current_filament_diameter = self._getFilamentDiameter(self._extruder_number)
 
+        self._is_layers_in_file = False
+        self._extruder_offsets = extruder_offsets  # dict with index the extruder number. can be empty
         self._clearValues()
 
+        self._current_position = Position(0, 0, 0, 0, [0] * self.MAX_EXTRUDER_COUNT)
+        self._current_path = PathBuffer()
+        self._min_layer_number = 0
+        self._negative_layers = 0
+        self._previous_layer = 0
+        self._previous_extrusion_value = 0.0
+
+    def _getFilamentDiameter(self, extruder_number: int) -> float:
+        try:
+            return self._filament_diameters[extruder_number]
+        except IndexError:
+            # There can be a mismatch between the number of extruders in the G-Code file and the number of extruders in the current machine.
+            return self.DEFAULT_FILAMENT_DIAMETER
+
+    def _showProgressMessage(self) -> None:
         self._message = Message(catalog.i18nc("@info:status", "Parsing G-code"),
                                 lifetime=0,
                                 title = catalog.i18nc("@info:title", "G-code Details"))
@@ -364,112 +501,109 @@ class FlavorParser:
         self._message.setProgress(0)
         self._message.show()
 
-        Logger.log("d", "Parsing g-code...")
+    def _processLine(self, line: str) -> None:
+        """Process a single line of g-code, without the line ending."""
 
-        current_position = Position(0, 0, 0, 0, [0] * self.MAX_EXTRUDER_COUNT)
-        current_path = [] #type: List[List[float]]
-        min_layer_number = 0
-        negative_layers = 0
-        previous_layer = 0
-        self._previous_extrusion_value = 0.0
-
-        for line in stream.split("\n"):
-            if self._cancelled:
-                Logger.log("d", "Parsing g-code file cancelled.")
-                return None
-            current_line += 1
-
-            if current_line % file_step == 0:
-                self._message.setProgress(math.floor(current_line / file_lines * 100))
-                Job.yieldThread()
+        line = line.strip()
+        if len(line) == 0:
+            return
+        if line[0] == "N":  # Skip the line number, if the line has one.
+            line = line.partition(" ")[2].lstrip()
             if len(line) == 0:
-                continue
-
-            if line.find(self._type_keyword) == 0:
-                type = line[len(self._type_keyword):].strip()
-                if type == "WALL-INNER":
-                    self._layer_type = LayerPolygon.InsetXType
-                elif type == "WALL-OUTER":
-                    self._layer_type = LayerPolygon.Inset0Type
-                elif type == "SKIN":
-                    self._layer_type = LayerPolygon.SkinType
-                elif type == "SKIRT":
-                    self._layer_type = LayerPolygon.SkirtType
-                elif type == "SUPPORT":
-                    self._layer_type = LayerPolygon.SupportType
-                elif type == "FILL":
-                    self._layer_type = LayerPolygon.InfillType
-                elif type == "SUPPORT-INTERFACE":
-                    self._layer_type = LayerPolygon.SupportInterfaceType
-                elif type == "PRIME-TOWER":
-                    self._layer_type = LayerPolygon.PrimeTowerType
-                else:
-                    Logger.log("w", "Encountered a unknown type (%s) while parsing g-code.", type)
+                return
 
-            # When the layer change is reached, the polygon is computed so we have just one layer per extruder
-            if self._is_layers_in_file and line[:len(self._layer_keyword)] == self._layer_keyword:
-                try:
-                    layer_number = int(line[len(self._layer_keyword):])
-                    self._createPolygon(self._current_layer_thickness, current_path, self._extruder_offsets.get(self._extruder_number, [0, 0]))
-                    current_path.clear()
-                    # Start the new layer at the end position of the last layer
-                    current_path.append([current_position.x, current_position.y, current_position.z, current_position.f, current_position.e[self._extruder_number], LayerPolygon.MoveCombingType])
-
-                    # When using a raft, the raft layers are stored as layers < 0, it mimics the same behavior
-                    # as in ProcessSlicedLayersJob
-                    if layer_number < min_layer_number:
-                        min_layer_number = layer_number
-                    if layer_number < 0:
-                        layer_number += abs(min_layer_number)
-                        negative_layers += 1
-                    else:
-                        layer_number += negative_layers
-
-                    # In case there is a gap in the layer count, empty layers are created
-                    for empty_layer in range(previous_layer + 1, layer_number):
-                        self._createEmptyLayer(empty_layer)
-
-                    self._layer_number = layer_number
-                    previous_layer = layer_number
-                except:
-                    pass
-
-            # This line is a comment. Ignore it (except for the layer_keyword)
-            if line.startswith(";"):
-                continue
-
-            G = self._getInt(line, "G")
+        if line.startswith(self._type_keyword):
+            type = line[len(self._type_keyword):].strip()
+            if type in self._type_line_types:
+                self._layer_type = self._type_line_types[type]
+            else:
+                Logger.log("w", "Encountered a unknown type (%s) while parsing g-code.", type)
+
+        # When the layer change is reached, the polygon is computed so we have just one layer per extruder
+        if line.startswith(self._layer_keyword):
+            self._is_layers_in_file = True
+            try:
+                layer_number = int(line[len(self._layer_keyword):])
+                self._startLayer()
+                layer_number = self._numberLayer(layer_number)
+
+                # In case there is a gap in the layer count, empty layers are created
+                for empty_layer in range(self._previous_layer + 1, layer_number):
+                    self._createEmptyLayer(empty_layer)
+
+                self._layer_number = layer_number
+                self._previous_layer = layer_number
+            except:
+                pass
+
+        # This line is a comment. Ignore it (except for the layer_keyword)
+        command = line[0]
+        if command == ";":
+            return
+
+        current_position = self._current_position
+        current_path = self._current_path
+        if command == "G":
+            G = self._getCommandNumber(line)
             if G is not None:
                 # When find a movement, the new position is calculated and added to the current_path, but
                 # don't need to create a polygon until the end of the layer
-                current_position = self.processGCode(G, line, current_position, current_path)
-                continue
+                self._current_position = self.processGCode(G, line, current_position, current_path)
+            return
+
+        # When changing the extruder, the polygon with the stored paths is computed
+        if command == "T":
+            T = self._getCommandNumber(line)
+            if T is not None:
+                self._extruders_seen.add(T)
+                self._createPolygon(self._current_layer_thickness, current_path, self._extruder_offsets.get(self._extruder_number, [0, 0]))
+                current_path.clear()
+
+                # When changing tool, store the end point of the previous path, then process the code and finally
+                # add another point with the new position of the head.
+                current_path.append([current_position.x, current_position.y, current_position.z, current_position.f, current_position.e[self._extruder_number], LayerPolygon.MoveCombingType])
+                current_position = self.processTCode(self._global_stack, T, line, current_position, current_path)
+                current_path.append([current_position.x, current_position.y, current_position.z, current_position.f, current_position.e[self._extruder_number], LayerPolygon.MoveCombingType])
+                self._current_position = current_position
+
+        elif command == "M":
+            M = self._getCommandNumber(line)
+            if M is not None:
+                self.processMCode(M, line, current_position, current_path)
+
+    def _numberLayer(self, layer_number: int) -> int:
+        """Get the number to give a layer in the layer data, from the number in its layer comment."""
+
+        # When using a raft, the raft layers are stored as layers < 0, it mimics the same behavior
+        # as in ProcessSlicedLayersJob
+        if layer_number < self._min_layer_number:
+            self._min_layer_number = layer_number
+        if layer_number < 0:
+            layer_number += abs(self._min_layer_number)
+            self._negative_layers += 1
+        else:
+            layer_number += self._negative_layers
+        return layer_number
+
+    def _startLayer(self) -> None:
+        """Finish the paths of the previous layer and start the paths of the next one."""
 
-            # When changing the extruder, the polygon with the stored paths is computed
-            if line.startswith("T"):
-                T = self._getInt(line, "T")
-                if T is not None:
-                    self._extruders_seen.add(T)
-                    self._createPolygon(self._current_layer_thickness, current_path, self._extruder_offsets.get(self._extruder_number, [0, 0]))
-                    current_path.clear()
-
-                    # When changing tool, store the end point of the previous path, then process the code and finally
-                    # add another point with the new position of the head.
-                    current_path.append([current_position.x, current_position.y, current_position.z, current_position.f, current_position.e[self._extruder_number], LayerPolygon.MoveCombingType])
-                    current_position = self.processTCode(global_stack, T, line, current_position, current_path)
-                    current_path.append([current_position.x, current_position.y, current_position.z, current_position.f, current_position.e[self._extruder_number], LayerPolygon.MoveCombingType])
-
-            if line.startswith("M"):
-                M = self._getInt(line, "M")
-                if M is not None:
-                    self.processMCode(M, line, current_position, current_path)
-
-        # "Flush" leftovers. Last layer paths are still stored
-        if len(current_path) > 1:
-            if self._createPolygon(self._current_layer_thickness, current_path, self._extruder_offsets.get(self._extruder_number, [0, 0])):
+        self._createPolygon(self._current_layer_thickness, self._current_path, self._extruder_offsets.get(self._extruder_number, [0, 0]))
+        self._current_path.clear()
+        # Start the new layer at the end position of the last layer
+        position = self._current_position
+        self._current_path.append([position.x, position.y, position.z, position.f, position.e[self._extruder_number], LayerPolygon.MoveCombingType])
+
+    def _finishPaths(self) -> None:
+        """Create the polygon of the paths that are still stored at the end of the g-code."""
+
+        if len(self._current_path) > 1:
+            if self._createPolygon(self._current_layer_thickness, self._current_path, self._extruder_offsets.get(self._extruder_number, [0, 0])):
                 self._layer_number += 1
-                current_path.clear()
+                self._current_path.clear()
 
+    @staticmethod
+    def _getMaterialColorMap() -> numpy.ndarray:
         material_color_map = numpy.zeros((8, 4), dtype = numpy.float32)
         material_color_map[0, :] = [0.0, 0.7, 0.9, 1.0]
         material_color_map[1, :] = [0.7, 0.9, 0.0, 1.0]
@@ -479,11 +613,269 @@ class FlavorParser:
         material_color_map[5, :] = [0.0, 0.0, 0.7, 1.0]
         material_color_map[6, :] = [0.3, 0.3, 0.3, 1.0]
         material_color_map[7, :] = [0.7, 0.7, 0.7, 1.0]
-        layer_mesh = self._layer_data_builder.build(material_color_map)
+        return material_color_map
+
+    #
+    # CURA-6643
+    # This function needs the filename so it can be set to the SceneNode. Otherwise, if you load a GCode file and press
+    # F5, that gcode SceneNode will be removed because it doesn't have a file to be reloaded from.
+    #
+    def processGCodeStream(self, stream: Union[str, TextIO], filename: str) -> Optional["CuraSceneNode"]:
+        """Parse g-code in a single pass over its lines.
+
+        :param stream: The g-code, or a file with the g-code. Files are read line by line, so they are never
+        completely in memory as a single string.
+        :param filename: The name of the file the g-code was read from.
+        """
+
+        Logger.log("d", "Preparing to load g-code")
+        if not self._prepareParsing():
+            return None
+
+        scene_node = CuraSceneNode()
+
+        gcode_list = []
+
+        ##############################################################################################
+        ##  This part is where the action starts
+        ##############################################################################################
+        if isinstance(stream, str):
+            stream_size = len(stream)
+            lines = io.StringIO(stream)  # type: Iterable[str]
+        else:
+            stream_size = self._getFileSize(stream)
+            lines = stream
+        read_size = 0
+        current_line = 0
+
+        self._showProgressMessage()
+        Logger.log("d", "Parsing g-code...")
+
+        for line in lines:
+            if self._cancelled:
+                Logger.log("d", "Parsing g-code file cancelled.")
+                return None
+            current_line += 1
+            read_size += len(line)
+            if not line.endswith("\n"):
+                line += "\n"
+            gcode_list.append(line)
+
+            if current_line % self._progress_line_interval == 0:
+                if stream_size > 0:
+                    self._message.setProgress(min(math.floor(read_size / stream_size * 100), 100))
+                Job.yieldThread()
+            self._processLine(line)
+
+        self._finishPaths()
+
+        layer_mesh = self._layer_data_builder.build(self._getMaterialColorMap())
         decorator = LayerDataDecorator()
         decorator.setLayerData(layer_mesh)
         scene_node.addDecorator(decorator)
 
+        if self._layer_number == 0:
+            Logger.log("w", "File doesn't contain any valid layers")
+        self._finishSceneNode(scene_node, filename, gcode_list)
+        return scene_node
+
+    def processGCodeFileLazily(self, file_name: str) -> Optional["CuraSceneNode"]:
+        """Load g-code for inspection in the layer view, parsing only the layers that are looked at.
+
+        The file is indexed first, which only finds where the layers start. The layers are parsed when the layer view
+        needs them, and only a limited number of them is kept in memory.
+
+        :param file_name: The g-code file to load.
+        """
+
+        # Imported here, so that the parser itself doesn't need the plug-in package.
+        from .GCodeLayerIndex import GCodeLayerIndex, LazyGCodeList
+        from .LazyLayerDataDecorator import LazyLayerDataDecorator
+
+        Logger.log("d", "Preparing to load g-code lazily")
+        if not self._prepareParsing():
+            return None
+
+        self._showProgressMessage()
+        Logger.log("d", "Indexing g-code...")
+        layer_index = GCodeLayerIndex(file_name)
+        layer_index.build()
+
+        # Get the machine state at the start of the first layer from the start g-code.
+        for line in layer_index.readChunk(0).split("\n"):
+            self._processLine(line)
+        first_layer_state = self.getMachineState()
+
+        scene_node = CuraSceneNode()
+        decorator = LayerDataDecorator()
+        scene_node.addDecorator(decorator)
+        # The layers are parsed by a parser of their own, so that this one can be used for other files meanwhile.
+        lazy_decorator = LazyLayerDataDecorator(layer_index, self.createLayerParser(), first_layer_state, self._getMaterialColorMap())
+        scene_node.addDecorator(lazy_decorator)
+        # Show the top layers, like when all layers are parsed.
+        layer_count = layer_index.getLayerCount()
+        decorator.setLayerData(lazy_decorator.loadLayers(0, layer_count - 1))
+
+        if layer_count == 0:
+            Logger.log("w", "File doesn't contain any valid layers")
+        self._finishSceneNode(scene_node, file_name, LazyGCodeList(layer_index))
+        return scene_node
+
+    @classmethod
+    def shouldParseInParallel(cls, file_name: str) -> bool:
+        """Whether a g-code file is large enough to be parsed with several processes."""
+
+        if not CuraApplication.getInstance().getPreferences().getValue("gcodereader/parallel_parsing"):
+            return False
+        if (os.cpu_count() or 1) < 2:
+            return False
+        try:
+            return os.path.getsize(file_name) >= cls._parallel_parsing_minimum_file_size
+        except OSError:
+            return False
+
+    def processGCodeFileInParallel(self, file_name: str) -> Optional["CuraSceneNode"]:
+        """Parse a g-code file with several processes, that each parse a shard of consecutive layers.
+
+        Only the machine state is carried from one shard to the next. The shards are parsed at the same time, so they
+        can't wait for the state at the end of the shard before them. Instead, they parse the last layers before
+        the shard to estimate it. Shards that started from a different state than the actual one are parsed again,
+        so the result is the same as when the file is parsed in a single pass.
+
+        :param file_name: The g-code file to load.
+        """
+
+        from .GCodeLayerIndex import GCodeLayerIndex, LazyGCodeList
+
+        Logger.log("d", "Preparing to load g-code in parallel")
+        if not self._prepareParsing():
+            return None
+
+        self._showProgressMessage()
+        Logger.log("d", "Indexing g-code...")
+        layer_index = GCodeLayerIndex(file_name)
+        layer_index.build()
+
+        # The start g-code is short, and gives the state of the machine at the start of the first layer.
+        for line in layer_index.readChunk(0).split("\n"):
+            self._processLine(line)
+        self._createPolygon(self._current_layer_thickness, self._current_path, self._extruder_offsets.get(self._extruder_number, [0, 0]))
+        state = self.getMachineState()
+
+        # Layer numbers depend on all layer comments before them, so number the layers up front.
+        layer_count = layer_index.getLayerCount()
+        layer_numbers = [self._numberLayer(layer_index.getLayerNumber(layer)) for layer in range(layer_count)]
+        shards = self._splitInShards(layer_count)
+        shard_arguments = (type(self), self._filament_diameters, self._extruder_offsets, layer_index)
+        Logger.log("d", "Parsing g-code in %s shards...", len(shards))
+
+        executor = None  # type: Optional[concurrent.futures.ProcessPoolExecutor]
+        try:
+            executor = createWorkerProcessPool(min(os.cpu_count() or 1, len(shards)), __name__, __file__)
+            futures = []
+            for first, end in shards:
+                warm_up = range(max(first - self._warm_up_layer_count, 0), first)
+                futures.append(executor.submit(_parseGCodeShard, *shard_arguments, state, warm_up, [(layer, layer_numbers[layer]) for layer in range(first, end)]))
+
+            for shard_number, (future, (first, end)) in enumerate(zip(futures, shards)):
+                shard_result = self._waitForShard(future)
+                if shard_result is None:
+                    Logger.log("d", "Parsing g-code file cancelled.")
+                    return None
+                shard_start_state, layer_results, shard_end_state = shard_result
+                if not self._machineStatesMatch(shard_start_state, state):  # The estimate was off, so parse the shard again from the actual state.
+                    Logger.log("d", "Parsing shard %s of the g-code again from the state at its start.", shard_number)
+                    shard_start_state, layer_results, shard_end_state = _parseGCodeShard(*shard_arguments, state, range(0), [(layer, layer_numbers[layer]) for layer in range(first, end)])
+                for layer_number, layer_result in zip(layer_numbers[first:end], layer_results):
+                    self._addShardLayer(layer_number, layer_result)
+                state = shard_end_state
+                self._message.setProgress(math.floor((shard_number + 1) / len(shards) * 100))
+        except Exception:
+            Logger.logException("w", "Failed to parse g-code in parallel, parsing it in a single pass instead.")
+            self._message.hide()
+            with open(file_name, "r", encoding = "utf-8") as file:
+                return self.processGCodeStream(file, file_name)
+        finally:
+            if executor is not None:
+                # Don't wait for the shards that are still being parsed when parsing is cancelled or failed.
+                executor.shutdown(wait = False, cancel_futures = True)
+
+        layer_mesh = self._layer_data_builder.build(self._getMaterialColorMap())
+        decorator = LayerDataDecorator()
+        decorator.setLayerData(layer_mesh)
+        scene_node = CuraSceneNode()
+        scene_node.addDecorator(decorator)
+
+        if not self._layer_data_builder.getLayers():
+            Logger.log("w", "File doesn't contain any valid layers")
+        self._finishSceneNode(scene_node, file_name, LazyGCodeList(layer_index))
+        return scene_node
+
+    def _waitForShard(self, future: concurrent.futures.Future) -> Optional[Tuple[Dict[str, Any], List[Optional[Tuple[float, float, List[Tuple]]]], Dict[str, Any]]]:
+        """Wait until a shard is parsed, unless parsing is cancelled meanwhile.
+
+        :return: The result of :py:func:`_parseGCodeShard`, or None if parsing was cancelled.
+        """
+
+        while not self._cancelled:
+            try:
+                return future.result(timeout = self._cancel_check_interval)
+            except concurrent.futures.TimeoutError:
+                pass
+        return None
+
+    @classmethod
+    def _machineStatesMatch(cls, state: Dict[str, Any], other_state: Dict[str, Any]) -> bool:
+        """Whether two machine states give the same result when parsing from them.
+
+        The numbers in a state that was estimated can differ slightly from the actual state by rounding, e.g. because
+        the extrusion offsets were added up in another order, so numbers are compared with a tolerance.
+        """
+
+        return all(cls._machineStateValuesMatch(state[name], other_state[name]) for name in cls._machine_state_attributes)
+
+    @classmethod
+    def _machineStateValuesMatch(cls, value: Any, other_value: Any) -> bool:
+        if isinstance(value, (list, tuple)):  # Including positions.
+            return isinstance(other_value, (list, tuple)) and len(value) == len(other_value) and all(cls._machineStateValuesMatch(item, other_item) for item, other_item in zip(value, other_value))
+        if isinstance(value, bool) or isinstance(other_value, bool):
+            return value == other_value
+        if isinstance(value, (int, float)) and isinstance(other_value, (int, float)):
+            return math.isclose(value, other_value, rel_tol = 0, abs_tol = cls._machine_state_tolerance)
+        return value == other_value
+
+    def _splitInShards(self, layer_count: int) -> List[Tuple[int, int]]:
+        """Divide the layers of a file over shards, as ranges from the first layer up to the layer after the last."""
+
+        shard_count = max(1, min(layer_count // self._minimum_shard_layer_count, 2 * (os.cpu_count() or 1)))
+        if not (self._is_absolute_positioning and self._is_absolute_extrusion):
+            # With relative coordinates, the state at the start of a shard can't be estimated from the layers before it.
+            shard_count = 1
+        boundaries = [round(shard * layer_count / shard_count) for shard in range(shard_count + 1)]
+        return list(zip(boundaries, boundaries[1:]))
+
+    def _addShardLayer(self, layer_number: int, layer_result: Optional[Tuple[float, float, List[Tuple]]]) -> None:
+        """Add a layer that was parsed in a shard to the layer data, in the same way as when parsing in a single pass."""
+
+        # In case there is a gap in the layer count, empty layers are created
+        for empty_layer in range(self._previous_layer + 1, layer_number):
+            self._createEmptyLayer(empty_layer)
+        self._layer_number = layer_number
+        self._previous_layer = layer_number
+        if layer_result is None:  # The layer has no lines.
+            return
+
+        height, thickness, polygon_data = layer_result
+        self._layer_data_builder.addLayer(layer_number)
+        self._layer_data_builder.setLayerHeight(layer_number, height)
+        self._layer_data_builder.setLayerThickness(layer_number, thickness)
+        this_layer = self._layer_data_builder.getLayer(layer_number)
+        for polygon in polygon_data:
+            this_poly = LayerPolygon(*polygon)
+            this_poly.buildCache()
+            this_layer.polygons.append(this_poly)
+
+    def _finishSceneNode(self, scene_node: CuraSceneNode, filename: str, gcode_list: Sequence[str]) -> None:
         gcode_list_decorator = GCodeListDecorator()
         gcode_list_decorator.setGcodeFileName(filename)
         gcode_list_decorator.setGCodeList(gcode_list)
@@ -497,12 +889,9 @@ class FlavorParser:
         Logger.log("d", "Finished parsing g-code.")
         self._message.hide()
 
-        if self._layer_number == 0:
-            Logger.log("w", "File doesn't contain any valid layers")
-
-        if not global_stack.getProperty("machine_center_is_zero", "value"):
-            machine_width = global_stack.getProperty("machine_width", "value")
-            machine_depth = global_stack.getProperty("machine_depth", "value")
+        if not self._global_stack.getProperty("machine_center_is_zero", "value"):
+            machine_width = self._global_stack.getProperty("machine_width", "value")
+            machine_depth = self._global_stack.getProperty("machine_depth", "value")
             scene_node.setPosition(Vector(-machine_width / 2, 0, machine_depth / 2))
 
         Logger.log("d", "G-code loading finished.")
@@ -520,4 +909,65 @@ class FlavorParser:
         backend = CuraApplication.getInstance().getBackend()
         backend.backendStateChange.emit(Backend.BackendState.Disabled)
 
-        return scene_node
+    def processLayer(self, layer_number: int, lines: Iterable[str], layer_data_builder: LayerDataBuilder) -> None:
+        """Parse the g-code of a single layer, continuing from the current machine state.
+
+        :param layer_number: The number to give the layer in the layer data.
+        :param lines: The g-code of the layer, starting with its layer comment.
+        :param layer_data_builder: The builder to add the layer to.
+        """
+
+        self._layer_data_builder = layer_data_builder
+        self._layer_number = layer_number
+        self._current_path.clear()
+        position = self._current_position
+        self._current_path.append([position.x, position.y, position.z, position.f, position.e[self._extruder_number], LayerPolygon.MoveCombingType])
+        for line in lines:
+            if line.startswith(self._layer_keyword):
+                continue  # The layer is already numbered.
+            self._processLine(line)
+        self._createPolygon(self._current_layer_thickness, self._current_path, self._extruder_offsets.get(self._extruder_number, [0, 0]))
+        self._current_path.clear()
+
+
+def _parseGCodeShard(parser_class: type, filament_diameters: List[float], extruder_offsets: Dict[int, List[float]],
+                     layer_index: "GCodeLayerIndex", start_state: Dict[str, Any], warm_up_layers: Sequence[int],
+                     layers: List[Tuple[int, int]]) -> Tuple[Dict[str, Any], List[Optional[Tuple[float, float, List[Tuple]]]], Dict[str, Any]]:
+    """Parse a shard of consecutive layers of a g-code file, usually in a worker process.
+
+    There is no application in the worker processes, so the lines are returned as arrays rather than polygons.
+
+    :param parser_class: The flavor of parser to parse the g-code with.
+    :param filament_diameters: The filament diameter of each extruder of the printer.
+    :param extruder_offsets: The offsets of the extruders, by extruder number.
+    :param layer_index: Where the layers are in the file.
+    :param start_state: The state of the machine at the start of the shard. If there are warm-up layers, this state
+    is only used for the settings that the layers don't change.
+    :param warm_up_layers: Layers before the shard that are parsed to estimate the state at the start of the shard.
+    :param layers: The index in the file and the number in the layer data of each layer in the shard.
+    :return: The state at the start of the shard, the height, thickness and lines of each layer (or None if it has no
+    lines) and the state at the end of the shard.
+    """
+
+    parser = parser_class()
+    parser._resetMachineState(filament_diameters, extruder_offsets)
+    parser._polygon_data = []
+    parser.setMachineState(start_state)
+    if warm_up_layers:
+        warm_up_layer_lines = [layer.split("\n") for layer in layer_index.readLayers(warm_up_layers[0], warm_up_layers[-1] + 1)]
+        parser.estimateMachineState(warm_up_layer_lines[0], layer_index.getLayerExtruder(warm_up_layers[0]))
+        for lines in warm_up_layer_lines:
+            parser.processLayer(-1, lines, LayerDataBuilder())
+    shard_start_state = parser.getMachineState()
+
+    results = []  # type: List[Optional[Tuple[float, float, List[Tuple]]]]
+    for (_, layer_number), layer in zip(layers, layer_index.readLayers(layers[0][0], layers[-1][0] + 1) if layers else []):
+        layer_data_builder = LayerDataBuilder()
+        parser._polygon_data = []
+        parser.processLayer(layer_number, layer.split("\n"), layer_data_builder)
+        this_layer = layer_data_builder.getLayer(layer_number)
+        if this_layer is None or not parser._polygon_data:
+            results.append(None)
+        else:
+            results.append((this_layer.height, this_layer.thickness, parser._polygon_data))
+    return shard_start_state, results, parser.getMachineState()
@@ -0,0 +1,191 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import mmap
+from collections.abc import MutableSequence
+from typing import Dict, Iterator, List, Optional, Union, overload
+
+
+class GCodeLayerIndex:
+    """Index of where the layers start in a g-code file, so that layers can be read without reading the whole file.
+
+    The file is split in chunks: the start g-code before the first layer, followed by one chunk per layer. Chunk
+    ``i + 1`` holds layer ``i``, counting the layers in the order they appear in the file.
+    """
+
+    _layer_keyword = b";LAYER:"
+
+    def __init__(self, file_name: str) -> None:
+        self._file_name = file_name
+        self._chunk_offsets = [0]  # type: List[int]  # Where each chunk starts in the file.
+        self._layer_extruders = []  # type: List[int]  # The active extruder at the start of each layer.
+        self._layer_numbers = []  # type: List[int]  # The number in the layer comment of each layer.
+        self._file_size = 0
+
+    def build(self) -> None:
+        """Find the start of every layer in the file."""
+
+        self._chunk_offsets = [0]
+        self._layer_extruders = []
+        self._layer_numbers = []
+        with open(self._file_name, "rb") as file:
+            try:
+                data = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+            except ValueError:  # Empty files can't be mapped.
+                self._file_size = 0
+                return
+            with data:
+                self._file_size = len(data)
+                layer_offsets = self._findLineStarts(data, self._layer_keyword)
+                tool_change_offsets = self._findLineStarts(data, b"T")
+
+                extruder_nr = 0
+                tool_changes = iter(tool_change_offsets)
+                tool_change = next(tool_changes, None)
+                for offset in layer_offsets:
+                    layer_number = self._parseLayerNumber(data, offset)
+                    if layer_number is None:
+                        continue  # The parser ignores layer comments without a valid number too.
+                    # Tool changes are rare, so only those lines are parsed to know the extruder of each layer.
+                    while tool_change is not None and tool_change < offset:
+                        extruder_nr = self._parseToolChange(data, tool_change, extruder_nr)
+                        tool_change = next(tool_changes, None)
+                    self._chunk_offsets.append(offset)
+                    self._layer_extruders.append(extruder_nr)
+                    self._layer_numbers.append(layer_number)
+
+    def getLayerCount(self) -> int:
+        return len(self._layer_extruders)
+
+    def getChunkCount(self) -> int:
+        return len(self._chunk_offsets)
+
+    def getLayerExtruder(self, layer: int) -> int:
+        """Get the extruder that is active at the start of a layer."""
+
+        return self._layer_extruders[layer]
+
+    def getLayerNumber(self, layer: int) -> int:
+        """Get the number in the layer comment of a layer. Raft layers have negative numbers."""
+
+        return self._layer_numbers[layer]
+
+    def readChunk(self, chunk: int) -> str:
+        """Read the g-code of a chunk from the file.
+
+        :param chunk: The index of the chunk. Chunk 0 is the start g-code, chunk ``i + 1`` is layer ``i``.
+        """
+
+        start = self._chunk_offsets[chunk]
+        end = self._chunk_offsets[chunk + 1] if chunk + 1 < len(self._chunk_offsets) else self._file_size
+        with open(self._file_name, "rb") as file:
+            file.seek(start)
+            return file.read(end - start).decode("utf-8", "replace")
+
+    def readLayer(self, layer: int) -> str:
+        return self.readChunk(layer + 1)
+
+    def readLayers(self, first: int, end: int) -> List[str]:
+        """Read the g-code of a range of consecutive layers from the file at once.
+
+        :param first: The first layer to read.
+        :param end: The layer after the last layer to read.
+        """
+
+        offsets = self._chunk_offsets[first + 1:end + 1]
+        offsets.append(self._chunk_offsets[end + 1] if end + 1 < len(self._chunk_offsets) else self._file_size)
+        with open(self._file_name, "rb") as file:
+            file.seek(offsets[0])
+            data = file.read(offsets[-1] - offsets[0])
+        return [data[layer_start - offsets[0]:layer_end - offsets[0]].decode("utf-8", "replace") for layer_start, layer_end in zip(offsets, offsets[1:])]
+
+    @staticmethod
+    def _findLineStarts(data: mmap.mmap, prefix: bytes) -> List[int]:
+        """Find the offsets of all lines in the data that start with a prefix."""
+
+        offsets = [0] if data[:len(prefix)] == prefix else []
+        pattern = b"\n" + prefix
+        position = data.find(pattern)
+        while position >= 0:
+            offsets.append(position + 1)
+            position = data.find(pattern, position + 1)
+        return offsets
+
+    @classmethod
+    def _parseLayerNumber(cls, data: mmap.mmap, offset: int) -> Optional[int]:
+        line_end = data.find(b"\n", offset)
+        line = data[offset + len(cls._layer_keyword):line_end if line_end >= 0 else len(data)]
+        try:
+            return int(line)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _parseToolChange(data: mmap.mmap, offset: int, extruder_nr: int) -> int:
+        line_end = data.find(b"\n", offset)
+        line = data[offset:line_end if line_end >= 0 else len(data)]
+        try:
+            return int(line[1:].split(b";", 1)[0].split()[0])
+        except (ValueError, IndexError):  # Not a tool change after all.
+            return extruder_nr
+
+
+class LazyGCodeList(MutableSequence):
+    """The g-code of a file as a list of chunks, like the g-code of a slice. The chunks are read when they are used.
+
+    Changed chunks are kept in memory. When chunks are inserted or removed, all chunks are read into memory.
+    """
+
+    def __init__(self, layer_index: GCodeLayerIndex) -> None:
+        self._layer_index = layer_index
+        self._changed_chunks = {}  # type: Dict[int, str]
+        self._chunks = None  # type: Optional[List[str]]  # All chunks, once the list is changed structurally.
+
+    def __len__(self) -> int:
+        if self._chunks is not None:
+            return len(self._chunks)
+        return self._layer_index.getChunkCount()
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if self._chunks is not None:
+            return self._chunks[index]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Chunk index out of range: {index}".format(index = index))
+        if index in self._changed_chunks:
+            return self._changed_chunks[index]
+        return self._layer_index.readChunk(index)
+
+    def __setitem__(self, index, value) -> None:
+        if self._chunks is not None or isinstance(index, slice):
+            self._readAll()[index] = value
+            return
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Chunk index out of range: {index}".format(index = index))
+        self._changed_chunks[index] = value
+
+    def __delitem__(self, index) -> None:
+        del self._readAll()[index]
+
+    def insert(self, index: int, value: str) -> None:
+        self._readAll().insert(index, value)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def _readAll(self) -> List[str]:
+        if self._chunks is None:
+            self._chunks = [self[index] for index in range(len(self))]
+            self._changed_chunks = {}
+        return self._chunks
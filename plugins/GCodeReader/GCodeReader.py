@@ -2,7 +2,8 @@
 # Copyright (c) 2020 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
 
-from typing import Optional, Union, List, TYPE_CHECKING
+import io
+from typing import Optional, Union, List, TextIO, TYPE_CHECKING
 
 from UM.FileHandler.FileReader import FileReader
 from UM.Mesh.MeshReader import MeshReader
@@ -41,9 +42,21 @@ class GCodeReader(MeshReader):
         self._flavor_reader = None  # type: Optional[FlavorParser]
 
         Application.getInstance().getPreferences().addPreference("gcodereader/show_caution", True)
+        Application.getInstance().getPreferences().addPreference("gcodereader/lazy_loading", False)
+        Application.getInstance().getPreferences().addPreference("gcodereader/parallel_parsing", True)
+        # The number of layers that is shown when only the shown layers are parsed.
+        Application.getInstance().getPreferences().addPreference("gcodereader/lazy_layer_count", 50)
 
     def preReadFromStream(self, stream, *args, **kwargs):
-        for line in stream.split("\n"):
+        """Find the flavor in the header of the g-code.
+
+        Only the comments at the start of the g-code are searched, so the rest of the g-code isn't read.
+
+        :param stream: The g-code, or a file with the g-code.
+        """
+
+        lines = io.StringIO(stream) if isinstance(stream, str) else stream
+        for line in lines:
             if line[:len(self._flavor_keyword)] == self._flavor_keyword:
                 try:
                     self._flavor_reader = self._flavor_readers_dict[line[len(self._flavor_keyword):].rstrip()]
@@ -51,6 +64,9 @@ class GCodeReader(MeshReader):
                 except:
                     # If there is no entry in the dictionary for this flavor, just skip and select the by-default flavor
                     break
+            line = line.strip()
+            if line and not line.startswith(";"):
+                break  # The first command is the end of the header.
 
         # If no flavor is found in the GCode, then we use the by-default
         self._flavor_reader = self._flavor_readers_dict[self._flavor_default]
@@ -59,19 +75,25 @@ class GCodeReader(MeshReader):
     # PreRead is used to get the correct flavor. If not, Marlin is set by default
     def preRead(self, file_name, *args, **kwargs):
         with open(file_name, "r", encoding = "utf-8") as file:
-            file_data = file.read()
-        return self.preReadFromStream(file_data, args, kwargs)
+            return self.preReadFromStream(file, args, kwargs)
 
-    def readFromStream(self, stream: str, filename: str) -> Optional["CuraSceneNode"]:
+    def readFromStream(self, stream: Union[str, TextIO], filename: str) -> Optional["CuraSceneNode"]:
         if self._flavor_reader is None:
             return None
         return self._flavor_reader.processGCodeStream(stream, filename)
 
     def _read(self, file_name: str) -> Union["SceneNode", List["SceneNode"]]:
+        if self._flavor_reader is not None and Application.getInstance().getPreferences().getValue("gcodereader/lazy_loading"):
+            node = self._flavor_reader.processGCodeFileLazily(file_name)
+            return [node] if node is not None else []
+        if self._flavor_reader is not None and self._flavor_reader.shouldParseInParallel(file_name):
+            node = self._flavor_reader.processGCodeFileInParallel(file_name)
+            return [node] if node is not None else []
+
+        # The file is parsed while it is being read, so it's never completely in memory as a single string.
         with open(file_name, "r", encoding = "utf-8") as file:
-            file_data = file.read()
+            node = self.readFromStream(file, file_name)
         result = []  # type: List[SceneNode]
-        node = self.readFromStream(file_data, file_name)
         if node is not None:
             result.append(node)
         return result
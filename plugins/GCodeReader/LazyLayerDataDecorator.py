@@ -0,0 +1,192 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import numpy
+
+from UM.Application import Application
+from UM.Job import Job
+from UM.Logger import Logger
+from UM.Scene.SceneNodeDecorator import SceneNodeDecorator
+
+from cura.Layer import Layer
+from cura.LayerData import LayerData
+from cura.LayerDataBuilder import LayerDataBuilder
+from cura.LayerDataDecorator import LayerDataDecorator
+
+from .GCodeLayerIndex import GCodeLayerIndex
+
+if TYPE_CHECKING:
+    from .FlavorParser import FlavorParser
+
+
+class LazyLayerDataDecorator(SceneNodeDecorator):
+    """Parses the layers of a g-code file when the layer view shows them.
+
+    Only the top layers of the visible range are put in the layer data of the node. Parsed layers are kept in a cache
+    of limited size, so browsing through the layers doesn't need to parse the same layers over and over again.
+
+    The state of the machine at the start of every layer that follows a parsed layer is remembered, so that it can
+    be parsed exactly. Layers that are parsed out of order start from an estimate of that state instead. The states
+    that follow from an estimate are estimates as well, until the layers before them are parsed from the actual state.
+    Layers that were parsed from an estimate are parsed again once the actual state at their start is known.
+    """
+
+    def __init__(self, layer_index: GCodeLayerIndex, parser: "FlavorParser", first_layer_state: Dict[str, Any], material_color_map: numpy.ndarray) -> None:
+        super().__init__()
+        self._layer_index = layer_index
+        self._parser = parser
+        self._material_color_map = material_color_map
+
+        self._layer_start_states = {0: first_layer_state}  # type: Dict[int, Dict[str, Any]]
+        self._estimated_start_states = set()  # type: Set[int]  # The layers whose start state is an estimate.
+        self._layer_cache = OrderedDict()  # type: OrderedDict[int, Optional[Layer]]  # Least recently used first.
+        self._estimated_layers = set()  # type: Set[int]  # The cached layers that were parsed from an estimate.
+
+        self._loaded_range = None  # type: Optional[Tuple[int, int]]
+        self._requested_range = None  # type: Optional[Tuple[int, int]]
+        self._load_job = None  # type: Optional[_LoadLayersJob]
+        self._callbacks = []  # type: List[Callable[[], None]]
+
+    def getLayerNumberRange(self) -> Tuple[int, int]:
+        """Get the numbers of the first and last layer in the file, also those that aren't loaded."""
+
+        return 0, self._layer_index.getLayerCount() - 1
+
+    def requestLayers(self, minimum: int, maximum: int, callback: Optional[Callable[[], None]] = None) -> None:
+        """Load the layers in a range of layers into the layer data of the node, in the background.
+
+        :param minimum: The lowest visible layer.
+        :param maximum: The highest visible layer.
+        :param callback: Called when the layer data of the node has been updated.
+        """
+
+        layer_range = self._getLoadRange(minimum, maximum)
+        if layer_range == self._loaded_range and self._load_job is None:
+            return
+        self._requested_range = layer_range
+        if callback is not None and callback not in self._callbacks:
+            self._callbacks.append(callback)
+        if self._load_job is None:
+            self._startLoadJob()
+
+    def loadLayers(self, minimum: int, maximum: int) -> LayerData:
+        """Create the layer data of the top layers in a range of layers, parsing the layers that aren't cached.
+
+        :param minimum: The lowest visible layer.
+        :param maximum: The highest visible layer.
+        """
+
+        first, last = self._getLoadRange(minimum, maximum)
+        builder = LayerDataBuilder(LayerDataBuilder.useCompactLayerData())
+        for layer_number in range(first, last + 1):
+            layer = self._getLayer(layer_number)
+            if layer is None:
+                continue
+            # The polygons are shared with the cache, but every build gets its own layers.
+            builder.addLayer(layer_number)
+            builder.setLayerHeight(layer_number, layer.height)
+            builder.setLayerThickness(layer_number, layer.thickness)
+            builder.getLayer(layer_number).polygons.extend(layer.polygons)
+        self._loaded_range = (first, last)
+        return builder.build(self._material_color_map)
+
+    @staticmethod
+    def _getLayerCountPreference() -> int:
+        return max(1, int(Application.getInstance().getPreferences().getValue("gcodereader/lazy_layer_count")))
+
+    def _getLoadRange(self, minimum: int, maximum: int) -> Tuple[int, int]:
+        last = min(max(maximum, 0), self._layer_index.getLayerCount() - 1)
+        first = max(minimum, last - self._getLayerCountPreference() + 1, 0)
+        return min(first, last), last
+
+    def _getLayer(self, layer_number: int) -> Optional[Layer]:
+        start_state = self._layer_start_states.get(layer_number)
+        is_estimated = start_state is None or layer_number in self._estimated_start_states
+        if layer_number in self._layer_cache and (is_estimated or layer_number not in self._estimated_layers):
+            self._layer_cache.move_to_end(layer_number)
+            return self._layer_cache[layer_number]
+
+        lines = self._layer_index.readLayer(layer_number).split("\n")
+        if start_state is not None:
+            self._parser.setMachineState(start_state)
+        else:
+            self._parser.setMachineState(self._layer_start_states[0])  # Keeps the settings of the start g-code.
+            self._parser.estimateMachineState(lines, self._layer_index.getLayerExtruder(layer_number))
+
+        builder = LayerDataBuilder()
+        self._parser.processLayer(layer_number, lines, builder)
+        next_layer_number = layer_number + 1
+        if next_layer_number not in self._layer_start_states or next_layer_number in self._estimated_start_states:
+            # Don't replace the actual state by an estimate.
+            self._layer_start_states[next_layer_number] = self._parser.getMachineState()
+            if is_estimated:
+                self._estimated_start_states.add(next_layer_number)
+            else:
+                self._estimated_start_states.discard(next_layer_number)
+
+        layer = builder.getLayer(layer_number)
+        self._layer_cache[layer_number] = layer
+        self._layer_cache.move_to_end(layer_number)
+        if is_estimated:
+            self._estimated_layers.add(layer_number)
+        else:
+            self._estimated_layers.discard(layer_number)
+        while len(self._layer_cache) > 2 * self._getLayerCountPreference():
+            removed_layer_number, _ = self._layer_cache.popitem(last = False)
+            self._estimated_layers.discard(removed_layer_number)
+        return layer
+
+    def _startLoadJob(self) -> None:
+        if self._requested_range is None:
+            return
+        self._load_job = _LoadLayersJob(self, *self._requested_range)
+        self._requested_range = None
+        self._load_job.finished.connect(self._onLoadJobFinished)
+        self._load_job.start()
+
+    def _onLoadJobFinished(self, job: "_LoadLayersJob") -> None:
+        self._load_job = None
+        if self._requested_range is not None and self._requested_range != self._loaded_range:
+            self._startLoadJob()  # The visible layers changed while loading, so only show the latest ones.
+            return
+        self._requested_range = None
+
+        layer_data = job.getResult()
+        node = self.getNode()
+        if layer_data is None or node is None:
+            return
+        decorator = node.getDecorator(LayerDataDecorator)
+        if decorator is None:
+            return
+        decorator.setLayerData(layer_data)
+
+        callbacks = self._callbacks
+        self._callbacks = []
+        for callback in callbacks:
+            callback()
+
+    def __deepcopy__(self, memo) -> "LazyLayerDataDecorator":
+        # The copy gets a parser of its own, since the layers of both could be loaded at the same time.
+        copied_decorator = LazyLayerDataDecorator(self._layer_index, self._parser.createLayerParser(), self._layer_start_states[0], self._material_color_map)
+        copied_decorator._layer_start_states = self._layer_start_states.copy()
+        copied_decorator._estimated_start_states = self._estimated_start_states.copy()
+        copied_decorator._layer_cache = self._layer_cache.copy()
+        copied_decorator._estimated_layers = self._estimated_layers.copy()
+        return copied_decorator
+
+
+class _LoadLayersJob(Job):
+    def __init__(self, decorator: LazyLayerDataDecorator, minimum: int, maximum: int) -> None:
+        super().__init__()
+        self._decorator = decorator
+        self._minimum = minimum
+        self._maximum = maximum
+
+    def run(self) -> None:
+        try:
+            self.setResult(self._decorator.loadLayers(self._minimum, self._maximum))
+        except Exception:
+            Logger.logException("w", "An exception occurred while loading g-code layers.")
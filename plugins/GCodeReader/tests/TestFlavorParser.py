@@ -0,0 +1,131 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import concurrent.futures
+import os
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+import numpy
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from FlavorParser import FlavorParser, PathBuffer, _parseGCodeShard
+from GCodeLayerIndex import GCodeLayerIndex
+
+
+@pytest.fixture
+def flavor_parser():
+    with patch("FlavorParser.CuraApplication", MagicMock()):
+        return FlavorParser()
+
+
+def test_pathBufferGrows():
+    path = PathBuffer()
+    for i in range(3000):
+        path.append([i, i + 1, i + 2, 10, 0, 1])
+    assert len(path) == 3000
+    assert numpy.array_equal(path.getData()[2999], [2999, 3000, 3001, 10, 0, 1])
+
+    path.clear()
+    assert len(path) == 0
+    assert path.getData().shape == (0, 6)
+
+
+@pytest.mark.parametrize("line, number", [
+    ("G1 X10 Y10", 1),
+    ("G28;home", 28),
+    ("M104\tS200", 104),
+    ("T1", 1),
+    ("G", None),
+    ("GX10", None)
+])
+def test_getCommandNumber(line, number):
+    assert FlavorParser._getCommandNumber(line) == number
+
+
+def test_processGCodeParameters(flavor_parser):
+    flavor_parser._gCode1 = MagicMock()
+    flavor_parser.processGCode(1, "G1 x10 Y20.5 F600 E-1 Zfoo ; comment X30", MagicMock(), PathBuffer())
+    params = flavor_parser._gCode1.call_args[0][1]
+    assert params == (10.0, 20.5, None, 10.0, -1.0)
+
+
+def test_calculateLineWidths(flavor_parser):
+    flavor_parser._current_filament_diameter = 1.75
+    points = numpy.array([[0, 0, 0], [10, 0, 0], [10, 0, 0], [20, 0, 0], [21, 0, 0]], dtype = numpy.float32)
+    extrusion_values = numpy.array([0, 0.4, 0.5, 0.1, 100], dtype = numpy.float32)
+    line_widths = flavor_parser._calculateLineWidths(points, extrusion_values, 0.2)
+
+    filament_area = (1.75 / 2) ** 2 * numpy.pi
+    assert line_widths[0] == pytest.approx(0.4 * filament_area / 10 / 0.2)
+    assert line_widths[1] == pytest.approx(0.1)  # No distance travelled.
+    assert line_widths[2] == 0.0  # Retraction.
+    assert line_widths[3] == pytest.approx(0.35)  # Too wide.
+
+
+def test_numberLayer(flavor_parser):
+    flavor_parser._resetMachineState([1.75], {})
+    # Raft layers have negative numbers in the g-code, but are numbered from 0 in the layer data.
+    assert [flavor_parser._numberLayer(layer_number) for layer_number in [-2, -1, 0, 1]] == [0, 1, 2, 3]
+
+
+def test_parseGCodeShard(tmp_path):
+    file_name = str(tmp_path / "test.gcode")
+    with open(file_name, "w") as file:
+        file.write("G28\nG92 E0\n")
+        for layer in range(4):
+            z = (layer + 1) * 0.2
+            file.write(";LAYER:{layer}\nG0 F6000 X0 Y0 Z{z}\n;TYPE:WALL-OUTER\nG1 F1500 X10 Y0 E{e1}\nG1 X10 Y10 E{e2}\n".format(layer = layer, z = z, e1 = layer + 0.5, e2 = layer + 1))
+    layer_index = GCodeLayerIndex(file_name)
+    layer_index.build()
+
+    with patch("FlavorParser.CuraApplication", MagicMock()):
+        parser = FlavorParser()
+        parser._resetMachineState([1.75], {})
+        start_state = parser.getMachineState()
+        arguments = (FlavorParser, [1.75], {}, layer_index)
+
+        _, whole, _ = _parseGCodeShard(*arguments, start_state, [], [(layer, layer) for layer in range(4)])
+        _, _, first_end_state = _parseGCodeShard(*arguments, start_state, [], [(0, 0), (1, 1)])
+        second_start_state, second, _ = _parseGCodeShard(*arguments, start_state, [0, 1], [(2, 2), (3, 3)])
+
+    assert second_start_state == first_end_state  # The warm-up layers give the actual state at the start of the shard.
+    assert len(whole) == 4
+    for whole_layer, second_layer in zip(whole[2:], second):
+        assert whole_layer[:2] == second_layer[:2]  # Height and thickness.
+        for whole_polygon, second_polygon in zip(whole_layer[2], second_layer[2]):
+            assert whole_polygon[0] == second_polygon[0]
+            for whole_array, second_array in zip(whole_polygon[1:], second_polygon[1:]):
+                assert numpy.array_equal(whole_array, second_array)
+
+
+def test_machineStatesMatch(flavor_parser):
+    flavor_parser._resetMachineState([1.75], {})
+    state = flavor_parser.getMachineState()
+    estimated_state = flavor_parser.getMachineState()
+    estimated_state["_current_position"] = estimated_state["_current_position"]._replace(x = state["_current_position"].x + 1e-9)
+    estimated_state["_extrusion_length_offset"][0] += 1e-9
+    assert FlavorParser._machineStatesMatch(state, estimated_state)  # Only rounding differences.
+
+    estimated_state["_current_position"].e[0] += 0.01
+    assert not FlavorParser._machineStatesMatch(state, estimated_state)
+
+    estimated_state = flavor_parser.getMachineState()
+    estimated_state["_is_absolute_extrusion"] = not state["_is_absolute_extrusion"]
+    assert not FlavorParser._machineStatesMatch(state, estimated_state)
+
+
+def test_waitForShardCancelled(flavor_parser):
+    future = concurrent.futures.Future()
+    flavor_parser._cancel_check_interval = 0.01
+    timer = threading.Timer(0.05, lambda: setattr(flavor_parser, "_cancelled", True))
+    timer.start()
+    assert flavor_parser._waitForShard(future) is None  # Doesn't wait for the shard anymore.
+    timer.join()
+
+    flavor_parser._cancelled = False
+    future.set_result("result")
+    assert flavor_parser._waitForShard(future) == "result"
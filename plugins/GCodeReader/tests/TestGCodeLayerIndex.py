@@ -0,0 +1,76 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from GCodeLayerIndex import GCodeLayerIndex, LazyGCodeList
+
+gcode = ";FLAVOR:Marlin\nG28\n;LAYER:0\nG1 X10 E1\nT1\nG1 X20 E2\n;LAYER:1\nG1 X30 E3\nT0 ; back\n;LAYER:2\nG1 X40 E4\n"
+
+
+@pytest.fixture
+def layer_index(tmp_path):
+    file_name = str(tmp_path / "test.gcode")
+    with open(file_name, "w", newline = "") as file:
+        file.write(gcode)
+    index = GCodeLayerIndex(file_name)
+    index.build()
+    return index
+
+
+def test_build(layer_index):
+    assert layer_index.getLayerCount() == 3
+    assert layer_index.getChunkCount() == 4
+    assert layer_index.readChunk(0) == ";FLAVOR:Marlin\nG28\n"
+    assert layer_index.readLayer(1) == ";LAYER:1\nG1 X30 E3\nT0 ; back\n"
+    assert [layer_index.getLayerExtruder(layer) for layer in range(3)] == [0, 1, 0]
+    assert [layer_index.getLayerNumber(layer) for layer in range(3)] == [0, 1, 2]
+
+
+def test_buildSkipsInvalidLayerComments(tmp_path):
+    file_name = str(tmp_path / "test.gcode")
+    with open(file_name, "w", newline = "") as file:
+        file.write(";LAYER:-1\nG1 X10\n;LAYER:\nG1 X20\n;LAYER:0\nG1 X30\n")
+    index = GCodeLayerIndex(file_name)
+    index.build()
+    assert index.getLayerCount() == 2
+    assert index.getLayerNumber(0) == -1
+    assert index.readLayer(0) == ";LAYER:-1\nG1 X10\n;LAYER:\nG1 X20\n"
+
+
+def test_readLayers(layer_index):
+    assert layer_index.readLayers(1, 3) == [layer_index.readLayer(1), layer_index.readLayer(2)]
+    assert layer_index.readLayers(0, 1) == [";LAYER:0\nG1 X10 E1\nT1\nG1 X20 E2\n"]
+
+
+def test_buildEmptyFile(tmp_path):
+    file_name = str(tmp_path / "empty.gcode")
+    open(file_name, "w").close()
+    index = GCodeLayerIndex(file_name)
+    index.build()
+    assert index.getLayerCount() == 0
+    assert index.getChunkCount() == 1
+    assert index.readChunk(0) == ""
+
+
+def test_lazyGCodeList(layer_index):
+    gcode_list = LazyGCodeList(layer_index)
+    assert len(gcode_list) == 4
+    assert "".join(gcode_list) == gcode
+    assert gcode_list[-1] == ";LAYER:2\nG1 X40 E4\n"
+
+    gcode_list[0] = ";Post-processed\n" + gcode_list[0]
+    assert gcode_list[0].startswith(";Post-processed\n")
+    assert layer_index.readChunk(0) == ";FLAVOR:Marlin\nG28\n"  # The file isn't changed.
+
+    gcode_list.append(";END\n")
+    assert len(gcode_list) == 5
+    assert "".join(gcode_list) == ";Post-processed\n" + gcode + ";END\n"
+
+    with pytest.raises(IndexError):
+        gcode_list[5]
@@ -3,12 +3,14 @@
 
 import re  # For escaping characters in the settings.
 import json
+from typing import Iterator, Sequence
 
 from UM.Mesh.MeshWriter import MeshWriter
 from UM.Logger import Logger
 from UM.Application import Application
 from UM.Settings.InstanceContainer import InstanceContainer
 from cura.Machines.ContainerTree import ContainerTree
+from cura.Scene.GCodeChunkList import GCodeChunkList
 
 from UM.i18n import i18nCatalog
 
@@ -63,15 +65,18 @@ class GCodeWriter(MeshWriter):
         entire scene is always written to the file since it is not possible to
         separate the g-code for just specific nodes.
 
+        The chunks of g-code are written to the stream one by one, so the
+        g-code is never completely copied in memory.
+
         :param stream: The stream to write the g-code to.
         :param nodes: This is ignored.
         :param mode: Additional information on how to format the g-code in the
-            file. This must always be text mode.
+            file. In binary mode, the g-code is written encoded as UTF-8.
         """
 
-        if mode != MeshWriter.OutputMode.TextMode:
-            Logger.log("e", "GCodeWriter does not support non-text mode.")
-            self.setInformation(catalog.i18nc("@error:not supported", "GCodeWriter does not support non-text mode."))
+        if mode not in (MeshWriter.OutputMode.TextMode, MeshWriter.OutputMode.BinaryMode):
+            Logger.log("e", "GCodeWriter does not support this output mode.")
+            self.setInformation(catalog.i18nc("@error:not supported", "GCodeWriter does not support this output mode."))
             return False
 
         active_build_plate = Application.getInstance().getMultiBuildPlateModel().activeBuildPlate
@@ -83,19 +88,34 @@ class GCodeWriter(MeshWriter):
         gcode_list = gcode_dict.get(active_build_plate, None)
         if gcode_list is not None:
             has_settings = False
-            for gcode in gcode_list:
-                if gcode[:len(self._setting_keyword)] == self._setting_keyword:
-                    has_settings = True
-                stream.write(gcode)
+            if mode == MeshWriter.OutputMode.BinaryMode:
+                setting_keyword = self._setting_keyword.encode("utf-8")
+                for encoded_gcode in self._iterEncoded(gcode_list):
+                    if encoded_gcode[:len(setting_keyword)] == setting_keyword:
+                        has_settings = True
+                    stream.write(encoded_gcode)
+            else:
+                for gcode in gcode_list:
+                    if gcode[:len(self._setting_keyword)] == self._setting_keyword:
+                        has_settings = True
+                    stream.write(gcode)
             # Serialise the current container stack and put it at the end of the file.
             if not has_settings:
                 settings = self._serialiseSettings(Application.getInstance().getGlobalContainerStack())
-                stream.write(settings)
+                stream.write(settings.encode("utf-8") if mode == MeshWriter.OutputMode.BinaryMode else settings)
             return True
 
         self.setInformation(catalog.i18nc("@warning:status", "Please prepare G-code before exporting."))
         return False
 
+    @staticmethod
+    def _iterEncoded(gcode_list: Sequence[str]) -> Iterator[bytes]:
+        """Iterate over the chunks of g-code encoded as UTF-8, without encoding them again if they are stored that way."""
+
+        if isinstance(gcode_list, GCodeChunkList):
+            return gcode_list.iterEncoded()
+        return (gcode.encode("utf-8") for gcode in gcode_list)
+
     def _serialiseSettings(self, stack):
         """Serialises a container stack to prepare it for writing at the end of the g-code.
 
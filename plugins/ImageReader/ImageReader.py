@@ -4,8 +4,9 @@
 import numpy
 
 import math
+from typing import List, Tuple
 
-from PyQt6.QtGui import QImage, qRed, qGreen, qBlue, qAlpha
+from PyQt6.QtGui import QImage
 from PyQt6.QtCore import Qt
 
 from UM.Mesh.MeshReader import MeshReader
@@ -94,15 +95,17 @@ class ImageReader(MeshReader):
         texel_width = 1.0 / width_minus_one * scale_vector.x
         texel_height = 1.0 / height_minus_one * scale_vector.z
 
-        height_data = numpy.zeros((height, width), dtype = numpy.float32)
+        has_alpha_channel = img.hasAlphaChannel()
+        pixels = self._getPixels(img)
+        red = (pixels >> 16) & 0xFF
+        green = (pixels >> 8) & 0xFF
+        blue = pixels & 0xFF
 
-        for x in range(0, width):
-            for y in range(0, height):
-                qrgb = img.pixel(x, y)
-                if use_transparency_model:
-                    height_data[y, x] = (0.299 * math.pow(qRed(qrgb) / 255.0, 2.2) + 0.587 * math.pow(qGreen(qrgb) / 255.0, 2.2) + 0.114 * math.pow(qBlue(qrgb) / 255.0, 2.2))
-                else:
-                    height_data[y, x] = (0.212655 * qRed(qrgb) + 0.715158 * qGreen(qrgb) + 0.072187 * qBlue(qrgb)) / 255 # fast computation ignoring gamma and degamma
+        if use_transparency_model:
+            height_data = 0.299 * numpy.power(red / 255.0, 2.2) + 0.587 * numpy.power(green / 255.0, 2.2) + 0.114 * numpy.power(blue / 255.0, 2.2)
+        else:
+            height_data = (0.212655 * red + 0.715158 * green + 0.072187 * blue) / 255 # fast computation ignoring gamma and degamma
+        height_data = height_data.astype(numpy.float32)
 
         Job.yieldThread()
 
@@ -129,100 +132,97 @@ class ImageReader(MeshReader):
         if use_transparency_model:
             divisor = 1.0 / math.log(transmittance_1mm / 100.0) # log-base doesn't matter here. Precompute this value for faster computation of each pixel.
             min_luminance = (transmittance_1mm / 100.0) ** height_from_base
-            for (y, x) in numpy.ndindex(height_data.shape):
-                mapped_luminance = min_luminance + (1.0 - min_luminance) * height_data[y, x]
-                height_data[y, x] = base_height + divisor * math.log(mapped_luminance) # use same base as a couple lines above this
+            mapped_luminance = min_luminance + (1.0 - min_luminance) * height_data.astype(numpy.float64)
+            height_data = (base_height + divisor * numpy.log(mapped_luminance)).astype(numpy.float32) # use same base as a couple lines above this
         else:
             height_data *= scale_vector.y
             height_data += base_height
 
-        if img.hasAlphaChannel():
-            for x in range(0, width):
-                for y in range(0, height):
-                    height_data[y, x] *= qAlpha(img.pixel(x, y)) / 255.0
+        if has_alpha_channel:
+            height_data *= ((pixels >> 24) & 0xFF) / 255.0
 
-        heightmap_face_count = 2 * height_minus_one * width_minus_one
-        total_face_count = heightmap_face_count + (width_minus_one * 2) * (height_minus_one * 2) + 2
+        Job.yieldThread()
 
-        mesh.reserveFaceCount(total_face_count)
+        vertices, indices = self._buildHeightmapMesh(height_data, texel_width, texel_height)
+        mesh.setVertices(vertices)
+        mesh.setIndices(indices)
+        mesh.calculateNormals()
 
-        # initialize to texel space vertex offsets.
-        # 6 is for 6 vertices for each texel quad.
-        heightmap_vertices = numpy.zeros((width_minus_one * height_minus_one, 6, 3), dtype = numpy.float32)
-        heightmap_vertices = heightmap_vertices + numpy.array([[
-            [0, base_height, 0],
-            [0, base_height, texel_height],
-            [texel_width, base_height, texel_height],
-            [texel_width, base_height, texel_height],
-            [texel_width, base_height, 0],
-            [0, base_height, 0]
-        ]], dtype = numpy.float32)
+        scene_node.setMeshData(mesh.build())
 
-        offsetsz, offsetsx = numpy.mgrid[0: height_minus_one, 0: width - 1]
-        offsetsx = numpy.array(offsetsx, numpy.float32).reshape(-1, 1) * texel_width
-        offsetsz = numpy.array(offsetsz, numpy.float32).reshape(-1, 1) * texel_height
+        return scene_node
 
-        # offsets for each texel quad
-        heightmap_vertex_offsets = numpy.concatenate([offsetsx, numpy.zeros((offsetsx.shape[0], offsetsx.shape[1]), dtype = numpy.float32), offsetsz], 1)
-        heightmap_vertices += heightmap_vertex_offsets.repeat(6, 0).reshape(-1, 6, 3)
+    @staticmethod
+    def _getPixels(img: QImage) -> numpy.ndarray:
+        """Get the colours of all pixels of an image at once, as 0xAARRGGBB values in an array of rows."""
 
-        # apply height data to y values
-        heightmap_vertices[:, 0, 1] = heightmap_vertices[:, 5, 1] = height_data[:-1, :-1].reshape(-1)
-        heightmap_vertices[:, 1, 1] = height_data[1:, :-1].reshape(-1)
-        heightmap_vertices[:, 2, 1] = heightmap_vertices[:, 3, 1] = height_data[1:, 1:].reshape(-1)
-        heightmap_vertices[:, 4, 1] = height_data[:-1, 1:].reshape(-1)
+        img = img.convertToFormat(QImage.Format.Format_ARGB32)
+        bits = img.constBits()
+        bits.setsize(img.sizeInBytes())
+        rows = numpy.frombuffer(bits, dtype = numpy.uint32).reshape(img.height(), img.bytesPerLine() // 4)
+        return rows[:, :img.width()].copy()  # Copy, because the buffer belongs to the image.
 
-        heightmap_indices = numpy.array(numpy.mgrid[0:heightmap_face_count * 3], dtype = numpy.int32).reshape(-1, 3)
+    @staticmethod
+    def _buildHeightmapMesh(height_data: numpy.ndarray, texel_width: float, texel_height: float) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Create a closed mesh of a heightmap, with its walls and bottom.
 
-        mesh._vertices[0:(heightmap_vertices.size // 3), :] = heightmap_vertices.reshape(-1, 3)
-        mesh._indices[0:(heightmap_indices.size // 3), :] = heightmap_indices
+        The texels share their vertices with their neighbours, so the heightmap gets smooth normals. Each wall and the
+        bottom have vertices of their own, so their normals stay flat and their edges stay sharp.
 
-        mesh._vertex_count = heightmap_vertices.size // 3
-        mesh._face_count = heightmap_indices.size // 3
+        :param height_data: The height of each pixel, in rows along the Z axis.
+        :return: The vertices and the indices of the faces of the mesh.
+        """
 
+        height, width = height_data.shape
+        width_minus_one = width - 1
+        height_minus_one = height - 1
         geo_width = width_minus_one * texel_width
         geo_height = height_minus_one * texel_height
 
-        # bottom
-        mesh.addFaceByPoints(0, 0, 0, 0, 0, geo_height, geo_width, 0, geo_height)
-        mesh.addFaceByPoints(geo_width, 0, geo_height, geo_width, 0, 0, 0, 0, 0)
-
-        # north and south walls
-        for n in range(0, width_minus_one):
-            x = n * texel_width
-            nx = (n + 1) * texel_width
-
-            hn0 = height_data[0, n]
-            hn1 = height_data[0, n + 1]
+        xs = numpy.arange(width, dtype = numpy.float32) * texel_width
+        zs = numpy.arange(height, dtype = numpy.float32) * texel_height
+        top_vertices = numpy.empty((height, width, 3), dtype = numpy.float32)
+        top_vertices[:, :, 0] = xs[numpy.newaxis, :]
+        top_vertices[:, :, 1] = height_data
+        top_vertices[:, :, 2] = zs[:, numpy.newaxis]
 
-            hs0 = height_data[height_minus_one, n]
-            hs1 = height_data[height_minus_one, n + 1]
+        # The vertices of the heightmap, followed by the vertices of the bottom, and of the north, south, west and east
+        # walls.
+        vertex_parts = [top_vertices.reshape(-1, 3)]  # type: List[numpy.ndarray]
+        bottom_start = width * height
+        vertex_parts.append(numpy.array([[0, 0, 0], [0, 0, geo_height], [geo_width, 0, geo_height], [geo_width, 0, 0]], dtype = numpy.float32))
+        vertex_count = bottom_start + 4
 
-            mesh.addFaceByPoints(x, 0, 0, nx, 0, 0, nx, hn1, 0)
-            mesh.addFaceByPoints(nx, hn1, 0, x, hn0, 0, x, 0, 0)
+        top = numpy.arange(width * height, dtype = numpy.int32).reshape(height, width)
+        faces = []  # type: List[numpy.ndarray]
 
-            mesh.addFaceByPoints(x, 0, geo_height, nx, 0, geo_height, nx, hs1, geo_height)
-            mesh.addFaceByPoints(nx, hs1, geo_height, x, hs0, geo_height, x, 0, geo_height)
+        # Two faces for each texel.
+        faces.append(numpy.stack([top[:-1, :-1], top[1:, :-1], top[1:, 1:]], axis = -1).reshape(-1, 3))
+        faces.append(numpy.stack([top[1:, 1:], top[:-1, 1:], top[:-1, :-1]], axis = -1).reshape(-1, 3))
 
-        # west and east walls
-        for n in range(0, height_minus_one):
-            y = n * texel_height
-            ny = (n + 1) * texel_height
-
-            hw0 = height_data[n, 0]
-            hw1 = height_data[n + 1, 0]
-
-            he0 = height_data[n, width_minus_one]
-            he1 = height_data[n + 1, width_minus_one]
-
-            mesh.addFaceByPoints(0, 0, y, 0, 0, ny, 0, hw1, ny)
-            mesh.addFaceByPoints(0, hw1, ny, 0, hw0, y, 0, 0, y)
-
-            mesh.addFaceByPoints(geo_width, 0, y, geo_width, 0, ny, geo_width, he1, ny)
-            mesh.addFaceByPoints(geo_width, he1, ny, geo_width, he0, y, geo_width, 0, y)
-
-        mesh.calculateNormals(fast = True)
-
-        scene_node.setMeshData(mesh.build())
-
-        return scene_node
+        # bottom
+        faces.append(numpy.array([[bottom_start, bottom_start + 1, bottom_start + 2],
+                                  [bottom_start + 2, bottom_start + 3, bottom_start]], dtype = numpy.int32))
+
+        # Two faces for each segment of the walls, between the bottom and a copy of the edge of the heightmap.
+        def addWall(top_edge: numpy.ndarray) -> None:
+            nonlocal vertex_count
+            edge_length = len(top_edge)
+            bottom_edge = top_edge.copy()
+            bottom_edge[:, 1] = 0
+            vertex_parts.append(top_edge)
+            vertex_parts.append(bottom_edge)
+
+            top_indices = numpy.arange(vertex_count, vertex_count + edge_length, dtype = numpy.int32)
+            bottom_indices = top_indices + edge_length
+            vertex_count += 2 * edge_length
+            faces.append(numpy.stack([bottom_indices[:-1], bottom_indices[1:], top_indices[1:]], axis = -1))
+            faces.append(numpy.stack([top_indices[1:], top_indices[:-1], bottom_indices[:-1]], axis = -1))
+
+        addWall(top_vertices[0, :])
+        addWall(top_vertices[height_minus_one, :])
+        addWall(top_vertices[:, 0])
+        addWall(top_vertices[:, width_minus_one])
+
+        vertices = numpy.concatenate(vertex_parts)
+        return vertices, numpy.concatenate(faces).astype(numpy.int32)
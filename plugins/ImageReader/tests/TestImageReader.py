@@ -0,0 +1,59 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import numpy
+
+import ImageReader
+
+
+def buildHeightmapMesh(height_data, texel_width, texel_height):
+    try:
+        return ImageReader.ImageReader.ImageReader._buildHeightmapMesh(height_data, texel_width, texel_height)
+    except AttributeError:
+        return ImageReader.ImageReader._buildHeightmapMesh(height_data, texel_width, texel_height)
+
+
+# Two rows of three pixels.
+height_data = numpy.array([[1, 2, 3],
+                           [4, 5, 6]], dtype = numpy.float32)
+
+
+def test_buildHeightmapMeshVertices():
+    vertices, _ = buildHeightmapMesh(height_data, 2, 3)
+
+    # The heightmap, the bottom, and a top and bottom edge for the north, south, west and east walls.
+    assert vertices.shape == (6 + 4 + 2 * (3 + 3 + 2 + 2), 3)
+    assert vertices.dtype == numpy.float32
+    assert vertices[:6].tolist() == [[0, 1, 0], [2, 2, 0], [4, 3, 0],
+                                     [0, 4, 3], [2, 5, 3], [4, 6, 3]]
+    assert vertices[6:10].tolist() == [[0, 0, 0], [0, 0, 3], [4, 0, 3], [4, 0, 0]]
+    assert vertices[10:16].tolist() == [[0, 1, 0], [2, 2, 0], [4, 3, 0],  # Copy of the north edge of the heightmap.
+                                        [0, 0, 0], [2, 0, 0], [4, 0, 0]]
+
+
+def test_buildHeightmapMeshFaces():
+    vertices, indices = buildHeightmapMesh(height_data, 2, 3)
+
+    # Two faces for each texel, for the bottom, and for each segment of the walls.
+    assert indices.shape == (2 * 2 + 2 + 2 * (2 + 2 + 1 + 1), 3)
+    assert indices.dtype == numpy.int32
+    assert indices.min() == 0
+    assert indices.max() == len(vertices) - 1  # Every vertex is used.
+
+    # The heightmap doesn't share its vertices with the walls and the bottom, so their normals stay flat.
+    heightmap_faces = indices[:4]
+    other_faces = indices[4:]
+    assert heightmap_faces.max() < 6
+    assert other_faces.min() >= 6
+
+    # The bottom and each wall are flat, and don't share vertices with each other either.
+    parts = [(4, 6, 6, 10, 1, 0),  # Faces, vertices, and the axis and coordinate of the plane they are in.
+             (6, 10, 10, 16, 2, 0),
+             (10, 14, 16, 22, 2, 3),
+             (14, 16, 22, 26, 0, 0),
+             (16, 18, 26, 30, 0, 4)]
+    for face_start, face_end, vertex_start, vertex_end, axis, coordinate in parts:
+        faces = indices[face_start:face_end]
+        assert faces.min() == vertex_start
+        assert faces.max() == vertex_end - 1
+        assert (vertices[faces][:, :, axis] == coordinate).all()
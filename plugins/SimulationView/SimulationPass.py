@@ -1,8 +1,10 @@
 # Copyright (c) 2021 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
+import itertools
 import math
 
 from UM.Math.Color import Color
+from UM.Math.Matrix import Matrix
 from UM.Math.Vector import Vector
 from UM.Scene.Iterator.DepthFirstIterator import DepthFirstIterator
 from UM.Resources import Resources
@@ -155,25 +157,26 @@ class SimulationPass(RenderPass):
                             # We look for the position of the head, searching the point of the current path
                             index = int(self._layer_view.getCurrentPath()) if not math.isnan(
                                 self._layer_view.getCurrentPath()) else 0
-                            for polygon in layer_data.getLayer(layer).polygons:
+                            # Layer polygons can hold a batch of polygons, so look at the points of each separate one.
+                            for polygon_data in itertools.chain.from_iterable(polygon.getPolygonData() for polygon in layer_data.getLayer(layer).polygons):
                                 # The size indicates all values in the two-dimension array, and the second dimension is
                                 # always size 3 because we have 3D points.
-                                if index >= polygon.data.size // 3 :
-                                    index -= polygon.data.size // 3
+                                if index >= polygon_data.size // 3 :
+                                    index -= polygon_data.size // 3
                                     continue
                                 # The head position is calculated and translated
                                 ratio = self._layer_view.getCurrentPath() - math.floor(self._layer_view.getCurrentPath())
-                                pos_a = Vector(polygon.data[index][0], polygon.data[index][1],
-                                               polygon.data[index][2])
+                                pos_a = Vector(polygon_data[index][0], polygon_data[index][1],
+                                               polygon_data[index][2])
                                 vertex_before_head = pos_a
                                 vertex_distance_ratio = ratio
-                                if ratio <= 0.0001 or index + 1 == len(polygon.data):
+                                if ratio <= 0.0001 or index + 1 == len(polygon_data):
                                     # in case there multiple polygons and polygon changes, the first point has the same value as the last point in the previous polygon
                                     head_position = pos_a + node.getWorldPosition()
                                 else:
-                                    pos_b = Vector(polygon.data[index + 1][0],
-                                                   polygon.data[index + 1][1],
-                                                   polygon.data[index + 1][2])
+                                    pos_b = Vector(polygon_data[index + 1][0],
+                                                   polygon_data[index + 1][1],
+                                                   polygon_data[index + 1][2])
                                     vec = pos_a * (1.0 - ratio) + pos_b * ratio
                                     head_position = vec + node.getWorldPosition()
                                     vertex_after_head = pos_b
@@ -202,12 +205,15 @@ class SimulationPass(RenderPass):
                     self._layer_shader.setUniformValue("u_next_vertex", not_a_vector)
                     self._layer_shader.setUniformValue("u_last_line_ratio", 1.0)
 
-                    # The first line does not have a previous line: add a MoveCombingType in front for start detection
-                    # this way the first start of the layer can also be drawn
-                    prev_line_types = numpy.concatenate([numpy.asarray([LayerPolygon.MoveCombingType], dtype = numpy.float32), layer_data._attributes["line_types"]["value"]])
-                    # Remove the last element
-                    prev_line_types = prev_line_types[0:layer_data._attributes["line_types"]["value"].size]
-                    layer_data._attributes["prev_line_types"] =  {'opengl_type': 'float', 'value': prev_line_types, 'opengl_name': 'a_prev_line_type'}
+                    # Compact layer data already holds the previous line types, and they only need to be computed once.
+                    if not layer_data.isCompact() and "prev_line_types" not in layer_data._attributes:
+                        # The first line does not have a previous line: add a MoveCombingType in front for start detection
+                        # this way the first start of the layer can also be drawn
+                        prev_line_types = numpy.concatenate([numpy.asarray([LayerPolygon.MoveCombingType], dtype = numpy.float32), layer_data._attributes["line_types"]["value"]])
+                        # Remove the last element
+                        prev_line_types = prev_line_types[0:layer_data._attributes["line_types"]["value"].size]
+                        layer_data._attributes["prev_line_types"] =  {'opengl_type': 'float', 'value': prev_line_types, 'opengl_name': 'a_prev_line_type'}
+                    self._setLayerDataUniforms(layer_data)
 
                     layers_batch = RenderBatch(self._current_shader, type = RenderBatch.RenderType.Solid, mode = RenderBatch.RenderMode.Lines, range = (start, end), backface_cull = True)
                     layers_batch.addItem(node.getWorldTransformation(), layer_data)
@@ -231,6 +237,7 @@ class SimulationPass(RenderPass):
 
                     self._old_current_layer = self._layer_view.getCurrentLayer()
                     self._old_current_path = self._layer_view.getCurrentPath()
+                    self._setLayerDataUniforms(None)  # The layer meshes below have colors per vertex.
 
                 # Create a new batch that is not range-limited
                 batch = RenderBatch(self._layer_shader, type = RenderBatch.RenderType.Solid)
@@ -262,6 +269,26 @@ class SimulationPass(RenderPass):
 
         self.release()
 
+    def _setLayerDataUniforms(self, layer_data) -> None:
+        """Let the layer shaders decode compact layer data, with the color palettes of that data.
+
+        :param layer_data: The layer data that is drawn next, or None for meshes with colors per vertex.
+        """
+
+        compact = layer_data is not None and layer_data.isCompact()
+        self._layer_shader.setUniformValue("u_compact_layer_data", 1 if compact else 0)
+        self._layer_shadow_shader.setUniformValue("u_compact_layer_data", 1 if compact else 0)
+        if not compact:
+            return
+
+        # Each matrix holds the colors of four line types or extruders, one color per column.
+        line_type_colors = layer_data.getLineTypeColors()
+        for i in range(3):
+            self._layer_shader.setUniformValue("u_line_type_colors_%d" % i, Matrix(line_type_colors[i * 4:(i + 1) * 4].T))
+        material_colors = layer_data.getMaterialColors()
+        for i in range(2):
+            self._layer_shader.setUniformValue("u_material_colors_%d" % i, Matrix(material_colors[i * 4:(i + 1) * 4].T))
+
     def _onSceneChanged(self, changed_object: SceneNode):
         if changed_object.callDecoration("getLayerData"):  # Any layer data has changed.
             self._switching_layers = True
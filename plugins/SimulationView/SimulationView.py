@@ -256,21 +256,20 @@ class SimulationView(CuraView):
             polylines = self.getLayerData()
             if polylines is not None:
                 for polyline in polylines.polygons:
-                    for line_index in range(len(polyline.lineLengths)):
-                        line_length = polyline.lineLengths[line_index]
-                        line_feedrate = polyline.lineFeedrates[line_index][0]
-
-                        if line_feedrate > 0.0:
-                            line_duration = line_length / line_feedrate
-                        else:
-                            # Something is wrong with this line, set an arbitrary non-null duration
-                            line_duration = 0.1
-
-                        total_duration += line_duration / SimulationView.SIMULATION_FACTOR
-                        self._cumulative_line_duration.append(total_duration)
-
-                    # for tool change we add an extra tool path
-                    self._cumulative_line_duration.append(total_duration)
+                    line_lengths = polyline.lineLengths
+                    line_feedrates = polyline.lineFeedrates.reshape(-1)
+                    # Something is wrong with lines without feedrate, set an arbitrary non-null duration for those.
+                    line_durations = numpy.full(line_lengths.shape, 0.1)
+                    numpy.divide(line_lengths, line_feedrates, out = line_durations, where = line_feedrates > 0.0)
+                    line_durations /= SimulationView.SIMULATION_FACTOR
+
+                    # for tool change we add an extra tool path after every polygon in the batch
+                    line_durations = numpy.insert(line_durations, polyline.polygonOffsets[1:], 0.0)
+
+                    cumulative_durations = total_duration + numpy.cumsum(line_durations)
+                    if cumulative_durations.size > 0:
+                        total_duration = float(cumulative_durations[-1])
+                    self._cumulative_line_duration.extend(cumulative_durations.tolist())
             # set current cached layer
             self._cumulative_line_duration_layer = self.getCurrentLayer()
 
@@ -355,6 +354,7 @@ class SimulationView(CuraView):
             self._current_layer_num = min(max(value, 0), self._max_layers)
             self._minimum_layer_num = min(self._current_layer_num, self._minimum_layer_num)
 
+            self._requestVisibleLayers()
             self._startUpdateTopLayers()
             self.currentLayerNumChanged.emit()
 
@@ -369,6 +369,7 @@ class SimulationView(CuraView):
             self._minimum_layer_num = min(max(value, 0), self._max_layers)
             self._current_layer_num = max(self._current_layer_num, self._minimum_layer_num)
 
+            self._requestVisibleLayers()
             self._startUpdateTopLayers()
             self.currentLayerNumChanged.emit()
 
@@ -540,6 +541,10 @@ class SimulationView(CuraView):
                 continue
 
             self.setActivity(True)
+            layer_number_range = node.callDecoration("getLayerNumberRange")
+            if layer_number_range is not None:  # Not all layers are loaded.
+                new_max_layers = max(new_max_layers, layer_number_range[1] - layer_number_range[0])
+                continue
             min_layer_number = sys.maxsize
             max_layer_number = -sys.maxsize
             for layer_id in layer_data.getLayers():
@@ -803,6 +808,17 @@ class SimulationView(CuraView):
         scene = Application.getInstance().getController().getScene()
         scene.sceneChanged.emit(scene.getRoot())
 
+    def _requestVisibleLayers(self) -> None:
+        """Make sure that the visible layers are loaded, for scene nodes that only load the layers that are shown."""
+
+        for node in DepthFirstIterator(self._controller.getScene().getRoot()):  # type: ignore
+            node.callDecoration("requestLayers", self._minimum_layer_num, self._current_layer_num, self._onLayersLoaded)
+
+    def _onLayersLoaded(self) -> None:
+        self.calculateMaxPathsOnLayer(self._current_layer_num)
+        self._startUpdateTopLayers()
+        self._controller.getScene().sceneChanged.emit(self._controller.getScene().getRoot())
+
     def _startUpdateTopLayers(self) -> None:
         if not self._compatibility_mode:
             return
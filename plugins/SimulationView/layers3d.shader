@@ -17,6 +17,14 @@ vertex41core =
     uniform lowp int u_layer_view_type;
     uniform lowp mat4 u_extruder_opacity;  // currently only for max 16 extruders, others always visible
 
+    // Compact layer data has no colors per vertex, they are looked up in these palettes (a color per column).
+    uniform lowp int u_compact_layer_data;
+    uniform lowp mat4 u_line_type_colors_0;
+    uniform lowp mat4 u_line_type_colors_1;
+    uniform lowp mat4 u_line_type_colors_2;
+    uniform lowp mat4 u_material_colors_0;  // currently only for max 8 extruders
+    uniform lowp mat4 u_material_colors_1;
+
     uniform highp mat4 u_normalMatrix;
 
     uniform vec3 u_last_vertex;
@@ -33,6 +41,8 @@ vertex41core =
     in highp float a_line_type;
     in highp float a_feedrate;
     in highp float a_thickness;
+    in highp float a_line_info;  // compact: line type + 16 * previous line type + 256 * extruder
+    in highp float a_line_dim_packed;  // compact: line width + 4096 * thickness, in microns
 
     out lowp vec4 v_color;
 
@@ -135,14 +145,57 @@ vertex41core =
         return vec4(red, green, blue, 1.0);
     }
 
+    vec4 lineTypeColor(int line_type)
+    {
+        if (line_type < 4)
+        {
+            return u_line_type_colors_0[line_type];
+        }
+        if (line_type < 8)
+        {
+            return u_line_type_colors_1[line_type - 4];
+        }
+        return u_line_type_colors_2[line_type - 8];
+    }
+
+    vec4 materialColor(int extruder)
+    {
+        if (extruder < 4)
+        {
+            return u_material_colors_0[extruder];
+        }
+        if (extruder < 8)
+        {
+            return u_material_colors_1[extruder - 4];
+        }
+        return vec4(0.0, 0.0, 0.0, 0.0);
+    }
+
     void main()
     {
+        vec2 line_dim = a_line_dim;
+        float extruder = a_extruder;
+        float prev_line_type = a_prev_line_type;
+        float line_type = a_line_type;
+        vec4 color = a_color;
+        vec4 material_color = a_material_color;
+        if (u_compact_layer_data == 1)
+        {
+            line_dim = vec2(mod(a_line_dim_packed, 4096.0), floor(a_line_dim_packed / 4096.0)) / 1000.0;
+            line_type = mod(a_line_info, 16.0);
+            prev_line_type = mod(floor(a_line_info / 16.0), 16.0);
+            extruder = floor(a_line_info / 256.0);
+            color = lineTypeColor(int(line_type));
+            // Travel moves are shown in their line type color, also in the material color view.
+            material_color = (line_type == 8.0 || line_type == 9.0) ? color : materialColor(int(extruder));
+        }
+
         vec4 v1_vertex = a_vertex;
         if (v1_vertex.xyz == u_next_vertex)
         {
             v1_vertex.xyz = mix(u_last_vertex, u_next_vertex, u_last_line_ratio);
         }
-        v1_vertex.y -= a_line_dim.y / 2;  // half layer down
+        v1_vertex.y -= line_dim.y / 2;  // half layer down
 
         vec4 world_space_vert = u_modelMatrix * v1_vertex;
         gl_Position = world_space_vert;
@@ -150,32 +203,32 @@ vertex41core =
 
         switch (u_layer_view_type) {
             case 0:  // "Material color"
-                v_color = a_material_color;
+                v_color = material_color;
                 break;
             case 1:  // "Line type"
-                v_color = a_color;
+                v_color = color;
                 break;
             case 2:  // "Speed", or technically 'Feedrate'
                 v_color = feedrateGradientColor(a_feedrate, u_min_feedrate, u_max_feedrate);
                 break;
             case 3:  // "Layer thickness"
-                v_color = layerThicknessGradientColor(a_line_dim.y, u_min_thickness, u_max_thickness);
+                v_color = layerThicknessGradientColor(line_dim.y, u_min_thickness, u_max_thickness);
                 break;
             case 4:  // "Line width"
-                v_color = lineWidthGradientColor(a_line_dim.x, u_min_line_width, u_max_line_width);
+                v_color = lineWidthGradientColor(line_dim.x, u_min_line_width, u_max_line_width);
                 break;
             case 5:  // "Flow"
-                float flow_rate =  a_line_dim.x * a_line_dim.y * a_feedrate;
+                float flow_rate =  line_dim.x * line_dim.y * a_feedrate;
                 v_color = flowRateGradientColor(flow_rate, u_min_flow_rate, u_max_flow_rate);
                 break;
         }
 
         v_vertex = world_space_vert.xyz;
         v_normal = (u_normalMatrix * normalize(a_normal)).xyz;
-        v_line_dim = a_line_dim;
-        v_extruder = int(a_extruder);
-        v_prev_line_type = a_prev_line_type;
-        v_line_type = a_line_type;
+        v_line_dim = line_dim;
+        v_extruder = int(extruder);
+        v_prev_line_type = prev_line_type;
+        v_line_type = line_type;
         v_extruder_opacity = u_extruder_opacity;
 
         // for testing without geometry shader
@@ -417,6 +470,7 @@ fragment41core =
 u_active_extruder = 0.0
 u_layer_view_type = 0
 u_extruder_opacity = [[1.0, 1.0, 1.0, 1.0], [1.0, 1.0, 1.0, 1.0], [1.0, 1.0, 1.0, 1.0], [1.0, 1.0, 1.0, 1.0]]
+u_compact_layer_data = 0
 
 u_specularColor = [0.4, 0.4, 0.4, 1.0]
 u_ambientColor = [0.3, 0.3, 0.3, 0.0]
@@ -460,3 +514,5 @@ a_prev_line_type = prev_line_type
 a_line_type = line_type
 a_feedrate = feedrate
 a_thickness = thickness
+a_line_info = line_info
+a_line_dim_packed = line_dim_packed
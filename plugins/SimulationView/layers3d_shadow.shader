@@ -7,6 +7,7 @@ vertex41core =
 
     uniform lowp float u_active_extruder;
     uniform lowp mat4 u_extruder_opacity;  // currently only for max 16 extruders, others always visible
+    uniform lowp int u_compact_layer_data;
 
     uniform highp mat4 u_normalMatrix;
 
@@ -18,6 +19,8 @@ vertex41core =
     in highp vec2 a_line_dim;  // line width and thickness
     in highp float a_extruder;
     in highp float a_line_type;
+    in highp float a_line_info;  // compact: line type + 16 * previous line type + 256 * extruder
+    in highp float a_line_dim_packed;  // compact: line width + 4096 * thickness, in microns
 
     out lowp vec4 v_color;
 
@@ -34,8 +37,18 @@ vertex41core =
 
     void main()
     {
+        vec2 line_dim = a_line_dim;
+        float extruder = a_extruder;
+        float line_type = a_line_type;
+        if (u_compact_layer_data == 1)
+        {
+            line_dim = vec2(mod(a_line_dim_packed, 4096.0), floor(a_line_dim_packed / 4096.0)) / 1000.0;
+            line_type = mod(a_line_info, 16.0);
+            extruder = floor(a_line_info / 256.0);
+        }
+
         vec4 v1_vertex = a_vertex;
-        v1_vertex.y -= a_line_dim.y / 2;  // half layer down
+        v1_vertex.y -= line_dim.y / 2;  // half layer down
 
         vec4 world_space_vert = u_modelMatrix * v1_vertex;
         gl_Position = world_space_vert;
@@ -44,9 +57,9 @@ vertex41core =
         v_color = vec4(0.4, 0.4, 0.4, 0.9);    // default color for not current layer
         v_vertex = world_space_vert.xyz;
         v_normal = (u_normalMatrix * normalize(a_normal)).xyz;
-        v_line_dim = a_line_dim;
-        v_extruder = int(a_extruder);
-        v_line_type = a_line_type;
+        v_line_dim = line_dim;
+        v_extruder = int(extruder);
+        v_line_type = line_type;
         v_extruder_opacity = u_extruder_opacity;
 
         // for testing without geometry shader
@@ -257,6 +270,7 @@ fragment41core =
 [defaults]
 u_active_extruder = 0.0
 u_extruder_opacity = [[1.0, 1.0, 1.0, 1.0], [1.0, 1.0, 1.0, 1.0], [1.0, 1.0, 1.0, 1.0], [1.0, 1.0, 1.0, 1.0]]
+u_compact_layer_data = 0
 
 u_specularColor = [0.4, 0.4, 0.4, 1.0]
 u_ambientColor = [0.3, 0.3, 0.3, 0.0]
@@ -284,3 +298,5 @@ a_line_dim = line_dim
 a_extruder = extruder
 a_material_color = material_color
 a_line_type = line_type
+a_line_info = line_info
+a_line_dim_packed = line_dim_packed
@@ -2,7 +2,7 @@
 # Cura is released under the terms of the LGPLv3 or higher.
 import json
 from dataclasses import asdict
-from typing import cast, List, Dict
+from typing import cast, Any, List, Dict, Optional
 
 from Charon.VirtualFile import VirtualFile  # To open UFP files.
 from Charon.OpenMode import OpenMode  # To indicate that we want to write to UFP files.
@@ -46,12 +46,14 @@ class UFPWriter(MeshWriter):
             )
         )
 
-    # This needs to be called on the main thread (Qt thread) because the serialization of material containers can
-    # trigger loading other containers. Because those loaded containers are QtObjects, they must be created on the
-    # Qt thread. The File read/write operations right now are executed on separated threads because they are scheduled
-    # by the Job class.
-    @call_on_qt_thread
     def write(self, stream, nodes, mode = MeshWriter.OutputMode.BinaryMode):
+        # The containers and the objects are read on the Qt thread. The files are written and compressed on the thread
+        # of the job that writes the file, so that writing a large g-code doesn't freeze the interface.
+        serialized_materials = self._serializeMaterials()
+        if serialized_materials is None:
+            return False
+        slice_metadata = self._getSliceMetadata()
+
         archive = VirtualFile()
         archive.openStream(stream, "application/x-ufp", OpenMode.WriteOnly)
 
@@ -65,15 +67,14 @@ class UFPWriter(MeshWriter):
             self.setInformation(error_msg)
             Logger.error(error_msg)
             return False
-        gcode_textio = StringIO()  # We have to convert the g-code into bytes.
         gcode_writer = cast(MeshWriter, PluginRegistry.getInstance().getPluginObject("GCodeWriter"))
-        success = gcode_writer.write(gcode_textio, None)
-        if not success:  # Writing the g-code failed. Then I can also not write the gzipped g-code.
-            self.setInformation(gcode_writer.getInformation())
-            return False
         try:
             gcode = archive.getStream("/3D/model.gcode")
-            gcode.write(gcode_textio.getvalue().encode("UTF-8"))
+            # The g-code is written into the archive chunk by chunk, rather than being copied into a string first.
+            success = gcode_writer.write(gcode, None, MeshWriter.OutputMode.BinaryMode)
+            if not success:  # Writing the g-code failed. Then I can also not write the UFP file.
+                self.setInformation(gcode_writer.getInformation())
+                return False
             archive.addRelation(virtual_path = "/3D/model.gcode",
                                 relation_type = "http://schemas.ultimaker.org/package/2018/relationships/gcode")
         except EnvironmentError as e:
@@ -86,8 +87,7 @@ class UFPWriter(MeshWriter):
         try:
             archive.addContentType(extension="json", mime_type="application/json")
             setting_textio = StringIO()
-            api = CuraApplication.getInstance().getCuraAPI()
-            json.dump(api.interface.settings.getSliceMetadata(), setting_textio, separators=(", ", ": "), indent=4)
+            json.dump(slice_metadata, setting_textio, separators=(", ", ": "), indent=4)
             steam = archive.getStream(SLICE_METADATA_PATH)
             steam.write(setting_textio.getvalue().encode("UTF-8"))
         except EnvironmentError as e:
@@ -121,11 +121,6 @@ class UFPWriter(MeshWriter):
             Logger.log("w", "Thumbnail not created, cannot save it")
 
         # Store the material.
-        application = CuraApplication.getInstance()
-        machine_manager = application.getMachineManager()
-        container_registry = application.getContainerRegistry()
-        global_stack = machine_manager.activeMachine
-
         material_extension = "xml.fdm_material"
         material_mime_type = "application/x-ultimaker-material-profile"
 
@@ -134,7 +129,45 @@ class UFPWriter(MeshWriter):
         except OPCError:
             Logger.log("w", "The material extension: %s was already added", material_extension)
 
-        added_materials = []
+        for material_file_name, serialized_material in serialized_materials.items():
+            try:
+                material_file = archive.getStream(material_file_name)
+                material_file.write(serialized_material.encode("UTF-8"))
+                archive.addRelation(virtual_path = material_file_name,
+                                    relation_type = "http://schemas.ultimaker.org/package/2018/relationships/material",
+                                    origin = "/3D/model.gcode")
+            except EnvironmentError as e:
+                error_msg = catalog.i18nc("@info:error", "Can't write to UFP file:") + " " + str(e)
+                self.setInformation(error_msg)
+                Logger.error(error_msg)
+                return False
+
+        try:
+            archive.close()
+        except EnvironmentError as e:
+            error_msg = catalog.i18nc("@info:error", "Can't write to UFP file:") + " " + str(e)
+            self.setInformation(error_msg)
+            Logger.error(error_msg)
+            return False
+        return True
+
+    # This needs to be called on the main thread (Qt thread) because the serialization of material containers can
+    # trigger loading other containers. Because those loaded containers are QtObjects, they must be created on the
+    # Qt thread. The File read/write operations right now are executed on separated threads because they are scheduled
+    # by the Job class.
+    @call_on_qt_thread
+    def _serializeMaterials(self) -> Optional[Dict[str, str]]:
+        """Serialize the materials that are loaded in the extruders of the active printer.
+
+        :return: The serialized materials by their path in the archive, or None if a material could not be serialized.
+        """
+
+        application = CuraApplication.getInstance()
+        machine_manager = application.getMachineManager()
+        container_registry = application.getContainerRegistry()
+        global_stack = machine_manager.activeMachine
+
+        serialized_materials = {}  # type: Dict[str, str]
         for extruder_stack in global_stack.extruderList:
             material = extruder_stack.material
             try:
@@ -145,46 +178,30 @@ class UFPWriter(MeshWriter):
             material_file_name = "/Materials/" + material_file_name
 
             # The same material should not be added again.
-            if material_file_name in added_materials:
+            if material_file_name in serialized_materials:
                 continue
 
             material_root_id = material.getMetaDataEntry("base_file")
             material_root_query = container_registry.findContainers(id = material_root_id)
             if not material_root_query:
                 Logger.log("e", "Cannot find material container with root id {root_id}".format(root_id = material_root_id))
-                return False
+                return None
             material_container = material_root_query[0]
 
             try:
-                serialized_material = material_container.serialize()
+                serialized_materials[material_file_name] = material_container.serialize()
             except NotImplementedError:
                 Logger.log("e", "Unable serialize material container with root id: %s", material_root_id)
-                return False
-
-            try:
-                material_file = archive.getStream(material_file_name)
-                material_file.write(serialized_material.encode("UTF-8"))
-                archive.addRelation(virtual_path = material_file_name,
-                                    relation_type = "http://schemas.ultimaker.org/package/2018/relationships/material",
-                                    origin = "/3D/model.gcode")
-            except EnvironmentError as e:
-                error_msg = catalog.i18nc("@info:error", "Can't write to UFP file:") + " " + str(e)
-                self.setInformation(error_msg)
-                Logger.error(error_msg)
-                return False
+                return None
+        return serialized_materials
 
-            added_materials.append(material_file_name)
-
-        try:
-            archive.close()
-        except EnvironmentError as e:
-            error_msg = catalog.i18nc("@info:error", "Can't write to UFP file:") + " " + str(e)
-            self.setInformation(error_msg)
-            Logger.error(error_msg)
-            return False
-        return True
+    @call_on_qt_thread
+    def _getSliceMetadata(self) -> Dict[str, Any]:
+        api = CuraApplication.getInstance().getCuraAPI()
+        return api.interface.settings.getSliceMetadata()
 
     @staticmethod
+    @call_on_qt_thread
     def _writeObjectList(archive):
         """Write a json list of object names to the METADATA_OBJECTS_PATH metadata field
 
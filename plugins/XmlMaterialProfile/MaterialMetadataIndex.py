@@ -0,0 +1,199 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from UM.Logger import Logger
+
+if TYPE_CHECKING:
+    from cura.CuraApplication import CuraApplication
+
+
+class MaterialMetadataIndex:
+    """Remembers what was read from the material profiles, between sessions.
+
+    Reading the metadata of a material profile means upgrading it and parsing all of its XML, and there are thousands
+    of material profiles once some material packages are installed. What was read from each profile (see
+    :py:meth:`XmlMaterialProfile._readMetadataTree`) is stored by the hash of its contents in a file in the cache
+    directory, together with the size and modification time of the files it was read from. The file is only used if
+    it was made by the same version of Cura.
+
+    Only the profiles that were read in a session are saved, so profiles that were removed are forgotten.
+    """
+
+    IndexVersion = 1
+
+    __instance = None  # type: Optional["MaterialMetadataIndex"]
+
+    @classmethod
+    def getInstance(cls) -> "MaterialMetadataIndex":
+        if cls.__instance is None:
+            cls.__instance = MaterialMetadataIndex()
+        return cls.__instance
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._file_path = None  # type: Optional[str]
+        self._key = ""
+        self._trees = {}  # type: Dict[str, Dict[str, Any]]  # What was read from each profile, by the hash of its contents.
+        self._files = {}  # type: Dict[str, List[Any]]  # The modification time, size and hash of each profile file.
+        self._used_hashes = set()  # type: Set[str]
+        self._is_loaded = False
+        self._is_prefetched = False
+        self._is_dirty = False
+
+    def load(self, file_path: str, key: str) -> None:
+        """Start using the index in a file, if it was made with the same key, or start a new index.
+
+        :param file_path: The file to read the index from, and to save it to.
+        :param key: Identifies how the profiles were read. See :py:meth:`createKey`.
+        """
+
+        trees = {}  # type: Dict[str, Dict[str, Any]]
+        files = {}  # type: Dict[str, List[Any]]
+        try:
+            with open(file_path, "r", encoding = "utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.IndexVersion and data.get("key") == key:
+                trees = data["trees"]
+                files = data["files"]
+            else:
+                Logger.log("i", "The material metadata index is out of date, so all material profiles will be read.")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            Logger.log("w", "Unable to read the material metadata index from {file_path}: {err}".format(file_path = file_path, err = str(e)))
+
+        with self._lock:
+            self._file_path = file_path
+            self._key = key
+            self._trees = trees
+            self._files = files
+            self._used_hashes = set()
+            self._is_loaded = True
+            self._is_prefetched = False
+            self._is_dirty = False
+
+    def save(self) -> None:
+        """Write the profiles that were read in this session to the index file, if anything changed."""
+
+        with self._lock:
+            if not self._is_loaded or self._file_path is None:
+                return
+            if not self._is_dirty and self._used_hashes == set(self._trees):
+                return
+            file_path = self._file_path
+            trees = {content_hash: tree for content_hash, tree in self._trees.items() if content_hash in self._used_hashes}
+            files = {profile_path: stamp for profile_path, stamp in self._files.items() if stamp[2] in trees}
+            data = json.dumps({"version": self.IndexVersion, "key": self._key, "trees": trees, "files": files})
+            self._is_dirty = False
+
+        temporary_path = file_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok = True)
+            with open(temporary_path, "w", encoding = "utf-8") as f:
+                f.write(data)
+            os.replace(temporary_path, file_path)  # Replace it at once, so another Cura never reads half an index.
+        except OSError as e:
+            Logger.log("w", "Unable to save the material metadata index to {file_path}: {err}".format(file_path = file_path, err = str(e)))
+
+    def isLoaded(self) -> bool:
+        return self._is_loaded
+
+    def startPrefetch(self) -> bool:
+        """Claim the reading of the profiles that are not in the index yet, which is only done once per session.
+
+        :return: Whether the caller should read them.
+        """
+
+        with self._lock:
+            if not self._is_loaded or self._is_prefetched:
+                return False
+            self._is_prefetched = True
+            return True
+
+    def getUnknownFiles(self, file_paths: Iterable[str]) -> List[str]:
+        """Get the profile files that changed, or that were not read before."""
+
+        result = []
+        with self._lock:
+            for file_path in file_paths:
+                stamp = self._files.get(file_path)
+                if stamp is not None and stamp[2] in self._trees:
+                    try:
+                        if list(self.getFileStamp(file_path)) == stamp[:2]:
+                            continue
+                    except OSError:
+                        continue  # It can't be read anyway.
+                result.append(file_path)
+        return result
+
+    def addFile(self, file_path: str, file_stamp: Tuple[int, int], content_hash: str, tree: Optional[Dict[str, Any]]) -> None:
+        """Remember what was read from a profile file.
+
+        :param file_path: The profile file.
+        :param file_stamp: The modification time and size of the file when it was read. See :py:meth:`getFileStamp`.
+        :param content_hash: The hash of the contents of the file. See :py:meth:`hashSerialized`.
+        :param tree: What was read from the profile, or None if it needs to be read by the container registry.
+        """
+
+        with self._lock:
+            if not self._is_loaded:
+                return
+            self._files[file_path] = [file_stamp[0], file_stamp[1], content_hash]
+            if tree is not None:
+                self._trees[content_hash] = tree
+            self._is_dirty = True
+
+    def getTree(self, serialized: str) -> Optional[Dict[str, Any]]:
+        """Get what was read from a profile before.
+
+        :param serialized: The contents of the profile, before it was upgraded.
+        :return: What was read from the profile, or None if it is not in the index. It must not be changed.
+        """
+
+        with self._lock:
+            if not self._is_loaded:
+                return None
+            content_hash = self.hashSerialized(serialized)
+            tree = self._trees.get(content_hash)
+            if tree is not None:
+                self._used_hashes.add(content_hash)
+            return tree
+
+    def addTree(self, serialized: str, tree: Dict[str, Any]) -> None:
+        """Remember what was read from a profile.
+
+        :param serialized: The contents of the profile, before it was upgraded.
+        :param tree: What was read from the profile.
+        """
+
+        with self._lock:
+            if not self._is_loaded:
+                return
+            content_hash = self.hashSerialized(serialized)
+            self._trees[content_hash] = tree
+            self._used_hashes.add(content_hash)
+            self._is_dirty = True
+
+    @classmethod
+    def createKey(cls, application: "CuraApplication") -> str:
+        """Create a key that changes if profiles could be read differently, with another version of Cura."""
+
+        key = hashlib.sha1()
+        key.update(application.getVersion().encode("utf-8"))
+        key.update(str(application.SettingVersion).encode("utf-8"))
+        return key.hexdigest()
+
+    @staticmethod
+    def hashSerialized(serialized: str) -> str:
+        return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def getFileStamp(file_path: str) -> Tuple[int, int]:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
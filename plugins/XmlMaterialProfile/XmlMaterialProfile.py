@@ -20,12 +20,18 @@ from UM.ConfigurationErrorMessage import ConfigurationErrorMessage
 from cura.CuraApplication import CuraApplication
 from cura.PrinterOutput.FormatMaps import FormatMaps
 from cura.Machines.VariantType import VariantType
+from cura.Utils.WorkerProcesses import createWorkerProcessPool
 
 try:
     from .XmlMaterialValidator import XmlMaterialValidator
 except (ImportError, SystemError):
     import XmlMaterialValidator  # type: ignore  # This fixes the tests not being able to import.
 
+try:
+    from .MaterialMetadataIndex import MaterialMetadataIndex
+except (ImportError, SystemError):
+    from MaterialMetadataIndex import MaterialMetadataIndex  # type: ignore  # This fixes the tests not being able to import.
+
 
 class XmlMaterialProfile(InstanceContainer):
     """Handles serializing and deserializing material containers from an XML file"""
@@ -33,6 +39,9 @@ class XmlMaterialProfile(InstanceContainer):
     CurrentFdmMaterialVersion = "1.3"
     Version = 1
 
+    _parallel_read_minimum_file_count = 200  # With fewer changed profiles, starting the worker processes takes longer than reading them.
+    _parallel_read_chunk_size = 50  # The number of profiles that a worker process reads at a time.
+
     def __init__(self, container_id, *args, **kwargs):
         super().__init__(container_id, *args, **kwargs)
         self._inherited_files = []
@@ -849,24 +858,62 @@ class XmlMaterialProfile(InstanceContainer):
 
     @classmethod
     def deserializeMetadata(cls, serialized: str, container_id: str) -> List[Dict[str, Any]]:
-        result_metadata = [] #All the metadata that we found except the base (because the base is returned).
+        metadata_index = MaterialMetadataIndex.getInstance()
+        if metadata_index.startPrefetch():
+            cls._prefetchMetadataTrees(metadata_index)
+
+        # What is read from the profile itself is the same every time, so it's only read again if the profile changed.
+        metadata_tree = metadata_index.getTree(serialized)
+        if metadata_tree is None:
+            try:
+                #Update the serialized data to the latest version.
+                metadata_tree = cls._readMetadataTree(cls._updateSerialized(serialized))
+            except:
+                Logger.logException("e", "An exception occurred while parsing the material profile")
+                return []
+            metadata_index.addTree(serialized, metadata_tree)
+
+        return cls._createMetadataFromTree(metadata_tree, container_id)
 
-        #Update the serialized data to the latest version.
-        serialized = cls._updateSerialized(serialized)
+    @classmethod
+    def _prefetchMetadataTrees(cls, metadata_index: MaterialMetadataIndex) -> None:
+        """Read the material profiles that changed since the last session all at once, in worker processes.
 
-        base_metadata = {
-            "type": "material",
-            "status": "unknown", #TODO: Add material verification.
-            "container_type": XmlMaterialProfile,
-            "id": container_id,
-            "base_file": container_id
-        }
+        The container registry asks for the metadata of the profiles one after the other. When many profiles changed,
+        like on the first start or after installing a material package, reading them in parallel is a lot faster.
+        """
 
+        file_paths = [file_path for file_path in Resources.getAllResourcesOfType(CuraApplication.ResourceTypes.MaterialInstanceContainer)
+                      if file_path.endswith(".xml.fdm_material")]
+        file_paths = metadata_index.getUnknownFiles(file_paths)
+        if len(file_paths) < cls._parallel_read_minimum_file_count or (os.cpu_count() or 1) < 2:
+            return
+
+        Logger.log("d", "Reading %s material profiles in parallel.", len(file_paths))
+        chunks = [file_paths[start:start + cls._parallel_read_chunk_size] for start in range(0, len(file_paths), cls._parallel_read_chunk_size)]
         try:
-            data = ET.fromstring(serialized)
-        except:
-            Logger.logException("e", "An exception occurred while parsing the material profile")
-            return []
+            with createWorkerProcessPool(min(os.cpu_count() or 1, len(chunks)), __name__, __file__) as executor:
+                for results in executor.map(_readMaterialFiles, chunks):
+                    for file_path, file_stamp, content_hash, metadata_tree in results:
+                        metadata_index.addFile(file_path, file_stamp, content_hash, metadata_tree)
+        except Exception:
+            Logger.logException("w", "Failed to read the material profiles in parallel, reading them one after the other instead.")
+
+    @classmethod
+    def _readMetadataTree(cls, serialized: str) -> Dict[str, Any]:
+        """Read everything that the metadata of a material profile is made from, besides the other containers.
+
+        The result only holds plain lists and dictionaries, so that it can be stored in the
+        :py:class:`MaterialMetadataIndex`.
+
+        :param serialized: The material profile, upgraded to the latest version.
+        :return: The metadata of the base material, and the compatibility of each machine, hotend and build plate
+        that the profile has settings for.
+        :raises ET.ParseError: The profile is not valid XML.
+        """
+
+        base_metadata = {}  # type: Dict[str, Any]
+        data = ET.fromstring(serialized)
 
         #TODO: Implement the <inherits> tag. It's unused at the moment though.
 
@@ -924,21 +971,94 @@ class XmlMaterialProfile(InstanceContainer):
         except StopIteration: #No 'hardware compatible' setting.
             common_compatibility = True
         base_metadata["compatible"] = common_compatibility
-        result_metadata.append(base_metadata)
-
-        # Map machine human-readable names to IDs
-        product_id_map = FormatMaps.getProductIdMap()
 
+        machines = []
         for machine in data.iterfind("./um:settings/um:machine", cls.__namespaces):
             machine_compatibility = common_compatibility
             for entry in machine.iterfind("./um:setting[@key='hardware compatible']", cls.__namespaces):
                 if entry.text is not None:
                     machine_compatibility = cls._parseCompatibleValue(entry.text)
 
-            for identifier in machine.iterfind("./um:machine_identifier", cls.__namespaces):
-                machine_id_list = product_id_map.get(identifier.get("product", ""), [])
+            identifiers = [{"product": identifier.get("product"), "manufacturer": identifier.get("manufacturer")}
+                           for identifier in machine.iterfind("./um:machine_identifier", cls.__namespaces)]
+
+            buildplates = []
+            for buildplate in machine.iterfind("./um:buildplate", cls.__namespaces):
+                buildplate_id = buildplate.get("id")
+                if buildplate_id is None:
+                    continue
+
+                buildplate_compatibility = True
+                buildplate_recommended = True
+                for entry in buildplate.iterfind("./um:setting", cls.__namespaces):
+                    key = entry.get("key")
+                    if entry.text is not None:
+                        if key == "hardware compatible":
+                            buildplate_compatibility = cls._parseCompatibleValue(entry.text)
+                        elif key == "hardware recommended":
+                            buildplate_recommended = cls._parseCompatibleValue(entry.text)
+                buildplates.append({"id": buildplate_id, "compatible": buildplate_compatibility, "recommended": buildplate_recommended})
+
+            hotends = []
+            for hotend in machine.iterfind("./um:hotend", cls.__namespaces):
+                hotend_name = hotend.get("id")
+                if hotend_name is None:
+                    continue
+
+                hotend_compatibility = machine_compatibility
+                for entry in hotend.iterfind("./um:setting[@key='hardware compatible']", cls.__namespaces):
+                    if entry.text is not None:
+                        hotend_compatibility = cls._parseCompatibleValue(entry.text)
+
+                hotend_buildplates = []
+                for buildplate in hotend.iterfind("./um:buildplate", cls.__namespaces):
+                    # The "id" field for buildplate in material profiles is actually name
+                    buildplate_name = buildplate.get("id")
+                    if buildplate_name is None:
+                        continue
+
+                    buildplate_mapped_settings, buildplate_unmapped_settings, buildplate_reserialize_settings = cls._getSettingsDictForNode(buildplate)
+                    hotend_buildplates.append({"name": buildplate_name,
+                                               "unmapped_settings": buildplate_unmapped_settings,
+                                               "reserialize_settings": buildplate_reserialize_settings})
+                hotends.append({"name": hotend_name, "compatible": hotend_compatibility, "buildplates": hotend_buildplates})
+
+            machines.append({"compatible": machine_compatibility, "identifiers": identifiers, "buildplates": buildplates, "hotends": hotends})
+
+        return {"metadata": base_metadata, "machines": machines}
+
+    @classmethod
+    def _createMetadataFromTree(cls, metadata_tree: Dict[str, Any], container_id: str) -> List[Dict[str, Any]]:
+        """Create the metadata of a material profile, from what was read from it and the machines and variants that
+        are loaded.
+
+        :param metadata_tree: What was read from the profile. See :py:meth:`_readMetadataTree`.
+        :param container_id: The ID of the base material.
+        """
+
+        result_metadata = [] #All the metadata that we found except the base (because the base is returned).
+
+        base_metadata = {
+            "type": "material",
+            "status": "unknown", #TODO: Add material verification.
+            "container_type": XmlMaterialProfile,
+            "id": container_id,
+            "base_file": container_id
+        }
+        base_metadata.update(copy.deepcopy(metadata_tree["metadata"]))  # The tree is shared with the index, so it must not be changed.
+        result_metadata.append(base_metadata)
+
+        # Map machine human-readable names to IDs
+        product_id_map = FormatMaps.getProductIdMap()
+
+        for machine in metadata_tree["machines"]:
+            machine_compatibility = machine["compatible"]
+
+            for identifier in machine["identifiers"]:
+                product = identifier["product"]
+                machine_id_list = product_id_map.get(product if product is not None else "", [])
                 if not machine_id_list:
-                    machine_id_list = cls.getPossibleDefinitionIDsFromName(identifier.get("product"))
+                    machine_id_list = cls.getPossibleDefinitionIDsFromName(product)
 
                 for machine_id in machine_id_list:
                     definition_metadatas = ContainerRegistry.getInstance().findDefinitionContainersMetadata(id = machine_id)
@@ -947,7 +1067,9 @@ class XmlMaterialProfile(InstanceContainer):
 
                     definition_metadata = definition_metadatas[0]
 
-                    machine_manufacturer = identifier.get("manufacturer", definition_metadata.get("manufacturer", "Unknown")) #If the XML material doesn't specify a manufacturer, use the one in the actual printer definition.
+                    machine_manufacturer = identifier["manufacturer"]
+                    if machine_manufacturer is None: #If the XML material doesn't specify a manufacturer, use the one in the actual printer definition.
+                        machine_manufacturer = definition_metadata.get("manufacturer", "Unknown")
 
                     # Always create the instance of the material even if it is not compatible, otherwise it will never
                     # show as incompatible if the material profile doesn't define hotends in the machine - CURA-5444
@@ -967,14 +1089,11 @@ class XmlMaterialProfile(InstanceContainer):
 
                     result_metadata.append(new_material_metadata)
 
-                    buildplates = machine.iterfind("./um:buildplate", cls.__namespaces)
                     buildplate_map = {}  # type: Dict[str, Dict[str, bool]]
                     buildplate_map["buildplate_compatible"] = {}
                     buildplate_map["buildplate_recommended"] = {}
-                    for buildplate in buildplates:
-                        buildplate_id = buildplate.get("id")
-                        if buildplate_id is None:
-                            continue
+                    for buildplate in machine["buildplates"]:
+                        buildplate_id = buildplate["id"]
 
                         variant_metadata = ContainerRegistry.getInstance().findInstanceContainersMetadata(id = buildplate_id)
                         if not variant_metadata:
@@ -984,29 +1103,11 @@ class XmlMaterialProfile(InstanceContainer):
                         if not variant_metadata:
                             continue
 
-                        settings = buildplate.iterfind("./um:setting", cls.__namespaces)
-                        buildplate_compatibility = True
-                        buildplate_recommended = True
-                        for entry in settings:
-                            key = entry.get("key")
-                            if entry.text is not None:
-                                if key == "hardware compatible":
-                                    buildplate_compatibility = cls._parseCompatibleValue(entry.text)
-                                elif key == "hardware recommended":
-                                    buildplate_recommended = cls._parseCompatibleValue(entry.text)
-
-                        buildplate_map["buildplate_compatible"][buildplate_id] = buildplate_compatibility
-                        buildplate_map["buildplate_recommended"][buildplate_id] = buildplate_recommended
-
-                    for hotend in machine.iterfind("./um:hotend", cls.__namespaces):
-                        hotend_name = hotend.get("id")
-                        if hotend_name is None:
-                            continue
+                        buildplate_map["buildplate_compatible"][buildplate_id] = buildplate["compatible"]
+                        buildplate_map["buildplate_recommended"][buildplate_id] = buildplate["recommended"]
 
-                        hotend_compatibility = machine_compatibility
-                        for entry in hotend.iterfind("./um:setting[@key='hardware compatible']", cls.__namespaces):
-                            if entry.text is not None:
-                                hotend_compatibility = cls._parseCompatibleValue(entry.text)
+                    for hotend in machine["hotends"]:
+                        hotend_name = hotend["name"]
 
                         new_hotend_specific_material_id = container_id + "_" + machine_id + "_" + hotend_name.replace(" ", "_")
 
@@ -1015,7 +1116,7 @@ class XmlMaterialProfile(InstanceContainer):
 
                         new_hotend_material_metadata.update(base_metadata)
                         new_hotend_material_metadata["variant_name"] = hotend_name
-                        new_hotend_material_metadata["compatible"] = hotend_compatibility
+                        new_hotend_material_metadata["compatible"] = hotend["compatible"]
                         new_hotend_material_metadata["machine_manufacturer"] = machine_manufacturer
                         new_hotend_material_metadata["id"] = new_hotend_specific_material_id
                         new_hotend_material_metadata["definition"] = machine_id
@@ -1028,14 +1129,9 @@ class XmlMaterialProfile(InstanceContainer):
                         #
                         # Buildplates in Hotends
                         #
-                        buildplates = hotend.iterfind("./um:buildplate", cls.__namespaces)
-                        for buildplate in buildplates:
-                            # The "id" field for buildplate in material profiles is actually name
-                            buildplate_name = buildplate.get("id")
-                            if buildplate_name is None:
-                                continue
-
-                            buildplate_mapped_settings, buildplate_unmapped_settings, buildplate_reserialize_settings = cls._getSettingsDictForNode(buildplate)
+                        for buildplate in hotend["buildplates"]:
+                            buildplate_name = buildplate["name"]
+                            buildplate_unmapped_settings = buildplate["unmapped_settings"]
                             buildplate_compatibility = buildplate_unmapped_settings.get("hardware compatible",
                                                                                         buildplate_map["buildplate_compatible"])
                             buildplate_recommended = buildplate_unmapped_settings.get("hardware recommended",
@@ -1052,7 +1148,7 @@ class XmlMaterialProfile(InstanceContainer):
                             new_hotend_and_buildplate_material_metadata["compatible"] = buildplate_compatibility
                             new_hotend_and_buildplate_material_metadata["buildplate_compatible"] = buildplate_compatibility
                             new_hotend_and_buildplate_material_metadata["buildplate_recommended"] = buildplate_recommended
-                            new_hotend_and_buildplate_material_metadata["reserialize_settings"] = buildplate_reserialize_settings
+                            new_hotend_and_buildplate_material_metadata["reserialize_settings"] = dict(buildplate["reserialize_settings"])
 
                             result_metadata.append(new_hotend_and_buildplate_material_metadata)
 
@@ -1214,6 +1310,37 @@ class XmlMaterialProfile(InstanceContainer):
     }
 
 
+def _readMaterialFiles(file_paths: List[str]) -> List[Tuple[str, Tuple[int, int], str, Optional[Dict[str, Any]]]]:
+    """Read what the metadata of some material profiles is made from, usually in a worker process.
+
+    There is no application in the worker processes, so profiles of older versions are left to the container registry,
+    which can upgrade them.
+
+    :param file_paths: The material profiles to read.
+    :return: For each profile, its path, its modification time and size, the hash of its contents and what was read
+    from it (see :py:meth:`XmlMaterialProfile._readMetadataTree`), or None if it wasn't read.
+    """
+
+    results = []
+    for file_path in file_paths:
+        try:
+            file_stamp = MaterialMetadataIndex.getFileStamp(file_path)
+            with open(file_path, "r", encoding = "utf-8") as f:
+                serialized = f.read()
+        except (OSError, UnicodeDecodeError):
+            continue  # The container registry will report it.
+
+        try:
+            metadata_tree = XmlMaterialProfile._readMetadataTree(serialized)  # type: Optional[Dict[str, Any]]
+        except Exception:
+            metadata_tree = None
+        else:
+            if metadata_tree["metadata"]["setting_version"] != CuraApplication.SettingVersion:
+                metadata_tree = None  # It needs to be upgraded first.
+        results.append((file_path, file_stamp, MaterialMetadataIndex.hashSerialized(serialized), metadata_tree))
+    return results
+
+
 def _indent(elem, level = 0):
     """Helper function for pretty-printing XML because ETree is stupid"""
 
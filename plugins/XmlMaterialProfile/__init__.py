@@ -1,10 +1,14 @@
 # Copyright (c) 2017 Ultimaker B.V.
 # Cura is released under the terms of the LGPLv3 or higher.
 
+import os.path
+
+from . import MaterialMetadataIndex
 from . import XmlMaterialProfile
 from . import XmlMaterialUpgrader
 
 from UM.MimeTypeDatabase import MimeType, MimeTypeDatabase
+from UM.Resources import Resources
 
 upgrader = XmlMaterialUpgrader.XmlMaterialUpgrader()
 
@@ -44,6 +48,11 @@ def register(app):
         (CuraApplication.ResourceTypes.MaterialInstanceContainer, "application/x-ultimaker-material-profile")
     )
 
+    # Remember what was read from the material profiles, so that they don't all need to be read again next time.
+    metadata_index = MaterialMetadataIndex.MaterialMetadataIndex.getInstance()
+    metadata_index.load(os.path.join(Resources.getCacheStoragePath(), "material_metadata.json"), MaterialMetadataIndex.MaterialMetadataIndex.createKey(app))
+    app.getContainerRegistry().allMetadataLoaded.connect(metadata_index.save)
+
     return {"version_upgrade": upgrader,
             "settings_container": XmlMaterialProfile.XmlMaterialProfile("default_xml_material_profile"),
             }
@@ -0,0 +1,74 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from MaterialMetadataIndex import MaterialMetadataIndex
+
+serialized = "<fdmmaterial version=\"1.3\" />"
+tree = {"metadata": {"setting_version": 25, "properties": {"diameter": "2.85"}}, "machines": []}
+
+
+def test_notLoaded():
+    index = MaterialMetadataIndex()
+    index.addTree(serialized, tree)
+    assert index.getTree(serialized) is None
+    assert not index.startPrefetch()
+
+
+def test_saveAndLoad(tmp_path):
+    file_path = os.path.join(str(tmp_path), "material_metadata.json")
+    index = MaterialMetadataIndex()
+    index.load(file_path, "key")
+    index.addTree(serialized, tree)
+    index.addTree("<fdmmaterial />", tree)
+    index.save()
+
+    next_index = MaterialMetadataIndex()
+    next_index.load(file_path, "key")
+    assert next_index.getTree(serialized) == tree
+    next_index.save()  # Only the profile that was read in this session is kept.
+
+    last_index = MaterialMetadataIndex()
+    last_index.load(file_path, "key")
+    assert last_index.getTree(serialized) == tree
+    assert last_index.getTree("<fdmmaterial />") is None
+
+
+def test_loadOtherKey(tmp_path):
+    file_path = os.path.join(str(tmp_path), "material_metadata.json")
+    index = MaterialMetadataIndex()
+    index.load(file_path, "key")
+    index.addTree(serialized, tree)
+    index.save()
+
+    next_index = MaterialMetadataIndex()
+    next_index.load(file_path, "other_key")  # Made by another version of Cura.
+    assert next_index.getTree(serialized) is None
+
+
+def test_getUnknownFiles(tmp_path):
+    profile_paths = []
+    for name in ("generic_pla", "generic_abs", "generic_petg"):
+        profile_path = os.path.join(str(tmp_path), name + ".xml.fdm_material")
+        with open(profile_path, "w", encoding = "utf-8") as f:
+            f.write(serialized)
+        profile_paths.append(profile_path)
+
+    index = MaterialMetadataIndex()
+    index.load(os.path.join(str(tmp_path), "material_metadata.json"), "key")
+    assert index.startPrefetch()
+    assert not index.startPrefetch()  # Only once per session.
+    assert index.getUnknownFiles(profile_paths) == profile_paths
+
+    content_hash = MaterialMetadataIndex.hashSerialized(serialized)
+    index.addFile(profile_paths[0], MaterialMetadataIndex.getFileStamp(profile_paths[0]), content_hash, tree)
+    index.addFile(profile_paths[1], MaterialMetadataIndex.getFileStamp(profile_paths[1]), content_hash, None)
+    with open(profile_paths[2], "w", encoding = "utf-8") as f:
+        f.write(serialized)
+    index.addFile(profile_paths[2], (0, 0), content_hash, tree)  # The file changed since it was read.
+    assert index.getUnknownFiles(profile_paths) == profile_paths[2:]
+    assert index.getTree(serialized) == tree
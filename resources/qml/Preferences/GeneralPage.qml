@@ -535,6 +535,23 @@ UM.PreferencesPage
                 }
             }
 
+            UM.TooltipArea
+            {
+                width: childrenRect.width
+                height: childrenRect.height
+                text: catalog.i18nc("@info:tooltip", "Should g-code files only be parsed for the layers that are shown in the preview? This makes large files open much faster, but only the top layers of the visible range are shown.")
+
+                UM.CheckBox
+                {
+                    id: gcodeLazyLoadingCheckbox
+
+                    checked: boolCheck(UM.Preferences.getValue("gcodereader/lazy_loading"))
+                    onClicked: UM.Preferences.setValue("gcodereader/lazy_loading", checked)
+
+                    text: catalog.i18nc("@option:check", "Only parse the shown layers of g-code files")
+                }
+            }
+
             UM.TooltipArea
             {
                 width: childrenRect.width
@@ -550,6 +567,21 @@ UM.PreferencesPage
                 }
             }
 
+            UM.TooltipArea
+            {
+                width: childrenRect.width
+                height: childrenRect.height
+                text: catalog.i18nc("@info:tooltip", "Should the layer view use less memory for large prints? This has no effect in compatibility mode.")
+
+                UM.CheckBox
+                {
+                    id: compactLayerDataCheckbox
+                    text: catalog.i18nc("@option:check", "Use compact layer data (applies to the next slice)")
+                    checked: boolCheck(UM.Preferences.getValue("view/compact_layer_data"))
+                    onCheckedChanged: UM.Preferences.setValue("view/compact_layer_data", checked)
+                }
+            }
+
             UM.TooltipArea
             {
                 width: childrenRect.width
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable, List
+
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cura.LayerDataBuilder import LayerDataBuilder
+from cura.LayerPolygon import LayerPolygon
+from plugins.CuraEngineBackend.ProcessSlicedLayersJob import ProcessSlicedLayersJob
+
+"""
+    Compares decoding the path segments of the engine per polygon (how it used to be done) with decoding all path
+    segments of a layer at once, on generated layer messages.
+
+    Needs Uranium to be importable. No theme is loaded, so a fixed color map is used for the line types.
+"""
+
+
+class LayerMessage:
+    """Stand-in for the LayerOptimized message of the engine."""
+
+    def __init__(self, layer_id: int, path_segments: List[SimpleNamespace]) -> None:
+        self.id = layer_id
+        self.height = (layer_id + 1) * 200
+        self.thickness = 200
+        self._path_segments = path_segments
+
+    def repeatedMessageCount(self, name: str) -> int:
+        return len(self._path_segments)
+
+    def getRepeatedMessage(self, name: str, index: int) -> SimpleNamespace:
+        return self._path_segments[index]
+
+
+def generate_layers(layer_count: int, segment_count: int, line_count: int, seed: int = 0) -> List[LayerMessage]:
+    random = numpy.random.default_rng(seed)
+    layers = []
+    for layer_id in range(layer_count):
+        segments = []
+        for _ in range(segment_count):
+            lines = int(random.integers(1, 2 * line_count))
+            segments.append(SimpleNamespace(
+                extruder = int(random.integers(0, 2)),
+                point_type = 0,
+                points = random.random((lines + 1) * 2, dtype = numpy.float32).tobytes(),
+                line_type = random.integers(0, 12, lines, dtype = numpy.uint8).tobytes(),
+                line_width = random.random(lines, dtype = numpy.float32).tobytes(),
+                line_thickness = random.random(lines, dtype = numpy.float32).tobytes(),
+                line_feedrate = random.random(lines, dtype = numpy.float32).tobytes()
+            ))
+        layers.append(LayerMessage(layer_id, segments))
+    return layers
+
+
+def decode_per_polygon(layer: LayerMessage) -> List[LayerPolygon]:
+    """The way path segments were decoded before: every segment is converted separately."""
+
+    polygons = []
+    for p in range(layer.repeatedMessageCount("path_segment")):
+        polygon = layer.getRepeatedMessage("path_segment", p)
+        line_types = numpy.frombuffer(polygon.line_type, dtype = "u1").reshape((-1, 1)).copy()
+        points = numpy.frombuffer(polygon.points, dtype = "f4").reshape((-1, 2))
+        line_widths = numpy.frombuffer(polygon.line_width, dtype = "f4").reshape((-1, 1))
+        line_thicknesses = numpy.frombuffer(polygon.line_thickness, dtype = "f4").reshape((-1, 1))
+        line_feedrates = numpy.frombuffer(polygon.line_feedrate, dtype = "f4").reshape((-1, 1))
+        new_points = numpy.empty((len(points), 3), numpy.float32)
+        new_points[:, 0] = points[:, 0]
+        new_points[:, 1] = layer.height / 1000
+        new_points[:, 2] = -points[:, 1]
+        this_poly = LayerPolygon(polygon.extruder, line_types, new_points, line_widths, line_thicknesses, line_feedrates)
+        this_poly.buildCache()
+        polygons.append(this_poly)
+    return polygons
+
+
+def decode_batched(layer: LayerMessage) -> List[LayerPolygon]:
+    path_segments = [layer.getRepeatedMessage("path_segment", p) for p in range(layer.repeatedMessageCount("path_segment"))]
+    this_poly = ProcessSlicedLayersJob.decodePathSegments(path_segments, layer.height)
+    this_poly.buildCache()
+    return [this_poly]
+
+
+def run(layers: List[LayerMessage], decode: Callable[[LayerMessage], List[LayerPolygon]]) -> float:
+    start_time = time.perf_counter()
+    builder = LayerDataBuilder()
+    for layer in layers:
+        builder.addLayer(layer.id)
+        builder.getLayer(layer.id).polygons.extend(decode(layer))
+    builder.build(numpy.ones((2, 4), dtype = numpy.float32))
+    return time.perf_counter() - start_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Benchmark decoding of sliced layers.")
+    parser.add_argument("--layers", type = int, default = 200, help = "Number of layers to generate.")
+    parser.add_argument("--segments", type = int, default = 200, help = "Number of path segments per layer.")
+    parser.add_argument("--lines", type = int, default = 20, help = "Average number of lines per path segment.")
+    parser.add_argument("--repeat", type = int, default = 3, help = "Number of runs to take the best time of.")
+    args = parser.parse_args()
+
+    LayerPolygon._LayerPolygon__color_map = numpy.linspace(0, 1, 12 * 4, dtype = numpy.float32).reshape((12, 4))
+    layers = generate_layers(args.layers, args.segments, args.lines)
+
+    per_polygon = min(run(layers, decode_per_polygon) for _ in range(args.repeat))
+    batched = min(run(layers, decode_batched) for _ in range(args.repeat))
+    print(f"Per polygon: {per_polygon:.3f}s")
+    print(f"Batched:     {batched:.3f}s ({per_polygon / batched:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from cura.Machines.ContainerTreeSnapshot import ContainerTreeSnapshot
+
+metadatas = [
+    {"id": "generic_pla", "type": "material", "definition": "fdmprinter"},
+    {"id": "generic_abs", "type": "material", "definition": "fdmprinter"},
+    {"id": "normal", "type": "quality", "definition": "fdmprinter"}
+]
+
+
+def findInstanceContainersMetadata(**kwargs):
+    return [metadata for metadata in metadatas if all(metadata.get(key) == value for key, value in kwargs.items())]
+
+
+def findContainersMetadata(id):
+    return [metadata for metadata in metadatas if metadata["id"] == id]
+
+
+@pytest.fixture
+def container_registry():
+    result = MagicMock()
+    result.findInstanceContainersMetadata = MagicMock(side_effect = findInstanceContainersMetadata)
+    result.findContainersMetadata = MagicMock(side_effect = findContainersMetadata)
+    return result
+
+
+def test_notLoaded(container_registry):
+    snapshot = ContainerTreeSnapshot()
+    with patch("UM.Settings.ContainerRegistry.ContainerRegistry.getInstance", MagicMock(return_value = container_registry)):
+        assert snapshot.findInstanceContainersMetadata(type = "material") == metadatas[:2]
+        assert snapshot.findInstanceContainersMetadata(type = "material") == metadatas[:2]
+    assert container_registry.findInstanceContainersMetadata.call_count == 2
+
+
+def test_saveAndLoad(container_registry, tmp_path):
+    file_path = os.path.join(str(tmp_path), "container_tree.json")
+    with patch("UM.Settings.ContainerRegistry.ContainerRegistry.getInstance", MagicMock(return_value = container_registry)):
+        snapshot = ContainerTreeSnapshot()
+        snapshot.load(file_path, "key")
+        snapshot.findInstanceContainersMetadata(type = "material", definition = "fdmprinter")
+        snapshot.save()
+
+        next_snapshot = ContainerTreeSnapshot()
+        next_snapshot.load(file_path, "key")
+        container_registry.findInstanceContainersMetadata.reset_mock()
+        assert next_snapshot.findInstanceContainersMetadata(definition = "fdmprinter", type = "material") == metadatas[:2]
+    container_registry.findInstanceContainersMetadata.assert_not_called()
+
+
+def test_loadOtherKey(container_registry, tmp_path):
+    file_path = os.path.join(str(tmp_path), "container_tree.json")
+    with patch("UM.Settings.ContainerRegistry.ContainerRegistry.getInstance", MagicMock(return_value = container_registry)):
+        snapshot = ContainerTreeSnapshot()
+        snapshot.load(file_path, "key")
+        snapshot.findInstanceContainersMetadata(type = "material")
+        snapshot.save()
+
+        next_snapshot = ContainerTreeSnapshot()
+        next_snapshot.load(file_path, "other_key")  # The profiles changed since the snapshot was saved.
+        container_registry.findInstanceContainersMetadata.reset_mock()
+        next_snapshot.findInstanceContainersMetadata(type = "material")
+    container_registry.findInstanceContainersMetadata.assert_called_once_with(type = "material")
+
+
+def test_profileRemoved(container_registry, tmp_path):
+    file_path = os.path.join(str(tmp_path), "container_tree.json")
+    with patch("UM.Settings.ContainerRegistry.ContainerRegistry.getInstance", MagicMock(return_value = container_registry)):
+        snapshot = ContainerTreeSnapshot()
+        snapshot.load(file_path, "key")
+        snapshot.findInstanceContainersMetadata(type = "material")
+
+        container_registry.findContainersMetadata = MagicMock(side_effect = lambda id: [] if id == "generic_abs" else findContainersMetadata(id))
+        container_registry.findInstanceContainersMetadata.side_effect = lambda **kwargs: [metadatas[0]]
+        assert snapshot.findInstanceContainersMetadata(type = "material") == [metadatas[0]]
+
+
+def test_profileChanged(container_registry, tmp_path):
+    file_path = os.path.join(str(tmp_path), "container_tree.json")
+    with patch("UM.Settings.ContainerRegistry.ContainerRegistry.getInstance", MagicMock(return_value = container_registry)):
+        snapshot = ContainerTreeSnapshot()
+        snapshot.load(file_path, "key")
+        snapshot.findInstanceContainersMetadata(type = "material")
+
+        snapshot._onContainerChanged(MagicMock(getMetaDataEntry = MagicMock(return_value = "user")))  # Not a profile of the tree.
+        snapshot._onContainerChanged(MagicMock(getMetaDataEntry = MagicMock(return_value = "material")))
+        container_registry.findInstanceContainersMetadata.reset_mock()
+        snapshot.findInstanceContainersMetadata(type = "material")
+        snapshot.save()
+    container_registry.findInstanceContainersMetadata.assert_called_once_with(type = "material")
+    assert not os.path.exists(file_path)
@@ -0,0 +1,138 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from UM.Settings.Validator import ValidatorState
+
+from cura.Machines.MachineErrorChecker import MachineErrorChecker
+
+
+class Application:
+    """Runs the calls that are done later only when the test processes the events."""
+
+    def __init__(self, global_stack):
+        self._calls = []
+        self._machine_manager = MagicMock(activeMachine = global_stack)
+
+    def getMachineManager(self):
+        return self._machine_manager
+
+    def callLater(self, function, *args):
+        self._calls.append((function, args))
+
+    def processEvents(self):
+        while self._calls:
+            function, args = self._calls.pop(0)
+            function(*args)
+
+
+def createStack(keys, error_keys):
+    stack = MagicMock()
+    stack.getAllKeys = MagicMock(side_effect = lambda: set(keys))
+    stack.checked_keys = []
+
+    def getProperty(key, property_name):
+        if property_name == "enabled":
+            return True
+        stack.checked_keys.append(key)
+        return ValidatorState.MinimumError if key in error_keys else ValidatorState.Valid
+    stack.getProperty = MagicMock(side_effect = getProperty)
+    return stack
+
+
+@pytest.fixture
+def global_stack():
+    result = MagicMock()
+    result.extruderList = [createStack(["layer_height", "infill_sparse_density", "wall_thickness"], set())]
+    result.definition.getProperty = MagicMock(return_value = True)  # Everything is settable per extruder.
+    return result
+
+
+@pytest.fixture
+def application(global_stack):
+    return Application(global_stack)
+
+
+@pytest.fixture
+def error_checker(application):
+    with patch("cura.CuraApplication.CuraApplication.getInstance", MagicMock(return_value = application)):
+        with patch("cura.Machines.MachineErrorChecker.QTimer"):
+            result = MachineErrorChecker()
+    result._error_check_timer.start = MagicMock(side_effect = result._rescheduleCheck)  # Start the check right away.
+    return result
+
+
+def test_noErrors(error_checker, application):
+    error_checker.startErrorCheck()
+    assert error_checker.needToWaitForResult
+    application.processEvents()
+
+    assert not error_checker.needToWaitForResult
+    assert not error_checker.hasError
+
+
+def test_errorRechecksRemainingSettings(error_checker, application, global_stack):
+    all_keys = {"layer_height", "infill_sparse_density", "wall_thickness"}
+    stack = createStack(all_keys, {"infill_sparse_density"})
+    global_stack.extruderList = [stack]
+    error_checker.startErrorCheck()
+    application.processEvents()
+
+    assert error_checker.hasError
+    assert stack.checked_keys[-1] == "infill_sparse_density"  # The check stopped at the error.
+    # The settings after the first error weren't checked, so the next check starts with them.
+    assert error_checker._keys_to_check == all_keys - set(stack.checked_keys[:-1])
+
+
+def test_checkInBatches(error_checker, application, global_stack):
+    error_checker._batch_duration = -1  # Check a single setting per batch.
+    error_checker.startErrorCheck()
+    batch_count = 0
+    while application._calls:
+        function, args = application._calls.pop(0)
+        function(*args)
+        batch_count += 1
+    assert batch_count == 3
+    assert not error_checker.hasError
+
+
+def test_settingChangedDiscardsCheck(error_checker, application, global_stack):
+    error_checker._batch_duration = -1
+    error_checker.startErrorCheck()
+    function, args = application._calls.pop(0)
+    function(*args)  # Checks the first setting.
+
+    global_stack.extruderList[0].getProperty.reset_mock()
+    error_checker._error_check_timer.start = MagicMock()  # The timer doesn't fire yet.
+    error_checker.startErrorCheckPropertyChanged("layer_height", "value")
+    error_checker._rescheduleCheck()  # The timer fires while the check is in progress.
+    error_checker._error_check_timer.start.reset_mock()
+    function, args = application._calls.pop(0)
+    function(*args)
+
+    # The check in progress is discarded without checking any more settings, and a new check is scheduled.
+    global_stack.extruderList[0].getProperty.assert_not_called()
+    assert error_checker.needToWaitForResult
+    error_checker._error_check_timer.start.assert_called_once_with()
+
+    error_checker._rescheduleCheck()
+    application.processEvents()
+    assert not error_checker.needToWaitForResult
+
+
+def test_waitForResult(error_checker, application):
+    assert error_checker.waitForResult(0)  # Nothing to wait for.
+
+    error_checker.startErrorCheck()
+    assert not error_checker.waitForResult(0)
+
+    waiting_thread_result = []
+    waiting_thread = threading.Thread(target = lambda: waiting_thread_result.append(error_checker.waitForResult(10)))
+    waiting_thread.start()
+    application.processEvents()
+    waiting_thread.join()
+    assert waiting_thread_result == [True]
@@ -0,0 +1,107 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from cura.Settings.FormulaValueCache import FormulaValueCache
+
+
+def createStack(stack_id, next_stack = None):
+    stack = MagicMock()
+    stack.getId = MagicMock(return_value = stack_id)
+    stack.getNextStack = MagicMock(return_value = next_stack)
+    stack.getSettingDefinition = MagicMock(return_value = None)
+    return stack
+
+
+@pytest.fixture
+def global_stack():
+    stack = createStack("global")
+    stack.extruderList = [createStack("extruder_0", stack), createStack("extruder_1", stack)]
+    return stack
+
+
+def test_getValueRemembersValue(global_stack):
+    cache = FormulaValueCache()
+    evaluate = MagicMock(return_value = 200)
+    extruder = global_stack.extruderList[1]
+
+    assert cache.getValue(extruder, "material_print_temperature", "extruderValue", evaluate) == 200
+    assert cache.getValue(extruder, "material_print_temperature", "extruderValue", evaluate) == 200
+    assert evaluate.call_count == 1
+    assert cache.getHitCount() == 1
+    assert cache.getMissCount() == 1
+
+    # Other look-ups of the same setting, or in other stacks, are remembered separately.
+    cache.getValue(extruder, "material_print_temperature", "resolveOrValue", evaluate)
+    cache.getValue(global_stack.extruderList[0], "material_print_temperature", "extruderValue", evaluate)
+    assert evaluate.call_count == 3
+
+
+def test_getValueFollowsAllStacksOfPrinter(global_stack):
+    cache = FormulaValueCache()
+    cache.getValue(global_stack.extruderList[0], "infill_sparse_density", "extruderValue", MagicMock(return_value = 20))
+
+    for stack in [global_stack] + global_stack.extruderList:
+        stack.propertyChanged.connect.assert_called_once_with(cache._onPropertyChanged)
+        stack.containersChanged.connect.assert_called_once_with(cache._onContainersChanged)
+
+
+def test_propertyChangedForgetsDependentSettings(global_stack):
+    cache = FormulaValueCache()
+    relation = MagicMock(role = "value", target = MagicMock(key = "infill_line_distance", relations = []))
+    global_stack.getSettingDefinition = MagicMock(side_effect = lambda key: MagicMock(relations = [relation]) if key == "infill_sparse_density" else None)
+    extruder = global_stack.extruderList[0]
+    cache.getValue(extruder, "infill_sparse_density", "extruderValue", MagicMock(return_value = 20))
+    cache.getValue(extruder, "infill_line_distance", "extruderValue", MagicMock(return_value = 2))
+    cache.getValue(extruder, "layer_height", "extruderValue", MagicMock(return_value = 0.1))
+
+    cache._onPropertyChanged("infill_sparse_density", "value")
+
+    evaluate = MagicMock(return_value = 0)
+    cache.getValue(extruder, "infill_sparse_density", "extruderValue", evaluate)
+    cache.getValue(extruder, "infill_line_distance", "extruderValue", evaluate)
+    cache.getValue(extruder, "layer_height", "extruderValue", evaluate)
+    assert evaluate.call_count == 2  # The layer height doesn't depend on the infill density.
+
+
+def test_containersChangedForgetsAllValues(global_stack):
+    cache = FormulaValueCache()
+    cache.getValue(global_stack, "adhesion_type", "resolveOrValue", MagicMock(return_value = "brim"))
+
+    cache._onContainersChanged(MagicMock())
+
+    evaluate = MagicMock(return_value = "skirt")
+    assert cache.getValue(global_stack, "adhesion_type", "resolveOrValue", evaluate) == "skirt"
+    assert evaluate.call_count == 1
+
+
+def test_valueChangedWhileEvaluatingIsNotRemembered(global_stack):
+    cache = FormulaValueCache()
+    cache.getValue(global_stack, "layer_height", "resolveOrValue", MagicMock(return_value = 0.1))
+
+    def evaluate():
+        cache._onPropertyChanged("adhesion_type", "value")
+        return "brim"
+
+    cache.getValue(global_stack, "adhesion_type", "resolveOrValue", evaluate)
+
+    evaluate_again = MagicMock(return_value = "skirt")
+    assert cache.getValue(global_stack, "adhesion_type", "resolveOrValue", evaluate_again) == "skirt"
+    assert evaluate_again.call_count == 1
+
+
+def test_limitToExtruderChangedForgetsDependentSettings(global_stack):
+    cache = FormulaValueCache()
+    # The brim width is resolved in the extruder that skirt_brim_extruder_nr points to.
+    relation = MagicMock(role = "limit_to_extruder", target = MagicMock(key = "brim_width", relations = []))
+    global_stack.getSettingDefinition = MagicMock(side_effect = lambda key: MagicMock(relations = [relation]) if key == "skirt_brim_extruder_nr" else None)
+    cache.getValue(global_stack, "brim_width", "resolveOrValue", MagicMock(return_value = 8))
+
+    cache._onPropertyChanged("skirt_brim_extruder_nr", "value")
+
+    evaluate = MagicMock(return_value = 4)
+    assert cache.getValue(global_stack, "brim_width", "resolveOrValue", evaluate) == 4
+    assert evaluate.call_count == 1
@@ -7,6 +7,7 @@ import pytest
 from UM.Math.Polygon import Polygon
 from UM.Math.Vector import Vector
 from cura.BuildVolume import BuildVolume, PRIME_CLEARANCE
+from cura.Scene.DisallowedAreasJob import DisallowedAreas, DisallowedAreaSettings, StackSettingsSnapshot
 import numpy
 
 @pytest.fixture
@@ -425,3 +426,92 @@ class TestGetEdgeDisallowedSize:
             with patch.dict(self.setting_property_dict, {"print_sequence": {"value": "one_at_a_time"}}):
                 assert build_volume.getEdgeDisallowedSize() == 0.1
 
+
+
+class TestGetNearbyDisallowedAreas:
+    def test_noNodes(self, build_volume: BuildVolume):
+        build_volume.setDisallowedAreas([Polygon(numpy.array([[0, 0], [10, 0], [10, 10]], numpy.float32))])
+        assert build_volume._getNearbyDisallowedAreas([]) == []
+
+    def test_nearbyAreas(self, build_volume: BuildVolume):
+        left_area = Polygon(numpy.array([[-50, -10], [-40, -10], [-40, 10], [-50, 10]], numpy.float32))
+        right_area = Polygon(numpy.array([[40, -10], [50, -10], [50, 10], [40, 10]], numpy.float32))
+        build_volume.setDisallowedAreas([left_area, right_area])
+
+        result = build_volume._getNearbyDisallowedAreas([(-45, 0, -35, 5), (0, 0, 5, 5), (-60, -5, 60, 5), None])
+        assert result == [[left_area], [], [left_area, right_area], []]
+
+    def test_areasChanged(self, build_volume: BuildVolume):
+        areas = [Polygon(numpy.array([[0, 0], [10, 0], [10, 10]], numpy.float32))]
+        build_volume.setDisallowedAreas(areas)
+        assert build_volume._getNearbyDisallowedAreas([(20, 20, 30, 30)]) == [[]]
+
+        # The same list, with an area in it that was moved, still counts as other areas.
+        areas[0] = Polygon(numpy.array([[20, 20], [30, 20], [30, 30]], numpy.float32))
+        build_volume.setDisallowedAreas(areas)
+        assert build_volume._getNearbyDisallowedAreas([(20, 20, 30, 30)]) == [[areas[0]]]
+
+
+class TestComputeDisallowedAreas:
+    setting_property_dict = {"machine_disallowed_areas": {"value": []},
+                             "machine_width": {"value": 200},
+                             "machine_depth": {"value": 200},
+                             "machine_nozzle_offset_x": {"value": 0},
+                             "machine_nozzle_offset_y": {"value": 0},
+                             "nozzle_disallowed_areas": {"value": []},
+                             "prime_blob_enable": {"value": False},
+                             "extruder_prime_pos_x": {"value": 0},
+                             "extruder_prime_pos_y": {"value": 0},
+                             }
+
+    def getPropertySideEffect(*args, **kwargs):
+        properties = TestComputeDisallowedAreas.setting_property_dict.get(args[1])
+        if properties:
+            return properties.get(args[2])
+
+    def createSettings(self, machine_width = 200) -> DisallowedAreaSettings:
+        mocked_stack = MagicMock(isEnabled = True)
+        mocked_stack.getId = MagicMock(return_value = "global")
+        mocked_stack.getMetaDataEntry = MagicMock(return_value = True)
+        mocked_extruder = MagicMock(isEnabled = True)
+        mocked_extruder.getId = MagicMock(return_value = "zomg")
+        with patch.dict(self.setting_property_dict, {"machine_width": {"value": machine_width}}):
+            mocked_stack.getProperty = MagicMock(side_effect = self.getPropertySideEffect)
+            mocked_extruder.getProperty = MagicMock(side_effect = self.getPropertySideEffect)
+            global_stack = StackSettingsSnapshot(mocked_stack, ["machine_disallowed_areas", "machine_width", "machine_depth"])
+            extruder = StackSettingsSnapshot(mocked_extruder, BuildVolume._disallowed_area_extruder_settings)
+        return DisallowedAreaSettings(global_stack = global_stack, used_extruders = [extruder], active_extruders = [extruder], border_size = 0, shape = "rectangular")
+
+    def test_sameSettingsAreComputedOnce(self, build_volume: BuildVolume):
+        with patch.object(build_volume, "_computeDisallowedAreasStatic", wraps = build_volume._computeDisallowedAreasStatic) as compute_static:
+            result = build_volume._computeDisallowedAreas(self.createSettings())
+            assert build_volume._computeDisallowedAreas(self.createSettings()) is result
+            assert compute_static.call_count == 2  # Once with the border and once without.
+
+            other_result = build_volume._computeDisallowedAreas(self.createSettings(machine_width = 300))
+            assert other_result is not result
+            assert compute_static.call_count == 4
+
+    def test_outdatedJobIsIgnored(self, build_volume: BuildVolume):
+        build_volume.rebuild = MagicMock()
+        outdated_job = MagicMock()
+        outdated_job.isCancelled = MagicMock(return_value = True)
+        outdated_job.getResult = MagicMock(return_value = DisallowedAreas([MagicMock()], [], [MagicMock()]))
+
+        build_volume._onDisallowedAreasJobFinished(outdated_job)
+        assert build_volume.getDisallowedAreas() == []
+        assert not build_volume.hasErrors()
+        build_volume.rebuild.assert_not_called()
+
+    def test_jobResultIsApplied(self, build_volume: BuildVolume):
+        build_volume.rebuild = MagicMock()
+        job = MagicMock()
+        job.isCancelled = MagicMock(return_value = False)
+        error_area = MagicMock()
+        job.getResult = MagicMock(return_value = DisallowedAreas([error_area], [], [error_area]))
+        build_volume._disallowed_areas_job = job
+
+        build_volume._onDisallowedAreasJobFinished(job)
+        assert build_volume.getDisallowedAreas() == [error_area]
+        assert build_volume.hasErrors()
+        build_volume.rebuild.assert_called_once_with()
@@ -1,9 +1,13 @@
 import copy
+import math
 from unittest.mock import patch, MagicMock
 
+import numpy
 import pytest
 
 from UM.Math.Polygon import Polygon
+from UM.Math.Quaternion import Quaternion
+from UM.Math.Vector import Vector
 from UM.Mesh.MeshBuilder import MeshBuilder
 from UM.Scene.GroupDecorator import GroupDecorator
 from UM.Scene.SceneNode import SceneNode
@@ -164,6 +168,59 @@ def test_compute2DConvexHullMeshData(convex_hull_decorator):
     assert convex_hull_decorator._compute2DConvexHull() == Polygon([[5.0, -5.0], [-5.0, -5.0], [-5.0, 5.0], [5.0, 5.0]])
 
 
+def test_compute2DConvexHullSharedBetweenMeshes(convex_hull_decorator):
+    ConvexHullDecorator._shared_convex_hulls.clear()
+    node = SceneNode()
+    mb = MeshBuilder()
+    mb.addCube(10, 10, 10)
+    node.setMeshData(mb.build())
+
+    convex_hull_decorator._getSettingProperty = MagicMock(return_value = 0)
+
+    with patch("UM.Application.Application.getInstance", MagicMock(return_value=mocked_application)):
+        convex_hull_decorator.setNode(node)
+
+    mocked_stack = MagicMock()
+    mocked_stack.getProperty = MagicMock(return_value=1)
+    convex_hull_decorator._global_stack = mocked_stack
+    convex_hull_decorator._compute2DConvexHull()
+
+    # Moving the node only moves the hull.
+    node.translate(Vector(20, 0, 0))
+    with patch.object(ConvexHullDecorator, "_computeMeshConvexHull") as compute_hull:
+        assert convex_hull_decorator._compute2DConvexHull() == Polygon([[25.0, -5.0], [15.0, -5.0], [15.0, 5.0], [25.0, 5.0]])
+        compute_hull.assert_not_called()
+
+    # Another mesh with the same shape, like that of a copy of the model, uses the same hull.
+    other_mb = MeshBuilder()
+    other_mb.addCube(10, 10, 10)
+    node.setMeshData(other_mb.build())
+    with patch.object(ConvexHullDecorator, "_computeMeshConvexHull") as compute_hull:
+        assert convex_hull_decorator._compute2DConvexHull() == Polygon([[25.0, -5.0], [15.0, -5.0], [15.0, 5.0], [25.0, 5.0]])
+        compute_hull.assert_not_called()
+
+
+def test_compute2DConvexHullRotatedMeshData(convex_hull_decorator):
+    node = SceneNode()
+    mb = MeshBuilder()
+    mb.addCube(10, 10, 10)
+    node.setMeshData(mb.build())
+    node.rotate(Quaternion.fromAngleAxis(math.pi / 4, Vector.Unit_Y))
+
+    convex_hull_decorator._getSettingProperty = MagicMock(return_value = 0)
+
+    with patch("UM.Application.Application.getInstance", MagicMock(return_value=mocked_application)):
+        convex_hull_decorator.setNode(node)
+
+    mocked_stack = MagicMock()
+    mocked_stack.getProperty = MagicMock(return_value=1)
+    convex_hull_decorator._global_stack = mocked_stack
+
+    points = convex_hull_decorator._compute2DConvexHull().getPoints()
+    assert len(points) == 4
+    assert numpy.allclose(numpy.abs(points).max(axis = 0), [5 * math.sqrt(2), 5 * math.sqrt(2)], atol = 0.1)
+
+
 def test_compute2DConvexHullMeshDataGrouped(convex_hull_decorator):
     parent_node = SceneNode()
     parent_node.addDecorator(GroupDecorator())
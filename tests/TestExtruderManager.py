@@ -1,5 +1,14 @@
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from UM.Math.Vector import Vector
+from UM.Scene.SceneNode import SceneNode
+from UM.Scene.SceneNodeDecorator import SceneNodeDecorator
+from UM.Signal import Signal
+
+from cura.Scene.CuraSceneNode import CuraSceneNode
 
 
 def createMockedExtruder(extruder_id):
@@ -15,3 +24,138 @@ def test_getAllExtruderSettings(extruder_manager):
     extruder_2.getProperty = MagicMock(return_value="zomg")
     extruder_manager.getActiveExtruderStacks = MagicMock(return_value = [extruder_1, extruder_2])
     assert extruder_manager.getAllExtruderSettings("whatever", "value") == ["beep", "zomg"]
+
+
+class ExtruderDecorator(SceneNodeDecorator):
+    """Prints a node with an extruder, like the SettingOverrideDecorator does."""
+
+    def __init__(self, extruder_id):
+        super().__init__()
+        self._extruder_id = extruder_id
+        self.activeExtruderChanged = Signal()
+
+    def getActiveExtruder(self):
+        return self._extruder_id
+
+    def setActiveExtruder(self, extruder_id):
+        self._extruder_id = extruder_id
+        self.activeExtruderChanged.emit()
+
+    def getActiveExtruderChangedSignal(self):
+        return self.activeExtruderChanged
+
+    def isSliceable(self):
+        return True
+
+    def getBuildPlateNumber(self):
+        return 0
+
+    def __deepcopy__(self, memo):
+        return ExtruderDecorator(self._extruder_id)
+
+
+def createExtruderStack(extruder_id, position):
+    extruder = createMockedExtruder(extruder_id)
+    extruder.id = extruder_id
+    extruder.getMetaDataEntry = MagicMock(side_effect = lambda key, default = None: position if key == "position" else default)
+    extruder.isEnabled = True
+    extruder.getProperty = MagicMock(return_value = False)  # No support.
+    extruder.propertyChanged = Signal()
+    extruder.containersChanged = Signal()
+    extruder.enabledChanged = Signal()
+    return extruder
+
+
+used_extruder_settings = {
+    "wall_0_extruder_nr": -1, "wall_x_extruder_nr": -1, "roofing_extruder_nr": -1, "top_bottom_extruder_nr": -1, "infill_extruder_nr": -1,
+    "adhesion_type": "none", "prime_tower_brim_enable": False
+}
+
+
+@pytest.fixture
+def printer(application, container_registry):
+    """A printer with two extruders, and a scene with an object printed with the first one."""
+
+    extruders = [createExtruderStack("extruder_0", "0"), createExtruderStack("extruder_1", "1")]
+    global_stack = MagicMock()
+    global_stack.getId = MagicMock(return_value = "global")
+    global_stack.extruderList = extruders
+    global_stack.getProperty = MagicMock(side_effect = lambda key, property_name: used_extruder_settings[key])
+    global_stack.getSettingDefinition = MagicMock(return_value = None)
+    global_stack.propertyChanged = Signal()
+    global_stack.containersChanged = Signal()
+    application.getGlobalContainerStack = MagicMock(return_value = global_stack)
+    container_registry.findContainerStacks = MagicMock(side_effect = lambda id: [extruder for extruder in extruders if extruder.id == id])
+
+    root = SceneNode()
+    scene = MagicMock()
+    scene.getRoot = MagicMock(return_value = root)
+    scene.sceneChanged = Signal()
+    application.getController().getScene = MagicMock(return_value = scene)
+    application.getMultiBuildPlateModel().activeBuildPlate = 0
+
+    node = CuraSceneNode(parent = root, no_setting_override = True)
+    node.setSelectable(True)
+    node.addDecorator(ExtruderDecorator("extruder_0"))
+    with patch("UM.Settings.ContainerRegistry.ContainerRegistry.getInstance", MagicMock(return_value = container_registry)):
+        with patch("cura.CuraApplication.CuraApplication.getInstance", MagicMock(return_value = application)):
+            yield global_stack, scene, node
+
+
+def test_getUsedExtruderStacksIsRemembered(extruder_manager, printer):
+    global_stack, scene, node = printer
+    with patch.object(extruder_manager, "_findUsedExtruderStacks", wraps = extruder_manager._findUsedExtruderStacks) as find_used_extruder_stacks:
+        assert extruder_manager.getUsedExtruderStacks() == [global_stack.extruderList[0]]
+        assert extruder_manager.getUsedExtruderStacks() == [global_stack.extruderList[0]]
+
+        node.setPosition(Vector(10, 0, 0))  # Moved, but still printed with the same extruder.
+        scene.sceneChanged.emit(node)
+        assert extruder_manager.getUsedExtruderStacks() == [global_stack.extruderList[0]]
+    assert find_used_extruder_stacks.call_count == 1
+
+
+def test_getUsedExtruderStacksAfterActiveExtruderChanged(extruder_manager, printer):
+    global_stack, scene, node = printer
+    extruder_manager.getUsedExtruderStacks()
+
+    node.callDecoration("setActiveExtruder", "extruder_1")  # Only emits activeExtruderChanged, not sceneChanged.
+    assert extruder_manager.getUsedExtruderStacks() == [global_stack.extruderList[1]]
+
+
+def test_getUsedExtruderStacksAfterNodeAdded(extruder_manager, printer):
+    global_stack, scene, node = printer
+    extruder_manager.getUsedExtruderStacks()
+
+    new_node = CuraSceneNode(no_setting_override = True)
+    new_node.setSelectable(True)
+    new_node.addDecorator(ExtruderDecorator("extruder_1"))
+    new_node.setParent(scene.getRoot())
+    scene.sceneChanged.emit(new_node)
+    assert set(extruder_manager.getUsedExtruderStacks()) == set(global_stack.extruderList)
+
+
+def test_getUsedExtruderStacksAfterSettingChange(extruder_manager, printer):
+    global_stack, scene, node = printer
+    with patch.object(extruder_manager, "_findUsedExtruderStacks", wraps = extruder_manager._findUsedExtruderStacks) as find_used_extruder_stacks:
+        extruder_manager.getUsedExtruderStacks()
+        global_stack.propertyChanged.emit("infill_sparse_density", "value")
+        extruder_manager.getUsedExtruderStacks()
+        assert find_used_extruder_stacks.call_count == 1
+
+        used_extruder_settings["infill_extruder_nr"] = 1
+        try:
+            global_stack.propertyChanged.emit("infill_extruder_nr", "value")
+            assert set(extruder_manager.getUsedExtruderStacks()) == set(global_stack.extruderList)
+        finally:
+            used_extruder_settings["infill_extruder_nr"] = -1
+        assert find_used_extruder_stacks.call_count == 2
+
+
+def test_getUsedExtruderStacksBeforeExtrudersRegistered(extruder_manager, printer):
+    global_stack, scene, node = printer
+    extruders = global_stack.extruderList
+    global_stack.extruderList = []
+    assert extruder_manager.getUsedExtruderStacks() == []
+
+    global_stack.extruderList = extruders  # Registered without a signal that the used extruders follow.
+    assert extruder_manager.getUsedExtruderStacks() == [extruders[0]]
@@ -0,0 +1,33 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+from cura.Scene.GCodeChunkList import GCodeChunkList
+
+
+def test_encodedChunks():
+    gcode_list = GCodeChunkList()
+    gcode_list.appendEncoded(b";LAYER:0\nG1 X10\n")
+    gcode_list.appendEncoded(";LAYER:1\n; °C\n".encode("utf-8"))
+    gcode_list.insertEncoded(0, b";FLAVOR:Marlin\n")
+
+    assert len(gcode_list) == 3
+    assert gcode_list[0] == ";FLAVOR:Marlin\n"
+    assert gcode_list[-1] == ";LAYER:1\n; °C\n"
+    assert gcode_list[1:] == [";LAYER:0\nG1 X10\n", ";LAYER:1\n; °C\n"]
+    assert gcode_list.getEncoded(2) == ";LAYER:1\n; °C\n".encode("utf-8")
+
+
+def test_changedChunks():
+    gcode_list = GCodeChunkList([b";FLAVOR:Marlin\n", b";LAYER:0\n"])
+    gcode_list[0] += ";POSTPROCESSED\n"
+    gcode_list.append(";END\n")
+
+    assert gcode_list == [";FLAVOR:Marlin\n;POSTPROCESSED\n", ";LAYER:0\n", ";END\n"]
+    assert list(gcode_list.iterEncoded()) == [b";FLAVOR:Marlin\n;POSTPROCESSED\n", b";LAYER:0\n", b";END\n"]
+    assert "".join(gcode_list) == ";FLAVOR:Marlin\n;POSTPROCESSED\n;LAYER:0\n;END\n"
+
+
+def test_invalidUtf8IsReplaced():
+    gcode_list = GCodeChunkList([b"G1 X10 ;\xff\n"])
+    assert gcode_list[0] == "G1 X10 ;�\n"
+    assert gcode_list.getEncoded(0) == b"G1 X10 ;\xff\n"  # Written to files as the engine sent it.
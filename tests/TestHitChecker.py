@@ -138,4 +138,51 @@ def test_canPrintNodesInProvidedOrder():
         assert not hit_checker.canPrintNodesInProvidedOrder([node2, node1, node3])
         assert not hit_checker.canPrintNodesInProvidedOrder([node2, node3, node1])
         assert not hit_checker.canPrintNodesInProvidedOrder([node3, node1, node2])
-        assert not hit_checker.canPrintNodesInProvidedOrder([node3, node2, node1])
\ No newline at end of file
+        assert not hit_checker.canPrintNodesInProvidedOrder([node3, node2, node1])
+
+def test_getHitMatrix():
+    node1 = CuraSceneNode(no_setting_override=True)
+    node2 = CuraSceneNode(no_setting_override=True)
+    hit_map = {
+        node1: {node1: 0, node2: 1},
+        node2: {node1: 0, node2: 0}
+    }
+
+    with patch.object(HitChecker, "_buildHitMap", return_value=hit_map):
+        hit_checker = HitChecker([node1, node2])
+        assert hit_checker.getHitMatrix([node1, node2]).tolist() == [[False, True], [False, False]]
+        assert hit_checker.getHitMatrix([node2, node1]).tolist() == [[False, False], [True, False]]
+
+
+def test_getNodesOrderedAutomatically():
+    node1 = CuraSceneNode(no_setting_override=True)
+    node2 = CuraSceneNode(no_setting_override=True)
+    node3 = CuraSceneNode(no_setting_override=True)
+
+    # nodes can be printed only in order node1 -> node2 -> node3
+    hit_map = {
+        node1: {node1: 0, node2: 0, node3: 0},
+        node2: {node1: 1, node2: 0, node3: 0},
+        node3: {node1: 1, node2: 1, node3: 0},
+    }
+
+    with patch.object(HitChecker, "_buildHitMap", return_value=hit_map):
+        hit_checker = HitChecker([node1, node2, node3])
+        assert OneAtATimeIterator._getNodesOrderedAutomatically(hit_checker, [node3, node1, node2]) == [node1, node2, node3]
+
+
+def test_getNodesOrderedAutomatically_Cycle():
+    node1 = CuraSceneNode(no_setting_override=True)
+    node2 = CuraSceneNode(no_setting_override=True)
+    node3 = CuraSceneNode(no_setting_override=True)
+
+    # node1 -> node2 -> node3 -> node1
+    hit_map = {
+        node1: {node1: 0, node2: 0, node3: 1},
+        node2: {node1: 1, node2: 0, node3: 0},
+        node3: {node1: 0, node2: 1, node3: 0},
+    }
+
+    with patch.object(HitChecker, "_buildHitMap", return_value=hit_map):
+        hit_checker = HitChecker([node1, node2, node3])
+        assert OneAtATimeIterator._getNodesOrderedAutomatically(hit_checker, [node1, node2, node3]) == []
@@ -0,0 +1,143 @@
+from unittest.mock import patch
+
+import numpy
+
+from cura.LayerDataBuilder import LayerDataBuilder
+from cura.LayerPolygon import LayerPolygon
+
+color_map = numpy.array([[i / 12, 0.5, 0.5, 1.0] for i in range(12)], dtype = numpy.float32)
+material_color_map = numpy.array([[1.0, 0.0, 0.0, 1.0], [0.0, 1.0, 0.0, 1.0]], dtype = numpy.float32)
+
+
+def createPolygon(extruder, line_types):
+    line_count = len(line_types)
+    line_types = numpy.array(line_types, dtype = numpy.uint8).reshape((-1, 1))
+    points = numpy.arange((line_count + 1) * 3, dtype = numpy.float32).reshape((-1, 3))
+    line_widths = numpy.full((line_count, 1), 0.4, dtype = numpy.float32)
+    line_thicknesses = numpy.full((line_count, 1), 0.2, dtype = numpy.float32)
+    line_feedrates = numpy.full((line_count, 1), 50, dtype = numpy.float32)
+    polygon = LayerPolygon(extruder, line_types, points, line_widths, line_thicknesses, line_feedrates)
+    polygon.buildCache()
+    return polygon
+
+
+def fillBuilder(builder, layer_numbers):
+    for layer_number in layer_numbers:
+        builder.addLayer(layer_number)
+        builder.getLayer(layer_number).polygons.append(createPolygon(layer_number % 2, [LayerPolygon.Inset0Type, LayerPolygon.MoveCombingType, LayerPolygon.InfillType]))
+
+
+@patch.object(LayerPolygon, "getColorMap", lambda: color_map)
+def test_appendLayerMatchesBuild():
+    full_builder = LayerDataBuilder()
+    fillBuilder(full_builder, [0, 1, 2])
+    full = full_builder.build(material_color_map)
+
+    incremental_builder = LayerDataBuilder()
+    fillBuilder(incremental_builder, [0, 1, 2])
+    for layer_number in [0, 1, 2]:
+        assert incremental_builder.appendLayer(layer_number, material_color_map)
+    incremental = incremental_builder.build(material_color_map)
+
+    assert numpy.array_equal(full.getVertices(), incremental.getVertices())
+    assert numpy.array_equal(full.getIndices(), incremental.getIndices())
+    assert numpy.array_equal(full.getColors(), incremental.getColors())
+    assert full.getElementCounts() == incremental.getElementCounts()
+
+
+@patch.object(LayerPolygon, "getColorMap", lambda: color_map)
+def test_buildPartialResult():
+    builder = LayerDataBuilder()
+    fillBuilder(builder, [0])
+    builder.appendLayer(0, material_color_map)
+    partial = builder.build(material_color_map)
+    partial_vertices = partial.getVertices().copy()
+
+    fillBuilder(builder, [1])
+    builder.appendLayer(1, material_color_map)
+    complete = builder.build(material_color_map)
+
+    assert list(partial.getLayers().keys()) == [0]
+    assert list(complete.getLayers().keys()) == [0, 1]
+    assert numpy.array_equal(partial.getVertices(), partial_vertices)  # Appending more layers doesn't change earlier results.
+    assert complete.getVertices().shape[0] > partial.getVertices().shape[0]
+
+
+@patch.object(LayerPolygon, "getColorMap", lambda: color_map)
+def test_appendLayerOutOfOrder():
+    builder = LayerDataBuilder()
+    fillBuilder(builder, [0, 2])
+    builder.appendLayer(2, material_color_map)
+    fillBuilder(builder, [1])
+    assert not builder.appendLayer(1, material_color_map)  # Would end up after layer 2 in the buffers.
+
+    ordered_builder = LayerDataBuilder()
+    fillBuilder(ordered_builder, [0, 1, 2])
+    assert numpy.array_equal(builder.build(material_color_map).getVertices(), ordered_builder.build(material_color_map).getVertices())
+    assert builder.getAppendedLayers() == [0, 1, 2]
+
+
+@patch.object(LayerPolygon, "getColorMap", lambda: color_map)
+def test_buildBatchedPolygons():
+    separate_builder = LayerDataBuilder()
+    separate_builder.addLayer(0)
+    first = createPolygon(0, [LayerPolygon.Inset0Type, LayerPolygon.Inset0Type])
+    second = createPolygon(1, [LayerPolygon.InfillType, LayerPolygon.MoveCombingType, LayerPolygon.InfillType])
+    separate_builder.getLayer(0).polygons.extend([first, second])
+    separate = separate_builder.build(material_color_map)
+
+    batched_builder = LayerDataBuilder()
+    batched_builder.addLayer(0)
+    batch = LayerPolygon(numpy.array([0, 1]), numpy.concatenate((first.types, second.types)),
+                         numpy.concatenate((first.data, second.data)),
+                         numpy.concatenate((first.lineWidths, second.lineWidths)),
+                         numpy.concatenate((first.lineThicknesses, second.lineThicknesses)),
+                         numpy.concatenate((first.lineFeedrates, second.lineFeedrates)),
+                         numpy.array([0, 2, 5]))
+    batch.buildCache()
+    batched_builder.getLayer(0).polygons.append(batch)
+    batched = batched_builder.build(material_color_map)
+
+    assert numpy.array_equal(separate.getVertices(), batched.getVertices())
+    assert numpy.array_equal(separate.getIndices(), batched.getIndices())
+    assert numpy.array_equal(separate.getAttribute("extruders")["value"], batched.getAttribute("extruders")["value"])
+    assert numpy.allclose(batch.lineLengths, numpy.concatenate((first.lineLengths, second.lineLengths)))
+    assert batch.polygonCount == 2
+
+
+@patch.object(LayerPolygon, "getColorMap", lambda: color_map)
+def test_buildCompact():
+    builder = LayerDataBuilder()
+    fillBuilder(builder, [0, 1, 2])
+    full = builder.build(material_color_map)
+
+    compact_builder = LayerDataBuilder(compact = True)
+    fillBuilder(compact_builder, [0, 1])
+    compact_builder.appendLayer(0, material_color_map)
+    compact_builder.appendLayer(1, material_color_map)
+    fillBuilder(compact_builder, [2])
+    compact = compact_builder.build(material_color_map)
+
+    assert compact.isCompact()
+    assert compact.getColors() is None
+    assert numpy.array_equal(full.getVertices(), compact.getVertices())
+    assert numpy.array_equal(full.getIndices(), compact.getIndices())
+    assert full.getElementCounts() == compact.getElementCounts()
+
+    # Decode the packed attributes the way the layer shader does.
+    line_info = compact.getAttribute("line_info")["value"]
+    line_types = numpy.mod(line_info, 16)
+    assert numpy.array_equal(line_types, full.getAttribute("line_types")["value"])
+    assert numpy.array_equal(numpy.floor(line_info / 256), full.getAttribute("extruders")["value"])
+    prev_line_types = numpy.mod(numpy.floor(line_info / 16), 16)
+    assert prev_line_types[0] == LayerPolygon.MoveCombingType
+    assert numpy.array_equal(prev_line_types[1:], line_types[:-1])
+    packed_line_dimensions = compact.getAttribute("line_dimensions")["value"]
+    line_dimensions = numpy.stack((numpy.mod(packed_line_dimensions, 4096), numpy.floor(packed_line_dimensions / 4096)), axis = 1) / 1000
+    assert numpy.allclose(line_dimensions, full.getAttribute("line_dimensions")["value"])
+
+    assert numpy.array_equal(compact.getLineTypeColors()[line_types.astype(int)], full.getColors())
+    material_colors = compact.getMaterialColors()[numpy.floor(line_info / 256).astype(int)]
+    travel_moves = (line_types == LayerPolygon.MoveCombingType) | (line_types == LayerPolygon.MoveRetractionType)
+    material_colors[travel_moves] = full.getColors()[travel_moves]
+    assert numpy.array_equal(material_colors, full.getAttribute("colors")["value"])
@@ -0,0 +1,98 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import numpy
+import pytest
+
+from UM.Math.Polygon import Polygon
+
+from cura.Arranging.Nest2DArrange import Nest2DArrange, _PlacedItem
+
+
+def createBuildVolume(disallowed_areas):
+    build_volume = MagicMock()
+    build_volume.getEdgeDisallowedSize = MagicMock(return_value = 0)
+    build_volume.getWidth = MagicMock(return_value = 200)
+    build_volume.getDepth = MagicMock(return_value = 200)
+    build_volume.getDisallowedAreas = MagicMock(return_value = disallowed_areas)
+    return build_volume
+
+
+@pytest.fixture(autouse = True)
+def clearCaches():
+    Nest2DArrange._converted_points_cache.clear()
+    Nest2DArrange._disallowed_area_cache = None
+    yield
+    Nest2DArrange._converted_points_cache.clear()
+    Nest2DArrange._disallowed_area_cache = None
+
+
+def test_toIntegerPoints():
+    arranger = Nest2DArrange([], createBuildVolume([]), factor = 100)
+    points = numpy.array([[0.5, -1.25], [2.0, 3.999]], numpy.float32)
+
+    result = arranger._toIntegerPoints(points)
+
+    assert result.dtype == numpy.int64
+    assert result.tolist() == [[50, -125], [200, 399]]  # Truncated towards zero, like int() does.
+
+
+def test_getConvertedPointsIsCached():
+    points = numpy.array([[0, 0], [10, 0], [10, 10]], numpy.int64)
+
+    converted_points = Nest2DArrange._getConvertedPoints(points)
+
+    assert [(point.x(), point.y()) for point in converted_points] == [(0, 0), (10, 0), (10, 10)]
+    assert Nest2DArrange._getConvertedPoints(points.copy()) is converted_points  # Same points, so the same result.
+    assert Nest2DArrange._getConvertedPoints(points + 1) is not converted_points
+
+
+def test_getConvertedPointsCacheIsLimited():
+    with patch.object(Nest2DArrange, "_maximum_cache_size", 2):
+        for i in range(3):
+            Nest2DArrange._getConvertedPoints(numpy.array([[i, 0], [0, i]], numpy.int64))
+
+        assert len(Nest2DArrange._converted_points_cache) <= 2
+
+
+def test_getDisallowedAreaPointsIsCached():
+    area = Polygon(numpy.array([[-10, -10], [10, -10], [10, 10], [-10, 10]], numpy.float32))
+    build_volume = createBuildVolume([area])
+    arranger = Nest2DArrange([], build_volume)
+
+    with patch.object(Polygon, "intersectionConvexHulls", autospec = True, side_effect = Polygon.intersectionConvexHulls) as intersect:
+        disallowed_points = arranger._getDisallowedAreaPoints(200, 200)
+        assert arranger._getDisallowedAreaPoints(200, 200) is disallowed_points
+        assert intersect.call_count == 1  # Only clipped once.
+
+        # Once the disallowed areas change, they are clipped again.
+        build_volume.getDisallowedAreas = MagicMock(return_value = [area.translate(5, 0)])
+        assert arranger._getDisallowedAreaPoints(200, 200) is not disallowed_points
+        assert intersect.call_count == 2
+
+
+def test_placedItem():
+    item = _PlacedItem(0, 1500, -2500, 1.5)
+
+    assert item.binId() == 0
+    assert item.translation().x() == 1500
+    assert item.translation().y() == -2500
+    assert item.rotation() == 1.5
+    assert not item.isFixed()
+
+
+def test_shouldNotNestInParallelOnMainThread():
+    with patch("os.cpu_count", MagicMock(return_value = 8)):
+        assert not Nest2DArrange._shouldNestInParallel(Nest2DArrange._parallel_nesting_minimum_item_count)  # Would freeze the interface.
+        assert not Nest2DArrange._shouldNestInParallel(Nest2DArrange._parallel_nesting_minimum_item_count - 1)
+
+        result = []
+        with patch("UM.Application.Application.getInstance") as get_instance:
+            get_instance.return_value.getPreferences.return_value.getValue = MagicMock(return_value = True)
+            thread = threading.Thread(target = lambda: result.append(Nest2DArrange._shouldNestInParallel(Nest2DArrange._parallel_nesting_minimum_item_count)))
+            thread.start()
+            thread.join()
+        assert result == [True]
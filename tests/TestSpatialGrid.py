@@ -0,0 +1,40 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import numpy
+
+from UM.Math.Polygon import Polygon
+
+from cura.Scene.SpatialGrid import SpatialGrid
+
+
+def test_query():
+    grid = SpatialGrid(10)
+    grid.insert("a", (0, 0, 5, 5))
+    grid.insert("b", (20, 20, 25, 25))
+    grid.insert("c", (4, 4, 21, 21))  # Spans multiple cells.
+
+    assert len(grid) == 3
+    assert grid.query((1, 1, 2, 2)) == ["a"]
+    assert grid.query((3, 3, 4, 4)) == ["a", "c"]
+    assert grid.query((22, 22, 30, 30)) == ["b"]
+    assert grid.query((5, 5, 20, 20)) == ["a", "b", "c"]  # Touching rectangles are found too.
+    assert grid.query((50, 50, 60, 60)) == []
+    assert grid.query((-10, -10, -1, -1)) == []
+
+
+def test_queryLargeItems():
+    grid = SpatialGrid(1)
+    grid.insert("small", (0, 0, 1, 1))
+    grid.insert("large", (-500, -500, 500, 500))
+    assert grid.query((100, 100, 101, 101)) == ["large"]
+    assert grid.query((-1000, -1000, 1000, 1000)) == ["small", "large"]
+
+
+def test_getPolygonRectangle():
+    hull = Polygon(numpy.array([[0, 0], [10, 0], [10, 5]], numpy.float32))
+    head_hull = Polygon(numpy.array([[-2, -1], [3, 8]], numpy.float32))
+    assert SpatialGrid.getPolygonRectangle(hull) == (0, 0, 10, 5)
+    assert SpatialGrid.getPolygonRectangle(hull, head_hull) == (-2, -1, 10, 8)
+    assert SpatialGrid.getPolygonRectangle(None, Polygon()) is None
+    assert SpatialGrid.translateRectangle((0, 0, 10, 5), 1, -1) == (1, -1, 11, 4)
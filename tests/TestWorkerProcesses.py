@@ -0,0 +1,12 @@
+# Copyright (c) 2026 UltiMaker
+# Cura is released under the terms of the LGPLv3 or higher.
+
+import os
+
+from cura.Utils.WorkerProcesses import getImportPath
+
+
+def test_getImportPath():
+    plugin_file = os.path.join(os.path.abspath(os.sep), "plugins", "GCodeReader", "FlavorParser.py")
+    assert getImportPath("GCodeReader.FlavorParser", plugin_file) == os.path.join(os.path.abspath(os.sep), "plugins")
+    assert getImportPath("FlavorParser", plugin_file) == os.path.join(os.path.abspath(os.sep), "plugins", "GCodeReader")